@@ -34,6 +34,14 @@ class Config:
     FARE_API_HOST = os.getenv('FARE_API_HOST', '0.0.0.0')
     FARE_API_PORT = int(os.getenv('FARE_API_PORT', 5001))
     
+    # Fare Service workers started by start_services.py. With GTFS_PRELOAD the
+    # launcher loads every GTFS table once and forks the workers from it, so
+    # they share the data copy-on-write instead of each holding a copy.
+    # Several workers share one listening socket, which needs fork: on
+    # Windows the launcher starts a single worker whatever this is set to.
+    FARE_API_WORKERS = int(os.getenv('FARE_API_WORKERS', 1))
+    GTFS_PRELOAD = os.getenv('GTFS_PRELOAD', 'False').lower() == 'true'
+    
     # ==================== CORS Configuration ====================
     # Parse comma-separated origins from environment variable
     _cors_origins_str = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:3001')
@@ -63,10 +71,65 @@ class Config:
     GTFS_CALENDAR = GTFS_DIR / 'calendar.txt'
     GTFS_AGENCY = GTFS_DIR / 'agency.txt'
     GTFS_TRANSLATIONS = GTFS_DIR / 'translations.txt'
+    GTFS_FEED_INFO = GTFS_DIR / 'feed_info.txt'
+    
+    # Read tables straight out of a GTFS zip instead of GTFS_DIR (streamed in chunks)
+    GTFS_ZIP_PATH = Path(os.environ['GTFS_ZIP_PATH']) if os.getenv('GTFS_ZIP_PATH') else None
+    GTFS_CHUNK_ROWS = int(os.getenv('GTFS_CHUNK_ROWS', 100000))
+    
+    # Name the feed in GTFS_DIR (or GTFS_ZIP_PATH) is served under; requests
+    # without a feed parameter use it
+    GTFS_FEED_NAME = os.getenv('GTFS_FEED_NAME', 'bmtc')
+    # Further feeds served side by side: name -> directory, file extension
+    # and the tables it cannot be served without
+    GTFS_EXTRA_FEEDS = {
+        'kaggle': {
+            'dir': DATASET_DIR / 'kaggle',
+            'extension': '.csv',
+            'required': ['stops', 'routes', 'trips']
+        }
+    }
+    # Evict least recently used feeds above this many MB of tables and built indexes (0: no limit)
+    GTFS_FEED_MEMORY_BUDGET_MB = int(os.getenv('GTFS_FEED_MEMORY_BUDGET_MB', 0))
+    
+    # Validate each GTFS table at load and reject tables with errors
+    GTFS_VALIDATION_ENABLED = os.getenv('GTFS_VALIDATION_ENABLED', 'True').lower() == 'true'
+    
+    # Columnar snapshot cache (memory-mapped on later starts)
+    GTFS_SNAPSHOT_ENABLED = os.getenv('GTFS_SNAPSHOT_ENABLED', 'True').lower() == 'true'
+    GTFS_SNAPSHOT_DIR = OUTPUT_DIR / os.getenv('GTFS_SNAPSHOT_DIRNAME', 'gtfs_snapshot')
+    # Adopt lookup indexes pre-built by `python gtfs_index.py compile` at startup
+    GTFS_INDEX_BUNDLE_ENABLED = os.getenv('GTFS_INDEX_BUNDLE_ENABLED', 'True').lower() == 'true'
+    
+    # Hot reload: poll the GTFS files and swap in a new feed without a restart
+    GTFS_RELOAD_ENABLED = os.getenv('GTFS_RELOAD_ENABLED', 'False').lower() == 'true'
+    GTFS_RELOAD_INTERVAL = int(os.getenv('GTFS_RELOAD_INTERVAL', 60))  # seconds
+    # Apply only changed rows of a new feed instead of reloading every table
+    GTFS_DIFF_ENABLED = os.getenv('GTFS_DIFF_ENABLED', 'True').lower() == 'true'
     
     # Training data
     TRAINING_DATA_PATH = DATASET_DIR / os.getenv('TRAINING_DATA_FILENAME', 'training_data_v2.csv')
     
+    # ==================== Stop Search ====================
+    # Fall back to typo-tolerant matching ("Majestc", "Silkboard") when a stop
+    # name has no exact, prefix or substring match
+    STOP_SEARCH_FUZZY = os.getenv('STOP_SEARCH_FUZZY', 'True').lower() == 'true'
+    STOP_SEARCH_FUZZY_LIMIT = int(os.getenv('STOP_SEARCH_FUZZY_LIMIT', 10))  # suggestions returned by stop search
+    STOP_AUTOCOMPLETE_LIMIT = int(os.getenv('STOP_AUTOCOMPLETE_LIMIT', 10))  # default autocomplete page size
+    STOP_AUTOCOMPLETE_MAX_LIMIT = int(os.getenv('STOP_AUTOCOMPLETE_MAX_LIMIT', 50))  # largest page a client may request
+    STOP_RESOLVE_MAX_BATCH = int(os.getenv('STOP_RESOLVE_MAX_BATCH', 500))  # names per batch resolve request
+    STOP_SEARCH_CACHE_SIZE = int(os.getenv('STOP_SEARCH_CACHE_SIZE', 2048))  # cached search/autocomplete results (with CACHE_ENABLED)
+    
+    # Nearby stop lookups
+    NEARBY_STOPS_LIMIT = int(os.getenv('NEARBY_STOPS_LIMIT', 5))  # default stops per point
+    NEARBY_STOPS_MAX_LIMIT = int(os.getenv('NEARBY_STOPS_MAX_LIMIT', 50))  # most stops per point
+    NEARBY_STOPS_MAX_RADIUS_KM = float(os.getenv('NEARBY_STOPS_MAX_RADIUS_KM', 5.0))  # largest search radius
+    NEARBY_STOPS_MAX_BATCH = int(os.getenv('NEARBY_STOPS_MAX_BATCH', 100))  # points per batch request
+    
+    # Stations: close stops with similar names (both directions, "Gate" / "Cross") grouped at load time
+    STATION_CLUSTER_RADIUS_M = float(os.getenv('STATION_CLUSTER_RADIUS_M', 200))  # largest distance between linked stops
+    STATION_SEARCH_LIMIT = int(os.getenv('STATION_SEARCH_LIMIT', 20))  # stations returned by station search
+    
     # ==================== Distance and Fare Calculation ====================
     # Distance thresholds (in kilometers)
     DISTANCE_THRESHOLD_TIER1 = float(os.getenv('DISTANCE_TIER1', 2.0))   # Up to 2 km
@@ -81,6 +144,12 @@ class Config:
     FARE_TIER4 = float(os.getenv('FARE_TIER4', 20.0))   # 10-15 km: ₹20
     FARE_TIER5 = float(os.getenv('FARE_TIER5', 25.0))   # 15+ km: ₹25
     
+    # Dense zone x zone fare matrix (one byte per cell for up to 254 fare
+    # outcomes); feeds with more fare zones answer from the fare rule index
+    FARE_MATRIX_MAX_ZONES = int(os.getenv('FARE_MATRIX_MAX_ZONES', 12000))  # zones above which the dense matrix is skipped for the rule index
+    FARE_BATCH_MAX_SIZE = int(os.getenv('FARE_BATCH_MAX_SIZE', 1000))  # pairs per batch fare request
+    FARE_EXPORT_MAX_STOPS = int(os.getenv('FARE_EXPORT_MAX_STOPS', 2000))  # rows (and columns) of an exported fare matrix
+    
     # Default fallback fare
     DEFAULT_FARE = float(os.getenv('DEFAULT_FARE', 10.0))
     
@@ -296,6 +365,9 @@ class TestingConfig(Config):
     
     # Disable external services
     CACHE_ENABLED = False
+    GTFS_SNAPSHOT_ENABLED = False
+    GTFS_INDEX_BUNDLE_ENABLED = False
+    GTFS_RELOAD_ENABLED = False
     RATE_LIMIT_ENABLED = False
     METRICS_ENABLED = False
     
@@ -0,0 +1,710 @@
+"""
+Fare Rule Lookup Engine for BMTC Fare Service
+
+calculate_fare used to answer every request with boolean masks over the
+whole fare_rules table (1.36M rows in the BMTC feed): the forward pair, the
+reverse pair, the route filter, contains_id, and then fare_attributes for
+the price. FareRuleIndex does that work once, when the tables load:
+
+- zone and route ids are numbered, and every rule's (origin, destination)
+  and (origin, destination, route) is packed into one int64 key
+- the first rule of each key is kept in a hash index (pandas Index over the
+  int64 keys: a compact khash table rather than a dict of tuples)
+- contains_id -> first rule, in a dict (few zones)
+- fare_id -> (price, currency) as a small table; every rule stores the
+  ordinal of its fare in an int32 array (NO_FARE for unknown fare_ids)
+
+A lookup is at most a handful of hash probes and array reads, whatever the
+number of rules. Precedence is that of the scan: the first rule in file
+order for the forward pair, else the reverse pair; a rule for the requested
+route wins within that direction; then the first contains_id rule for
+either zone. scan_fare keeps the scan as the reference.
+
+FareMatrix goes one step further for requests without a route: it resolves
+every zone pair once into a dense zone x zone array of small integers
+(ordinals into a table of fare outcomes), maps stops to zones through
+stops.zone_id, and can be written to an .npy file that all workers
+memory-map instead of each holding the fare tables.
+
+Pairs without a GTFS fare are priced by distance: haversine_km and
+distance_band_fares work on arrays of stop pairs and read the bands from
+config.get_fare_tiers().
+
+Usage:
+    from fare_engine import FareRuleIndex, FareMatrix
+
+    index = FareRuleIndex(data['fare_rules'], data['fare_attributes'])
+    index.lookup('1', '3', route_id='V-500')
+    # {'fare_id': 'fare_2', 'price': 10.0, 'currency': 'INR', 'route_id': 'V-500'}
+
+    matrix = FareMatrix(index, stops['stop_id'], stops['zone_id'])
+    matrix.save(path)                   # memory-map the cells from path
+    matrix.lookup('1', '3')             # same result, two array reads
+
+    python fare_engine.py benchmark     # time lookups on a full-size rules table
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from config import config
+
+# Fare ordinal of rules whose fare_id has no fare_attributes row
+NO_FARE = -1
+
+# Size of the BMTC fare_rules table
+FULL_RULES = 1_360_000
+
+
+def _column(df: pd.DataFrame, name: str) -> Optional[np.ndarray]:
+    """Column values as an object array, or None if the column is missing"""
+    return df[name].to_numpy(dtype=object) if name in df.columns else None
+
+
+class FareRuleIndex:
+    """
+    Hash lookups of fare rules by zone pair and route, built once.
+
+    Results are the same dicts calculate_fare returns for GTFS fares.
+    """
+
+    def __init__(self, rules: Optional[pd.DataFrame], fares: Optional[pd.DataFrame]):
+        """
+        Args:
+            rules: fare_rules table (None for feeds without fare tables)
+            fares: fare_attributes table (None for feeds without fare tables)
+        """
+        if rules is None:
+            rules = pd.DataFrame()
+        if fares is None:
+            fares = pd.DataFrame(columns=['fare_id', 'price', 'currency_type'])
+
+        # Fare table: fare_id -> ordinal of its first fare_attributes row
+        self.fare_codes: Dict[Any, int] = {}
+        self.fare_ids: List[Any] = []
+        prices: List[float] = []
+        self.currencies: List[Any] = []
+        for fare_id, price, currency in zip(
+            fares['fare_id'].tolist(), fares['price'].tolist(), fares['currency_type'].tolist()
+        ):
+            if fare_id not in self.fare_codes:
+                self.fare_codes[fare_id] = len(self.fare_ids)
+                self.fare_ids.append(fare_id)
+                prices.append(float(price))
+                self.currencies.append(currency)
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+        count = len(rules)
+        rule_fare_ids = _column(rules, 'fare_id')
+        self.route_ids = _column(rules, 'route_id')
+        if rule_fare_ids is None:
+            self.rule_fares = np.full(count, NO_FARE, dtype=np.int32)
+        else:
+            self.rule_fares = pd.Series(rule_fare_ids, dtype=object).map(self.fare_codes).fillna(NO_FARE).to_numpy(dtype=np.int32)
+
+        # Zones (origin and destination share one numbering) and routes
+        origins, destinations = _column(rules, 'origin_id'), _column(rules, 'destination_id')
+        if origins is None or destinations is None:
+            origins = destinations = np.full(count, None, dtype=object)
+        zones = pd.Index(pd.unique(pd.Series(np.concatenate([origins, destinations])).dropna()))
+        routes = pd.Index(pd.unique(pd.Series(self.route_ids).dropna())) if self.route_ids is not None else pd.Index([])
+        origin_codes = zones.get_indexer(origins).astype(np.int64)
+        destination_codes = zones.get_indexer(destinations).astype(np.int64)
+        route_codes = (routes.get_indexer(self.route_ids).astype(np.int64)
+                       if self.route_ids is not None else np.full(count, -1, dtype=np.int64))
+        # Zones and routes number in the thousands, so plain dicts are the fastest probe
+        self._zones: Dict[Any, int] = {zone: code for code, zone in enumerate(zones)}
+        self._routes: Dict[Any, int] = {route: code for code, route in enumerate(routes)}
+
+        # First rule of each (origin, destination) and (origin, destination, route)
+        paired = (origin_codes >= 0) & (destination_codes >= 0)
+        pair_keys = origin_codes * len(self._zones) + destination_codes
+        self._pairs, self._pair_rows = self._first_rows(pair_keys, paired)
+        routed = paired & (route_codes >= 0)
+        self._route_pairs, self._route_pair_rows = self._first_rows(pair_keys * max(len(self._routes), 1) + route_codes, routed)
+
+        self.contains: Dict[Any, int] = {}
+        contains_ids = _column(rules, 'contains_id')
+        if contains_ids is not None:
+            for position, zone in enumerate(contains_ids.tolist()):
+                if not pd.isna(zone):
+                    self.contains.setdefault(zone, position)
+
+    @staticmethod
+    def _first_rows(keys: np.ndarray, valid: np.ndarray):
+        """Distinct keys (as a hash index) and the first rule row holding each"""
+        rows = np.flatnonzero(valid)
+        unique_keys, first = np.unique(keys[rows], return_index=True)
+        return pd.Index(unique_keys), rows[first].astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.rule_fares)
+
+    @staticmethod
+    def _probe(index: pd.Index, rows: np.ndarray, key: int) -> Optional[int]:
+        """Rule row stored for key, or None"""
+        try:
+            return int(rows[index.get_loc(key)])
+        except KeyError:
+            return None
+
+    def pair_rule(self, origin_id, destination_id, route_id=None) -> Optional[int]:
+        """
+        Find the rule for a zone pair, trying the reverse direction if needed.
+
+        Args:
+            origin_id: Origin zone (or stop) id
+            destination_id: Destination zone (or stop) id
+            route_id: Prefer a rule for this route within the direction found
+
+        Returns:
+            fare_rules row, or None if neither direction has a rule
+        """
+        origin, destination = self._zones.get(origin_id), self._zones.get(destination_id)
+        if origin is None or destination is None:
+            return None
+        zones = len(self._zones)
+        for key in (origin * zones + destination, destination * zones + origin):
+            row = self._probe(self._pairs, self._pair_rows, key)
+            if row is None:
+                continue
+            route = self._routes.get(route_id) if route_id else None
+            if route is not None:
+                routed = self._probe(self._route_pairs, self._route_pair_rows, key * len(self._routes) + route)
+                if routed is not None:
+                    return routed
+            return row
+        return None
+
+    def knows(self, zone_id) -> bool:
+        """Whether any rule names zone_id as origin, destination or contains_id"""
+        return zone_id in self._zones or zone_id in self.contains
+
+    def _result(self, row: int) -> Dict[str, Any]:
+        fare = self.rule_fares[row]
+        return {
+            'fare_id': self.fare_ids[fare],
+            'price': float(self.prices[fare]),
+            'currency': self.currencies[fare],
+            'route_id': self.route_ids[row] if self.route_ids is not None else None
+        }
+
+    def lookup(self, origin_id, destination_id, route_id=None) -> Optional[Dict[str, Any]]:
+        """
+        Find the GTFS fare between two zones (or stops).
+
+        Args:
+            origin_id: Origin zone (or stop) id
+            destination_id: Destination zone (or stop) id
+            route_id: Prefer rules for this route
+
+        Returns:
+            Dict with fare_id, price, currency and route_id (and source
+            'contains_zone' for the contains_id fallback), or None
+        """
+        origin_id, destination_id = str(origin_id), str(destination_id)
+        row = self.pair_rule(origin_id, destination_id, route_id)
+        if row is not None and self.rule_fares[row] != NO_FARE:
+            return self._result(row)
+
+        # Rules that contain either zone; the first one in file order wins
+        contains_rows = [self.contains[zone] for zone in (origin_id, destination_id) if zone in self.contains]
+        if contains_rows:
+            row = min(contains_rows)
+            if self.rule_fares[row] != NO_FARE:
+                return {**self._result(row), 'source': 'contains_zone'}
+        return None
+
+
+# ==================== Zone fare matrix ====================
+
+def _cell_dtype(outcomes: int) -> np.dtype:
+    """Smallest unsigned dtype holding every outcome ordinal plus the empty cell"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if outcomes < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+class FareMatrix:
+    """
+    Dense zone-to-zone fares, resolved once from a FareRuleIndex.
+
+    cells[origin, destination] holds the ordinal of the pair's fare outcome
+    (its fare and whether it came from contains_id), or empty when GTFS has
+    no fare for the pair. Outcomes do not depend on routes, so they number
+    about twice the fares in use, and cells use the smallest unsigned dtype
+    that fits them (one byte with up to 254). A lookup is a zone id probe and
+    two array reads; when the rules name routes, the route of the rule that
+    priced the pair is read from the rule index as well.
+
+    After save() the cells are memory-mapped from an .npy file, and
+    pickles (the index bundle) carry the file path instead of the cells:
+    every worker loading the bundle maps the same pages.
+    """
+
+    def __init__(
+        self,
+        rules: FareRuleIndex,
+        stop_ids: Optional[Sequence] = None,
+        stop_zones: Optional[Sequence] = None,
+        max_zones: Optional[int] = None
+    ):
+        """
+        Args:
+            rules: Fare rule index the matrix is resolved from (also answers
+                requests for routes with route-specific rules)
+            stop_ids: stop_id column; stops whose id is not a fare zone are
+                looked up by their zone_id
+            stop_zones: zone_id column in the same order
+            max_zones: Largest number of zones to build cells for (default:
+                config.FARE_MATRIX_MAX_ZONES); larger feeds answer from rules
+        """
+        self.rules = rules
+        self.max_zones = config.FARE_MATRIX_MAX_ZONES if max_zones is None else max_zones
+
+        # Pair zones keep their FareRuleIndex codes; zones only named by contains_id follow
+        self.zones: List[Any] = list(rules._zones) + [zone for zone in rules.contains if zone not in rules._zones]
+        self.codes: Dict[Any, int] = {zone: code for code, zone in enumerate(self.zones)}
+        if stop_ids is not None and stop_zones is not None:
+            for stop_id, zone in zip(stop_ids, stop_zones):
+                if pd.isna(zone):
+                    continue
+                code = self.codes.get(str(zone))
+                if code is not None:
+                    self.codes.setdefault(str(stop_id), code)
+
+        self.path: Optional[Path] = None
+        self.cells: Optional[np.ndarray] = None
+        self.outcome_rows = np.empty(0, dtype=np.int32)
+        self.outcome_contains = np.empty(0, dtype=bool)
+        self.empty = 0
+        if len(self.zones) <= self.max_zones:
+            self._build()
+
+    def _build(self) -> None:
+        rules, zone_count = self.rules, len(self.zones)
+        pair_zones = len(rules._zones)
+
+        # Rule behind each (origin, destination) cell: the forward pair, else the reverse one
+        keys = rules._pairs.to_numpy().astype(np.int64)
+        origins, destinations = keys // max(pair_zones, 1), keys % max(pair_zones, 1)
+        reverse = ~np.isin(destinations * pair_zones + origins, keys)
+        cell_origins = np.concatenate([origins, destinations[reverse]])
+        cell_destinations = np.concatenate([destinations, origins[reverse]])
+        cell_rows = np.concatenate([rules._pair_rows, rules._pair_rows[reverse]])
+        # Rules with an unknown fare_id leave the cell to contains_id, like the lookup
+        priced = rules.rule_fares[cell_rows] != NO_FARE
+        cell_origins, cell_destinations, cell_rows = cell_origins[priced], cell_destinations[priced], cell_rows[priced]
+
+        contains_zones = np.array([self.codes[zone] for zone in rules.contains], dtype=np.int64)
+        contains_rows = np.array(list(rules.contains.values()), dtype=np.int32)
+
+        # Outcomes: distinct (fare, contains) of the rules that price cells,
+        # each with the first rule holding it
+        rows = np.concatenate([cell_rows, contains_rows]).astype(np.int32)
+        flags = np.concatenate([np.zeros(len(cell_rows), dtype=bool), np.ones(len(contains_rows), dtype=bool)])
+        outcome_keys = rules.rule_fares[rows].astype(np.int64) * 2 + flags
+        outcome_of, distinct = pd.factorize(outcome_keys)
+        first = np.full(len(distinct), len(rows), dtype=np.int64)
+        np.minimum.at(first, outcome_of, np.arange(len(rows)))
+        self.outcome_rows = rows[first]
+        self.outcome_contains = flags[first]
+
+        dtype = _cell_dtype(len(distinct))
+        self.empty = int(np.iinfo(dtype).max)
+        cells = np.full((zone_count, zone_count), self.empty, dtype=dtype)
+
+        # contains_id rules price every cell of their zone; the first rule in
+        # file order wins, so zones are filled from the last rule to the first
+        contains_outcomes = outcome_of[len(cell_rows):]
+        unpriced = rules.rule_fares[contains_rows] == NO_FARE
+        for position in np.argsort(-contains_rows, kind='stable'):
+            zone = contains_zones[position]
+            outcome = self.empty if unpriced[position] else contains_outcomes[position]
+            cells[zone, :] = outcome
+            cells[:, zone] = outcome
+
+        cells[cell_origins, cell_destinations] = outcome_of[:len(cell_rows)]
+        self.cells = cells
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        if self.path is not None:
+            state['cells'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self.path is not None:
+            try:
+                self.cells = np.load(self.path, mmap_mode='r')
+            except (OSError, ValueError):
+                # File removed since the bundle was written: answer from the rules
+                self.cells = None
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Write the cells to an .npy file and memory-map them from there.
+
+        The file is written next to its final name first and then moved into
+        place, so a worker mapping it never sees a partial file.
+
+        Args:
+            path: Target .npy file
+
+        Returns:
+            The written path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix='.fare_matrix-', suffix='.npy', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.cells))
+            os.replace(staging, path)
+        except Exception:
+            if os.path.exists(staging):
+                os.unlink(staging)
+            raise
+        self.cells = np.load(path, mmap_mode='r')
+        self.path = path
+        return path
+
+    def zone_id(self, stop_or_zone_id) -> str:
+        """Get the fare zone of a stop (the id itself when it names a zone or is unknown)"""
+        key = str(stop_or_zone_id)
+        code = self.codes.get(key)
+        return self.zones[code] if code is not None else key
+
+    def lookup(self, origin_id, destination_id, route_id=None) -> Optional[Dict[str, Any]]:
+        """
+        Find the GTFS fare between two stops or zones (same result as
+        FareRuleIndex.lookup on their zones).
+
+        Args:
+            origin_id: Origin stop or zone id
+            destination_id: Destination stop or zone id
+            route_id: Prefer rules for this route
+
+        Returns:
+            Dict with fare_id, price, currency and route_id (and source
+            'contains_zone' for the contains_id fallback), or None
+        """
+        origin, destination = self.codes.get(str(origin_id)), self.codes.get(str(destination_id))
+        if not self._in_cells(origin, destination, route_id):
+            return self.rules.lookup(self.zone_id(origin_id), self.zone_id(destination_id), route_id)
+        return self._outcome_result(int(self.cells[origin, destination]), origin, destination)
+
+    def lookup_many(
+        self,
+        origin_ids: Sequence,
+        destination_ids: Sequence,
+        route_ids: Optional[Sequence] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Find the GTFS fares of many pairs, reading the cells in one gather.
+
+        Args:
+            origin_ids: Origin stop or zone ids
+            destination_ids: Destination stop or zone ids (same length)
+            route_ids: Route of each pair, or None for no route
+
+        Returns:
+            lookup() result of every pair, in input order
+        """
+        if route_ids is None:
+            route_ids = [None] * len(origin_ids)
+        origins = [self.codes.get(str(origin_id)) for origin_id in origin_ids]
+        destinations = [self.codes.get(str(destination_id)) for destination_id in destination_ids]
+        in_cells = np.array([
+            self._in_cells(origin, destination, route_id)
+            for origin, destination, route_id in zip(origins, destinations, route_ids)
+        ], dtype=bool)
+
+        outcomes = np.full(len(origins), self.empty, dtype=np.int64)
+        if in_cells.any():
+            gathered = np.flatnonzero(in_cells)
+            outcomes[gathered] = self.cells[
+                np.array([origins[i] for i in gathered]), np.array([destinations[i] for i in gathered])
+            ]
+        results: List[Optional[Dict[str, Any]]] = []
+        for direct, outcome, origin, destination, origin_id, destination_id, route_id in zip(
+                in_cells.tolist(), outcomes.tolist(), origins, destinations, origin_ids, destination_ids, route_ids):
+            if direct:
+                results.append(self._outcome_result(outcome, origin, destination))
+                continue
+            # Stops outside every rule (e.g. feeds without zones) cannot match one
+            origin_zone, destination_zone = self.zone_id(origin_id), self.zone_id(destination_id)
+            if not (self.rules.knows(origin_zone) or self.rules.knows(destination_zone)):
+                results.append(None)
+                continue
+            results.append(self.rules.lookup(origin_zone, destination_zone, route_id))
+        return results
+
+    def _in_cells(self, origin: Optional[int], destination: Optional[int], route_id) -> bool:
+        """Whether the cells answer a pair; route-specific rules and unknown zones
+        (which may still hit contains_id) are left to the rules"""
+        return (self.cells is not None and origin is not None and destination is not None
+                and not (route_id and route_id in self.rules._routes))
+
+    def _outcome_result(self, outcome: int, origin: int, destination: int) -> Optional[Dict[str, Any]]:
+        if outcome == self.empty:
+            return None
+        row = int(self.outcome_rows[outcome])
+        contains = bool(self.outcome_contains[outcome])
+        if self.rules._routes:
+            # Rules sharing a fare may name different routes: find the one that priced the pair
+            row = self._priced_row(self.zones[origin], self.zones[destination], contains)
+        result = self.rules._result(row)
+        if contains:
+            result['source'] = 'contains_zone'
+        return result
+
+    def _priced_row(self, origin_zone, destination_zone, contains: bool) -> int:
+        """fare_rules row behind a cell, found the way FareRuleIndex.lookup finds it"""
+        if contains:
+            return min(self.rules.contains[zone] for zone in (origin_zone, destination_zone) if zone in self.rules.contains)
+        return self.rules.pair_rule(origin_zone, destination_zone)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the zone count, cell dtype and footprint of the matrix"""
+        return {
+            'zones': len(self.zones),
+            'outcomes': len(self.outcome_rows),
+            'dtype': str(self.cells.dtype) if self.cells is not None else None,
+            'cells_mb': round(self.cells.nbytes / 1e6, 2) if self.cells is not None else 0.0,
+            'memory_mapped': self.path is not None and self.cells is not None
+        }
+
+
+# ==================== Distance fares ====================
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distances in km between arrays of points given in degrees"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype=np.float64)) for values in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * config.EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def distance_band_fares(distance_km, fare_tiers: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Map distances to the fares of the configured distance bands.
+
+    A distance falls in the first tier whose max_km it does not exceed,
+    found with one sorted search over the tier limits.
+
+    Args:
+        distance_km: Array of distances in km (NaN for unknown)
+        fare_tiers: Tier configuration (default: config.get_fare_tiers())
+
+    Returns:
+        Array of fares, the default fare where the distance is unknown
+    """
+    fare_tiers = fare_tiers or config.get_fare_tiers()
+    limits = np.array([tier['max_km'] for tier in fare_tiers['tiers']], dtype=np.float64)
+    fares = np.array([tier['fare'] for tier in fare_tiers['tiers']], dtype=np.float64)
+    distance_km = np.asarray(distance_km, dtype=np.float64)
+
+    # side='left' puts a distance equal to a limit in that limit's tier;
+    # distances past the last limit pay the last tier
+    tiers = np.minimum(np.searchsorted(limits, distance_km, side='left'), len(limits) - 1)
+    return np.where(np.isnan(distance_km), fare_tiers['default'], fares[tiers])
+
+
+# ==================== Reference scan ====================
+
+def scan_fare(rules: pd.DataFrame, fares: pd.DataFrame, origin_id, destination_id, route_id=None) -> Optional[Dict[str, Any]]:
+    """
+    Find a fare with boolean masks over the tables (reference for FareRuleIndex).
+
+    Args:
+        rules: fare_rules table
+        fares: fare_attributes table
+        origin_id: Origin zone (or stop) id
+        destination_id: Destination zone (or stop) id
+        route_id: Prefer rules for this route
+
+    Returns:
+        Same result as FareRuleIndex.lookup
+    """
+    origin_id, destination_id = str(origin_id), str(destination_id)
+    matching = rules[(rules['origin_id'] == origin_id) & (rules['destination_id'] == destination_id)]
+    if matching.empty:
+        matching = rules[(rules['origin_id'] == destination_id) & (rules['destination_id'] == origin_id)]
+    if route_id and not matching.empty and 'route_id' in matching.columns:
+        routed = matching[matching['route_id'] == route_id]
+        if not routed.empty:
+            matching = routed
+
+    def fare(rule, **extra):
+        details = fares[fares['fare_id'] == rule['fare_id']]
+        if details.empty:
+            return None
+        return {
+            'fare_id': rule['fare_id'],
+            'price': float(details.iloc[0]['price']),
+            'currency': details.iloc[0]['currency_type'],
+            'route_id': rule['route_id'] if 'route_id' in rules.columns else None,
+            **extra
+        }
+
+    result = fare(matching.iloc[0]) if not matching.empty else None
+    if result is None and 'contains_id' in rules.columns:
+        contains = rules[rules['contains_id'].isin([origin_id, destination_id])]
+        if not contains.empty:
+            result = fare(contains.iloc[0], source='contains_zone')
+    return result
+
+
+# ==================== Benchmark ====================
+
+def synthetic_fare_tables(rules: int = FULL_RULES, zones: int = 1200, routes: int = 2500, seed: int = 3):
+    """
+    Build fare tables shaped like the BMTC feed for benchmarking.
+
+    Args:
+        rules: Number of fare_rules rows
+        zones: Number of distinct zone ids
+        routes: Number of distinct route ids
+        seed: Random seed
+
+    Returns:
+        (fare_rules, fare_attributes) DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    zone_ids = np.array([f'Z{zone}' for zone in range(zones)], dtype=object)
+    route_ids = np.array([f'R{route}' for route in range(routes)], dtype=object)
+    fare_count = 40
+    fare_rules = pd.DataFrame({
+        'fare_id': np.array([f'fare_{fare}' for fare in range(fare_count + 2)], dtype=object)[rng.integers(0, fare_count + 2, rules)],
+        'route_id': route_ids[rng.integers(0, routes, rules)],
+        'origin_id': zone_ids[rng.integers(0, zones, rules)],
+        'destination_id': zone_ids[rng.integers(0, zones, rules)],
+        'contains_id': None
+    })
+    # A few contains_id rules, as in feeds mixing both styles
+    contains = rng.choice(rules, size=min(rules, 50), replace=False)
+    fare_rules.loc[contains, ['origin_id', 'destination_id']] = None
+    fare_rules.loc[contains, 'contains_id'] = zone_ids[rng.integers(0, zones, len(contains))]
+    fare_attributes = pd.DataFrame({
+        'fare_id': [f'fare_{fare}' for fare in range(fare_count)],
+        'price': 5.0 + 2.5 * np.arange(fare_count),
+        'currency_type': 'INR'
+    })
+    return fare_rules, fare_attributes
+
+
+def run_benchmark(rules: pd.DataFrame, fares: pd.DataFrame, queries: int = 20, seed: int = 5) -> Dict[str, float]:
+    """
+    Time FareRuleIndex lookups against the mask scan on the same queries.
+
+    Queries mix forward and reverse pairs of existing rules, with and
+    without a route, and pairs without rules.
+
+    Args:
+        rules: fare_rules table
+        fares: fare_attributes table
+        queries: Number of queries timed with the scan (the index answers
+            100 times as many)
+        seed: Random seed for the queries
+
+    Returns:
+        Build times, per-call latencies in microseconds, the matrix size and
+        the number of disagreements with the scan
+    """
+    start = perf_counter()
+    index = FareRuleIndex(rules, fares)
+    build_ms = (perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(rules), queries)
+    origins = rules['origin_id'].to_numpy(dtype=object)[picks]
+    destinations = rules['destination_id'].to_numpy(dtype=object)[picks]
+    route_ids = rules['route_id'].to_numpy(dtype=object)[rng.integers(0, len(rules), queries)]
+    cases = []
+    for i in range(queries):
+        origin, destination = str(origins[i]), str(destinations[i])
+        kind = i % 4
+        if kind == 1:
+            origin, destination = destination, origin
+        elif kind == 3:
+            destination = 'unknown'
+        cases.append((origin, destination, route_ids[i] if i % 2 else None))
+
+    start = perf_counter()
+    scanned = [scan_fare(rules, fares, *case) for case in cases]
+    scan_us = (perf_counter() - start) / len(cases) * 1e6
+
+    repeats = 100
+    start = perf_counter()
+    for _ in range(repeats):
+        indexed = [index.lookup(*case) for case in cases]
+    index_us = (perf_counter() - start) / (len(cases) * repeats) * 1e6
+
+    start = perf_counter()
+    matrix = FareMatrix(index)
+    matrix_build_ms = (perf_counter() - start) * 1000
+    # The matrix answers requests without a route; routed ones go to the index
+    unrouted = [(origin, destination) for origin, destination, route_id in cases if route_id is None]
+    start = perf_counter()
+    for _ in range(repeats):
+        looked_up = [matrix.lookup(*case) for case in cases]
+    matrix_us = (perf_counter() - start) / (len(cases) * repeats) * 1e6
+    start = perf_counter()
+    for _ in range(repeats):
+        for case in unrouted:
+            matrix.lookup(*case)
+    unrouted_us = (perf_counter() - start) / (max(len(unrouted), 1) * repeats) * 1e6
+
+    return {
+        'rules': len(rules),
+        'queries': len(cases),
+        'build_ms': round(build_ms, 1),
+        'index_us': round(index_us, 2),
+        'scan_us': round(scan_us, 2),
+        'speedup': round(scan_us / index_us, 1) if index_us else None,
+        'mismatches': sum(a != b for a, b in zip(indexed, scanned)),
+        **{f'matrix_{key}': value for key, value in matrix.stats().items() if key != 'memory_mapped'},
+        'matrix_build_ms': round(matrix_build_ms, 1),
+        'matrix_us': round(matrix_us, 2),
+        'matrix_unrouted_us': round(unrouted_us, 2),
+        'matrix_mismatches': sum(a != b for a, b in zip(looked_up, scanned))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fare rule lookup tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    benchmark = subparsers.add_parser('benchmark', help='Time fare lookups (index and matrix) against the mask scan')
+    benchmark.add_argument('--feed', help='Use the fare tables of a configured feed instead of synthetic ones')
+    benchmark.add_argument('--rules', type=int, default=FULL_RULES, help='Synthetic fare_rules rows')
+    benchmark.add_argument('--queries', type=int, default=20, help='Queries timed with the scan')
+    args = parser.parse_args()
+
+    if args.feed:
+        from gtfs_loader import GTFSDataset
+        dataset = GTFSDataset.from_config(feed=args.feed)
+        rules, fares = dataset['fare_rules'], dataset['fare_attributes']
+        if rules is None or fares is None:
+            parser.error(f'feed {args.feed} has no fare tables')
+    else:
+        rules, fares = synthetic_fare_tables(rules=args.rules)
+
+    result = run_benchmark(rules, fares, queries=args.queries)
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == '__main__':
+    main()
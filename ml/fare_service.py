@@ -1,9 +1,14 @@
+import csv
+import gc
+import io
+import json
 import os
+from functools import partial
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g, has_request_context, stream_with_context
 from flask_cors import CORS
-from functools import lru_cache
 from time import time
 
 # Load environment variables from .env file
@@ -13,7 +18,19 @@ load_dotenv()
 # Import logging utilities
 from logger import setup_logger, log_request, log_response, log_error, log_startup
 from config import config
-from validators import FareRequestValidator, JourneyPlanRequestValidator
+from fare_engine import distance_band_fares, haversine_km
+from validators import (
+    FareRequestValidator, BatchFareRequestValidator, FareMatrixExportRequestValidator, JourneyPlanRequestValidator, StopAutocompleteRequestValidator,
+    NearbyStopsRequestValidator, BatchNearbyStopsRequestValidator, BatchStopResolveRequestValidator
+)
+from gtfs_loader import (
+    GTFSDataset, COORDINATE_DECIMALS, get_index,
+    dataset_status, dataset_memory_report, dataset_validation_report
+)
+from gtfs_feed import FeedManager, FeedRegistry
+from gtfs_index import load_bundle, build_shape_points
+from query_cache import QueryCache
+from stop_search import lowercase_names, scan_stop_position, encode_cursor
 
 # Setup logger
 logger = setup_logger('fare_api', log_file=config.BASE_DIR / 'fare_api.log')
@@ -35,6 +52,11 @@ def before_request():
     """Record request start time"""
     g.start_time = time()
     log_request(logger, request.method, request.path)
+    
+    # Requests select a GTFS feed with ?feed=<name>
+    feed_name = request.args.get('feed')
+    if feed_name is not None and feed_name not in feeds:
+        return jsonify({'error': f'Unknown feed "{feed_name}"', 'feeds': feeds.names()}), 404
 
 @app.after_request
 def after_request(response):
@@ -42,162 +64,270 @@ def after_request(response):
     if hasattr(g, 'start_time'):
         duration_ms = (time() - g.start_time) * 1000
         log_response(logger, request.path, response.status_code, duration_ms)
+    
+    # Report which feed (and version) served this request
+    if 'gtfs_feed' in g:
+        response.headers['X-GTFS-Feed'] = g.gtfs_feed
+    feed_version = getattr(g.get('gtfs_data'), 'feed_version', None)
+    if feed_version:
+        response.headers['X-GTFS-Feed-Version'] = feed_version
     return response
 
-@lru_cache(maxsize=1)
-def load_gtfs_data():
-    """Load and cache GTFS data"""
+def build_gtfs_dataset(feed_name=None):
+    """Create the GTFS dataset of a configured feed (tables load on first access)"""
     try:
-        logger.info(f"Loading GTFS data from {GTFS_DIR}")
+        if feed_name is None or feed_name == config.GTFS_FEED_NAME:
+            source = config.GTFS_ZIP_PATH or GTFS_DIR
+        else:
+            source = config.GTFS_EXTRA_FEEDS[feed_name]['dir']
+        logger.info(f"Loading GTFS data from {source}")
         
-        # Check if GTFS directory exists
-        if not os.path.exists(GTFS_DIR):
-            logger.error(f"GTFS directory not found: {GTFS_DIR}")
-            return None
-            
-        # Load fare attributes
-        fare_attr_path = config.GTFS_FARE_ATTRIBUTES
-        if not os.path.exists(fare_attr_path):
-            logger.error(f"Fare attributes file not found: {fare_attr_path}")
+        # Check if the GTFS directory (or zip) exists
+        if not os.path.exists(source):
+            logger.error(f"GTFS source not found: {source}")
             return None
-        fare_attr_df = pd.read_csv(fare_attr_path)
-        logger.info(f"Loaded {len(fare_attr_df)} fare attributes from fare_attributes.txt")
         
-        # Load fare rules
-        fare_rules_path = config.GTFS_FARE_RULES
-        if not os.path.exists(fare_rules_path):
-            logger.error(f"Fare rules file not found: {fare_rules_path}")
-            return None
-        fare_rules_df = pd.read_csv(fare_rules_path)
-        logger.info(f"Loaded {len(fare_rules_df)} fare rules from fare_rules.txt")
-        
-        # Convert IDs to strings for consistent comparison
-        if 'origin_id' in fare_rules_df.columns:
-            fare_rules_df['origin_id'] = fare_rules_df['origin_id'].astype(str)
-        if 'destination_id' in fare_rules_df.columns:
-            fare_rules_df['destination_id'] = fare_rules_df['destination_id'].astype(str)
-        
-        # Load stops
-        stops_path = config.GTFS_STOPS
-        if not os.path.exists(stops_path):
-            logger.error(f"Stops file not found: {stops_path}")
+        dataset = GTFSDataset.from_config(config, feed=feed_name)
+        
+        # Fail early if a required file is missing, without parsing anything
+        missing = dataset.missing_required()
+        if missing:
+            for path in missing:
+                logger.error(f"Required GTFS file not found: {path}")
             return None
-        stops_df = pd.read_csv(stops_path)
-        logger.info(f"Loaded {len(stops_df)} stops from stops.txt")
         
-        # Convert stop_id to string
-        if 'stop_id' in stops_df.columns:
-            stops_df['stop_id'] = stops_df['stop_id'].astype(str)
+        # Adopt pre-built lookup indexes (python gtfs_index.py compile)
+        if config.GTFS_INDEX_BUNDLE_ENABLED:
+            load_bundle(dataset)
         
-        # Load routes
-        routes_path = config.GTFS_ROUTES
-        if not os.path.exists(routes_path):
-            logger.error(f"Routes file not found: {routes_path}")
-            return None
-        routes_df = pd.read_csv(routes_path)
-        logger.info(f"Loaded {len(routes_df)} routes from routes.txt")
-        
-        # Load shapes
-        shapes_path = config.GTFS_SHAPES
-        shapes_df = None
-        if os.path.exists(shapes_path):
-            shapes_df = pd.read_csv(shapes_path)
-            logger.info(f"Loaded {len(shapes_df)} shape points from shapes.txt")
-        
-        # Load trips
-        trips_path = config.GTFS_TRIPS
-        trips_df = None
-        if os.path.exists(trips_path):
-            trips_df = pd.read_csv(trips_path)
-            logger.info(f"Loaded {len(trips_df)} trips from trips.txt")
-        
-        # Load stop_times
-        stop_times_path = config.GTFS_STOP_TIMES
-        stop_times_df = None
-        if os.path.exists(stop_times_path):
-            stop_times_df = pd.read_csv(stop_times_path)
-            logger.info(f"Loaded {len(stop_times_df)} stop times from stop_times.txt")
-        
-        logger.info("GTFS data loaded successfully")
-        
-        return {
-            'fare_attributes': fare_attr_df,
-            'fare_rules': fare_rules_df,
-            'stops': stops_df,
-            'routes': routes_df,
-            'shapes': shapes_df,
-            'trips': trips_df,
-            'stop_times': stop_times_df
-        }
+        logger.info("GTFS dataset ready (tables load on first access)")
+        return dataset
     except Exception as e:
         log_error(logger, e, "Error loading GTFS data")
         return None
 
-def get_route_shapes(shapes_df, route_short_name):
+# Served GTFS feeds, each swapped atomically when a new feed drop is detected
+feeds = FeedRegistry(
+    {
+        name: FeedManager(partial(build_gtfs_dataset, name), name=name, incremental=config.GTFS_DIFF_ENABLED)
+        for name in [config.GTFS_FEED_NAME, *config.GTFS_EXTRA_FEEDS]
+    },
+    default=config.GTFS_FEED_NAME,
+    memory_budget=config.GTFS_FEED_MEMORY_BUDGET_MB * 1024 * 1024
+)
+
+# Results of repeated stop searches and autocomplete pages
+stop_query_cache = QueryCache(
+    max_size=config.STOP_SEARCH_CACHE_SIZE,
+    timeout=config.CACHE_DEFAULT_TIMEOUT,
+    enabled=config.CACHE_ENABLED
+)
+
+def drop_cached_stop_queries(feed_name, old, new):
+    """Drop the cached stop queries of a feed once a new version is swapped in or it is evicted"""
+    dropped = stop_query_cache.invalidate(lambda key: key[0] == feed_name)
+    logger.info(f"Dropped {dropped} cached stop queries of GTFS feed {feed_name}")
+
+for feed_name in feeds.names():
+    feeds.get(feed_name).add_swap_listener(partial(drop_cached_stop_queries, feed_name))
+
+def requested_feed():
+    """Get the feed name selected by the current request (None: default feed)"""
+    if has_request_context():
+        return request.args.get('feed')
+    return None
+
+def load_gtfs_data():
+    """
+    Get the active GTFS dataset of the requested feed.
+    
+    Within a request the dataset is pinned on first use, so a request that
+    is in flight during a feed reload finishes against the version it
+    started with.
+    """
+    if has_request_context():
+        if 'gtfs_data' not in g:
+            g.gtfs_feed = requested_feed() or feeds.default
+            g.gtfs_data = feeds.current(g.gtfs_feed)
+        return g.gtfs_data
+    return feeds.current()
+
+def start_feed_watcher():
+    """Start watching the GTFS files for new feed drops, if enabled"""
+    if config.GTFS_RELOAD_ENABLED:
+        feeds.start_watchers(config.GTFS_RELOAD_INTERVAL)
+
+def preload_gtfs_data():
+    """
+    Materialize every GTFS table in the current process ahead of forking.
+    
+    Workers forked afterwards inherit the loaded frames copy-on-write. The
+    loaded objects are moved out of the garbage collector's reach
+    (gc.freeze) so collections in the workers don't write to their headers
+    and un-share the pages.
+    """
+    data = load_gtfs_data()
+    if data is None:
+        return None
+    
+    if isinstance(data, GTFSDataset):
+        data.materialize()
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    
+    report = dataset_memory_report(data)
+    logger.info(f"Preloaded GTFS data for forked workers ({report['total_bytes_after'] / 1e6:.1f} MB)")
+    return data
+
+def get_route_shapes(shapes_df, route_short_name, shape_points=None):
     """Get shape data for a route"""
     if shapes_df is None or route_short_name is None:
         return []
     
     try:
-        # Filter shapes by route short name (shape_id contains route short name)
-        matching_shapes = shapes_df[shapes_df['shape_id'].str.contains(str(route_short_name), na=False)]
+        if shape_points is None:
+            shape_points = build_shape_points({'shapes': shapes_df})
         
-        if matching_shapes.empty:
+        # Use the first shape whose shape_id contains the route short name
+        name = str(route_short_name)
+        shape_id = next((shape_id for shape_id in shape_points if name in shape_id), None)
+        if shape_id is None:
             return []
-        
-        # Group by shape_id and sort by sequence
-        shape_groups = matching_shapes.groupby('shape_id')
-        
-        # Use the first shape (most common one)
-        first_shape = shape_groups.get_group(matching_shapes['shape_id'].iloc[0])
-        sorted_shape = first_shape.sort_values('shape_pt_sequence')
+        points = shape_points[shape_id]
         
         # Convert to the format expected by frontend
         return [
             {
-                'shapePtLat': float(row['shape_pt_lat']),
-                'shapePtLon': float(row['shape_pt_lon']),
-                'shapePtSequence': int(row['shape_pt_sequence'])
+                'shapePtLat': round(float(lat), COORDINATE_DECIMALS),
+                'shapePtLon': round(float(lon), COORDINATE_DECIMALS),
+                'shapePtSequence': int(seq)
             }
-            for _, row in sorted_shape.iterrows()
+            for lat, lon, seq in zip(points['lat'], points['lon'], points['seq'])
         ]
     except Exception as e:
         log_error(logger, e, "Error getting route shapes")
         return []
 
-def find_stop_by_name(stops_df, name):
-    """Find a stop by name"""
-    if not name or not isinstance(name, str):
-        return None
+def stop_record(row):
+    """Convert a stops row to a plain dict, rounding float32 coordinates"""
+    record = row.to_dict()
+    for key in ('stop_lat', 'stop_lon'):
+        if key in record and pd.notna(record[key]):
+            record[key] = round(float(record[key]), COORDINATE_DECIMALS)
+    return record
+
+def stop_summaries(stops_df, rows):
+    """Build id, name and rounded coordinate dicts for stops rows"""
+    columns = [column for column in ('stop_id', 'stop_name', 'stop_lat', 'stop_lon') if column in stops_df.columns]
+    records = stops_df[columns].iloc[rows].to_dict('records')
+    for record in records:
+        for key in ('stop_lat', 'stop_lon'):
+            if key in record:
+                record[key] = round(float(record[key]), COORDINATE_DECIMALS) if pd.notna(record[key]) else None
+    return records
+
+def nearby_stop_records(stops_df, rows, distances_km):
+    """Build stop dicts with their distance for spatial index results"""
+    found = rows >= 0
+    records = stop_summaries(stops_df, rows[found])
+    for record, distance in zip(records, distances_km[found].tolist()):
+        record['distance_km'] = round(distance, 3)
+    return records
+
+def find_stop_by_name(stops_df, name, stop_names=None):
+    """
+    Find a stop by name.
+    
+    Tries an exact match, then the part before a parenthesis as a prefix,
+    then a prefix and finally a substring match; the first stop in file
+    order wins at each step. With an index and STOP_SEARCH_FUZZY, a name
+    without such a match resolves to its closest fuzzy match.
     
-    # Clean input
-    name = name.strip().lower()
-    if not name:
+    Args:
+        stops_df: Stops table
+        name: Stop name as entered by the user
+        stop_names: 'stop_names' index of stops_df (scans the names when omitted)
+    """
+    if stop_names is not None:
+        position = stop_names.resolve(name, fuzzy=config.STOP_SEARCH_FUZZY)
+    else:
+        lower = np.asarray(lowercase_names(stops_df['stop_name']), dtype=str)
+        position = scan_stop_position(lower, name)
+    if position is None:
         return None
+    return stop_record(stops_df.iloc[position])
+
+def default_fare():
+    """Fare used when neither a fare rule nor a distance is available"""
+    return {
+        'fare_id': 'default',
+        'price': config.DEFAULT_FARE,
+        'currency': 'INR',
+        'route_id': None,
+        'source': 'default_fallback'
+    }
+
+def stop_distances_km(data, origin_ids, destination_ids):
+    """
+    Great-circle distances between many stop pairs in one array pass.
     
-    # First try exact match
-    exact_match = stops_df[stops_df['stop_name'].str.lower() == name]
-    if not exact_match.empty:
-        return exact_match.iloc[0].to_dict()
+    Args:
+        data: GTFS data dictionary
+        origin_ids: Origin stop ids (strings)
+        destination_ids: Destination stop ids (strings, same length)
     
-    # Try with parenthetical variations
-    if '(' in name:
-        base_name = name.split('(')[0].strip()
-        parenthetical_matches = stops_df[stops_df['stop_name'].str.lower().str.startswith(base_name)]
-        if not parenthetical_matches.empty:
-            return parenthetical_matches.iloc[0].to_dict()
+    Returns:
+        Array of distances in km, NaN where a stop is unknown or has no coordinates
+    """
+    distances = np.full(len(origin_ids), np.nan)
+    coords = get_index(data, 'stop_coords')
+    if coords is not None and len(origin_ids):
+        stop_rows = get_index(data, 'stop_rows')
+        origin_rows = np.array([stop_rows.get(stop_id, -1) for stop_id in origin_ids], dtype=np.int64)
+        dest_rows = np.array([stop_rows.get(stop_id, -1) for stop_id in destination_ids], dtype=np.int64)
+        lat, lon = coords
+        # Unknown stops (row -1) read the last stop and are masked out after
+        distances = haversine_km(lat[origin_rows], lon[origin_rows], lat[dest_rows], lon[dest_rows])
+        distances[(origin_rows < 0) | (dest_rows < 0)] = np.nan
+    return distances
+
+def distance_fares(data, origin_ids, destination_ids):
+    """
+    Calculate the distance-band fares of many stop pairs in one array pass.
     
-    # Try starts with
-    starts_with_matches = stops_df[stops_df['stop_name'].str.lower().str.startswith(name)]
-    if not starts_with_matches.empty:
-        return starts_with_matches.iloc[0].to_dict()
+    BMTC typically charges by distance bands (config.get_fare_tiers()).
+    Pairs whose stops are unknown or have no coordinates get the default fare.
     
-    # Try contains
-    contains_matches = stops_df[stops_df['stop_name'].str.lower().str.contains(name)]
-    if not contains_matches.empty:
-        return contains_matches.iloc[0].to_dict()
+    Args:
+        data: GTFS data dictionary
+        origin_ids: Origin stop ids (strings)
+        destination_ids: Destination stop ids (strings, same length)
     
-    return None
+    Returns:
+        List of fare dicts in input order
+    """
+    try:
+        distances = stop_distances_km(data, origin_ids, destination_ids)
+    except Exception as e:
+        log_error(logger, e, "Error calculating distance-based fares")
+        distances = np.full(len(origin_ids), np.nan)
+    prices = distance_band_fares(distances)
+    
+    fares = []
+    for distance_km, price in zip(distances.tolist(), prices.tolist()):
+        if np.isnan(distance_km):
+            fares.append(default_fare())
+        else:
+            fares.append({
+                'fare_id': 'distance_based',
+                'price': price,
+                'currency': 'INR',
+                'route_id': None,
+                'distance_km': round(distance_km, 2),
+                'source': 'distance_calculation'
+            })
+    return fares
 
 def calculate_fare(origin_id, destination_id, route_id=None):
     """Calculate fare between two stops based on GTFS data"""
@@ -205,139 +335,47 @@ def calculate_fare(origin_id, destination_id, route_id=None):
     if data is None:
         return None
     
-    fare_rules_df = data['fare_rules']
-    fare_attr_df = data['fare_attributes']
-    
-    # Convert to strings for consistent comparison
-    origin_id = str(origin_id)
-    destination_id = str(destination_id)
+    # Forward pair, reverse pair, route-specific rule, then contains_id, resolved
+    # ahead of time into the zone fare matrix (see fare_engine)
+    fare = get_index(data, 'fare_matrix').lookup(origin_id, destination_id, route_id)
+    if fare is not None:
+        return fare
     
-    # Find matching fare rules
-    matching_rules = fare_rules_df[
-        (fare_rules_df['origin_id'] == origin_id) &
-        (fare_rules_df['destination_id'] == destination_id)
-    ]
+    # If no matching fare found, calculate based on distance approximation
+    return distance_fares(data, [str(origin_id)], [str(destination_id)])[0]
+
+def calculate_fares(origin_ids, destination_ids, route_ids=None):
+    """
+    Calculate the fares of many stop pairs at once.
     
-    # If no direct match, try reverse direction
-    if matching_rules.empty:
-        matching_rules = fare_rules_df[
-            (fare_rules_df['origin_id'] == destination_id) &
-            (fare_rules_df['destination_id'] == origin_id)
-        ]
+    Each pair gets the result calculate_fare would give it: GTFS fares come
+    from one gather over the zone fare matrix, and the distance fallback is
+    computed for all remaining pairs in one array pass. Pairs whose stops
+    have no coordinates get the default fare.
     
-    # If route_id is provided, filter by it
-    if route_id and not matching_rules.empty and 'route_id' in matching_rules.columns:
-        route_specific_rules = matching_rules[matching_rules['route_id'] == route_id]
-        if not route_specific_rules.empty:
-            matching_rules = route_specific_rules
-    
-    if not matching_rules.empty:
-        fare_id = matching_rules.iloc[0]['fare_id']
-        fare_details = fare_attr_df[fare_attr_df['fare_id'] == fare_id]
-        
-        if not fare_details.empty:
-            price = float(fare_details.iloc[0]['price'])
-            currency = fare_details.iloc[0]['currency_type']
-            
-            return {
-                'fare_id': fare_id,
-                'price': price,
-                'currency': currency,
-                'route_id': matching_rules.iloc[0]['route_id'] if 'route_id' in matching_rules.columns else None
-            }
+    Args:
+        origin_ids: Origin stop ids
+        destination_ids: Destination stop ids (same length)
+        route_ids: Route of each pair (None for no route)
     
-    # If still no match, try to find a fare based on similar zones
-    # This is a fallback for when exact origin/destination pairs aren't in fare_rules
-    if 'contains_id' in fare_rules_df.columns:
-        # Look for rules that contain both origin and destination zones
-        contains_rules = fare_rules_df[
-            fare_rules_df['contains_id'].isin([origin_id, destination_id])
-        ]
-        if not contains_rules.empty:
-            fare_id = contains_rules.iloc[0]['fare_id']
-            fare_details = fare_attr_df[fare_attr_df['fare_id'] == fare_id]
-            
-            if not fare_details.empty:
-                price = float(fare_details.iloc[0]['price'])
-                currency = fare_details.iloc[0]['currency_type']
-                
-                return {
-                    'fare_id': fare_id,
-                    'price': price,
-                    'currency': currency,
-                    'route_id': contains_rules.iloc[0]['route_id'] if 'route_id' in contains_rules.columns else None,
-                    'source': 'contains_zone'
-                }
+    Returns:
+        List of fare dicts in input order, or None if GTFS data is unavailable
+    """
+    data = load_gtfs_data()
+    if data is None:
+        return None
     
-    # If no matching fare found, calculate based on distance approximation
-    # BMTC typically charges based on distance bands
-    try:
-        # Try to get stop coordinates
-        stops_df = data['stops']
-        origin_stop = stops_df[stops_df['stop_id'] == origin_id]
-        dest_stop = stops_df[stops_df['stop_id'] == destination_id]
-        
-        if not origin_stop.empty and not dest_stop.empty and 'stop_lat' in stops_df.columns and 'stop_lon' in stops_df.columns:
-            from math import radians, cos, sin, asin, sqrt
-            
-            # Calculate distance using Haversine formula
-            def haversine(lon1, lat1, lon2, lat2):
-                # Convert decimal degrees to radians
-                lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-                # Haversine formula
-                dlon = lon2 - lon1
-                dlat = lat2 - lat1
-                a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-                c = 2 * asin(sqrt(a))
-                # Radius of earth in kilometers is 6371
-                km = 6371 * c
-                return km
-            
-            # Get coordinates
-            lat1 = float(origin_stop.iloc[0]['stop_lat'])
-            lon1 = float(origin_stop.iloc[0]['stop_lon'])
-            lat2 = float(dest_stop.iloc[0]['stop_lat'])
-            lon2 = float(dest_stop.iloc[0]['stop_lon'])
-            
-            # Calculate distance
-            distance_km = haversine(lon1, lat1, lon2, lat2)
-            
-            # BMTC fare structure (approximate):
-            # Up to 2 km: ₹5
-            # 2-5 km: ₹10
-            # 5-10 km: ₹15
-            # 10-15 km: ₹20
-            # 15+ km: ₹25
-            if distance_km <= 2:
-                price = 5.0
-            elif distance_km <= 5:
-                price = 10.0
-            elif distance_km <= 10:
-                price = 15.0
-            elif distance_km <= 15:
-                price = 20.0
-            else:
-                price = 25.0
-                
-            return {
-                'fare_id': 'distance_based',
-                'price': price,
-                'currency': 'INR',
-                'route_id': None,
-                'distance_km': round(distance_km, 2),
-                'source': 'distance_calculation'
-            }
-    except Exception as e:
-        log_error(logger, e, "Error calculating distance-based fare")
+    origin_ids = [str(stop_id) for stop_id in origin_ids]
+    destination_ids = [str(stop_id) for stop_id in destination_ids]
+    fares = get_index(data, 'fare_matrix').lookup_many(origin_ids, destination_ids, route_ids)
+    pending = [i for i, fare in enumerate(fares) if fare is None]
+    if not pending:
+        return fares
     
-    # Final fallback - base fare
-    return {
-        'fare_id': 'default',
-        'price': 10.0,
-        'currency': 'INR',
-        'route_id': None,
-        'source': 'default_fallback'
-    }
+    fallback = distance_fares(data, [origin_ids[i] for i in pending], [destination_ids[i] for i in pending])
+    for i, fare in zip(pending, fallback):
+        fares[i] = fare
+    return fares
 
 @app.route('/api/health', methods=['GET'])
 @app.route('/api/fare/health', methods=['GET'])
@@ -347,9 +385,61 @@ def health():
     return jsonify({
         'status': 'healthy',
         'service': 'BMTC Fare Calculation Service',
-        'version': '1.0'
+        'version': '1.0',
+        'feed_version': getattr(load_gtfs_data(), 'feed_version', None)
     })
 
+@app.route('/api/gtfs/status', methods=['GET'])
+def gtfs_status():
+    """Report which GTFS tables are loaded and how long each took"""
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    status = dataset_status(data)
+    status['feed'] = feeds.get(requested_feed()).status()
+    return jsonify(status)
+
+@app.route('/api/gtfs/feeds', methods=['GET'])
+def gtfs_feeds():
+    """List the served GTFS feeds with their load state and memory use"""
+    return jsonify(feeds.status())
+
+@app.route('/api/gtfs/reload', methods=['POST'])
+def gtfs_reload():
+    """Build the GTFS files on disk into a new dataset and swap it in"""
+    try:
+        force = request.args.get('force', 'false').lower() == 'true'
+        feed = feeds.get(requested_feed())
+        reloaded = feed.reload(force=force)
+        return jsonify({
+            'reloaded': reloaded,
+            'feed': feed.status()
+        })
+    except Exception as e:
+        log_error(logger, e, "Error reloading GTFS feed")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/gtfs/memory', methods=['GET'])
+def gtfs_memory():
+    """Report memory per loaded GTFS table before and after dtype compaction"""
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    return jsonify(dataset_memory_report(data))
+
+@app.route('/api/gtfs/validation', methods=['GET'])
+def gtfs_validation():
+    """Report schema and integrity checks of the GTFS tables"""
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    # full=true loads every table so the report covers the whole feed
+    full = request.args.get('full', 'false').lower() == 'true'
+    return jsonify(dataset_validation_report(data, full=full))
+
 @app.route('/api/stops', methods=['GET'])
 @app.route('/api/fare/stops', methods=['GET'])
 def get_stops():
@@ -364,6 +454,80 @@ def get_stops():
         'count': len(stops)
     })
 
+def search_results(data, query):
+    """Find the stops whose name contains query, or the closest names"""
+    stops_df = data['stops']
+    stop_names = get_index(data, 'stop_names')
+    
+    # Find stops that contain the query string
+    rows = stop_names.containing(query)
+    results = stops_df[['stop_id', 'stop_name']].iloc[rows].to_dict('records')
+    match = 'substring'
+    
+    # Nothing contains it literally: try abbreviations, punctuation and word order
+    if not results:
+        rows = stop_names.canonical_matches(query)
+        results = stops_df[['stop_id', 'stop_name']].iloc[rows].to_dict('records')
+        match = 'canonical' if results else match
+    
+    # Spelled the way it sounds (voice input): same phonetic key
+    if not results:
+        rows = stop_names.phonetic_matches(query)
+        results = stops_df[['stop_id', 'stop_name']].iloc[rows].to_dict('records')
+        match = 'phonetic' if results else match
+    
+    # Still nothing: suggest the closest names, allowing for typos
+    if not results and config.STOP_SEARCH_FUZZY:
+        matches = stop_names.fuzzy(query, limit=config.STOP_SEARCH_FUZZY_LIMIT)
+        results = [
+            {**stops_df[['stop_id', 'stop_name']].iloc[row].to_dict(), 'distance': distance}
+            for row, distance in matches
+        ]
+        match = 'fuzzy' if results else match
+    
+    return {
+        'stops': results,
+        'count': len(results),
+        'query': query,
+        'match': match
+    }
+
+def autocomplete_results(data, query, offset, limit):
+    """Rank the stops matching partially typed text and build one page"""
+    stops_df = data['stops']
+    stop_names = get_index(data, 'stop_names')
+    route_counts = get_index(data, 'stop_routes')
+    
+    # Prefix matches first, then word starts, then substrings; busier stops first within each
+    page, total = stop_names.autocomplete(query, route_counts, offset=offset, limit=limit)
+    matches = [(row, match, None) for row, match in page]
+    
+    # Nothing contains it: suggest the closest names, allowing for typos
+    if not total and not offset and config.STOP_SEARCH_FUZZY:
+        matches = [(row, 'fuzzy', distance) for row, distance in stop_names.fuzzy(query, limit=limit)]
+        total = len(matches)
+    
+    records = stops_df[['stop_id', 'stop_name']].iloc[[row for row, _, _ in matches]].to_dict('records')
+    results = []
+    for record, (row, match, distance) in zip(records, matches):
+        record.update({'match': match, 'route_count': int(route_counts[row])})
+        if distance is not None:
+            record['distance'] = distance
+        results.append(record)
+    
+    end = offset + len(results)
+    return {
+        'stops': results,
+        'count': len(results),
+        'total': total,
+        'query': query,
+        'next_cursor': encode_cursor(query, end, getattr(data, 'feed_version', None)) if end < total else None
+    }
+
+def cached_stop_query(data, kind, *params):
+    """Key a stop query by feed, feed version, query kind and parameters"""
+    return (g.get('gtfs_feed'), getattr(data, 'feed_version', None), kind, config.STOP_SEARCH_FUZZY, *params)
+
 @app.route('/api/stops/search', methods=['GET'])
 @app.route('/api/fare/stops/search', methods=['GET'])
 def search_stops():
@@ -376,18 +540,270 @@ def search_stops():
     if data is None:
         return jsonify({'error': 'Failed to load GTFS data'}), 500
     
+    return jsonify(stop_query_cache.get_or_compute(
+        cached_stop_query(data, 'search', query),
+        partial(search_results, data, query)
+    ))
+
+@app.route('/api/stops/autocomplete', methods=['GET'])
+@app.route('/api/fare/stops/autocomplete', methods=['GET'])
+def autocomplete_stops():
+    """Suggest stops for partially typed text, one page at a time"""
+    validator = StopAutocompleteRequestValidator()
+    is_valid, result = validator.validate(request.args.to_dict())
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    query, limit, offset = result['q'], result['limit'], result['offset']
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    # Row positions in a cursor are only meaningful for the feed version that issued it
+    if offset and result['feed_version'] != getattr(data, 'feed_version', None):
+        return jsonify({'error': 'Validation failed', 'details': ['cursor expired; the stop data has changed']}), 400
+    
+    return jsonify(stop_query_cache.get_or_compute(
+        cached_stop_query(data, 'autocomplete', query, offset, limit),
+        partial(autocomplete_results, data, query, offset, limit)
+    ))
+
+@app.route('/api/stops/cache', methods=['GET'])
+@app.route('/api/fare/stops/cache', methods=['GET'])
+def stop_cache_stats():
+    """Report hit rate, size and evictions of the stop query cache"""
+    return jsonify(stop_query_cache.stats())
+
+@app.route('/api/stops/resolve', methods=['POST'])
+@app.route('/api/fare/stops/resolve', methods=['POST'])
+def resolve_stops():
+    """Resolve many stop names (or partial names) in one request"""
+    validator = BatchStopResolveRequestValidator()
+    is_valid, result = validator.validate(request.get_json(silent=True))
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
     stops_df = data['stops']
+    stop_names = get_index(data, 'stop_names')
     
-    # Find stops that contain the query string
-    matching_stops = stops_df[stops_df['stop_name'].str.lower().str.contains(query)]
-    results = matching_stops[['stop_id', 'stop_name']].to_dict('records')
+    # Repeated names are resolved once, and each stop is converted once
+    positions = stop_names.resolve_many(result['names'], fuzzy=result['fuzzy'], phonetic=result['phonetic'])
+    found = sorted({position for position in positions if position is not None})
+    records = dict(zip(found, stop_summaries(stops_df, found)))
+    results = [
+        {'query': name, 'stop': records.get(position)}
+        for name, position in zip(result['names'], positions)
+    ]
+    
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'resolved': sum(position is not None for position in positions)
+    })
+
+@app.route('/api/stops/nearby', methods=['GET'])
+@app.route('/api/fare/stops/nearby', methods=['GET'])
+def nearby_stops():
+    """Get the stops closest to a point"""
+    validator = NearbyStopsRequestValidator()
+    is_valid, result = validator.validate(request.args.to_dict())
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    rows, distances = get_index(data, 'stop_spatial').nearest(
+        [result['lat']], [result['lon']], k=result['limit'], radius_km=result['radius_km']
+    )
+    results = nearby_stop_records(data['stops'], rows[0], distances[0])
     
     return jsonify({
         'stops': results,
         'count': len(results),
-        'query': query
+        'lat': result['lat'],
+        'lon': result['lon']
     })
 
+@app.route('/api/stops/within', methods=['GET'])
+@app.route('/api/fare/stops/within', methods=['GET'])
+def stops_within():
+    """Get the stops within a radius of a point, closest first"""
+    validator = NearbyStopsRequestValidator(require_radius=True)
+    is_valid, result = validator.validate(request.args.to_dict())
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    [(rows, distances)] = get_index(data, 'stop_spatial').within(
+        [result['lat']], [result['lon']], radius_km=result['radius_km'], limit=result['limit']
+    )
+    results = nearby_stop_records(data['stops'], rows, distances)
+    
+    return jsonify({
+        'stops': results,
+        'count': len(results),
+        'lat': result['lat'],
+        'lon': result['lon'],
+        'radius_km': result['radius_km']
+    })
+
+@app.route('/api/stops/nearby/batch', methods=['POST'])
+@app.route('/api/fare/stops/nearby/batch', methods=['POST'])
+def nearby_stops_batch():
+    """Get the stops closest to each of several points in one lookup"""
+    validator = BatchNearbyStopsRequestValidator()
+    is_valid, result = validator.validate(request.get_json(silent=True))
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    # One vectorized tree query for every point
+    rows, distances = get_index(data, 'stop_spatial').nearest(
+        result['lat'], result['lon'], k=result['limit'], radius_km=result['radius_km']
+    )
+    stops_df = data['stops']
+    results = [
+        {'lat': lat, 'lon': lon, 'stops': nearby_stop_records(stops_df, point_rows, point_distances)}
+        for lat, lon, point_rows, point_distances in zip(result['lat'], result['lon'], rows, distances)
+    ]
+    
+    return jsonify({
+        'results': results,
+        'count': len(results)
+    })
+
+def station_records(data, stations_rows):
+    """Build id, name, centroid and member stop id dicts for stations"""
+    stations = get_index(data, 'stop_stations')
+    stop_ids = data['stops']['stop_id'].astype(str).to_numpy()
+    records = []
+    for station in stations_rows:
+        members = stations.members(station)
+        located = not np.isnan(stations.lat[station])
+        records.append({
+            'station_id': stations.ids[station],
+            'station_name': stations.names[station],
+            'station_lat': round(float(stations.lat[station]), COORDINATE_DECIMALS) if located else None,
+            'station_lon': round(float(stations.lon[station]), COORDINATE_DECIMALS) if located else None,
+            'stop_count': len(members),
+            'stop_ids': stop_ids[members].tolist()
+        })
+    return records
+
+def station_search_results(data, query):
+    """Find the stations whose name or member stop names contain query, or the closest names"""
+    stations = get_index(data, 'stop_stations')
+    found = stations.search(query)
+    match = 'substring'
+    if not len(found) and config.STOP_SEARCH_FUZZY:
+        found = [station for station, _ in stations.name_index.fuzzy(query, limit=config.STATION_SEARCH_LIMIT)]
+        match = 'fuzzy'
+    results = station_records(data, list(found)[:config.STATION_SEARCH_LIMIT])
+    
+    return {
+        'stations': results,
+        'count': len(results),
+        'total': len(found),
+        'query': query,
+        'match': match if results else None
+    }
+
+@app.route('/api/stations/search', methods=['GET'])
+@app.route('/api/fare/stations/search', methods=['GET'])
+def search_stations():
+    """Search stations (groups of close, similarly named stops) by name"""
+    query = request.args.get('q', '').lower()
+    if not query:
+        return jsonify({'stations': []})
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    return jsonify(stop_query_cache.get_or_compute(
+        cached_stop_query(data, 'stations', query),
+        partial(station_search_results, data, query)
+    ))
+
+@app.route('/api/stations/<station_id>', methods=['GET'])
+@app.route('/api/fare/stations/<station_id>', methods=['GET'])
+def get_station(station_id):
+    """Get a station and its member stops"""
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    stations = get_index(data, 'stop_stations')
+    station = stations.position(station_id)
+    if station is None:
+        return jsonify({'error': f'Station {station_id} not found'}), 404
+    
+    [record] = station_records(data, [station])
+    record['stops'] = stop_summaries(data['stops'], stations.members(station))
+    return jsonify(record)
+
+@app.route('/api/stops/<stop_id>/station', methods=['GET'])
+@app.route('/api/fare/stops/<stop_id>/station', methods=['GET'])
+def get_stop_station(stop_id):
+    """Get the station a stop belongs to"""
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    row = get_index(data, 'stop_rows').get(stop_id)
+    if row is None:
+        return jsonify({'error': f'Stop {stop_id} not found'}), 404
+    
+    [record] = station_records(data, [int(get_index(data, 'stop_stations').station_of[row])])
+    return jsonify(record)
+
+# Sources of fares priced from GTFS fare rules; other sources are fallbacks
+GTFS_FARE_SOURCES = ('gtfs', 'contains_zone')
+
+SAME_STOP_ERROR = 'Origin and destination are the same stop'
+
+def fare_details(fare_info, distance_km=None):
+    """
+    Build the fare fields shared by the single and batch fare responses.
+    
+    Args:
+        fare_info: Fare dict from calculate_fare / calculate_fares
+        distance_km: Distance between the stops, used when the fare is not
+            distance-based (NaN or None when unknown)
+    
+    Returns:
+        Dict with fare, currency, fare_id, route_id, gst, total, source,
+        fallback and (when known) distance_km
+    """
+    price = float(fare_info['price'])
+    source = fare_info.get('source', 'gtfs')
+    details = {
+        'fare': price,
+        'currency': fare_info['currency'],
+        'fare_id': fare_info['fare_id'],
+        'route_id': fare_info['route_id'],
+        'gst': price * config.GST_RATE,
+        'total': price * (1 + config.GST_RATE),
+        'source': source,
+        'fallback': source not in GTFS_FARE_SOURCES
+    }
+    distance_km = fare_info.get('distance_km', distance_km)
+    if distance_km is not None and not np.isnan(distance_km):
+        details['distance_km'] = round(float(distance_km), 2)
+    return details
+
 @app.route('/api/calculate_fare', methods=['POST'])
 @app.route('/api/fare/calculate', methods=['POST'])
 def calculate_fare_endpoint():
@@ -420,8 +836,9 @@ def calculate_fare_endpoint():
         routes_df = gtfs_data['routes']
         
         # Find stops by name
-        origin_stop = find_stop_by_name(stops_df, origin)
-        destination_stop = find_stop_by_name(stops_df, destination)
+        stop_names = get_index(gtfs_data, 'stop_names')
+        origin_stop = find_stop_by_name(stops_df, origin, stop_names)
+        destination_stop = find_stop_by_name(stops_df, destination, stop_names)
         
         if origin_stop is None:
             return jsonify({'error': f'Origin stop "{origin}" not found'}), 404
@@ -430,6 +847,8 @@ def calculate_fare_endpoint():
         
         origin_id = origin_stop['stop_id']
         destination_id = destination_stop['stop_id']
+        if str(origin_id) == str(destination_id):
+            return jsonify({'error': SAME_STOP_ERROR}), 400
         
         # Get actual stop names from database
         actual_origin_name = origin_stop['stop_name']
@@ -444,31 +863,9 @@ def calculate_fare_endpoint():
         
         # Calculate fare
         fare_info = calculate_fare(origin_id, destination_id, route_id)
-        
         if fare_info is None:
-            # Fallback to estimated fare if no GTFS data found
-            distance_km = 5.0  # Default distance if unknown
-            price = 5.0 + (distance_km * 2.0)
-            
-            return jsonify({
-                'origin': origin,
-                'destination': destination,
-                'fare': float(price),
-                'currency': 'INR',
-                'distance_km': float(distance_km),
-                'gst': float(price * 0.05),
-                'total': float(price * 1.05),
-                'source': 'estimated',
-                'message': 'Fare estimated based on average distance'
-            })
-        
-        # Calculate GST (5%) and total
-        price = float(fare_info['price'])
-        gst = float(price * 0.05)
-        total = float(price * 1.05)
-        
-        # Approximate distance based on fare (assuming ₹2/km after base fare)
-        distance_km = float((price - 5.0) / 2.0 if price > 5.0 else 1.0)
+            return jsonify({'error': 'Failed to load GTFS data'}), 500
+        distance_km = stop_distances_km(gtfs_data, [str(origin_id)], [str(destination_id)])[0]
         
         # Return fare information
         response = {
@@ -478,14 +875,7 @@ def calculate_fare_endpoint():
             'actual_destination_name': actual_destination_name,
             'origin_id': origin_id,
             'destination_id': destination_id,
-            'fare': price,
-            'currency': fare_info['currency'],
-            'fare_id': fare_info['fare_id'],
-            'route_id': fare_info['route_id'],
-            'distance_km': distance_km,
-            'gst': gst,
-            'total': total,
-            'source': 'gtfs',
+            **fare_details(fare_info, distance_km),
             'message': 'Fare calculated from GTFS dataset'
         }
         
@@ -493,13 +883,194 @@ def calculate_fare_endpoint():
         if route_name:
             response['route_name'] = route_name
         
-        logger.info(f"Calculated fare: ₹{price:.2f} for {origin} -> {destination} (distance ~{distance_km:.2f}km)")
+        logger.info(f"Calculated fare: ₹{response['fare']:.2f} for {origin} -> {destination} ({response['source']})")
         return jsonify(response)
         
     except Exception as e:
         log_error(logger, e, "Error calculating fare")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/calculate_fare/batch', methods=['POST'])
+@app.route('/api/fare/calculate/batch', methods=['POST'])
+def calculate_fare_batch():
+    """Calculate the fares of many origin/destination pairs, given by stop id or name"""
+    validator = BatchFareRequestValidator()
+    is_valid, result = validator.validate(request.get_json(silent=True))
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    stops_df = data['stops']
+    pairs = result['pairs']
+    fields = BatchFareRequestValidator.STOP_FIELDS
+    
+    # Names are resolved together (each distinct name once), ids by the stop_rows index
+    names = [pair[field] for pair in pairs for field in fields if pair[field] is not None]
+    positions = iter(get_index(data, 'stop_names').resolve_many(
+        names, fuzzy=result['fuzzy'], phonetic=result['phonetic']
+    ))
+    stop_rows = get_index(data, 'stop_rows')
+    rows = [
+        [next(positions) if pair[field] is not None else stop_rows.get(pair[f'{field}_id']) for field in fields]
+        for pair in pairs
+    ]
+    
+    stop_ids = stops_df['stop_id'].astype(str).to_numpy()
+    stop_names = stops_df['stop_name'].to_numpy(dtype=object)
+    priced = [i for i, (origin_row, dest_row) in enumerate(rows)
+              if origin_row is not None and dest_row is not None and origin_row != dest_row]
+    fares = calculate_fares(
+        [stop_ids[rows[i][0]] for i in priced],
+        [stop_ids[rows[i][1]] for i in priced],
+        [pairs[i]['route_id'] for i in priced]
+    ) if priced else []
+    fare_of = dict(zip(priced, fares))
+    distances = stop_distances_km(
+        data, [stop_ids[rows[i][0]] for i in priced], [stop_ids[rows[i][1]] for i in priced]
+    ) if priced else []
+    distance_of = dict(zip(priced, distances))
+    
+    results = []
+    sources = {}
+    for i, (pair, pair_rows) in enumerate(zip(pairs, rows)):
+        item = {}
+        for field, row in zip(fields, pair_rows):
+            item[field] = pair[field] if pair[field] is not None else pair[f'{field}_id']
+            item[f'{field}_id'] = stop_ids[row] if row is not None else None
+            item[f'{field}_name'] = stop_names[row] if row is not None else None
+        fare_info = fare_of.get(i)
+        if fare_info is None:
+            missing = next((field for field, row in zip(fields, pair_rows) if row is None), None)
+            item['fare'] = None
+            item['error'] = (f'{missing.capitalize()} stop "{item[missing]}" not found' if missing
+                             else SAME_STOP_ERROR)
+            results.append(item)
+            continue
+        
+        item.update(fare_details(fare_info, distance_of[i]))
+        sources[item['source']] = sources.get(item['source'], 0) + 1
+        results.append(item)
+    
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'priced': len(priced),
+        'sources': sources
+    })
+
+def fare_matrix_axis(data, stop_rows, level):
+    """Row (and column) ids of an exported fare matrix, with stop names at stop level"""
+    stops_df = data['stops']
+    stop_ids = stops_df['stop_id'].astype(str).to_numpy()[stop_rows]
+    if level == 'zone':
+        matrix = get_index(data, 'fare_matrix')
+        return list(dict.fromkeys(matrix.zone_id(stop_id) for stop_id in stop_ids)), None
+    return stop_ids.tolist(), stops_df['stop_name'].to_numpy(dtype=object)[stop_rows].tolist()
+
+def fare_matrix_rows(data, ids, route_id, level):
+    """
+    Yield an N x N fare matrix one origin at a time.
+    
+    Each row is priced in one vectorized pass over the N destinations
+    (calculate_fares for stops, GTFS fares only for zones), so working
+    memory stays O(N) however large the output.
+    
+    Yields:
+        (origin id, fares, sources) with None on the diagonal and where
+        there is no fare
+    """
+    matrix = get_index(data, 'fare_matrix')
+    route_ids = [route_id] * len(ids)
+    for position, origin_id in enumerate(ids):
+        origins = [origin_id] * len(ids)
+        if level == 'zone':
+            fares = matrix.lookup_many(origins, ids, route_ids)
+        else:
+            fares = calculate_fares(origins, ids, route_ids)
+        fares[position] = None
+        yield (
+            origin_id,
+            [fare['price'] if fare else None for fare in fares],
+            [fare.get('source', 'gtfs') if fare else None for fare in fares]
+        )
+
+def fare_matrix_csv(ids, rows):
+    """CSV lines of a fare matrix: a header of destination ids, then one line per origin"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush():
+        lines = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return lines
+    
+    writer.writerow(['origin_id', *ids])
+    yield flush()
+    for origin_id, prices, _ in rows:
+        writer.writerow([origin_id, *('' if price is None else price for price in prices)])
+        yield flush()
+
+def fare_matrix_ndjson(header, names, rows):
+    """NDJSON lines of a fare matrix: a header record, then one record per origin"""
+    yield json.dumps(header) + '\n'
+    for position, (origin_id, prices, sources) in enumerate(rows):
+        record = {'origin_id': origin_id}
+        if names is not None:
+            record['origin_name'] = names[position]
+        record.update({'fares': prices, 'sources': sources})
+        yield json.dumps(record) + '\n'
+
+@app.route('/api/fare_matrix', methods=['GET'])
+@app.route('/api/fare/matrix', methods=['GET'])
+def export_fare_matrix():
+    """Stream the stop-to-stop or zone-to-zone fares of a route or a set of stops as CSV or NDJSON"""
+    validator = FareMatrixExportRequestValidator()
+    is_valid, result = validator.validate(request.args.to_dict())
+    if not is_valid:
+        return jsonify({'error': 'Validation failed', 'details': result['errors']}), 400
+    
+    data = load_gtfs_data()
+    if data is None:
+        return jsonify({'error': 'Failed to load GTFS data'}), 500
+    
+    route_id, level = result['route_id'], result['level']
+    if result['stop_ids'] is not None:
+        stop_rows = get_index(data, 'stop_rows')
+        rows = [stop_rows.get(stop_id) for stop_id in result['stop_ids']]
+        missing = [stop_id for stop_id, row in zip(result['stop_ids'], rows) if row is None]
+        if missing:
+            return jsonify({'error': f'Stops not found: {", ".join(missing[:10])}'}), 404
+        rows = list(dict.fromkeys(rows))
+    else:
+        rows = get_index(data, 'route_stops').get(route_id)
+        if rows is None:
+            return jsonify({'error': f'Route "{route_id}" not found or has no stops'}), 404
+        if len(rows) > validator.max_stops:
+            return jsonify({
+                'error': f'Route "{route_id}" serves {len(rows)} stops, more than the maximum of {validator.max_stops}'
+            }), 400
+    
+    ids, names = fare_matrix_axis(data, rows, level)
+    matrix_rows = fare_matrix_rows(data, ids, route_id, level)
+    logger.info(f"Exporting {len(ids)}x{len(ids)} {level} fare matrix as {result['format']}")
+    if result['format'] == 'csv':
+        lines, mimetype = fare_matrix_csv(ids, matrix_rows), 'text/csv'
+    else:
+        header = {'level': level, 'route_id': route_id, 'columns': ids}
+        if names is not None:
+            header['names'] = names
+        lines, mimetype = fare_matrix_ndjson(header, names, matrix_rows), 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(lines),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=fare_matrix_{level}.{result["format"]}'}
+    )
+
 @app.route('/api/journey/plan', methods=['GET'])
 def plan_journey():
     """API endpoint to plan a journey between two stops"""
@@ -533,8 +1104,9 @@ def plan_journey():
         routes_df = gtfs_data['routes']
         
         # Find stops by name
-        origin_stop = find_stop_by_name(stops_df, fromStop)
-        dest_stop = find_stop_by_name(stops_df, toStop)
+        stop_names = get_index(gtfs_data, 'stop_names')
+        origin_stop = find_stop_by_name(stops_df, fromStop, stop_names)
+        dest_stop = find_stop_by_name(stops_df, toStop, stop_names)
         
         if not origin_stop:
             return jsonify({'error': f'Origin stop not found: {fromStop}'}), 404
@@ -562,30 +1134,16 @@ def plan_journey():
         
         # Get route shapes
         shapes_df = gtfs_data.get('shapes')
-        route_shapes = get_route_shapes(shapes_df, route_short_name)
+        route_shapes = get_route_shapes(shapes_df, route_short_name, get_index(gtfs_data, 'shape_points'))
         
         # Calculate fare
         fare_result = calculate_fare(origin_stop['stop_id'], dest_stop['stop_id'], route_id)
         
         # Calculate estimated time (simple approximation)
-        from math import radians, cos, sin, asin, sqrt
-        
-        def haversine(lon1, lat1, lon2, lat2):
-            # Convert decimal degrees to radians
-            lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-            # Haversine formula
-            dlon = lon2 - lon1
-            dlat = lat2 - lat1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a))
-            r = 6371  # Radius of earth in kilometers
-            return c * r
-        
-        # Calculate distance
-        distance = haversine(
-            float(origin_stop['stop_lon']), float(origin_stop['stop_lat']),
-            float(dest_stop['stop_lon']), float(dest_stop['stop_lat'])
-        )
+        distance = float(haversine_km(
+            float(origin_stop['stop_lat']), float(origin_stop['stop_lon']),
+            float(dest_stop['stop_lat']), float(dest_stop['stop_lon'])
+        ))
         
         # Estimate time (assuming average bus speed of 20 km/h)
         avg_speed = 20  # km/h
@@ -699,7 +1257,7 @@ def export_fares_to_csv():
             fare_attributes_df,
             on='fare_id',
             how='left'
-        ).groupby(['origin_id', 'destination_id'])['price'].mean()
+        ).groupby(['origin_id', 'destination_id'], observed=True)['price'].mean()
         logger.debug(f"Sample Zone-Based Fares:\n{zone_fares.head(10)}")
     
     return True
@@ -729,9 +1287,10 @@ def export_fares_endpoint():
 if __name__ == '__main__':
     # Load data on startup
     data = load_gtfs_data()
+    start_feed_watcher()
     
-    # Export fare data to CSV for analysis
-    if data:
+    # Export fare data to CSV for analysis (materializes every table)
+    if data and config.EXPORT_ENABLED:
         logger.info("Exporting GTFS fare data to CSV for analysis")
         export_fares_to_csv()
     
@@ -742,16 +1301,31 @@ if __name__ == '__main__':
         config.FARE_API_HOST,
         config.FARE_API_PORT,
         gtfs_loaded=data is not None,
-        stops=len(data['stops']) if data else 0,
-        routes=len(data['routes']) if data else 0,
-        endpoints=6
+        gtfs_tables_loaded=', '.join(dataset_status(data)['loaded_tables']) if data else 'none',
+        endpoints=22
     )
     
     logger.info("Available Endpoints:")
     logger.info("  - GET  /api/health")
+    logger.info("  - GET  /api/gtfs/status")
+    logger.info("  - GET  /api/gtfs/memory")
+    logger.info("  - GET  /api/gtfs/feeds")
+    logger.info("  - GET  /api/gtfs/validation")
+    logger.info("  - POST /api/gtfs/reload")
     logger.info("  - GET  /api/stops")
     logger.info("  - GET  /api/stops/search")
+    logger.info("  - GET  /api/stops/autocomplete")
+    logger.info("  - POST /api/stops/resolve")
+    logger.info("  - GET  /api/stops/cache")
+    logger.info("  - GET  /api/stops/nearby")
+    logger.info("  - GET  /api/stops/within")
+    logger.info("  - POST /api/stops/nearby/batch")
+    logger.info("  - GET  /api/stops/<stop_id>/station")
+    logger.info("  - GET  /api/stations/search")
+    logger.info("  - GET  /api/stations/<station_id>")
     logger.info("  - POST /api/calculate_fare")
+    logger.info("  - POST /api/calculate_fare/batch")
+    logger.info("  - GET  /api/fare_matrix")
     logger.info("  - GET  /api/journey/plan")
     logger.info("  - GET  /api/export-fares")
     
@@ -0,0 +1,265 @@
+"""
+Incremental GTFS Feed Ingestion for BMTC Fare Service
+
+A new BMTC feed drop usually changes a small share of stops, routes and
+trips. Instead of reloading every table and rebuilding every derived index,
+this module diffs the new feed files against the tables of the active
+dataset and applies only the inserted, updated and deleted rows:
+
+- Tables whose source file is unchanged are reused as-is.
+- Changed tables are matched row by row on their primary key (see
+  GTFS_PRIMARY_KEYS) and compared by row hash. Surviving rows keep their
+  position, updated rows are replaced in place and inserted rows are
+  appended, so positional indexes stay valid where possible.
+- Indexes whose tables are unchanged are carried over; indexes registered
+  with an update function are patched; the rest are rebuilt.
+
+Tables without a primary key, with duplicate keys or with a changed column
+layout are replaced wholesale.
+
+Usage:
+    from gtfs_diff import apply_feed_diff
+
+    new = GTFSDataset.from_config()
+    report = apply_feed_diff(active, new)
+    print(report['tables']['stops'])   # {'mode': 'patched', 'inserted': 12, ...}
+"""
+
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from logger import setup_logger
+from config import config
+from gtfs_loader import GTFSDataset, INDEX_BUILDERS, concat_typed_chunks, read_table
+from gtfs_validation import GTFS_PRIMARY_KEYS, parent_tables
+from gtfs_snapshot import source_fingerprint
+
+logger = setup_logger('gtfs_diff', log_file=config.BASE_DIR / 'fare_api.log')
+
+# Number of changed keys per kind listed in a diff report
+REPORT_SAMPLE_KEYS = 20
+
+
+def _key_index(df: pd.DataFrame, key: List[str]) -> pd.Index:
+    """Build the primary key index of a table"""
+    if len(key) == 1:
+        return pd.Index(df[key[0]].astype(object), name=key[0])
+    return pd.MultiIndex.from_frame(df[key].astype(object))
+
+
+def table_row_hashes(df: pd.DataFrame, key: List[str]) -> Dict[str, Any]:
+    """
+    Compute the primary key and per-row content hash of a table.
+
+    Hashes are value-based, so categorical columns with different category
+    sets hash equal for equal values.
+
+    Args:
+        df: Table with the memory-lean schema applied
+        key: Primary key columns
+
+    Returns:
+        Dict with 'keys' (pandas Index, positional) and 'hashes' (uint64 array)
+    """
+    return {
+        'keys': _key_index(df, key),
+        'hashes': pd.util.hash_pandas_object(df, index=False).to_numpy()
+    }
+
+
+def _diff_key(name: str, old_df: pd.DataFrame, new_df: pd.DataFrame) -> Optional[List[str]]:
+    """Get the key to diff a table on, or None if it must be replaced"""
+    key = GTFS_PRIMARY_KEYS.get(name)
+    if not key or key[0] not in old_df.columns:
+        return None
+    # Optional GTFS columns (e.g. fare_rules.contains_id) may be absent
+    key = [column for column in key if column in old_df.columns]
+    if list(old_df.columns) != list(new_df.columns):
+        return None
+    if [str(dtype) for dtype in old_df.dtypes] != [str(dtype) for dtype in new_df.dtypes]:
+        return None
+    return key
+
+
+def _sample(keys: pd.Index) -> List[Any]:
+    return [list(k) if isinstance(k, tuple) else k for k in keys[:REPORT_SAMPLE_KEYS]]
+
+
+def diff_table(
+    name: str,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    old_hashes: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Diff two versions of a GTFS table and build the patched table.
+
+    Args:
+        name: GTFS table name
+        old_df: Table of the active feed
+        new_df: Table parsed from the new feed files
+        old_hashes: Cached table_row_hashes() of old_df, if available
+
+    Returns:
+        Dict with 'mode' ('unchanged', 'patched' or 'replaced'), row counts,
+        'inserted'/'updated'/'deleted' counts and sample keys, 'inserted_from'
+        (position of the first appended row), the resulting 'df' and its
+        'row_hashes'
+    """
+    result = {
+        'rows_before': int(len(old_df)),
+        'rows_after': int(len(new_df)),
+        'inserted': 0, 'updated': 0, 'deleted': 0
+    }
+    key = _diff_key(name, old_df, new_df)
+    if key is None:
+        return {**result, 'mode': 'replaced', 'df': new_df, 'row_hashes': None}
+    if old_hashes is None or len(old_hashes['hashes']) != len(old_df):
+        old_hashes = table_row_hashes(old_df, key)
+    if old_hashes['keys'].has_duplicates:
+        return {**result, 'mode': 'replaced', 'df': new_df, 'row_hashes': None}
+    new_hashes = table_row_hashes(new_df, key)
+    if new_hashes['keys'].has_duplicates:
+        return {**result, 'mode': 'replaced', 'df': new_df, 'row_hashes': None}
+
+    old_keys, new_keys = old_hashes['keys'], new_hashes['keys']
+    n_old = len(old_df)
+
+    # Position of each old row in the new table (-1: deleted)
+    new_pos = new_keys.get_indexer(old_keys)
+    kept = new_pos >= 0
+    changed = np.zeros(n_old, dtype=bool)
+    changed[kept] = old_hashes['hashes'][kept] != new_hashes['hashes'][new_pos[kept]]
+    inserted_pos = np.flatnonzero(~new_keys.isin(old_keys))
+
+    result.update({
+        'inserted': int(len(inserted_pos)),
+        'updated': int(changed.sum()),
+        'deleted': int((~kept).sum()),
+        'inserted_keys': _sample(new_keys[inserted_pos]),
+        'updated_keys': _sample(old_keys[changed]),
+        'deleted_keys': _sample(old_keys[~kept])
+    })
+    if not (result['inserted'] or result['updated'] or result['deleted']):
+        return {**result, 'mode': 'unchanged', 'df': old_df, 'row_hashes': old_hashes}
+
+    # Rows of the patched table, as positions in old rows followed by new rows
+    source = np.where(changed, n_old + new_pos, np.arange(n_old))[kept]
+    order = np.concatenate([source, n_old + inserted_pos])
+    patched = concat_typed_chunks([old_df, new_df]).take(order).reset_index(drop=True)
+    hashes = np.concatenate([old_hashes['hashes'], new_hashes['hashes']])[order]
+
+    return {
+        **result,
+        'mode': 'patched',
+        'inserted_from': int(len(source)),
+        'df': patched,
+        'row_hashes': {'keys': _key_index(patched, key), 'hashes': hashes}
+    }
+
+
+def apply_feed_diff(old: GTFSDataset, new: GTFSDataset) -> Dict[str, Any]:
+    """
+    Populate a new dataset from the active one by applying the feed diff.
+
+    Every table and index the active dataset has loaded is installed in the
+    new dataset, reusing or patching the previous version where possible.
+    Tables the active dataset never loaded stay lazy.
+
+    Args:
+        old: Active dataset
+        new: Freshly created (not yet loaded) dataset for the new feed files
+
+    Returns:
+        Change report with per-table and per-index details
+    """
+    start = perf_counter()
+    changes: Dict[str, Dict[str, Any]] = {}
+
+    # Referenced tables first, so validating a patched table (which loads
+    # its parents) finds them already installed
+    loaded = sorted(old.status()['loaded_tables'], key=lambda name: len(parent_tables(name)))
+    for name in loaded:
+        if name not in new.paths or new.is_loaded(name):
+            continue
+        table_start = perf_counter()
+        old_df = old[name]
+        fingerprint = source_fingerprint(new.paths[name])
+
+        if fingerprint is not None and fingerprint == old.loaded_fingerprint(name) and old_df is not None:
+            new.adopt_table(
+                name, old_df, source='reused',
+                default_bytes=old.default_bytes(name), fingerprint=fingerprint,
+                validation=old.table_validation(name)
+            )
+            if name in old.row_hashes:
+                new.row_hashes[name] = old.row_hashes[name]
+            change = {'mode': 'unchanged', 'rows_before': int(len(old_df)), 'rows_after': int(len(old_df))}
+        elif fingerprint is None:
+            # File removed from the feed; required tables fail in new[name]
+            new[name]
+            change = {'mode': 'removed', 'rows_before': int(len(old_df)) if old_df is not None else 0, 'rows_after': 0}
+        elif old_df is None:
+            new_df = new[name]
+            change = {'mode': 'added', 'rows_before': 0, 'rows_after': int(len(new_df))}
+        else:
+            parsed = read_table(name, new.paths[name], new.snapshot_dir, chunk_rows=new.chunk_rows)
+            change = diff_table(name, old_df, parsed['df'], old_hashes=old.row_hashes.get(name))
+            source = 'reused' if change['mode'] == 'unchanged' else change['mode']
+            df = change.pop('df')
+            validation = old.table_validation(name)
+            if df is not old_df:
+                # Raises for a rejected required table, which fails the reload
+                df = new.check_table(name, df)
+                validation = new.table_validation(name)
+            new.adopt_table(
+                name, df, source=source if df is not None else 'rejected',
+                default_bytes=parsed['default_bytes'], fingerprint=fingerprint,
+                validation=validation
+            )
+            row_hashes = change.pop('row_hashes')
+            if row_hashes is not None:
+                new.row_hashes[name] = row_hashes
+
+        change['diff_ms'] = round((perf_counter() - table_start) * 1000, 2)
+        changes[name] = change
+
+    index_report = {}
+    for name in old.built_indexes():
+        spec = INDEX_BUILDERS.get(name)
+        if spec is None:
+            continue
+        index_start = perf_counter()
+        tables = spec['tables']
+        if all(changes.get(table, {}).get('mode') == 'unchanged' for table in tables):
+            new.adopt_index(name, old.index(name))
+            action = 'carried'
+        else:
+            updated = None
+            if spec['update'] is not None:
+                updated = spec['update'](old.index(name), new, {table: changes.get(table, {}) for table in tables})
+            if updated is not None:
+                new.adopt_index(name, updated)
+                action = 'updated'
+            else:
+                new.index(name)
+                action = 'rebuilt'
+        index_report[name] = {'action': action, 'ms': round((perf_counter() - index_start) * 1000, 2)}
+
+    report = {
+        'tables': changes,
+        'indexes': index_report,
+        'changed_tables': [name for name, change in changes.items() if change['mode'] != 'unchanged'],
+        'total_ms': round((perf_counter() - start) * 1000, 2)
+    }
+    logger.info(
+        f"Applied GTFS feed diff in {report['total_ms']:.0f}ms: " +
+        (', '.join(
+            f"{name} +{c.get('inserted', 0)} ~{c.get('updated', 0)} -{c.get('deleted', 0)} ({c['mode']})"
+            for name, c in changes.items() if c['mode'] != 'unchanged'
+        ) or 'no table changes')
+    )
+    return report
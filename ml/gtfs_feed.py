@@ -0,0 +1,398 @@
+"""
+GTFS Feed Hot Reload for BMTC Fare Service
+
+This module provides FeedManager, which owns the active GTFS dataset of a
+process and can replace it with a new feed drop without a restart. A new
+dataset is built and warmed off to the side (the tables and indexes the
+running dataset already uses are loaded up front) and then swapped in with a
+single reference assignment, so requests never wait on a reload and requests
+already in flight finish against the version they started with.
+
+With incremental ingestion (the default) the new dataset is populated by
+applying the feed diff to the running one (see gtfs_diff): unchanged tables
+and indexes are reused and changed tables are patched row by row. The
+change report of the last reload is kept for status reporting.
+
+FeedRegistry holds several such feeds (e.g. the Vonter BMTC feed and the
+older Kaggle-derived one) and evicts unused ones under a memory budget.
+
+A background watcher thread polls the source files and reloads once a
+change has been stable for one poll interval (so a half-copied feed drop is
+not picked up).
+
+Usage:
+    from gtfs_feed import FeedManager
+
+    feed = FeedManager(build_dataset)
+    data = feed.current()                         # builds on first call
+    feed.start_watcher(config.GTFS_RELOAD_INTERVAL)
+    feed.reload()                                 # or reload on demand
+
+    feeds = FeedRegistry({'bmtc': feed, 'kaggle': other}, default='bmtc')
+    data = feeds.current('kaggle')
+"""
+
+import threading
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from logger import setup_logger, log_error
+from config import config
+from gtfs_loader import GTFSDataset
+from gtfs_diff import apply_feed_diff
+
+logger = setup_logger('gtfs_feed', log_file=config.BASE_DIR / 'fare_api.log')
+
+
+class FeedManager:
+    """
+    Holds the active GTFS dataset and swaps in new feed versions atomically.
+
+    The factory returns a new (lazy) dataset, or None when the feed cannot
+    be served; a None result is kept just like a loaded dataset until the
+    next successful reload.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Optional[GTFSDataset]],
+        name: str = 'default',
+        incremental: bool = True
+    ):
+        """
+        Args:
+            factory: Callable creating a dataset for the current source files
+            name: Feed name used in log messages
+            incremental: Apply the feed diff on reload instead of reloading
+                every table the active dataset has loaded
+        """
+        self.name = name
+        self.incremental = incremental
+        self._factory = factory
+        self._current: Optional[GTFSDataset] = None
+        self._initialized = False
+        self._signature: Optional[Dict[str, Any]] = None
+        self._build_lock = threading.Lock()
+        self._listeners: List[Callable[[Optional[GTFSDataset], Optional[GTFSDataset]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.loaded_at: Optional[str] = None
+        self.reload_count = 0
+        self.last_reload_ms: Optional[float] = None
+        self.last_diff: Optional[Dict[str, Any]] = None
+
+    # ==================== Active dataset ====================
+
+    def current(self) -> Optional[GTFSDataset]:
+        """Get the active dataset, creating it on first call"""
+        if not self._initialized:
+            with self._build_lock:
+                if not self._initialized:
+                    self._current = self._build()
+                    self._initialized = True
+        return self._current
+
+    def _build(self) -> Optional[GTFSDataset]:
+        dataset = self._factory()
+        self._signature = None
+        if dataset is not None:
+            self._signature = dataset.source_signature()
+            # Read feed_info now so the version is fixed to these files
+            dataset.feed_version
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        return dataset
+
+    def add_swap_listener(
+        self,
+        listener: Callable[[Optional[GTFSDataset], Optional[GTFSDataset]], None]
+    ) -> None:
+        """
+        Register a callback run after each swap as listener(old, new).
+
+        Eviction also runs it, with new=None. Use this to drop caches
+        derived from the previous feed.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, old: Optional[GTFSDataset], new: Optional[GTFSDataset]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(old, new)
+            except Exception as e:
+                log_error(logger, e, "Error in GTFS feed swap listener")
+
+    # ==================== Reloading ====================
+
+    def has_changed(self) -> bool:
+        """Check whether the source files differ from the active dataset's"""
+        if not self._initialized:
+            # Not loaded (or evicted): the next current() reads the files anyway
+            return False
+        current = self._current
+        if current is None:
+            # Nothing is being served; retry whenever asked
+            return True
+        return current.source_signature() != self._signature
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Build the current source files into a new dataset and swap it in.
+
+        The new dataset gets every table and index the active one has
+        loaded (patched from the active version when incremental), so the
+        first requests after the swap are as fast as the last ones before it.
+
+        Args:
+            force: Reload even if the source files look unchanged
+
+        Returns:
+            True if a new dataset was swapped in
+        """
+        with self._build_lock:
+            old = self._current
+            if not force and old is not None and old.source_signature() == self._signature:
+                return False
+
+            start = perf_counter()
+            try:
+                signature = None
+                diff = None
+                new = self._factory()
+                if new is not None:
+                    signature = new.source_signature()
+                    if old is not None and self.incremental:
+                        diff = apply_feed_diff(old, new)
+                    elif old is not None:
+                        new.warm(tables=old.status()['loaded_tables'], indexes=old.built_indexes())
+                    new.feed_version
+            except Exception as e:
+                log_error(logger, e, f"Error reloading GTFS feed {self.name}; keeping the active version")
+                return False
+
+            if new is None:
+                logger.error(f"New GTFS feed {self.name} could not be loaded; keeping the active version")
+                return False
+
+            # Swap: a single reference assignment, atomic for readers
+            self._current = new
+            self._signature = signature
+            self._initialized = True
+            self.loaded_at = datetime.now().isoformat(timespec='seconds')
+            self.reload_count += 1
+            self.last_diff = diff
+            self.last_reload_ms = round((perf_counter() - start) * 1000, 2)
+
+        old_version = old.feed_version if old is not None else None
+        logger.info(
+            f"Swapped GTFS feed {self.name}: {old_version} -> {new.feed_version} "
+            f"(built in {self.last_reload_ms:.0f}ms)"
+        )
+        self._notify(old, new)
+        return True
+
+    def evict(self) -> None:
+        """
+        Drop the active dataset; the next current() builds it again.
+
+        Requests still holding the dataset keep using it until they finish.
+        Swap listeners run with new=None, since the rebuilt dataset may
+        carry the same feed_version as the evicted one.
+        """
+        with self._build_lock:
+            if not self._initialized:
+                return
+            old = self._current
+            self._current = None
+            self._signature = None
+            self._initialized = False
+        logger.info(f"Evicted GTFS feed {self.name}")
+        self._notify(old, None)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Check whether the feed currently holds a dataset"""
+        return self._initialized and self._current is not None
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Get the bytes of the tables and indexes the active dataset holds"""
+        current = self._current
+        if not isinstance(current, GTFSDataset):
+            return {'table_bytes': 0, 'index_bytes': 0}
+        report = current.memory_report()
+        return {'table_bytes': report['total_bytes_after'], 'index_bytes': report['total_index_bytes']}
+
+    def memory_bytes(self) -> int:
+        """Get the bytes of the tables and indexes the active dataset holds"""
+        return sum(self.memory_usage().values())
+
+    # ==================== Background watcher ====================
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Start a daemon thread that reloads the feed when its files change.
+
+        Args:
+            interval: Seconds between checks
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(interval,),
+            name=f'gtfs-feed-watcher-{self.name}',
+            daemon=True
+        )
+        self._watcher.start()
+        logger.info(f"Watching GTFS feed {self.name} for changes every {interval}s")
+
+    def stop_watcher(self) -> None:
+        """Stop the background watcher thread"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        pending = None
+        while not self._stop_event.wait(interval):
+            try:
+                if not self.has_changed():
+                    pending = None
+                    continue
+                current = self._current
+                signature = current.source_signature() if current is not None else None
+                # Only reload once the files have stopped changing
+                if signature == pending or current is None:
+                    self.reload(force=current is None)
+                    pending = None
+                else:
+                    pending = signature
+            except Exception as e:
+                log_error(logger, e, f"Error watching GTFS feed {self.name}")
+
+    def status(self) -> Dict[str, Any]:
+        """Get reload state for status reporting"""
+        current = self._current
+        usage = self.memory_usage()
+        return {
+            'feed': self.name,
+            'feed_version': current.feed_version if current is not None else None,
+            'loaded_at': self.loaded_at,
+            'reload_count': self.reload_count,
+            'last_reload_ms': self.last_reload_ms,
+            'last_diff': self.last_diff,
+            'watching': self._watcher is not None and self._watcher.is_alive(),
+            'loaded': self.is_loaded,
+            'memory_bytes': sum(usage.values()),
+            **usage
+        }
+
+
+class FeedRegistry:
+    """
+    Several GTFS feeds served side by side.
+
+    Each feed has its own FeedManager, and so its own dataset, indexes,
+    memory accounting and reload state. With a memory budget, the least
+    recently used feeds are evicted once the loaded tables and built
+    indexes of all feeds exceed it; an evicted feed is rebuilt on its next
+    use. Tables and indexes load lazily after a feed is handed out, so the
+    budget is enforced on the next access.
+    """
+
+    def __init__(self, managers: Dict[str, FeedManager], default: str, memory_budget: int = 0):
+        """
+        Args:
+            managers: Feed name -> FeedManager
+            default: Feed used when none is requested
+            memory_budget: Bytes of loaded tables and indexes to stay under (0: no limit)
+        """
+        if default not in managers:
+            raise ValueError(f"Default feed {default} is not registered")
+        self.managers = dict(managers)
+        self.default = default
+        self.memory_budget = memory_budget
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.managers
+
+    def names(self) -> List[str]:
+        """Get the registered feed names"""
+        return list(self.managers)
+
+    def get(self, name: Optional[str] = None) -> FeedManager:
+        """
+        Get the manager of a feed.
+
+        Raises:
+            KeyError: If the feed is not registered
+        """
+        return self.managers[name or self.default]
+
+    def current(self, name: Optional[str] = None) -> Optional[GTFSDataset]:
+        """
+        Get the active dataset of a feed (default feed when name is None).
+
+        Raises:
+            KeyError: If the feed is not registered
+        """
+        name = name or self.default
+        dataset = self.managers[name].current()
+        self._last_used[name] = perf_counter()
+        self.enforce_budget(keep=name)
+        return dataset
+
+    def memory_bytes(self) -> int:
+        """Get the bytes of loaded tables and indexes across all feeds"""
+        return sum(manager.memory_bytes() for manager in self.managers.values())
+
+    def enforce_budget(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Evict least recently used feeds until tables and indexes fit the budget.
+
+        Args:
+            keep: Feed that must not be evicted (the one being served)
+
+        Returns:
+            Names of the evicted feeds
+        """
+        if not self.memory_budget:
+            return []
+        evicted = []
+        with self._lock:
+            usage = {name: manager.memory_bytes() for name, manager in self.managers.items()}
+            total = sum(usage.values())
+            candidates = sorted(
+                (name for name, manager in self.managers.items() if name != keep and manager.is_loaded),
+                key=lambda name: self._last_used.get(name, 0.0)
+            )
+            for name in candidates:
+                if total <= self.memory_budget:
+                    break
+                self.managers[name].evict()
+                total -= usage[name]
+                evicted.append(name)
+        if evicted:
+            logger.info(
+                f"Evicted GTFS feeds {', '.join(evicted)} to stay within "
+                f"{self.memory_budget / 1e6:.0f} MB ({total / 1e6:.1f} MB loaded)"
+            )
+        return evicted
+
+    def start_watchers(self, interval: float) -> None:
+        """Start the background watcher of every feed"""
+        for manager in self.managers.values():
+            manager.start_watcher(interval)
+
+    def status(self) -> Dict[str, Any]:
+        """Get per-feed state for status reporting"""
+        return {
+            'default': self.default,
+            'memory_budget_bytes': self.memory_budget or None,
+            'memory_bytes': self.memory_bytes(),
+            'feeds': {name: manager.status() for name, manager in self.managers.items()}
+        }
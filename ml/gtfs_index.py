@@ -0,0 +1,428 @@
+"""
+Pre-built GTFS Lookup Indexes for BMTC Fare Service
+
+Request handlers used to answer lookups by scanning DataFrames: stop name
+filters, fare_rules masks and a str.contains over every shape point. This
+module registers the lookup structures those handlers need (see
+gtfs_loader.register_index) and can compile all of them once into a
+versioned bundle stored next to the columnar snapshot:
+
+- stop_rows:    stop_id -> row of stops
+- stop_names:   StopNameIndex over stop names and their translations
+- fare_pairs:   FareRuleIndex: (origin_id, destination_id[, route_id]) ->
+                first fare rule, contains_id rules and fare_id -> price/currency
+- fare_matrix:  FareMatrix: dense zone x zone fare ordinals over fare_pairs,
+                memory-mapped from an .npy file next to the snapshot
+- stop_routes:  number of distinct routes serving each stops row
+- stop_spatial: StopSpatialIndex over stop coordinates
+- stop_stations: StopStations grouping close, similarly named stops
+- route_trips:  route_id -> trip_ids
+- route_stops:  route_id -> stops rows in stop_sequence order
+- shape_points: shape_id -> points sorted by shape_pt_sequence
+
+At startup the service adopts every bundled index whose source files are
+unchanged, so the first request does not pay for building them. Indexes
+whose files changed (or that are not bundled) are still built on first use.
+
+Usage:
+    python gtfs_index.py compile      # build and write the bundle
+    python gtfs_index.py info         # show what the bundle holds
+
+    from gtfs_index import load_bundle
+    load_bundle(dataset)              # adopt bundled indexes
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from logger import setup_logger
+from config import config
+from gtfs_loader import GTFSDataset, INDEX_BUILDERS, get_index, register_index
+from gtfs_snapshot import source_fingerprint
+from gtfs_validation import GTFSValidationError
+from fare_engine import FareMatrix, FareRuleIndex
+from stop_search import StopNameIndex, stop_name_aliases
+from stop_spatial import StopSpatialIndex
+from stop_clusters import StopStations
+
+logger = setup_logger('gtfs_index', log_file=config.BASE_DIR / 'fare_api.log')
+
+# Bump whenever an index layout changes so stale bundles are ignored
+INDEX_BUNDLE_VERSION = 11
+
+
+# ==================== Index builders ====================
+
+def update_stop_rows(stop_rows, data, changes):
+    """Add appended stops to stop_rows; deletions shift rows, so rebuild then"""
+    change = changes['stops']
+    if change.get('mode') != 'patched' or change['deleted']:
+        return None
+    stop_rows = dict(stop_rows)
+    stop_ids = data['stops']['stop_id']
+    for position in range(change['inserted_from'], len(stop_ids)):
+        stop_rows.setdefault(stop_ids.iloc[position], position)
+    return stop_rows
+
+
+@register_index('stop_rows', tables=['stops'], update=update_stop_rows)
+def build_stop_rows(data):
+    """Map stop_id to the row position of its first occurrence in stops"""
+    stop_rows = {}
+    for position, stop_id in enumerate(data['stops']['stop_id']):
+        stop_rows.setdefault(stop_id, position)
+    return stop_rows
+
+
+@register_index('stop_names', tables=['stops', 'translations'])
+def build_stop_names(data):
+    """Stop name lookups for find_stop_by_name and stop search (see stop_search)"""
+    stops = data['stops']
+    return StopNameIndex(stops['stop_name'], aliases=stop_name_aliases(stops, data.get('translations')))
+
+
+@register_index('fare_pairs', tables=['fare_rules', 'fare_attributes'])
+def build_fare_pairs(data):
+    """Hash lookups of fare rules by zone pair and route (see fare_engine)"""
+    return FareRuleIndex(data['fare_rules'], data['fare_attributes'])
+
+
+def fare_matrix_path(dataset: GTFSDataset) -> Path:
+    """Get the fare matrix file of a dataset, named after its source files"""
+    tables = INDEX_BUILDERS['fare_matrix']['tables']
+    fingerprints = {table: dataset.loaded_fingerprint(table) for table in tables}
+    digest = hashlib.sha1(json.dumps(fingerprints, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return Path(dataset.snapshot_dir) / f'fare_matrix.v{INDEX_BUNDLE_VERSION}-{digest}.npy'
+
+
+@register_index('fare_matrix', tables=['stops', 'fare_rules', 'fare_attributes'])
+def build_fare_matrix(data):
+    """
+    Dense zone x zone fares over the fare_pairs index (see fare_engine).
+
+    With a snapshot directory the cells are written there and memory-mapped,
+    so workers adopting the index bundle share one copy. Matrices of older
+    source files are left in place (other workers or feeds may still map
+    them); compile_bundle removes them.
+    """
+    stops = data['stops']
+    matrix = FareMatrix(
+        get_index(data, 'fare_pairs'), stops['stop_id'],
+        stops['zone_id'] if 'zone_id' in stops.columns else None
+    )
+    if isinstance(data, GTFSDataset) and data.snapshot_dir is not None and matrix.cells is not None:
+        path = matrix.save(fare_matrix_path(data))
+        logger.info(f"Wrote fare matrix for {len(matrix)} zones ({matrix.cells.nbytes / 1e6:.1f} MB) to {path}")
+    return matrix
+
+
+def remove_stale_fare_matrices(snapshot_dir: Union[str, Path], keep: Path) -> List[Path]:
+    """
+    Remove fare matrix files other than keep from a snapshot directory.
+
+    Files still mapped by a running process cannot be removed on Windows;
+    they are skipped and removed by a later compile.
+
+    Returns:
+        The removed files
+    """
+    removed = []
+    for stale in Path(snapshot_dir).glob('fare_matrix.v*.npy'):
+        if stale == keep:
+            continue
+        try:
+            stale.unlink(missing_ok=True)
+            removed.append(stale)
+        except OSError as e:
+            logger.warning(f"Could not remove stale fare matrix {stale}: {e}")
+    return removed
+
+
+def _trip_routes(trips: pd.DataFrame) -> pd.Series:
+    """route_id of every trip_id (first row of duplicated trips)"""
+    route_by_trip = pd.Series(trips['route_id'].astype(str).to_numpy(), index=trips['trip_id'].astype(str).to_numpy())
+    return route_by_trip[~route_by_trip.index.duplicated()]
+
+
+@register_index('stop_routes', tables=['stops', 'trips', 'stop_times'])
+def build_stop_routes(data):
+    """
+    Number of distinct routes serving each stop, in stops row order.
+
+    Used to rank autocomplete suggestions. Stops are 0 when trips or
+    stop_times are missing (or rejected).
+    """
+    stops = data['stops']
+    counts = np.zeros(len(stops), dtype=np.int32)
+    trips, stop_times = data.get('trips'), data.get('stop_times')
+    if trips is None or stop_times is None or stop_times.empty:
+        return counts
+
+    served = pd.DataFrame({
+        'stop_id': stop_times['stop_id'].astype(str).to_numpy(),
+        'route_id': _trip_routes(trips).reindex(stop_times['trip_id'].astype(str).to_numpy()).to_numpy()
+    }).dropna().drop_duplicates()
+    per_stop = served.groupby('stop_id', sort=False).size()
+    matched = per_stop.reindex(stops['stop_id'].astype(str).to_numpy())
+    return matched.fillna(0).to_numpy(dtype=np.int32)
+
+
+@register_index('stop_coords', tables=['stops'])
+def build_stop_coords(data):
+    """Stop latitudes and longitudes as float arrays in stops row order (None without coordinates)"""
+    stops = data['stops']
+    if 'stop_lat' not in stops.columns or 'stop_lon' not in stops.columns:
+        return None
+    return stops['stop_lat'].to_numpy(dtype=np.float64), stops['stop_lon'].to_numpy(dtype=np.float64)
+
+
+@register_index('stop_spatial', tables=['stops'])
+def build_stop_spatial(data):
+    """KD-tree over stop coordinates for nearest-stop and radius queries"""
+    stops = data['stops']
+    return StopSpatialIndex(stops['stop_lat'], stops['stop_lon'])
+
+
+@register_index('stop_stations', tables=['stops'])
+def build_stop_stations(data):
+    """Stations of close, similarly named stops for station search (see stop_clusters)"""
+    stops = data['stops']
+    return StopStations(
+        stops['stop_id'], stops['stop_name'], stops['stop_lat'], stops['stop_lon'],
+        parent_stations=stops['parent_station'] if 'parent_station' in stops.columns else None
+    )
+
+
+@register_index('route_trips', tables=['trips'])
+def build_route_trips(data):
+    """Map route_id to its trip_ids in trips row order"""
+    trips = data['trips']
+    if trips is None:
+        return {}
+    return {
+        route_id: group.tolist()
+        for route_id, group in trips.groupby('route_id', observed=True, sort=False)['trip_id']
+    }
+
+
+@register_index('route_stops', tables=['stops', 'trips', 'stop_times'])
+def build_route_stops(data):
+    """
+    Map route_id to the stops rows it serves.
+
+    Stops are in stop_sequence order of the route's trips (trips in file
+    order), each stop at its first visit. Empty when trips or stop_times
+    are missing (or rejected).
+    """
+    stops = data['stops']
+    trips, stop_times = data.get('trips'), data.get('stop_times')
+    if trips is None or stop_times is None or stop_times.empty:
+        return {}
+
+    trip_ids = stop_times['trip_id'].astype(str).to_numpy()
+    trip_order = pd.Index(trips['trip_id'].astype(str).to_numpy()).drop_duplicates()
+    visits = pd.DataFrame({
+        'route_id': _trip_routes(trips).reindex(trip_ids).to_numpy(),
+        'trip': trip_order.get_indexer(trip_ids),
+        'sequence': pd.to_numeric(stop_times['stop_sequence'], errors='coerce').to_numpy(),
+        'row': pd.Index(stops['stop_id'].astype(str).to_numpy()).get_indexer(stop_times['stop_id'].astype(str).to_numpy())
+    })
+    visits = visits[visits['route_id'].notna() & (visits['trip'] >= 0) & (visits['row'] >= 0)]
+    visits = visits.sort_values(['trip', 'sequence'], kind='stable').drop_duplicates(['route_id', 'row'])
+    return {
+        route_id: group.to_numpy(dtype=np.int32)
+        for route_id, group in visits.groupby('route_id', sort=False)['row']
+    }
+
+
+@register_index('shape_points', tables=['shapes'])
+def build_shape_points(data):
+    """
+    Map shape_id to its points sorted by shape_pt_sequence.
+
+    Shapes are kept in order of first appearance, so the first shape
+    matching a route name is the same one a scan of the table would find.
+    """
+    shapes = data['shapes']
+    if shapes is None:
+        return {}
+    points = {}
+    for shape_id, group in shapes.groupby('shape_id', observed=True, sort=False):
+        order = np.argsort(group['shape_pt_sequence'].to_numpy(), kind='stable')
+        points[shape_id] = {
+            'lat': group['shape_pt_lat'].to_numpy()[order],
+            'lon': group['shape_pt_lon'].to_numpy()[order],
+            'seq': group['shape_pt_sequence'].to_numpy()[order]
+        }
+    return points
+
+
+# ==================== Bundle ====================
+
+def bundle_path(base_dir: Union[str, Path]) -> Path:
+    """Get the index bundle path under a snapshot base directory"""
+    return Path(base_dir) / f'indexes.v{INDEX_BUNDLE_VERSION}.pkl'
+
+
+def compile_bundle(dataset: GTFSDataset, path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Build every registered index and write them to a bundle.
+
+    Indexes whose tables are missing or rejected are skipped.
+
+    Args:
+        dataset: Dataset to build the indexes from
+        path: Bundle file to write
+
+    Returns:
+        Summary dict with the bundled index names, build times and size
+    """
+    path = Path(path)
+    indexes, skipped = {}, {}
+    for name, spec in INDEX_BUILDERS.items():
+        start = perf_counter()
+        try:
+            index = dataset.index(name)
+        except (FileNotFoundError, GTFSValidationError, KeyError) as e:
+            skipped[name] = f"{type(e).__name__}: {e}"
+            continue
+        indexes[name] = {
+            'tables': {table: dataset.loaded_fingerprint(table) for table in spec['tables']},
+            'index': index,
+            'build_ms': round((perf_counter() - start) * 1000, 2)
+        }
+
+    bundle = {
+        'format_version': INDEX_BUNDLE_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'feed_version': dataset.feed_version,
+        'indexes': indexes
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, staging = tempfile.mkstemp(prefix='.indexes-', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, path)
+    except Exception:
+        if os.path.exists(staging):
+            os.unlink(staging)
+        raise
+
+    logger.info(f"Wrote GTFS index bundle with {len(indexes)} indexes to {path}")
+
+    # The bundle now points at the current fare matrix; older ones are only
+    # mapped by processes that have not adopted it yet
+    matrix = indexes.get('fare_matrix', {}).get('index')
+    if matrix is not None and matrix.path is not None:
+        remove_stale_fare_matrices(matrix.path.parent, keep=matrix.path)
+    return {
+        'path': str(path),
+        'bytes': path.stat().st_size,
+        'indexes': {name: entry['build_ms'] for name, entry in indexes.items()},
+        'skipped': skipped
+    }
+
+
+def read_bundle(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Read an index bundle.
+
+    Args:
+        path: Bundle file
+
+    Returns:
+        The bundle dict, or None if it is missing, unreadable or from
+        another bundle version
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            bundle = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Could not read GTFS index bundle {path}: {type(e).__name__}: {e}")
+        return None
+    if bundle.get('format_version') != INDEX_BUNDLE_VERSION:
+        return None
+    return bundle
+
+
+def load_bundle(dataset: GTFSDataset, path: Optional[Union[str, Path]] = None) -> List[str]:
+    """
+    Adopt bundled indexes whose source files are unchanged.
+
+    Args:
+        dataset: Freshly created dataset
+        path: Bundle file (default: next to the dataset's snapshots)
+
+    Returns:
+        Names of the adopted indexes
+    """
+    if path is None:
+        if dataset.snapshot_dir is None:
+            return []
+        path = bundle_path(dataset.snapshot_dir)
+
+    start = perf_counter()
+    bundle = read_bundle(path)
+    if bundle is None:
+        return []
+
+    adopted = []
+    for name, entry in bundle['indexes'].items():
+        if name not in INDEX_BUILDERS or name in dataset.built_indexes():
+            continue
+        # A table the dataset has no path for counts as a missing file
+        fresh = all(
+            (source_fingerprint(dataset.paths[table]) if table in dataset.paths else None) == fingerprint
+            for table, fingerprint in entry['tables'].items()
+        )
+        if fresh:
+            dataset.adopt_index(name, entry['index'])
+            adopted.append(name)
+
+    load_ms = (perf_counter() - start) * 1000
+    logger.info(f"Loaded {len(adopted)}/{len(bundle['indexes'])} GTFS indexes from {path} in {load_ms:.1f}ms")
+    return adopted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile GTFS lookup indexes into a bundle')
+    parser.add_argument('command', choices=['compile', 'info'])
+    parser.add_argument('--output', type=Path, help='Bundle path (default: next to the GTFS snapshot)')
+    args = parser.parse_args()
+    path = args.output or bundle_path(config.GTFS_SNAPSHOT_DIR)
+
+    if args.command == 'compile':
+        summary = compile_bundle(GTFSDataset.from_config(config), path)
+        print(f"Wrote {summary['path']} ({summary['bytes'] / 1e6:.1f} MB)")
+        for name, build_ms in summary['indexes'].items():
+            print(f"  {name:<14} built in {build_ms:8.1f} ms")
+        for name, reason in summary['skipped'].items():
+            print(f"  {name:<14} skipped ({reason})")
+        return
+
+    bundle = read_bundle(path)
+    if bundle is None:
+        print(f"No usable index bundle at {path}")
+        return
+    print(f"{path}: feed {bundle['feed_version']}, created {bundle['created_at']}")
+    for name, entry in bundle['indexes'].items():
+        print(f"  {name:<14} tables: {', '.join(entry['tables'])}")
+
+
+if __name__ == '__main__':
+    main()
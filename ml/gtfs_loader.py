@@ -0,0 +1,859 @@
+"""
+Lazy GTFS Data Loading for BMTC Fare Service
+
+This module provides GTFSDataset, a read-only mapping of GTFS table name to
+DataFrame that loads each table the first time it is accessed. A worker that
+only serves /api/stops/search therefore never parses trips, shapes or
+stop_times, and its startup time and resident memory depend only on the
+endpoints it actually serves.
+
+Tables are read through the columnar snapshot cache (see gtfs_snapshot) when
+it is enabled, so a table access after the first start is a memory-map
+rather than a CSV parse.
+
+Usage:
+    from gtfs_loader import GTFSDataset
+
+    data = GTFSDataset.from_config()
+    if data.missing_required():
+        ...
+    stops_df = data['stops']          # loaded on first access
+    print(data.load_timings())        # {'stops': {'rows': 9360, 'load_ms': 4.1, ...}}
+"""
+
+import pickle
+import sys
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from logger import setup_logger, log_error
+from config import config
+from gtfs_snapshot import source_fingerprint, load_table, write_table, read_manifest
+from gtfs_zip import ZipMember
+from gtfs_validation import (
+    GTFSValidationError, parent_tables, summarize_reports, validate_dataset, validate_table
+)
+
+logger = setup_logger('gtfs_loader', log_file=config.BASE_DIR / 'fare_api.log')
+
+# Table name -> config attribute holding its path, and whether the
+# service can run without it
+GTFS_TABLES = {
+    'fare_attributes': {'path_attr': 'GTFS_FARE_ATTRIBUTES', 'required': True},
+    'fare_rules': {'path_attr': 'GTFS_FARE_RULES', 'required': True},
+    'stops': {'path_attr': 'GTFS_STOPS', 'required': True},
+    'routes': {'path_attr': 'GTFS_ROUTES', 'required': True},
+    'shapes': {'path_attr': 'GTFS_SHAPES', 'required': False},
+    'trips': {'path_attr': 'GTFS_TRIPS', 'required': False},
+    'stop_times': {'path_attr': 'GTFS_STOP_TIMES', 'required': False},
+    'feed_info': {'path_attr': 'GTFS_FEED_INFO', 'required': False},
+    'translations': {'path_attr': 'GTFS_TRANSLATIONS', 'required': False},
+}
+
+# Column storage per GTFS file. Kinds:
+#   'id'       - unique identifier, interned Python strings
+#   'category' - repeated identifier or label, pandas categorical
+#   'text'     - free text, left as parsed
+#   numeric    - NumPy dtype name; downcast from the parsed column
+# Columns not listed keep their default pandas dtype.
+GTFS_SCHEMAS = {
+    'stops': {
+        'stop_id': 'id', 'stop_code': 'id', 'stop_name': 'text',
+        'zone_id': 'category', 'parent_station': 'category',
+        'stop_lat': 'float32', 'stop_lon': 'float32',
+        'location_type': 'int8', 'wheelchair_boarding': 'int8'
+    },
+    'routes': {
+        'route_id': 'id', 'agency_id': 'category',
+        'route_short_name': 'text', 'route_long_name': 'text',
+        'route_type': 'int16'
+    },
+    'trips': {
+        'trip_id': 'id', 'route_id': 'category', 'service_id': 'category',
+        'shape_id': 'category', 'trip_headsign': 'category', 'block_id': 'category',
+        'direction_id': 'int8', 'wheelchair_accessible': 'int8', 'bikes_allowed': 'int8'
+    },
+    'stop_times': {
+        'trip_id': 'category', 'stop_id': 'category',
+        'arrival_time': 'category', 'departure_time': 'category',
+        'stop_sequence': 'int32', 'pickup_type': 'int8', 'drop_off_type': 'int8',
+        'timepoint': 'int8', 'shape_dist_traveled': 'float32'
+    },
+    'shapes': {
+        'shape_id': 'category',
+        'shape_pt_lat': 'float32', 'shape_pt_lon': 'float32',
+        'shape_pt_sequence': 'int32', 'shape_dist_traveled': 'float32'
+    },
+    'fare_attributes': {
+        'fare_id': 'id', 'currency_type': 'category', 'agency_id': 'category',
+        'payment_method': 'int8', 'transfers': 'int8', 'transfer_duration': 'int32'
+    },
+    'fare_rules': {
+        'fare_id': 'category', 'route_id': 'category',
+        'origin_id': 'category', 'destination_id': 'category', 'contains_id': 'category'
+    },
+    'feed_info': {
+        'feed_version': 'id', 'feed_start_date': 'id', 'feed_end_date': 'id'
+    },
+    'translations': {
+        'table_name': 'category', 'field_name': 'category', 'language': 'category',
+        'record_id': 'id', 'translation': 'text'
+    },
+}
+
+# Derived lookup structures built from loaded tables:
+# index name -> {'builder': fn(data) -> index, 'tables': tables it reads,
+#                'update': optional fn(index, data, changes) -> index or None}
+INDEX_BUILDERS: Dict[str, Dict[str, Any]] = {}
+
+
+def register_index(name: str, tables: Iterable[str], update: Optional[Callable] = None) -> Callable:
+    """
+    Decorator registering a builder for a derived lookup structure.
+
+    Registered indexes are built once per dataset on first use (see
+    GTFSDataset.index) and rebuilt off to the side when a new feed is
+    swapped in.
+
+    Args:
+        name: Index name used with get_index()
+        tables: GTFS tables the builder reads
+        update: Optional fn(index, data, changes) applying a feed diff (see
+            gtfs_diff) to an existing index; returns the updated index, or
+            None when the index has to be rebuilt
+
+    Example:
+        >>> @register_index('stop_rows', tables=['stops'])
+        ... def build_stop_rows(data):
+        ...     return {stop_id: i for i, stop_id in enumerate(data['stops']['stop_id'])}
+    """
+    def decorator(builder: Callable) -> Callable:
+        INDEX_BUILDERS[name] = {'builder': builder, 'tables': tuple(tables), 'update': update}
+        return builder
+    return decorator
+
+# Coordinates are held as float32 (~1 m resolution in Bangalore); round to this
+# many decimals when emitting them so responses don't show float32 noise
+COORDINATE_DECIMALS = 5
+
+_STRING_KINDS = ('id', 'category', 'text')
+
+# Some exports (e.g. the Kaggle feed) start with a UTF-8 byte order mark.
+# They may also end every row with a stray delimiter, which pandas would
+# otherwise take as a sign that the first column is the index, so all
+# parses pass index_col=False.
+CSV_ENCODING = 'utf-8-sig'
+
+# Rows per chunk when streaming a table out of a zip archive
+DEFAULT_CHUNK_ROWS = 100000
+
+
+def _intern_strings(series: pd.Series) -> pd.Series:
+    """Convert a column to interned Python strings, keeping missing values"""
+    values = series.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    interned = np.empty(len(values), dtype=object)
+    interned[~missing] = [sys.intern(str(v)) for v in values[~missing]]
+    interned[missing] = np.nan
+    return pd.Series(interned, index=series.index, dtype=object, name=series.name)
+
+
+def _downcast_numeric(series: pd.Series, dtype_name: str) -> pd.Series:
+    """Downcast a numeric column, widening to float32 when integers have gaps"""
+    if series.dtype == np.dtype(dtype_name):
+        return series
+    numeric = pd.to_numeric(series, errors='raise')
+    target = np.dtype(dtype_name)
+    if target.kind == 'i':
+        if numeric.isna().any():
+            return numeric.astype(np.float32)
+        info = np.iinfo(target)
+        if len(numeric) and (numeric.min() < info.min or numeric.max() > info.max):
+            return numeric
+    return numeric.astype(target)
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a parsed GTFS table to its memory-lean column types.
+
+    Columns that fail to convert are left as parsed (and logged), so a
+    malformed file never prevents the table from loading here.
+
+    Args:
+        name: GTFS table name (e.g. 'stops')
+        df: Parsed table
+
+    Returns:
+        The same DataFrame with converted columns
+    """
+    for column, kind in GTFS_SCHEMAS.get(name, {}).items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        try:
+            if kind == 'id':
+                if series.dtype != object:
+                    df[column] = _intern_strings(series)
+            elif kind == 'category':
+                if not isinstance(series.dtype, pd.CategoricalDtype):
+                    df[column] = series.astype(str).where(series.notna()).astype('category')
+            elif kind == 'text':
+                continue
+            else:
+                df[column] = _downcast_numeric(series, kind)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not convert {name}.{column} to {kind}: {e}")
+    return df
+
+
+def _csv_dtypes(name: str) -> Dict[str, Any]:
+    """Parse identifier columns as text so numeric-looking IDs keep their spelling"""
+    return {
+        column: str
+        for column, kind in GTFS_SCHEMAS.get(name, {}).items()
+        if kind in _STRING_KINDS
+    }
+
+
+def memory_bytes(df: Optional[pd.DataFrame]) -> int:
+    """Get the deep memory footprint of a table in bytes"""
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class _ByteCounter:
+    """Write-only sink that only counts what is written to it"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data) -> int:
+        size = memoryview(data).nbytes
+        self.bytes += size
+        return size
+
+
+class _SharedRefPickler(pickle.Pickler):
+    """Pickler that writes objects in shared_ids as references, not contents"""
+
+    def __init__(self, file, shared_ids: Iterable[int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_ids = set(shared_ids)
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        return id(obj) if id(obj) in self.shared_ids else None
+
+
+def index_bytes(index: Any, shared: Iterable[Any] = ()) -> int:
+    """
+    Estimate the memory footprint of a derived index in bytes.
+
+    Indexes are plain Python containers, arrays and frames, so their pickled
+    size is a close and cheap-to-get stand-in for their resident size.
+    Objects in shared (tables and other indexes the index refers to) are
+    counted where they are owned, not again here.
+
+    Args:
+        index: Index object
+        shared: Objects owned elsewhere
+
+    Returns:
+        Pickled size in bytes
+    """
+    sink = _ByteCounter()
+    _SharedRefPickler(sink, (id(obj) for obj in shared if obj is not index)).dump(index)
+    return sink.bytes
+
+
+def concat_typed_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate typed pieces of one table, keeping categorical columns.
+
+    Each piece has its own categories from apply_schema(); they are unioned
+    (sorted, as for a single parse) first so pd.concat does not fall back to
+    object columns. The pieces themselves are not modified.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    categorical = [
+        column for column in chunks[0].columns
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype)
+    ]
+    if categorical:
+        merged = {}
+        for column in categorical:
+            categories = chunks[0][column].cat.categories
+            for chunk in chunks[1:]:
+                categories = categories.union(chunk[column].cat.categories)
+            merged[column] = categories
+        chunks = [
+            chunk.assign(**{column: chunk[column].cat.set_categories(merged[column]) for column in categorical})
+            for chunk in chunks
+        ]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _read_csv(name: str, path: Union[Path, ZipMember], chunk_rows: Optional[int]) -> Tuple[pd.DataFrame, int]:
+    """
+    Parse a GTFS file into a typed table.
+
+    With chunk_rows the file is parsed and converted chunk by chunk, so only
+    one chunk is ever held with default dtypes. Zip members are always
+    streamed this way.
+
+    Returns:
+        The typed table and its footprint with default dtypes
+    """
+    if chunk_rows is None and not isinstance(path, ZipMember):
+        # Measure the footprint as parsed, then convert in place
+        df = pd.read_csv(path, dtype=_csv_dtypes(name), encoding=CSV_ENCODING, index_col=False)
+        default_bytes = memory_bytes(df)
+        return apply_schema(name, df), default_bytes
+
+    chunks, default_bytes = [], 0
+    with (path.open() if isinstance(path, ZipMember) else open(path, 'rb')) as stream:
+        reader = pd.read_csv(
+            stream, dtype=_csv_dtypes(name), encoding=CSV_ENCODING, index_col=False,
+            chunksize=chunk_rows or DEFAULT_CHUNK_ROWS
+        )
+        for chunk in reader:
+            default_bytes += memory_bytes(chunk)
+            chunks.append(apply_schema(name, chunk))
+    if not chunks:
+        # Header-only file
+        with (path.open() if isinstance(path, ZipMember) else open(path, 'rb')) as stream:
+            df = pd.read_csv(stream, dtype=_csv_dtypes(name), encoding=CSV_ENCODING, index_col=False)
+        return apply_schema(name, df), memory_bytes(df)
+    return concat_typed_chunks(chunks), default_bytes
+
+
+def read_table(
+    name: str,
+    path: Union[Path, ZipMember],
+    snapshot_dir: Optional[Path] = None,
+    chunk_rows: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Read one GTFS table, preferring a fresh columnar snapshot over the CSV.
+
+    Args:
+        name: GTFS table name (e.g. 'stops')
+        path: Path to the GTFS text file, or a member of a GTFS zip
+        snapshot_dir: Snapshot base directory, or None to always parse CSV
+        chunk_rows: Parse the CSV in chunks of this many rows (bounds peak
+            memory for large tables such as stop_times)
+
+    Returns:
+        Dict with the typed 'df', the 'source' it came from ('snapshot' or
+        'csv') and 'default_bytes', the footprint with default pandas dtypes
+    """
+    fingerprint = source_fingerprint(path) if snapshot_dir is not None else None
+    if fingerprint is not None:
+        df = load_table(snapshot_dir, name, fingerprint)
+        if df is not None:
+            manifest = read_manifest(snapshot_dir, name) or {}
+            return {
+                'df': apply_schema(name, df),
+                'source': 'snapshot',
+                'default_bytes': manifest.get('extra', {}).get('default_bytes')
+            }
+
+    df, default_bytes = _read_csv(name, path, chunk_rows)
+
+    if fingerprint is not None:
+        write_table(snapshot_dir, name, df, fingerprint, extra={'default_bytes': default_bytes})
+    return {'df': df, 'source': 'csv', 'default_bytes': default_bytes}
+
+
+class GTFSDataset(Mapping):
+    """
+    Thread-safe, lazily materialized set of GTFS tables.
+
+    Behaves like the dict previously returned by load_gtfs_data():
+    data['stops'] returns the stops DataFrame, and optional tables whose file
+    is missing return None. Each table is loaded at most once; concurrent
+    first accesses to the same table wait for a single load.
+    """
+
+    def __init__(
+        self,
+        paths: Dict[str, Path],
+        required: Iterable[str] = (),
+        snapshot_dir: Optional[Path] = None,
+        chunk_rows: Optional[int] = None,
+        validate: bool = True
+    ):
+        """
+        Args:
+            paths: Table name -> GTFS text file path or ZipMember
+            required: Table names the dataset cannot be served without
+            snapshot_dir: Snapshot base directory, or None to disable snapshots
+            chunk_rows: Parse tables in chunks of this many rows
+            validate: Validate each table as it is loaded and reject bad ones
+        """
+        self.paths = {
+            name: path if isinstance(path, ZipMember) else Path(path)
+            for name, path in paths.items()
+        }
+        self.chunk_rows = chunk_rows
+        self.validate = validate
+        self.required = [name for name in required if name in self.paths]
+        self.snapshot_dir = snapshot_dir
+        self._tables: Dict[str, Optional[pd.DataFrame]] = {}
+        self._timings: Dict[str, Dict[str, Any]] = {}
+        self._memory: Dict[str, Dict[str, Optional[int]]] = {}
+        self._fingerprints: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._validation: Dict[str, Dict[str, Any]] = {}
+        self._rejected: Dict[str, GTFSValidationError] = {}
+        self._locks = {name: threading.Lock() for name in self.paths}
+        self._indexes: Dict[str, Any] = {}
+        self._index_timings: Dict[str, float] = {}
+        self._index_bytes: Dict[str, int] = {}
+        self._index_lock = threading.RLock()
+        # Per-table row keys and hashes, kept by gtfs_diff for the next diff
+        self.row_hashes: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_config(cls, cfg=None, feed: Optional[str] = None) -> 'GTFSDataset':
+        """
+        Create a dataset for a GTFS feed configured in cfg (default: active config).
+
+        The primary feed (GTFS_FEED_NAME) is read from GTFS_DIR, or from the
+        archive at GTFS_ZIP_PATH when that is set. Other feeds come from
+        GTFS_EXTRA_FEEDS and keep their snapshots in a subdirectory of
+        GTFS_SNAPSHOT_DIR.
+
+        Args:
+            cfg: Config object
+            feed: Feed name (default: the primary feed)
+
+        Raises:
+            KeyError: If the feed is not configured
+        """
+        cfg = cfg or config
+        paths = {name: getattr(cfg, spec['path_attr']) for name, spec in GTFS_TABLES.items()}
+        required = [name for name, spec in GTFS_TABLES.items() if spec['required']]
+        snapshot_dir = cfg.GTFS_SNAPSHOT_DIR
+        if feed is not None and feed != cfg.GTFS_FEED_NAME:
+            feed_spec = cfg.GTFS_EXTRA_FEEDS[feed]
+            extension = feed_spec.get('extension', '.txt')
+            paths = {name: Path(feed_spec['dir']) / (Path(path).stem + extension) for name, path in paths.items()}
+            required = feed_spec.get('required', required)
+            snapshot_dir = snapshot_dir / feed
+        elif cfg.GTFS_ZIP_PATH:
+            paths = {name: ZipMember(cfg.GTFS_ZIP_PATH, Path(path).name) for name, path in paths.items()}
+        snapshot_dir = snapshot_dir if cfg.GTFS_SNAPSHOT_ENABLED else None
+        return cls(
+            paths, required=required, snapshot_dir=snapshot_dir,
+            chunk_rows=cfg.GTFS_CHUNK_ROWS, validate=cfg.GTFS_VALIDATION_ENABLED
+        )
+
+    # ==================== Mapping interface ====================
+
+    def __getitem__(self, name: str) -> Optional[pd.DataFrame]:
+        if name not in self.paths:
+            raise KeyError(name)
+        if name in self._tables:
+            return self._tables[name]
+        with self._locks[name]:
+            if name in self._rejected:
+                # Rejected required tables fail fast without re-parsing
+                raise self._rejected[name]
+            if name not in self._tables:
+                self._tables[name] = self._load(name)
+            return self._tables[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, name: object) -> bool:
+        # Membership must not trigger a load
+        return name in self.paths
+
+    # ==================== Loading ====================
+
+    def _load(self, name: str) -> Optional[pd.DataFrame]:
+        path = self.paths[name]
+        if not path.exists():
+            if name in self.required:
+                raise FileNotFoundError(f"Required GTFS file not found: {path}")
+            logger.info(f"Optional GTFS file not found, skipping {name}: {path}")
+            self._timings[name] = {'rows': 0, 'load_ms': 0.0, 'source': 'missing'}
+            return None
+
+        start = perf_counter()
+        # Taken before reading so a concurrent rewrite is seen as a change later
+        self._fingerprints[name] = source_fingerprint(path)
+        try:
+            result = read_table(name, path, self.snapshot_dir, chunk_rows=self.chunk_rows)
+        except Exception as e:
+            log_error(logger, e, f"Error loading GTFS table {name}")
+            raise
+        df = result['df']
+        load_ms = (perf_counter() - start) * 1000
+
+        self._timings[name] = {
+            'rows': int(len(df)),
+            'load_ms': round(load_ms, 2),
+            'source': result['source']
+        }
+        df = self.check_table(name, df)
+        if df is None:
+            return None
+        self._memory[name] = {
+            'default_bytes': result.get('default_bytes'),
+            'bytes': memory_bytes(df)
+        }
+        logger.info(f"Loaded {len(df)} rows from {path.name} in {load_ms:.1f}ms ({result['source']})")
+        return df
+
+    def check_table(self, name: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Validate a parsed table before it is served (see gtfs_validation).
+
+        Tables it references are loaded first so foreign keys can be
+        checked. A rejected optional table is treated like a missing file.
+
+        Args:
+            name: GTFS table name
+            df: Parsed, typed table
+
+        Returns:
+            The table, or None if an optional table was rejected
+
+        Raises:
+            GTFSValidationError: If a required table was rejected
+        """
+        if not self.validate:
+            return df
+        parents = {}
+        for parent in parent_tables(name):
+            if parent in self.paths:
+                try:
+                    parents[parent] = self[parent]
+                except (FileNotFoundError, GTFSValidationError):
+                    parents[parent] = None
+        report = validate_table(name, df, parents)
+        self._validation[name] = report
+        if name in self._timings:
+            self._timings[name]['validate_ms'] = report['validate_ms']
+
+        for issue in report['issues']:
+            if issue['severity'] == 'warning':
+                logger.warning(f"GTFS {name}: {issue['message']}")
+        if report['valid']:
+            return df
+
+        error = GTFSValidationError(report)
+        logger.error(str(error))
+        if name in self.required:
+            self._rejected[name] = error
+            raise error
+        self._timings.setdefault(name, {'rows': int(len(df)), 'load_ms': 0.0})['source'] = 'rejected'
+        return None
+
+    def validation_report(self) -> Dict[str, Any]:
+        """Get the validation reports of every table loaded (or rejected) so far"""
+        return summarize_reports(dict(self._validation))
+
+    def adopt_table(
+        self,
+        name: str,
+        df: Optional[pd.DataFrame],
+        source: str,
+        default_bytes: Optional[int] = None,
+        fingerprint: Optional[Dict[str, Any]] = None,
+        validation: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Install an already materialized table instead of loading it.
+
+        Used when a new feed version reuses or patches the previous
+        version's table (see gtfs_diff).
+
+        Args:
+            name: GTFS table name
+            df: The table, or None if its file no longer exists
+            source: Where the table came from, for load_timings()
+            default_bytes: Footprint with default dtypes, if known
+            fingerprint: Fingerprint of the source file the table reflects
+            validation: Validation report of the table, if it was validated
+        """
+        with self._locks[name]:
+            self._tables[name] = df
+            self._fingerprints[name] = fingerprint
+            if validation is not None:
+                self._validation[name] = validation
+            self._timings[name] = {'rows': int(len(df)) if df is not None else 0, 'load_ms': 0.0, 'source': source}
+            if df is not None:
+                self._memory[name] = {'default_bytes': default_bytes, 'bytes': memory_bytes(df)}
+
+    def adopt_index(self, name: str, index: Any) -> None:
+        """Install an index carried over or updated from a previous feed version"""
+        with self._index_lock:
+            self._indexes[name] = index
+            self._index_timings[name] = 0.0
+            self._record_index_bytes(name)
+
+    def missing_required(self) -> List[str]:
+        """Get the paths of required GTFS files that do not exist"""
+        return [str(self.paths[name]) for name in self.required if not self.paths[name].exists()]
+
+    def is_loaded(self, name: str) -> bool:
+        """Check whether a table has already been materialized"""
+        return name in self._tables
+
+    def materialize(self, names: Optional[Iterable[str]] = None) -> 'GTFSDataset':
+        """
+        Force-load tables (default: all of them).
+
+        Args:
+            names: Table names to load
+
+        Returns:
+            self, for chaining
+        """
+        for name in (names or list(self.paths)):
+            self[name]
+        return self
+
+    def source_signature(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get the current fingerprint of every source file (None if missing)"""
+        return {name: source_fingerprint(path) for name, path in self.paths.items()}
+
+    @property
+    def feed_version(self) -> Optional[str]:
+        """feed_version from feed_info.txt, if the feed publishes one"""
+        if 'feed_info' not in self.paths:
+            return None
+        feed_info = self['feed_info']
+        if feed_info is None or feed_info.empty or 'feed_version' not in feed_info.columns:
+            return None
+        version = feed_info['feed_version'].iloc[0]
+        return None if pd.isna(version) else str(version)
+
+    # ==================== Derived indexes ====================
+
+    def index(self, name: str) -> Any:
+        """
+        Get a registered derived index, building it on first use.
+
+        Args:
+            name: Index name registered with register_index()
+
+        Returns:
+            The index object
+        """
+        if name in self._indexes:
+            return self._indexes[name]
+        with self._index_lock:
+            if name not in self._indexes:
+                start = perf_counter()
+                self._indexes[name] = INDEX_BUILDERS[name]['builder'](self)
+                build_ms = (perf_counter() - start) * 1000
+                self._index_timings[name] = round(build_ms, 2)
+                self._record_index_bytes(name)
+                logger.info(f"Built GTFS index {name} in {build_ms:.1f}ms")
+            return self._indexes[name]
+
+    def _record_index_bytes(self, name: str) -> None:
+        # Called with _index_lock held. A size that cannot be measured is
+        # left out of the budget rather than failing the build.
+        shared = [df for df in self._tables.values() if df is not None]
+        shared += [index for other, index in self._indexes.items() if other != name]
+        try:
+            self._index_bytes[name] = index_bytes(self._indexes[name], shared)
+        except Exception as e:
+            logger.warning(f"Could not measure GTFS index {name}: {type(e).__name__}: {e}")
+            self._index_bytes[name] = 0
+
+    def built_indexes(self) -> List[str]:
+        """Get the names of indexes built so far"""
+        return list(self._indexes)
+
+    def warm(self, tables: Iterable[str] = (), indexes: Iterable[str] = ()) -> 'GTFSDataset':
+        """
+        Load tables and build indexes ahead of serving traffic.
+
+        Args:
+            tables: Table names to materialize
+            indexes: Index names to build
+
+        Returns:
+            self, for chaining
+        """
+        for name in tables:
+            if name in self.paths:
+                self[name]
+        for name in indexes:
+            if name in INDEX_BUILDERS:
+                self.index(name)
+        return self
+
+    def load_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Get rows, load time and source for every table loaded so far"""
+        return {name: dict(timing) for name, timing in self._timings.items()}
+
+    def table_validation(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the validation report of a loaded table, if it was validated"""
+        return self._validation.get(name)
+
+    def loaded_fingerprint(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the fingerprint of the source file a loaded table was read from"""
+        return self._fingerprints.get(name)
+
+    def default_bytes(self, name: str) -> Optional[int]:
+        """Get the footprint of a loaded table with default dtypes, if known"""
+        return self._memory.get(name, {}).get('default_bytes')
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Get bytes per loaded table with default dtypes (as parsed) and after
+        the memory-lean schema was applied, plus bytes per built index.
+        """
+        return _memory_summary(self._memory, self._index_bytes)
+
+    def status(self) -> Dict[str, Any]:
+        """Get per-table load state for status reporting"""
+        return {
+            'tables': {
+                name: {'loaded': self.is_loaded(name), **self._timings.get(name, {})}
+                for name in self.paths
+            },
+            'loaded_tables': [name for name in self.paths if self.is_loaded(name)],
+            'indexes': dict(self._index_timings)
+        }
+
+
+def dataset_status(data: Mapping) -> Dict[str, Any]:
+    """
+    Describe the load state of a GTFS dataset.
+
+    Plain dicts of DataFrames (already fully loaded) are also accepted.
+
+    Args:
+        data: GTFSDataset or dict of table name -> DataFrame
+
+    Returns:
+        Status dict with per-table details
+    """
+    if isinstance(data, GTFSDataset):
+        return data.status()
+    return {
+        'tables': {
+            name: {'loaded': True, 'rows': int(len(df)) if df is not None else 0}
+            for name, df in data.items()
+        },
+        'loaded_tables': list(data.keys())
+    }
+
+
+def dataset_validation_report(data: Mapping, full: bool = False) -> Dict[str, Any]:
+    """
+    Get the validation report of a GTFS dataset.
+
+    Args:
+        data: GTFSDataset or dict of table name -> DataFrame
+        full: Load (and so validate) every table of a GTFSDataset first
+
+    Returns:
+        Report dict with overall 'valid', totals and per-table reports
+    """
+    if not isinstance(data, GTFSDataset):
+        return validate_dataset(data)
+    if full:
+        for name in data.paths:
+            try:
+                data[name]
+            except (FileNotFoundError, GTFSValidationError):
+                pass
+    return data.validation_report()
+
+
+def _memory_summary(
+    tables: Dict[str, Dict[str, Optional[int]]], indexes: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    report = {}
+    for name, entry in tables.items():
+        before, after = entry.get('default_bytes'), entry['bytes']
+        report[name] = {
+            'bytes_before': before,
+            'bytes_after': after,
+            'saved_pct': round(100.0 * (before - after) / before, 1) if before else None
+        }
+    known_before = [e['bytes_before'] for e in report.values() if e['bytes_before'] is not None]
+    return {
+        'tables': report,
+        'total_bytes_before': sum(known_before) if known_before else None,
+        'total_bytes_after': sum(e['bytes_after'] for e in report.values()),
+        'indexes': dict(indexes or {}),
+        'total_index_bytes': sum((indexes or {}).values())
+    }
+
+
+def dataset_memory_report(data: Mapping) -> Dict[str, Any]:
+    """
+    Report memory use per loaded table and built index of a GTFS dataset.
+
+    For plain dicts of DataFrames the default-dtype footprint is unknown and
+    reported as None, and their ad-hoc indexes are not reported.
+
+    Args:
+        data: GTFSDataset or dict of table name -> DataFrame
+
+    Returns:
+        Report dict with bytes_before/bytes_after per table, bytes per built
+        index and totals
+    """
+    if isinstance(data, GTFSDataset):
+        return data.memory_report()
+    return _memory_summary({
+        name: {'default_bytes': None, 'bytes': memory_bytes(df)}
+        for name, df in data.items()
+        if df is not None
+    })
+
+
+# Indexes for plain dicts of frames (e.g. test fixtures), keyed by dict
+# identity. The dict itself is kept alive alongside so its id is not reused.
+# Re-entrant, as builders may get the indexes they are built on.
+_ADHOC_INDEX_LIMIT = 8
+_adhoc_indexes: Dict[int, Any] = {}
+_adhoc_lock = threading.RLock()
+
+
+def get_index(data: Mapping, name: str) -> Any:
+    """
+    Get a registered derived index for a GTFS dataset.
+
+    Args:
+        data: GTFSDataset or dict of table name -> DataFrame
+        name: Index name registered with register_index()
+
+    Returns:
+        The index object
+    """
+    if isinstance(data, GTFSDataset):
+        return data.index(name)
+
+    with _adhoc_lock:
+        entry = _adhoc_indexes.get(id(data))
+        if entry is None or entry[0] is not data:
+            if len(_adhoc_indexes) >= _ADHOC_INDEX_LIMIT:
+                _adhoc_indexes.pop(next(iter(_adhoc_indexes)))
+            entry = (data, {})
+            _adhoc_indexes[id(data)] = entry
+        indexes = entry[1]
+        if name not in indexes:
+            indexes[name] = INDEX_BUILDERS[name]['builder'](data)
+        return indexes[name]
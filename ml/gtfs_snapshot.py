@@ -0,0 +1,277 @@
+"""
+Columnar GTFS Snapshot Cache for BMTC Fare Service
+
+Parsing the GTFS text files with pandas is the slowest part of a cold start
+(trips.txt alone is ~54k rows). This module compiles each parsed table into a
+set of typed NumPy column arrays on disk so later starts can memory-map them
+instead of re-parsing CSV.
+
+Layout (one directory per table, inside a format-versioned root):
+
+    <OUTPUT_DIR>/gtfs_snapshot/v1/<table>/manifest.json
+    <OUTPUT_DIR>/gtfs_snapshot/v1/<table>/c0.npy, c1.codes.npy, c1.values.npy, ...
+
+Numeric and boolean columns are stored as raw arrays. Text columns are
+dictionary-encoded (int32 codes + unique values) which keeps the files small
+and lets missing values round-trip as code -1.
+
+A snapshot is only used while the fingerprint (size and mtime) of its source
+file matches; any change to the source triggers a rebuild on the next load.
+
+Usage:
+    from gtfs_snapshot import source_fingerprint, load_table, write_table
+
+    fingerprint = source_fingerprint(config.GTFS_STOPS)
+    stops_df = load_table(config.GTFS_SNAPSHOT_DIR, 'stops', fingerprint)
+    if stops_df is None:
+        stops_df = pd.read_csv(config.GTFS_STOPS)
+        write_table(config.GTFS_SNAPSHOT_DIR, 'stops', stops_df, fingerprint)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from logger import setup_logger
+from config import config
+from gtfs_zip import ZipMember
+
+logger = setup_logger('gtfs_snapshot', log_file=config.BASE_DIR / 'fare_api.log')
+
+# Bump whenever the on-disk layout changes so stale snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def source_fingerprint(path: Union[str, Path, ZipMember]) -> Optional[Dict[str, Any]]:
+    """
+    Build the change-detection fingerprint for a GTFS source file.
+
+    Args:
+        path: Path to the source file, or a member of a GTFS zip
+
+    Returns:
+        Dict with path, size and mtime_ns (size and crc for zip members), or
+        None if the file does not exist
+    """
+    if isinstance(path, ZipMember):
+        return path.fingerprint()
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return {
+        'path': str(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def snapshot_root(base_dir: Union[str, Path]) -> Path:
+    """Get the format-versioned snapshot root under base_dir"""
+    return Path(base_dir) / f'v{SNAPSHOT_FORMAT_VERSION}'
+
+
+def _table_dir(base_dir: Union[str, Path], name: str) -> Path:
+    return snapshot_root(base_dir) / name
+
+
+def _read_manifest(table_dir: Path) -> Optional[Dict[str, Any]]:
+    manifest_path = table_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_fresh(base_dir: Union[str, Path], name: str, fingerprint: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether a table snapshot exists and matches the source fingerprint.
+
+    Args:
+        base_dir: Snapshot base directory
+        name: GTFS table name (e.g. 'stops')
+        fingerprint: Current source fingerprint from source_fingerprint()
+
+    Returns:
+        True if the snapshot can be used as-is
+    """
+    if fingerprint is None:
+        return False
+    try:
+        manifest = _read_manifest(_table_dir(base_dir, name))
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest is not None and
+        manifest.get('format_version') == SNAPSHOT_FORMAT_VERSION and
+        manifest.get('source') == fingerprint
+    )
+
+
+def _encode_column(series: pd.Series, target: Path, stem: str) -> Dict[str, Any]:
+    """Write one column to disk and return its manifest entry"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = np.asarray(series.cat.codes, dtype=np.int32)
+        values = np.asarray(dtype.categories.astype(str), dtype=str)
+        np.save(target / f'{stem}.codes.npy', codes)
+        np.save(target / f'{stem}.values.npy', values)
+        return {'kind': 'category', 'file': stem}
+
+    if pd.api.types.is_bool_dtype(dtype) or (
+        pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype)
+    ):
+        np.save(target / f'{stem}.npy', series.to_numpy())
+        return {'kind': 'numeric', 'file': stem, 'dtype': str(dtype)}
+
+    # Everything else is dictionary-encoded text
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = np.asarray([str(v) for v in uniques], dtype=str)
+    np.save(target / f'{stem}.codes.npy', codes.astype(np.int32))
+    np.save(target / f'{stem}.values.npy', values)
+    return {'kind': 'string', 'file': stem}
+
+
+def _decode_column(entry: Dict[str, Any], table_dir: Path, mmap_mode: Optional[str]):
+    """Rebuild one column from its manifest entry"""
+    stem = entry['file']
+    if entry['kind'] == 'numeric':
+        return np.load(table_dir / f'{stem}.npy', mmap_mode=mmap_mode)
+
+    codes = np.load(table_dir / f'{stem}.codes.npy', mmap_mode=mmap_mode)
+    values = np.load(table_dir / f'{stem}.values.npy')
+    if entry['kind'] == 'category':
+        return pd.Categorical.from_codes(codes, categories=values.astype(object))
+
+    decoded = np.empty(len(codes), dtype=object)
+    present = codes >= 0
+    decoded[present] = values.astype(object)[codes[present]]
+    decoded[~present] = np.nan
+    # Keep object storage so repeated values share one str instance
+    return pd.Series(decoded, dtype=object, copy=False)
+
+
+def write_table(
+    base_dir: Union[str, Path],
+    name: str,
+    df: pd.DataFrame,
+    fingerprint: Optional[Dict[str, Any]],
+    extra: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Write a parsed GTFS table as a columnar snapshot.
+
+    The table is written to a temporary directory first and then moved into
+    place, so a concurrent reader never sees a half-written snapshot.
+
+    Args:
+        base_dir: Snapshot base directory
+        name: GTFS table name (e.g. 'stops')
+        df: Parsed table
+        fingerprint: Source fingerprint the snapshot was built from
+        extra: Optional metadata stored in the manifest
+
+    Returns:
+        True if the snapshot was written
+    """
+    if fingerprint is None:
+        return False
+
+    root = snapshot_root(base_dir)
+    staging = None
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f'.{name}-', dir=root))
+        columns = []
+        for i, column in enumerate(df.columns):
+            entry = _encode_column(df[column], staging, f'c{i}')
+            entry['name'] = str(column)
+            columns.append(entry)
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'table': name,
+            'rows': int(len(df)),
+            'columns': columns,
+            'source': fingerprint,
+            'extra': extra or {}
+        }
+        with open(staging / MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        target = _table_dir(base_dir, name)
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        logger.info(f"Wrote GTFS snapshot for {name} ({len(df)} rows) to {target}")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write GTFS snapshot for {name}: {type(e).__name__}: {e}")
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        return False
+
+
+def load_table(
+    base_dir: Union[str, Path],
+    name: str,
+    fingerprint: Optional[Dict[str, Any]],
+    mmap: bool = True
+) -> Optional[pd.DataFrame]:
+    """
+    Load a table from its snapshot if it is still fresh.
+
+    Args:
+        base_dir: Snapshot base directory
+        name: GTFS table name (e.g. 'stops')
+        fingerprint: Current source fingerprint
+        mmap: Memory-map numeric and code arrays instead of reading them
+
+    Returns:
+        The table, or None if there is no usable snapshot
+    """
+    if not is_fresh(base_dir, name, fingerprint):
+        return None
+
+    table_dir = _table_dir(base_dir, name)
+    try:
+        manifest = _read_manifest(table_dir)
+        mmap_mode = 'r' if mmap else None
+        data = {
+            entry['name']: _decode_column(entry, table_dir, mmap_mode)
+            for entry in manifest['columns']
+        }
+        df = pd.DataFrame(data, copy=False)
+        if len(df) != manifest['rows']:
+            logger.warning(f"GTFS snapshot for {name} is truncated, ignoring it")
+            return None
+        return df
+    except Exception as e:
+        logger.warning(f"Could not read GTFS snapshot for {name}: {type(e).__name__}: {e}")
+        return None
+
+
+def read_manifest(base_dir: Union[str, Path], name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the manifest of a table snapshot.
+
+    Args:
+        base_dir: Snapshot base directory
+        name: GTFS table name
+
+    Returns:
+        Manifest dict, or None if the snapshot does not exist
+    """
+    try:
+        return _read_manifest(_table_dir(base_dir, name))
+    except (OSError, ValueError):
+        return None
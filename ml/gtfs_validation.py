@@ -0,0 +1,289 @@
+"""
+GTFS Schema and Integrity Validation for BMTC Fare Service
+
+Every GTFS table is validated right after it is parsed and before it is
+handed out or used to build indexes. All checks are vectorized pandas
+operations, so validation costs a small fraction of the parse:
+
+- required columns per file (error)
+- numeric columns that did not parse as numbers (error)
+- missing or duplicate IDs (error; duplicate composite keys are warnings)
+- foreign keys: trip -> route, stop_time -> stop/trip, fare_rule -> fare/route
+  (warning, or error when most rows are orphaned)
+- stop and shape coordinates outside the config.BANGALORE_* box (warning)
+
+A table with any error is rejected. This catches files that are valid CSV
+but the wrong content, such as a stop_times.txt that is really a copy of
+routes.txt.
+
+Usage:
+    from gtfs_validation import validate_table, validate_dataset
+
+    report = validate_table('stops', stops_df, parents={})
+    if not report['valid']:
+        ...
+    print(validate_dataset(data))   # report for every table
+"""
+
+from time import perf_counter
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import config
+
+# Columns identifying a row of each GTFS file (used to detect duplicate IDs
+# and to diff feed versions). Files without an entry have no row identity.
+GTFS_PRIMARY_KEYS = {
+    'stops': ['stop_id'],
+    'routes': ['route_id'],
+    'trips': ['trip_id'],
+    'fare_attributes': ['fare_id'],
+    'fare_rules': ['fare_id', 'route_id', 'origin_id', 'destination_id', 'contains_id'],
+    'stop_times': ['trip_id', 'stop_sequence'],
+    'shapes': ['shape_id', 'shape_pt_sequence'],
+}
+
+# Columns a file is unusable without
+REQUIRED_COLUMNS = {
+    'stops': ['stop_id', 'stop_name', 'stop_lat', 'stop_lon'],
+    'routes': ['route_id', 'route_type'],
+    'trips': ['route_id', 'service_id', 'trip_id'],
+    'stop_times': ['trip_id', 'stop_id', 'stop_sequence'],
+    'fare_attributes': ['fare_id', 'price'],
+    'fare_rules': ['fare_id'],
+    'shapes': ['shape_id', 'shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence'],
+    'feed_info': ['feed_publisher_name', 'feed_lang'],
+    'translations': ['table_name', 'field_name', 'language', 'translation'],
+}
+
+# Columns that must hold numbers
+NUMERIC_COLUMNS = {
+    'stops': ['stop_lat', 'stop_lon'],
+    'routes': ['route_type'],
+    'stop_times': ['stop_sequence'],
+    'fare_attributes': ['price'],
+    'shapes': ['shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence'],
+}
+
+# table -> [(column, parent table, parent column)]
+FOREIGN_KEYS = {
+    'trips': [('route_id', 'routes', 'route_id')],
+    'stop_times': [('trip_id', 'trips', 'trip_id'), ('stop_id', 'stops', 'stop_id')],
+    'fare_rules': [('fare_id', 'fare_attributes', 'fare_id'), ('route_id', 'routes', 'route_id')],
+}
+
+# (lat column, lon column) checked against the service area
+COORDINATE_COLUMNS = {
+    'stops': ('stop_lat', 'stop_lon'),
+    'shapes': ('shape_pt_lat', 'shape_pt_lon'),
+}
+
+# Share of orphaned references above which a foreign key check is an error
+MAX_ORPHAN_RATIO = 0.5
+
+# Offending values listed per issue
+MAX_EXAMPLES = 5
+
+
+class GTFSValidationError(ValueError):
+    """Raised when a GTFS table fails validation; carries the table report"""
+
+    def __init__(self, report: Dict[str, Any]):
+        self.report = report
+        messages = '; '.join(
+            issue['message'] for issue in report['issues'] if issue['severity'] == 'error'
+        )
+        super().__init__(f"GTFS table {report['table']} failed validation: {messages}")
+
+
+def _issue(
+    check: str,
+    severity: str,
+    message: str,
+    column: Optional[str] = None,
+    count: int = 0,
+    examples: Optional[List[Any]] = None
+) -> Dict[str, Any]:
+    return {
+        'check': check,
+        'severity': severity,
+        'column': column,
+        'count': int(count),
+        'message': message,
+        'examples': [str(v) for v in (examples or [])[:MAX_EXAMPLES]]
+    }
+
+
+def _check_numeric(name: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    issues = []
+    for column in NUMERIC_COLUMNS.get(name, []):
+        if column in df.columns and not pd.api.types.is_numeric_dtype(df[column].dtype):
+            parsed = pd.to_numeric(df[column], errors='coerce')
+            bad = df[column][parsed.isna() & df[column].notna()]
+            issues.append(_issue(
+                'invalid_type', 'error', f"{column} is not numeric",
+                column=column, count=len(bad), examples=bad.unique().tolist()
+            ))
+    return issues
+
+
+def _check_ids(name: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    key = [column for column in GTFS_PRIMARY_KEYS.get(name, []) if column in df.columns]
+    if not key:
+        return []
+    issues = []
+    missing = int(df[key[0]].isna().sum())
+    if missing:
+        issues.append(_issue('missing_ids', 'error', f"{missing} rows without {key[0]}", column=key[0], count=missing))
+
+    duplicated = df.duplicated(subset=key, keep='first')
+    count = int(duplicated.sum())
+    if count:
+        # Duplicate single-column IDs make lookups ambiguous; repeated
+        # composite rows (e.g. fare_rules) are only redundant
+        severity = 'error' if len(key) == 1 else 'warning'
+        examples = df.loc[duplicated, key[0]].unique().tolist()
+        issues.append(_issue(
+            'duplicate_ids', severity, f"{count} duplicate {'/'.join(key)} values",
+            column='/'.join(key), count=count, examples=examples
+        ))
+    return issues
+
+
+def _check_coordinates(name: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    columns = COORDINATE_COLUMNS.get(name)
+    if columns is None or any(column not in df.columns for column in columns):
+        return []
+    lat, lon = df[columns[0]], df[columns[1]]
+    if not (pd.api.types.is_numeric_dtype(lat.dtype) and pd.api.types.is_numeric_dtype(lon.dtype)):
+        return []  # reported by _check_numeric
+    outside = ~(
+        lat.between(config.BANGALORE_LAT_MIN, config.BANGALORE_LAT_MAX) &
+        lon.between(config.BANGALORE_LON_MIN, config.BANGALORE_LON_MAX)
+    )
+    count = int(outside.sum())
+    if not count:
+        return []
+    id_column = GTFS_PRIMARY_KEYS[name][0]
+    examples = df.loc[outside, id_column].head(MAX_EXAMPLES).tolist() if id_column in df.columns else []
+    return [_issue(
+        'coordinates_out_of_bounds', 'warning',
+        f"{count} rows with coordinates outside the Bangalore service area",
+        column=f'{columns[0]}/{columns[1]}', count=count, examples=examples
+    )]
+
+
+def _check_foreign_keys(
+    name: str,
+    df: pd.DataFrame,
+    parents: Mapping[str, Optional[pd.DataFrame]]
+) -> List[Dict[str, Any]]:
+    issues = []
+    for column, parent, parent_column in FOREIGN_KEYS.get(name, []):
+        if column not in df.columns:
+            continue
+        parent_df = parents.get(parent)
+        if parent_df is None or parent_column not in parent_df.columns:
+            issues.append(_issue(
+                'foreign_key_unchecked', 'warning',
+                f"{column} not checked: {parent} is not available", column=column
+            ))
+            continue
+        values = df[column]
+        referenced = values.notna()
+        orphaned = referenced & ~values.isin(parent_df[parent_column])
+        count = int(orphaned.sum())
+        if not count:
+            continue
+        ratio = count / max(int(referenced.sum()), 1)
+        severity = 'error' if ratio > MAX_ORPHAN_RATIO else 'warning'
+        issues.append(_issue(
+            'foreign_key', severity,
+            f"{count} {column} values ({ratio:.0%}) not found in {parent}.{parent_column}",
+            column=column, count=count, examples=values[orphaned].unique().tolist()
+        ))
+    return issues
+
+
+def validate_table(
+    name: str,
+    df: pd.DataFrame,
+    parents: Optional[Mapping[str, Optional[pd.DataFrame]]] = None
+) -> Dict[str, Any]:
+    """
+    Validate one parsed GTFS table.
+
+    Args:
+        name: GTFS table name (e.g. 'stop_times')
+        df: Table with the memory-lean schema applied
+        parents: Tables referenced by its foreign keys (see parent_tables());
+            references to absent parents are reported as unchecked
+
+    Returns:
+        Report dict with 'valid', error/warning counts, 'issues' and
+        'validate_ms'
+    """
+    start = perf_counter()
+    missing = [column for column in REQUIRED_COLUMNS.get(name, []) if column not in df.columns]
+    if missing:
+        # Nothing else is meaningful for a file with the wrong layout
+        issues = [_issue(
+            'missing_columns', 'error',
+            f"missing required columns: {', '.join(missing)}",
+            count=len(missing), examples=missing
+        )]
+    else:
+        issues = (
+            _check_numeric(name, df) +
+            _check_ids(name, df) +
+            _check_coordinates(name, df) +
+            _check_foreign_keys(name, df, parents or {})
+        )
+
+    errors = sum(1 for issue in issues if issue['severity'] == 'error')
+    return {
+        'table': name,
+        'rows': int(len(df)),
+        'valid': errors == 0,
+        'errors': errors,
+        'warnings': len(issues) - errors,
+        'issues': issues,
+        'validate_ms': round((perf_counter() - start) * 1000, 2)
+    }
+
+
+def parent_tables(name: str) -> List[str]:
+    """Get the tables a GTFS table references through foreign keys"""
+    return [parent for _, parent, _ in FOREIGN_KEYS.get(name, [])]
+
+
+def validate_dataset(data: Mapping) -> Dict[str, Any]:
+    """
+    Validate every table of a GTFS dataset.
+
+    Args:
+        data: Dict of table name -> DataFrame (missing optional tables may
+            be None)
+
+    Returns:
+        Report dict with overall 'valid', totals and per-table reports
+    """
+    tables = {}
+    for name, df in data.items():
+        if df is None:
+            continue
+        parents = {parent: data.get(parent) for parent in parent_tables(name) if parent in data}
+        tables[name] = validate_table(name, df, parents)
+    return summarize_reports(tables)
+
+
+def summarize_reports(tables: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-table reports into a dataset report"""
+    return {
+        'valid': all(report['valid'] for report in tables.values()),
+        'errors': sum(report['errors'] for report in tables.values()),
+        'warnings': sum(report['warnings'] for report in tables.values()),
+        'tables': tables
+    }
@@ -0,0 +1,109 @@
+"""
+GTFS Zip Archive Sources for BMTC Fare Service
+
+The upstream BMTC feed is published as a GTFS zip. This module lets the
+loader read tables straight out of the archive: a ZipMember stands in for
+the path of a loose .txt file, and its contents are streamed (decompressed
+on the fly) into the CSV parser chunk by chunk, so the archive is never
+extracted to disk and no table is ever held in memory as raw text.
+
+Member fingerprints use the CRC and size recorded in the zip directory, so
+a re-packed archive whose table contents did not change does not count as
+a change of that table.
+
+Usage:
+    from gtfs_zip import ZipMember
+
+    stops = ZipMember(config.GTFS_ZIP_PATH, 'stops.txt')
+    if stops.exists():
+        with stops.open() as f:
+            ...
+"""
+
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional, Union
+
+
+class ZipMember:
+    """
+    A GTFS file inside a zip archive.
+
+    The member is matched by file name, so feeds that wrap their files in a
+    top-level directory (gtfs/stops.txt) are found as well.
+    """
+
+    def __init__(self, archive: Union[str, Path], filename: str):
+        """
+        Args:
+            archive: Path to the GTFS zip
+            filename: GTFS file name (e.g. 'stops.txt')
+        """
+        self.archive = Path(archive)
+        self.filename = filename
+
+    @property
+    def name(self) -> str:
+        """File name of the member, like Path.name"""
+        return self.filename
+
+    def __str__(self) -> str:
+        return f'{self.archive}!{self.filename}'
+
+    def __repr__(self) -> str:
+        return f'ZipMember({str(self.archive)!r}, {self.filename!r})'
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ZipMember) and (self.archive, self.filename) == (other.archive, other.filename)
+
+    def __hash__(self) -> int:
+        return hash((self.archive, self.filename))
+
+    def _info(self, archive: zipfile.ZipFile) -> Optional[zipfile.ZipInfo]:
+        for info in archive.infolist():
+            if info.filename == self.filename or info.filename.endswith('/' + self.filename):
+                return info
+        return None
+
+    def info(self) -> Optional[zipfile.ZipInfo]:
+        """Get the zip directory entry of the member, or None if it is absent"""
+        try:
+            with zipfile.ZipFile(self.archive) as archive:
+                return self._info(archive)
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def exists(self) -> bool:
+        """Check whether the archive exists and contains the member"""
+        return self.info() is not None
+
+    def fingerprint(self) -> Optional[Dict[str, Any]]:
+        """
+        Build the change-detection fingerprint of the member.
+
+        Returns:
+            Dict with path, size and crc, or None if the member does not exist
+        """
+        info = self.info()
+        if info is None:
+            return None
+        return {'path': str(self), 'size': info.file_size, 'crc': info.CRC}
+
+    @contextmanager
+    def open(self) -> Iterator[IO[bytes]]:
+        """
+        Open the member for streaming reads.
+
+        The stream decompresses on the fly; the archive stays open until
+        the context exits.
+
+        Raises:
+            FileNotFoundError: If the archive or member does not exist
+        """
+        with zipfile.ZipFile(self.archive) as archive:
+            info = self._info(archive)
+            if info is None:
+                raise FileNotFoundError(f"GTFS file not found in archive: {self}")
+            with archive.open(info) as stream:
+                yield stream
@@ -0,0 +1,142 @@
+"""
+Query Result Cache for BMTC Fare Service
+
+Stop search and autocomplete traffic is very repetitive: riders type the
+same few prefixes ("ma", "maj", "kor", ...) over and over. QueryCache keeps
+the results of recent queries in a bounded, thread-safe LRU so repeated
+queries skip the index lookup and building the stop records.
+
+- Entries are evicted least recently used first once max_size is reached
+- Entries older than the timeout are treated as misses and dropped
+- invalidate() drops every entry (or those matching a predicate); the fare
+  service calls it when a feed swaps to a new version
+- stats() reports hits, misses, hit rate, size, evictions and expirations
+
+Cache keys should include everything the result depends on (feed name and
+version, normalized query, page, options).
+
+Usage:
+    from query_cache import QueryCache
+
+    cache = QueryCache(max_size=2048, timeout=300)
+    result = cache.get_or_compute(('bmtc', version, 'search', query), compute)
+    cache.invalidate(lambda key: key[0] == 'bmtc')
+    cache.stats()
+"""
+
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results with a per-entry timeout.
+
+    A disabled cache (or one with max_size 0) computes every result and
+    stores nothing, but still counts misses.
+    """
+
+    def __init__(self, max_size: int = 1024, timeout: Optional[float] = None, enabled: bool = True):
+        """
+        Args:
+            max_size: Most entries kept
+            timeout: Seconds an entry stays valid (None or 0: no timeout)
+            enabled: Store results at all
+        """
+        self.max_size = max_size
+        self.timeout = timeout or None
+        self.enabled = enabled
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get the cached result for key, computing and storing it on a miss.
+
+        The result is computed outside the lock, so two requests missing the
+        same key at once may both compute it. Cached results are shared
+        between requests and must not be modified by callers.
+
+        Args:
+            key: Hashable cache key
+            compute: Callable producing the result
+
+        Returns:
+            The cached or computed result
+        """
+        if not self.enabled or self.max_size <= 0:
+            with self._lock:
+                self.misses += 1
+            return compute()
+
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.timeout is None or now - stored_at < self.timeout:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            predicate: Only drop keys for which this returns True (default: all)
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if predicate is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [key for key in self._entries if predicate(key)]
+                for key in keys:
+                    del self._entries[key]
+                dropped = len(keys)
+            self.invalidations += 1
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters for status reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'timeout_seconds': self.timeout,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -10,8 +10,9 @@ ensuring they run together and handle graceful shutdown.
 import os
 import sys
 import signal
+import socket
 import time
-from multiprocessing import Process
+import multiprocessing
 from pathlib import Path
 
 # Import configuration
@@ -23,7 +24,18 @@ logger = setup_logger('service_launcher', log_file=config.BASE_DIR / 'services.l
 
 # Global process references
 prediction_api_process = None
-fare_api_process = None
+fare_api_processes = []
+
+# Listening socket shared by all Fare Service workers (FARE_API_WORKERS > 1)
+fare_api_socket = None
+
+# Fork lets Fare Service workers inherit preloaded GTFS data; platforms
+# without fork (Windows) fall back to spawn and each worker loads its own copy
+if 'fork' in multiprocessing.get_all_start_methods():
+    process_context = multiprocessing.get_context('fork')
+else:
+    process_context = multiprocessing.get_context()
+Process = process_context.Process
 
 
 def run_prediction_api():
@@ -45,25 +57,102 @@ def run_prediction_api():
         sys.exit(1)
 
 
-def run_fare_api():
-    """Run the Fare Service API"""
+def run_fare_api(listen_fd=None):
+    """
+    Run the Fare Service API
+    
+    Args:
+        listen_fd: File descriptor of a listening socket shared with other
+            workers; when None the worker binds FARE_API_PORT itself
+    """
     try:
-        logger.info("Starting Fare Service API...")
+        logger.info(f"Starting Fare Service API (pid {os.getpid()})...")
         
         # Import and run the Flask app
-        from fare_service import app
+        from fare_service import app, start_feed_watcher
         
-        app.run(
-            host=config.FARE_API_HOST,
-            port=config.FARE_API_PORT,
-            debug=config.DEBUG,
-            use_reloader=False  # Disable reloader in multiprocess mode
-        )
+        # Watcher threads don't survive fork, so each worker starts its own
+        start_feed_watcher()
+        
+        if listen_fd is None:
+            app.run(
+                host=config.FARE_API_HOST,
+                port=config.FARE_API_PORT,
+                debug=config.DEBUG,
+                use_reloader=False  # Disable reloader in multiprocess mode
+            )
+        else:
+            # Pre-forked worker: accept connections on the inherited socket
+            from werkzeug.serving import make_server
+            server = make_server(
+                config.FARE_API_HOST,
+                config.FARE_API_PORT,
+                app,
+                threaded=True,
+                fd=listen_fd
+            )
+            server.serve_forever()
     except Exception as e:
         logger.error(f"Fare Service API crashed: {e}", exc_info=True)
         sys.exit(1)
 
 
+def preload_fare_data():
+    """
+    Load all GTFS tables in the launcher before the Fare Service workers
+    are forked, so every worker shares one copy-on-write copy.
+    """
+    if process_context.get_start_method() != 'fork':
+        logger.warning("GTFS_PRELOAD needs the fork start method; workers will load GTFS data themselves")
+        return False
+    
+    from fare_service import preload_gtfs_data
+    data = preload_gtfs_data()
+    if data is None:
+        logger.warning("GTFS preload failed; workers will load GTFS data themselves")
+        return False
+    return True
+
+
+def start_fare_workers():
+    """
+    Start FARE_API_WORKERS Fare Service processes.
+    
+    Several workers share one listening socket, which needs the fork start
+    method; elsewhere a single worker is started.
+    """
+    global fare_api_socket
+    
+    worker_count = max(1, config.FARE_API_WORKERS)
+    if worker_count > 1 and process_context.get_start_method() != 'fork':
+        # Spawned workers do not inherit the parent's socket, so they could not share it
+        logger.warning(
+            f"FARE_API_WORKERS={worker_count} needs the fork start method (not available on Windows); "
+            "starting a single Fare Service worker"
+        )
+        worker_count = 1
+    
+    listen_fd = None
+    if worker_count > 1:
+        # Bind once in the parent; every worker accepts on the same socket
+        fare_api_socket = socket.create_server((config.FARE_API_HOST, config.FARE_API_PORT))
+        fare_api_socket.set_inheritable(True)
+        listen_fd = fare_api_socket.fileno()
+    
+    processes = []
+    for i in range(worker_count):
+        process = Process(target=run_fare_api, args=(listen_fd,), name=f"FareAPI-{i + 1}")
+        process.start()
+        processes.append(process)
+    logger.info(f"Started {worker_count} Fare Service worker(s)")
+    return processes
+
+
+def fare_listen_fd():
+    """Get the shared listening socket descriptor, if workers share one"""
+    return fare_api_socket.fileno() if fare_api_socket is not None else None
+
+
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     logger.info(f"Received signal {signum}, initiating graceful shutdown...")
@@ -77,13 +166,17 @@ def signal_handler(signum, frame):
             logger.warning("Prediction API did not terminate gracefully, killing...")
             prediction_api_process.kill()
     
-    if fare_api_process and fare_api_process.is_alive():
-        logger.info("Terminating Fare Service API...")
-        fare_api_process.terminate()
-        fare_api_process.join(timeout=5)
+    for fare_api_process in fare_api_processes:
         if fare_api_process.is_alive():
-            logger.warning("Fare Service API did not terminate gracefully, killing...")
-            fare_api_process.kill()
+            logger.info(f"Terminating {fare_api_process.name}...")
+            fare_api_process.terminate()
+            fare_api_process.join(timeout=5)
+            if fare_api_process.is_alive():
+                logger.warning(f"{fare_api_process.name} did not terminate gracefully, killing...")
+                fare_api_process.kill()
+    
+    if fare_api_socket is not None:
+        fare_api_socket.close()
     
     logger.info("All services stopped. Exiting.")
     sys.exit(0)
@@ -125,7 +218,7 @@ def check_prerequisites():
 
 def monitor_processes():
     """Monitor both processes and restart if they crash"""
-    global prediction_api_process, fare_api_process
+    global prediction_api_process
     
     while True:
         time.sleep(5)  # Check every 5 seconds
@@ -144,24 +237,30 @@ def monitor_processes():
                 prediction_api_process = Process(target=run_prediction_api, name="PredictionAPI")
                 prediction_api_process.start()
         
-        # Check Fare API
-        if fare_api_process and not fare_api_process.is_alive():
+        # Check Fare API workers
+        for i, fare_api_process in enumerate(fare_api_processes):
+            if fare_api_process.is_alive():
+                continue
             exit_code = fare_api_process.exitcode
-            logger.error(f"Fare Service API process died with exit code {exit_code}")
+            logger.error(f"{fare_api_process.name} process died with exit code {exit_code}")
             if not is_production():
                 # In development, don't restart automatically
                 logger.error("Stopping all services due to Fare API crash")
                 signal_handler(signal.SIGTERM, None)
             else:
-                # In production, attempt restart
-                logger.info("Attempting to restart Fare Service API...")
-                fare_api_process = Process(target=run_fare_api, name="FareAPI")
-                fare_api_process.start()
+                # In production, attempt restart (re-forked from the preloaded parent)
+                logger.info(f"Attempting to restart {fare_api_process.name}...")
+                fare_api_processes[i] = Process(
+                    target=run_fare_api,
+                    args=(fare_listen_fd(),),
+                    name=fare_api_process.name
+                )
+                fare_api_processes[i].start()
 
 
 def main():
     """Main entry point for the service launcher"""
-    global prediction_api_process, fare_api_process
+    global prediction_api_process, fare_api_processes
     
     # Print banner
     print("=" * 70)
@@ -169,7 +268,7 @@ def main():
     print("=" * 70)
     print(f"Environment: {config.APP_ENV if hasattr(config, 'APP_ENV') else 'development'}")
     print(f"Prediction API: http://{config.PREDICT_API_HOST}:{config.PREDICT_API_PORT}")
-    print(f"Fare Service API: http://{config.FARE_API_HOST}:{config.FARE_API_PORT}")
+    print(f"Fare Service API: http://{config.FARE_API_HOST}:{config.FARE_API_PORT} ({config.FARE_API_WORKERS} worker(s))")
     print("=" * 70)
     print()
     
@@ -191,10 +290,14 @@ def main():
         # Wait a moment before starting the second service
         time.sleep(2)
         
-        # Start Fare Service API in separate process
-        logger.info("Launching Fare Service API process...")
-        fare_api_process = Process(target=run_fare_api, name="FareAPI")
-        fare_api_process.start()
+        # Load GTFS once so forked Fare Service workers share it
+        if config.GTFS_PRELOAD:
+            logger.info("Preloading GTFS data for Fare Service workers...")
+            preload_fare_data()
+        
+        # Start Fare Service API in separate process(es)
+        logger.info("Launching Fare Service API process(es)...")
+        fare_api_processes = start_fare_workers()
         
         logger.info("=" * 70)
         logger.info("✅ Both services started successfully!")
@@ -0,0 +1,285 @@
+"""
+Stop Clustering into Stations for BMTC Stop Search
+
+The feed lists many stops that riders think of as one place: the same
+landmark on both sides of the road ("Hebbal" / "Hebbal (Towards Majestic)"),
+or a "Gate" and a "Cross" stop a few metres apart ("Nagarabhavi Circle" /
+"Nagarabhavi Gate"). This module groups such stops into stations once, when
+the feed loads, so search and routing can work on the much smaller station
+set and expand to member stops only when needed.
+
+Two stops belong to the same station when they are within the cluster
+radius of each other and the core words of one name are all present in the
+other. Core words are the canonical words (see stop_names) left after
+dropping generic ones such as "bus", "stop", "gate" or "cross"; a name made
+only of generic words keeps all of its words. Stops sharing a GTFS
+parent_station are always grouped. Stations are the connected groups of
+stops linked this way; a stop without a close, similarly named neighbour
+is a station of its own.
+
+Each station takes the most common name of its stops (the first in file
+order on ties), the mean of their coordinates, and the stop_id of its first
+stop (or its parent_station) as station_id.
+
+Usage:
+    from stop_clusters import StopStations
+
+    stations = StopStations(stops['stop_id'], stops['stop_name'],
+                            stops['stop_lat'], stops['stop_lon'])
+    station = stations.station_of[row]          # station of a stops row
+    stations.members(station)                   # stops rows of a station
+    stations.search('majestic')                 # stations by name
+
+    python stop_clusters.py stats     # cluster the configured feed and report
+"""
+
+import argparse
+from collections import Counter
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from config import config
+from stop_names import canonical_tokens
+from stop_search import StopNameIndex, normalize_query
+from stop_spatial import km_to_chord, unit_vectors
+
+# Words that tell stops of one place apart rather than naming the place
+GENERIC_WORDS = frozenset({
+    'bus', 'stop', 'stand', 'station', 'depot', 'terminal', 'gate', 'cross',
+    'circle', 'junction', 'main', 'opposite', 'near', 'platform', 'bay'
+})
+
+
+def core_words(name) -> frozenset:
+    """Get the canonical words of a name that identify the place"""
+    words = frozenset(canonical_tokens(name))
+    return (words - GENERIC_WORDS) or words
+
+
+def similar_names(first: frozenset, second: frozenset) -> bool:
+    """Check whether the core words of one name are all in the other"""
+    if not first or not second:
+        return False
+    return first <= second or second <= first
+
+
+class StopStations:
+    """
+    Stations built by clustering stops, in stops row order.
+
+    station_of maps each stops row to its station; stations are numbered
+    in order of their first stop, and their member rows are in file order.
+    """
+
+    def __init__(
+        self,
+        stop_ids: Sequence,
+        names: Sequence,
+        lat: Sequence[float],
+        lon: Sequence[float],
+        parent_stations: Optional[Sequence] = None,
+        radius_m: Optional[float] = None
+    ):
+        """
+        Args:
+            stop_ids: stop_id column in row order
+            names: stop_name column in row order
+            lat: Stop latitudes in degrees
+            lon: Stop longitudes in degrees
+            parent_stations: parent_station column (stops sharing one are grouped)
+            radius_m: Largest distance between linked stops (default:
+                config.STATION_CLUSTER_RADIUS_M)
+        """
+        stop_ids = [str(stop_id) for stop_id in stop_ids]
+        names = list(names)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.radius_m = config.STATION_CLUSTER_RADIUS_M if radius_m is None else radius_m
+        count = len(stop_ids)
+
+        # parent_station ids, None for stops without one
+        parents: List[Optional[str]] = [None] * count
+        if parent_stations is not None:
+            parents = [None if pd.isna(parent) or not str(parent).strip() else str(parent).strip()
+                       for parent in parent_stations]
+        pairs = [self._close_similar_pairs(names, lat, lon), self._shared_parent_pairs(parents)]
+        pairs = np.concatenate(pairs)
+
+        # Connected groups of linked stops, numbered by their first row
+        graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(count, count))
+        _, labels = connected_components(graph, directed=False)
+        _, first_rows, station_of = np.unique(labels, return_index=True, return_inverse=True)
+        order = np.argsort(first_rows, kind='stable')
+        renumber = np.empty_like(order)
+        renumber[order] = np.arange(len(order))
+        self.station_of = renumber[station_of].astype(np.int32)
+
+        # Member rows of station s are rows[offsets[s]:offsets[s + 1]]
+        self.rows = np.argsort(self.station_of, kind='stable').astype(np.int32)
+        self.offsets = np.searchsorted(self.station_of[self.rows], np.arange(len(order) + 1)).astype(np.int32)
+
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.lat = np.full(len(order), np.nan)
+        self.lon = np.full(len(order), np.nan)
+        for station in range(len(order)):
+            members = self.members(station)
+            parent = next((parents[row] for row in members if parents[row] is not None), None)
+            self.ids.append(parent or stop_ids[members[0]])
+            self.names.append(self._station_name([names[row] for row in members]))
+            located = members[np.isfinite(lat[members]) & np.isfinite(lon[members])]
+            if len(located):
+                self.lat[station] = lat[located].mean()
+                self.lon[station] = lon[located].mean()
+        self.positions: Dict[str, int] = {}
+        for station, station_id in enumerate(self.ids):
+            self.positions.setdefault(station_id, station)
+
+        # Station names, with every member stop name as an alias
+        aliases = []
+        for station, name in enumerate(self.names):
+            lowered = normalize_query(name)
+            for member_name in {names[row] for row in self.members(station)}:
+                if isinstance(member_name, str) and normalize_query(member_name) != lowered:
+                    aliases.append((station, member_name))
+        self.name_index = StopNameIndex(self.names, aliases=aliases)
+
+    def _close_similar_pairs(self, names: List, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Pairs of rows within the radius whose names are similar"""
+        located = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        if len(located) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        tree = cKDTree(unit_vectors(lat[located], lon[located]))
+        close = tree.query_pairs(km_to_chord(self.radius_m / 1000), output_type='ndarray')
+        words: Dict[int, frozenset] = {}
+        linked = []
+        for first, second in located[close].tolist():
+            if first not in words:
+                words[first] = core_words(names[first])
+            if second not in words:
+                words[second] = core_words(names[second])
+            if similar_names(words[first], words[second]):
+                linked.append((first, second))
+        return np.asarray(linked, dtype=np.int64).reshape(-1, 2)
+
+    @staticmethod
+    def _shared_parent_pairs(parents: List[Optional[str]]) -> np.ndarray:
+        """Pairs linking each stop with a parent_station to the first stop sharing it"""
+        first_rows: Dict[str, int] = {}
+        linked = []
+        for row, parent in enumerate(parents):
+            if parent is not None:
+                linked.append((row, first_rows.setdefault(parent, row)))
+        return np.asarray(linked, dtype=np.int64).reshape(-1, 2)
+
+    @staticmethod
+    def _station_name(member_names: List) -> str:
+        """Most common name of the member stops, the first one on ties"""
+        member_names = [name for name in member_names if isinstance(name, str) and name.strip()]
+        if not member_names:
+            return ''
+        counts = Counter(member_names)
+        return max(member_names, key=lambda name: counts[name])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def members(self, station: int) -> np.ndarray:
+        """Get the stops rows of a station in file order"""
+        return self.rows[self.offsets[station]:self.offsets[station + 1]]
+
+    def sizes(self) -> np.ndarray:
+        """Get the number of stops of every station"""
+        return np.diff(self.offsets)
+
+    def position(self, station_id) -> Optional[int]:
+        """Get the station numbered by station_id, or None"""
+        return self.positions.get(str(station_id))
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Find stations whose name or a member stop name contains query.
+
+        Falls back to canonical matches (abbreviations, punctuation, word
+        order) when nothing contains the query literally.
+
+        Args:
+            query: Lowercased search text
+
+        Returns:
+            Station numbers in order of their first stop
+        """
+        stations = self.name_index.containing(query)
+        if not len(stations):
+            stations = self.name_index.canonical_matches(query)
+        return stations
+
+    def resolve(self, name, fuzzy: bool = False) -> Optional[int]:
+        """Resolve a name to one station with the precedence of StopNameIndex.resolve"""
+        return self.name_index.resolve(name, fuzzy=fuzzy)
+
+
+# ==================== Statistics ====================
+
+def cluster_stats(stations: StopStations, build_ms: Optional[float] = None) -> Dict[str, float]:
+    """
+    Summarize how much clustering shrinks the stop set.
+
+    Args:
+        stations: Clustered stations
+        build_ms: Clustering time to report
+
+    Returns:
+        Stop and station counts and station sizes
+    """
+    sizes = stations.sizes()
+    stops = int(sizes.sum())
+    stats = {
+        'stops': stops,
+        'stations': len(stations),
+        'reduction': round(1 - len(stations) / stops, 4) if stops else 0.0,
+        'multi_stop_stations': int((sizes > 1).sum()),
+        'largest_station': int(sizes.max()) if len(sizes) else 0,
+        'radius_m': stations.radius_m
+    }
+    if build_ms is not None:
+        stats['build_ms'] = round(build_ms, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stop clustering tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    stats = subparsers.add_parser('stats', help='Cluster the stops of a feed and report the station set')
+    stats.add_argument('--feed', help='Configured feed name (default: the primary feed)')
+    stats.add_argument('--radius', type=float, help='Cluster radius in metres')
+    stats.add_argument('--largest', type=int, default=5, help='Largest stations to list')
+    args = parser.parse_args()
+
+    from gtfs_loader import GTFSDataset
+    dataset = GTFSDataset.from_config(feed=args.feed)
+    stops = dataset['stops']
+    start = perf_counter()
+    stations = StopStations(
+        stops['stop_id'], stops['stop_name'], stops['stop_lat'], stops['stop_lon'],
+        parent_stations=stops['parent_station'] if 'parent_station' in stops.columns else None,
+        radius_m=args.radius
+    )
+    result = cluster_stats(stations, build_ms=(perf_counter() - start) * 1000)
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+    sizes = stations.sizes()
+    for station in np.argsort(-sizes, kind='stable')[:args.largest]:
+        member_names = sorted({stops['stop_name'].iloc[row] for row in stations.members(station)})
+        print(f"{stations.names[station]} ({sizes[station]} stops): {', '.join(member_names)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Stop Name Canonicalization for BMTC Stop Search
+
+The same stop is written many ways across the feed, its translations and
+user input: "K.R. Puram" / "K R Puram", "H B R Layout" / "HBR Layout",
+"Silk Board Jn" / "Silk Board Junction", "Magadi Rd" / "Magadi Road", with
+direction hints such as "(Towards Majestic)". This module reduces a name to
+a canonical key:
+
+1. Unicode NFKC, zero-width joiners dropped, lowercased
+2. "(towards ...)" direction suffixes removed
+3. '&' becomes "and", apostrophes are dropped, other punctuation splits words
+4. abbreviations and spelled-out ordinals are expanded (rd -> road,
+   jn -> junction, first -> 1st)
+5. runs of single letters are joined into one initialism (h b r -> hbr)
+
+CanonicalNames precomputes the key and token set of every stop name and
+alias once, so matching a query costs one canonicalization of the query
+plus a dict probe (same key) or a posting list intersection (all query
+tokens present, in any order).
+
+Usage:
+    from stop_names import canonical_name, CanonicalNames
+
+    canonical_name('K.R. Puram Rly Stn')     # 'kr puram railway station'
+
+    names = CanonicalNames(['Silk Board Junction', 'K R Puram'])
+    names.first('silk board jn')             # 0
+    names.covering('puram kr')               # array([1])
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from transliteration import clean_kannada
+
+# Direction suffix of BMTC names and translations: "(ಟುವರ್ಡ್ಸ್ X)" is "(towards X)"
+_DIRECTION_SUFFIX = re.compile(r'\s*\((?:ಟುವರ್ಡ್ಸ್|towards)\s[^)]*\)', re.IGNORECASE)
+
+# Kannada vowel signs and virama are not \w, so the whole block is listed
+_NON_WORD = re.compile(r'[^\w\u0c80-\u0cff]+')
+
+_APOSTROPHES = re.compile("['’`]")
+
+# Abbreviations seen in BMTC stop names and typed queries
+ABBREVIATIONS = {
+    'rd': 'road',
+    'crs': 'cross',
+    'jn': 'junction',
+    'jct': 'junction',
+    'junc': 'junction',
+    'stn': 'station',
+    'rly': 'railway',
+    'stg': 'stage',
+    'lyt': 'layout',
+    'ext': 'extension',
+    'extn': 'extension',
+    'blk': 'block',
+    'mn': 'main',
+    'ngr': 'nagar',
+    'hosp': 'hospital',
+    'clg': 'college',
+    'sch': 'school',
+    'opp': 'opposite',
+    'nr': 'near',
+    'govt': 'government',
+    'univ': 'university',
+    'busstand': 'bus stand',
+    'busstop': 'bus stop',
+}
+
+ORDINALS = {
+    'first': '1st', 'second': '2nd', 'third': '3rd', 'fourth': '4th', 'fifth': '5th',
+    'sixth': '6th', 'seventh': '7th', 'eighth': '8th', 'ninth': '9th', 'tenth': '10th',
+}
+
+
+def strip_direction(name: str) -> str:
+    """Drop the "(towards ...)" direction suffix of a stop name"""
+    return _DIRECTION_SUFFIX.sub('', name).strip()
+
+
+def canonical_tokens(name) -> List[str]:
+    """
+    Split a stop name into canonical words.
+
+    Args:
+        name: Stop name, alias or query
+
+    Returns:
+        Canonical words in name order (empty for missing names)
+    """
+    if not isinstance(name, str):
+        return []
+    name = clean_kannada(unicodedata.normalize('NFKC', name))
+    name = strip_direction(name).lower().replace('&', ' and ')
+    words = _NON_WORD.sub(' ', _APOSTROPHES.sub('', name)).split()
+
+    tokens: List[str] = []
+    letters: List[str] = []
+    for word in words:
+        expanded = ABBREVIATIONS.get(word) or ORDINALS.get(word) or word
+        if len(expanded) == 1 and 'a' <= expanded <= 'z':
+            letters.append(expanded)
+            continue
+        if letters:
+            tokens.append(''.join(letters))
+            letters = []
+        tokens.extend(expanded.split())
+    if letters:
+        tokens.append(''.join(letters))
+    return tokens
+
+
+def canonical_name(name) -> Optional[str]:
+    """Get the canonical key of a stop name (None if it has no words)"""
+    return ' '.join(canonical_tokens(name)) or None
+
+
+class CanonicalNames:
+    """
+    Canonical keys and token postings of stop names, built once.
+
+    Several names may belong to one row (e.g. translations and their
+    transliterations). Lookups return stops rows.
+    """
+
+    def __init__(self, names: Iterable, rows: Optional[Iterable[int]] = None):
+        """
+        Args:
+            names: Stop names (any case)
+            rows: Stops row of each name (default: names are the stops rows)
+        """
+        names = list(names)
+        rows = list(range(len(names))) if rows is None else [int(row) for row in rows]
+
+        # Canonical key -> first row; token -> entries holding it
+        self.keys: Dict[str, int] = {}
+        entry_rows: List[int] = []
+        entry_sizes: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for name, row in zip(names, rows):
+            tokens = canonical_tokens(name)
+            if not tokens:
+                continue
+            key = ' '.join(tokens)
+            if row < self.keys.get(key, row + 1):
+                self.keys[key] = row
+            entry = len(entry_rows)
+            entry_rows.append(row)
+            entry_sizes.append(len(set(tokens)))
+            for token in set(tokens):
+                postings.setdefault(token, []).append(entry)
+
+        self._entry_rows = np.asarray(entry_rows, dtype=np.int32)
+        self._entry_sizes = np.asarray(entry_sizes, dtype=np.int32)
+        self._postings = {token: np.asarray(entries, dtype=np.int32) for token, entries in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._entry_rows)
+
+    def first(self, name) -> Optional[int]:
+        """Get the first row whose canonical key equals that of name"""
+        key = canonical_name(name)
+        return self.keys.get(key) if key else None
+
+    def _covering_entries(self, name) -> np.ndarray:
+        tokens = set(canonical_tokens(name))
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        lists = []
+        for token in tokens:
+            entries = self._postings.get(token)
+            if entries is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(entries)
+        lists.sort(key=len)
+        entries = lists[0]
+        for other in lists[1:]:
+            entries = np.intersect1d(entries, other, assume_unique=True)
+            if not len(entries):
+                break
+        return entries
+
+    def covering(self, name) -> np.ndarray:
+        """Get every row (in file order) with a name holding all words of name"""
+        return np.unique(self._entry_rows[self._covering_entries(name)])
+
+    def best_covering(self, name) -> Optional[int]:
+        """
+        Get the row whose name holds all words of name with the fewest
+        other words (ties go to file order).
+        """
+        entries = self._covering_entries(name)
+        if not len(entries):
+            return None
+        best = np.lexsort((self._entry_rows[entries], self._entry_sizes[entries]))[0]
+        return int(self._entry_rows[entries[best]])
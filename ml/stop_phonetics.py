@@ -0,0 +1,184 @@
+"""
+Phonetic Stop Name Keys for Voice Queries
+
+Speech recognition spells Bangalore stop names the way they sound:
+"Yeshwantpur" for "Yeshawanthapura", "Malleshwaram" for "Malleswaram",
+"Jaya Nagar" for "Jayanagara", "Majestik" for "Majestic". None of these
+share a substring or canonical key with the stop name, and they are often
+too many edits apart for fuzzy matching. This module reduces a name to a
+phonetic key tuned for romanized Kannada place names:
+
+1. canonical words (see stop_names), Kannada script transliterated, joined
+   without spaces so "jaya nagar" and "jayanagar" agree
+2. spelling variants merged: aspirates (th -> t, bh -> b, dh -> d, ...),
+   sh -> s, w -> v, z -> j, ph -> f, c/q -> k (s before e, i, y), x -> ks,
+   and word endings such as puram -> pura
+3. vowel spellings merged (ee, ie -> i; oo, ou -> u; final y -> i) and doubled
+   letters collapsed (hebbal -> hebal, aa -> a)
+4. final vowels and the inherent vowel 'a' after the first letter dropped,
+   so schwa deletion no longer matters (nagara = nagar, pete = pet,
+   yeshawanthapura = yeshwantpur); other vowels stay, so "Majestc" is
+   still a typo of "Majestic" rather than the same sound
+
+PhoneticNames computes the key of every stop name and alias once. A lookup
+is one key computation plus a dict probe; when several different names
+share the key, the one spelled most like the query wins (then file order).
+
+Usage:
+    from stop_phonetics import phonetic_key, PhoneticNames
+
+    phonetic_key('Yeshawanthapura')     # 'yesvntpur'
+    phonetic_key('yeshwantpur')         # 'yesvntpur'
+
+    names = PhoneticNames(['Malleswaram', 'Jayanagara'])
+    names.first('malleshwaram')         # 0
+    names.matching('jaya nagar')        # array([1])
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from stop_names import canonical_tokens
+from transliteration import has_kannada, transliterate_kannada
+
+# Letters and letter pairs spelled differently for the same sound
+SOUND_VARIANTS = {
+    'chh': 'c', 'ch': 'c', 'sh': 's', 'th': 't', 'dh': 'd', 'bh': 'b',
+    'kh': 'k', 'gh': 'g', 'jh': 'j', 'ph': 'f', 'ce': 'se', 'ci': 'si',
+    'cy': 'sy', 'c': 'k', 'q': 'k', 'x': 'ks', 'w': 'v', 'z': 'j',
+    'ee': 'i', 'ie': 'i', 'oo': 'u', 'ou': 'u',
+}
+
+# Word endings with a common variant ("Krishnarajapuram" / "K R Pura",
+# "Banashankary" / "Banashankari")
+WORD_ENDINGS = (
+    ('puram', 'pura'),
+    ('y', 'i'),
+    ('palyam', 'palya'),
+    ('nagaram', 'nagara'),
+)
+
+# Longest variants first, so 'ch' is not read as 'c' followed by 'h'
+_SOUNDS = re.compile('|'.join(sorted(SOUND_VARIANTS, key=len, reverse=True)))
+
+_DOUBLED = re.compile(r'(.)\1+')
+
+_NON_LATIN = re.compile('[^a-z0-9]')
+
+_FINAL_VOWELS = 'aeiou'
+
+
+def _spelling(word: str) -> str:
+    """Merge the spelling variants of one word"""
+    word = _SOUNDS.sub(lambda match: SOUND_VARIANTS[match.group()], word)
+    for ending, replacement in WORD_ENDINGS:
+        if word.endswith(ending):
+            return word[:-len(ending)] + replacement
+    return word
+
+
+def phonetic_spelling(name) -> Optional[str]:
+    """
+    Get the normalized spelling of a name that its phonetic key is taken from.
+
+    Args:
+        name: Stop name, alias or query (Latin or Kannada script)
+
+    Returns:
+        Lowercase Latin spelling without spaces, or None if it has no words
+    """
+    tokens = canonical_tokens(name)
+    if not tokens:
+        return None
+    words = []
+    for token in tokens:
+        if has_kannada(token):
+            words.extend(transliterate_kannada(token).lower().split())
+        else:
+            words.append(token)
+    # Doubled letters are collapsed within words, so no word is lost in its neighbour
+    spelled = ''.join(_DOUBLED.sub(r'\1', _spelling(_NON_LATIN.sub('', word))) for word in words)
+    return spelled or None
+
+
+def _skeleton(spelled: str) -> str:
+    """Drop final vowels and the inherent 'a' of a spelling; the first letter stays"""
+    spelled = spelled[0] + spelled[1:].rstrip(_FINAL_VOWELS)
+    return spelled[0] + spelled[1:].replace('a', '')
+
+
+def phonetic_key(name) -> Optional[str]:
+    """Get the phonetic key of a stop name (None if it has no words)"""
+    spelled = phonetic_spelling(name)
+    return _skeleton(spelled) if spelled else None
+
+
+class PhoneticNames:
+    """
+    Phonetic keys of stop names, built once.
+
+    Several names may belong to one row (e.g. translations and their
+    transliterations). Lookups return stops rows.
+    """
+
+    def __init__(self, names: Iterable, rows: Optional[Iterable[int]] = None):
+        """
+        Args:
+            names: Stop names (any case or script)
+            rows: Stops row of each name (default: names are the stops rows)
+        """
+        names = list(names)
+        rows = list(range(len(names))) if rows is None else [int(row) for row in rows]
+
+        # Phonetic key -> distinct spellings with their first row, by row
+        spellings: Dict[str, Dict[str, int]] = {}
+        # Phonetic key -> every row holding it
+        key_rows: Dict[str, List[int]] = {}
+        for name, row in zip(names, rows):
+            spelled = phonetic_spelling(name)
+            if spelled is None:
+                continue
+            key = _skeleton(spelled)
+            variants = spellings.setdefault(key, {})
+            if row < variants.get(spelled, row + 1):
+                variants[spelled] = row
+            key_rows.setdefault(key, []).append(row)
+
+        self._spellings: Dict[str, List[Tuple[str, int]]] = {
+            key: sorted(variants.items(), key=lambda item: item[1]) for key, variants in spellings.items()
+        }
+        self._rows = {key: np.unique(np.asarray(found, dtype=np.int32)) for key, found in key_rows.items()}
+
+    def __len__(self) -> int:
+        return len(self._spellings)
+
+    def first(self, name) -> Optional[int]:
+        """
+        Get the row whose name sounds like name.
+
+        When names spelled differently share the key, the one spelled most
+        like name wins; ties go to file order.
+        """
+        spelled = phonetic_spelling(name)
+        if spelled is None:
+            return None
+        variants = self._spellings.get(_skeleton(spelled))
+        if not variants:
+            return None
+        if len(variants) == 1:
+            return variants[0][1]
+        best_row, best_score = None, -1.0
+        for variant, row in variants:
+            score = 1.0 if variant == spelled else SequenceMatcher(None, spelled, variant).ratio()
+            if score > best_score:
+                best_row, best_score = row, score
+        return best_row
+
+    def matching(self, name) -> np.ndarray:
+        """Get every row (in file order) with a name sounding like name"""
+        key = phonetic_key(name)
+        found = self._rows.get(key) if key else None
+        return found if found is not None else np.empty(0, dtype=np.int32)
@@ -0,0 +1,796 @@
+"""
+Indexed Stop Name Resolution for BMTC Fare Service
+
+find_stop_by_name resolves the origin and destination of every fare and
+journey request. Resolving a name used to scan every stop name up to four
+times (exact, parenthetical prefix, prefix, substring). StopNameIndex answers
+each step from a prebuilt structure instead:
+
+- exact:     dict of lowercased name -> first row
+- prefix:    names sorted once; a prefix is a contiguous range found with
+             bisect, and the first row in file order is the range minimum
+- substring: inverted index of 1- to 3-character grams; candidates are the
+             intersection of the rarest gram postings, verified in row order
+
+Precedence and tie-breaking are the same as the scan: the first stop in file
+order wins at each step. scan_stop_position keeps the scan as a reference
+and as the fallback for callers without an index.
+
+Names that only differ from a stop name in abbreviations, punctuation or
+word order ("K.R. Puram", "Silk Board Jn") are matched next by their
+canonical keys (see stop_names), which are computed once for every name.
+
+Names spelled the way they sound, as speech recognition writes them
+("Yeshwantpur", "Malleshwaram", "Jaya Nagar"), are matched by their
+phonetic keys (see stop_phonetics): one dict probe per query.
+
+Names with no such match ("Majestc", "Silkboard") can fall back to fuzzy
+matching: distinct names sharing enough trigrams with the query are
+candidates, and each is scored by the bounded Levenshtein distance between
+the query and its closest run of consecutive words (bit-parallel, see
+window_distance).
+
+Usage:
+    from stop_search import StopNameIndex
+
+    index = StopNameIndex(stops_df['stop_name'])
+    row = index.resolve('Majestic')               # row position or None
+    positions = index.resolve_many(names)         # one row or None per name
+    rows = index.containing('silk')               # all rows, file order
+    rows = index.canonical_matches('board silk')  # all canonical words present
+    rows = index.phonetic_matches('yeshwantpur')  # names that sound alike
+    matches = index.fuzzy('silkboard', limit=5)   # [(row, distance), ...]
+    page, total = index.autocomplete('ro', popularity, offset=0, limit=10)
+
+    python stop_search.py benchmark               # compare with the scan
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import re
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from transliteration import clean_kannada, has_kannada, transliterate_kannada
+from stop_names import CanonicalNames, strip_direction
+from stop_phonetics import PhoneticNames
+
+# Longest gram kept in the inverted index; queries up to this length are
+# answered from a single posting list without verification
+GRAM_SIZE = 3
+
+# Posting lists intersected before candidates are verified one by one
+MAX_INTERSECTIONS = 3
+
+# Sorts after any character a stop name can contain; bounds prefix ranges
+_PREFIX_END = '\U0010ffff'
+
+_NO_ROWS = np.empty(0, dtype=np.int32)
+
+# Fuzzy matching: queries shorter than this are not corrected, longer ones
+# allow one edit, and two from FUZZY_TWO_EDIT_LENGTH characters on
+FUZZY_MIN_LENGTH = 4
+FUZZY_TWO_EDIT_LENGTH = 8
+
+# Distinct names scored per query (those sharing the most trigrams)
+FUZZY_MAX_CANDIDATES = 200
+
+# Autocomplete match kinds, best first
+AUTOCOMPLETE_MATCHES = ('prefix', 'word', 'substring')
+
+# Bit layout of the autocomplete sort key: rank | popularity | row
+_POPULARITY_CAP = 1 << 21
+_ROW_MASK = (1 << 21) - 1
+
+# Kannada vowel signs and virama are not \w, so the whole block is listed
+_WORD = re.compile(r'[\w\u0c80-\u0cff]+')
+
+
+def lowercase_names(names: Iterable) -> List[str]:
+    """Lowercase stop names in row order; missing names become '' and never match"""
+    return [name.lower() if isinstance(name, str) else '' for name in names]
+
+
+def normalize_query(name) -> Optional[str]:
+    """Strip and lowercase a stop name as entered by a user (None if empty)"""
+    if not name or not isinstance(name, str):
+        return None
+    name = name.strip().lower()
+    return name or None
+
+
+def name_words(name: str) -> List[str]:
+    """Split a lowercased name into words, dropping punctuation"""
+    return _WORD.findall(name)
+
+
+def max_edits(length: int) -> int:
+    """Get the edits a fuzzy query of this length may be away from a name"""
+    if length < FUZZY_MIN_LENGTH:
+        return 0
+    return 2 if length >= FUZZY_TWO_EDIT_LENGTH else 1
+
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """Per-character position bitmasks of pattern for window_distance()"""
+    masks: Dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def window_distance(
+    pattern: str,
+    masks: Dict[str, int],
+    words: List[str],
+    max_distance: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Bounded Levenshtein distance between pattern and its closest run of
+    consecutive words (joined by single spaces).
+
+    Uses the bit-parallel algorithm of Myers (1999): one pass per start word
+    yields the distance to every run beginning there, read off at each word
+    boundary, in O(length of the run) word operations.
+
+    Args:
+        pattern: Lowercased query words joined by single spaces
+        masks: pattern_masks(pattern)
+        words: Lowercased words of a stop name
+        max_distance: Largest distance of interest
+
+    Returns:
+        (distance, placement) of the best run, where placement is 0 for the
+        whole name, 1 for a run at its start and 2 for a run inside it; or
+        None if no run is within max_distance
+    """
+    length = len(pattern)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    best = None
+    for start in range(len(words)):
+        positive, negative, score, consumed = full, 0, length, 0
+        for end in range(start, len(words)):
+            text = words[end] if end == start else ' ' + words[end]
+            consumed += len(text)
+            if consumed > length + max_distance:
+                break
+            for char in text:
+                eq = masks.get(char, 0)
+                vertical = eq | negative
+                horizontal = (((eq & positive) + positive) ^ positive) | eq
+                up = negative | (~(horizontal | positive) & full)
+                down = positive & horizontal
+                if up & last:
+                    score += 1
+                elif down & last:
+                    score -= 1
+                up = ((up << 1) | 1) & full
+                down = (down << 1) & full
+                positive = down | (~(vertical | up) & full)
+                negative = up & vertical
+            if score <= max_distance:
+                placement = 0 if start == 0 and end == len(words) - 1 else (1 if start == 0 else 2)
+                if best is None or (score, placement) < best:
+                    best = (score, placement)
+    return best
+
+
+# ==================== Reference scan ====================
+
+def scan_stop_position(lower: np.ndarray, name) -> Optional[int]:
+    """
+    Resolve a stop name by scanning every name (reference implementation).
+
+    Args:
+        lower: Lowercased stop names as a NumPy string array in row order
+        name: Stop name as entered by the user
+
+    Returns:
+        Row position of the matching stop, or None
+    """
+    name = normalize_query(name)
+    if name is None:
+        return None
+
+    def first(mask):
+        rows = np.flatnonzero(mask)
+        return int(rows[0]) if len(rows) else None
+
+    matches = np.flatnonzero(lower == name)
+    if len(matches):
+        return int(matches[0])
+    if '(' in name:
+        position = first(np.char.startswith(lower, name.split('(')[0].strip()))
+        if position is not None:
+            return position
+    position = first(np.char.startswith(lower, name))
+    if position is None:
+        position = first(np.char.find(lower, name) >= 0)
+    return position
+
+
+# ==================== Index ====================
+
+class NameTable:
+    """
+    Exact, prefix and substring lookups over names of stops rows.
+
+    Several names may belong to one row (e.g. translations). Entries must be
+    in row order, so the first matching entry is also the first matching
+    row in file order.
+    """
+
+    def __init__(self, names: List[str], rows: Optional[Iterable[int]] = None):
+        """
+        Args:
+            names: Lowercased names
+            rows: Stops row of each name, non-decreasing (default: names
+                are the stops rows themselves)
+        """
+        self.names = names
+        if rows is None:
+            self.rows = np.arange(len(names), dtype=np.int32)
+        else:
+            self.rows = np.asarray(list(rows), dtype=np.int32)
+
+        self.exact: Dict[str, int] = {}
+        for entry, name in enumerate(names):
+            if name:
+                self.exact.setdefault(name, int(self.rows[entry]))
+
+        # Stable sort: equal names keep ascending entries
+        order = sorted(range(len(names)), key=names.__getitem__)
+        self._sorted_names = [names[entry] for entry in order]
+        self._sorted_entries = np.asarray(order, dtype=np.int32)
+
+        postings: Dict[str, List[int]] = {}
+        for entry, name in enumerate(names):
+            for gram in self._grams(name):
+                postings.setdefault(gram, []).append(entry)
+        self._postings = {gram: np.asarray(entries, dtype=np.int32) for gram, entries in postings.items()}
+
+        # Name suffixes starting at each later word, sorted, for word-boundary matches
+        word_starts = sorted(
+            (name[match.start():], entry)
+            for entry, name in enumerate(names)
+            for match in _WORD.finditer(name) if match.start() > 0
+        )
+        self._sorted_word_suffixes = [suffix for suffix, _ in word_starts]
+        self._word_entries = np.asarray([entry for _, entry in word_starts], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _prefix_range(self, sorted_names: List[str], prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(sorted_names, prefix)
+        return lo, bisect.bisect_left(sorted_names, prefix + _PREFIX_END, lo)
+
+    @staticmethod
+    def _grams(text: str) -> set:
+        """Distinct substrings of text up to GRAM_SIZE characters"""
+        return {
+            text[start:start + size]
+            for size in range(1, min(GRAM_SIZE, len(text)) + 1)
+            for start in range(len(text) - size + 1)
+        }
+
+    def first_with_prefix(self, prefix: str) -> Optional[int]:
+        """Get the first row (in file order) with a name starting with prefix"""
+        lo, hi = self._prefix_range(self._sorted_names, prefix)
+        if lo == hi:
+            return None
+        return int(self.rows[self._sorted_entries[lo:hi].min()])
+
+    def with_prefix(self, prefix: str) -> np.ndarray:
+        """Get the rows with a name starting with prefix (unordered, may repeat)"""
+        lo, hi = self._prefix_range(self._sorted_names, prefix)
+        return self.rows[self._sorted_entries[lo:hi]]
+
+    def with_word_prefix(self, prefix: str) -> np.ndarray:
+        """Get the rows with a later word of a name starting with prefix (unordered, may repeat)"""
+        lo, hi = self._prefix_range(self._sorted_word_suffixes, prefix)
+        return self.rows[self._word_entries[lo:hi]]
+
+    def _candidates(self, text: str) -> np.ndarray:
+        """Entries whose names may contain text (exact when len(text) <= GRAM_SIZE)"""
+        if len(text) <= GRAM_SIZE:
+            return self._postings.get(text, _NO_ROWS)
+        grams = {text[start:start + GRAM_SIZE] for start in range(len(text) - GRAM_SIZE + 1)}
+        postings = sorted((self._postings.get(gram, _NO_ROWS) for gram in grams), key=len)
+        candidates = postings[0]
+        for entries in postings[1:MAX_INTERSECTIONS]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, entries, assume_unique=True)
+        return candidates
+
+    def matching(self, text: str) -> np.ndarray:
+        """Get the rows with a name containing text (unordered, may repeat)"""
+        if not text:
+            return self.rows
+        entries = self._candidates(text)
+        if len(text) > GRAM_SIZE:
+            names = self.names
+            entries = np.asarray([entry for entry in entries.tolist() if text in names[entry]], dtype=np.int32)
+        return self.rows[entries]
+
+    def containing(self, text: str) -> np.ndarray:
+        """Get every row with a name containing text, in file order"""
+        return np.unique(self.matching(text))
+
+    def first_containing(self, text: str) -> Optional[int]:
+        """Get the first row (in file order) with a name containing text"""
+        if not text:
+            return int(self.rows[0]) if len(self.rows) else None
+        names = self.names
+        for entry in self._candidates(text).tolist():
+            if text in names[entry]:
+                return int(self.rows[entry])
+        return None
+
+    def resolve(self, name: str) -> Optional[int]:
+        """
+        Resolve a normalized name: exact, then the part before a
+        parenthesis as a prefix, then prefix, then substring.
+        """
+        position = self.exact.get(name)
+        if position is None and '(' in name:
+            position = self.first_with_prefix(name.split('(')[0].strip())
+        if position is None:
+            position = self.first_with_prefix(name)
+        if position is None:
+            position = self.first_containing(name)
+        return position
+
+
+def stop_name_aliases(stops, translations) -> List[Tuple[int, str]]:
+    """
+    Collect translated stop names from a GTFS translations table.
+
+    Translations may reference a stop by record_id (its stop_id) or by
+    field_value (every stop with that name).
+
+    Args:
+        stops: Stops table
+        translations: translations table, or None
+
+    Returns:
+        (stops row, translated name) pairs
+    """
+    if translations is None or translations.empty or 'translation' not in translations.columns:
+        return []
+    selected = translations
+    if 'table_name' in selected.columns:
+        selected = selected[selected['table_name'].astype(str) == 'stops']
+    if 'field_name' in selected.columns:
+        selected = selected[selected['field_name'].astype(str) == 'stop_name']
+
+    rows_by_id: Dict[str, int] = {}
+    rows_by_name: Dict[str, List[int]] = {}
+    for position, (stop_id, stop_name) in enumerate(zip(stops['stop_id'].tolist(), stops['stop_name'].tolist())):
+        rows_by_id.setdefault(str(stop_id), position)
+        if isinstance(stop_name, str):
+            rows_by_name.setdefault(stop_name, []).append(position)
+
+    record_ids = selected['record_id'].tolist() if 'record_id' in selected.columns else [None] * len(selected)
+    field_values = selected['field_value'].tolist() if 'field_value' in selected.columns else [None] * len(selected)
+    aliases = []
+    for translation, record_id, field_value in zip(selected['translation'].tolist(), record_ids, field_values):
+        if not isinstance(translation, str):
+            continue
+        if isinstance(record_id, str) and record_id in rows_by_id:
+            aliases.append((rows_by_id[record_id], translation))
+        elif isinstance(field_value, str):
+            aliases.extend((position, translation) for position in rows_by_name.get(field_value, []))
+    return aliases
+
+
+class StopNameIndex:
+    """
+    Prebuilt stop name lookups over the stops table in row order.
+
+    Translated names (and their Latin transliterations) are aliases of
+    their stop: they are matched only when no stop name matches, so
+    English lookups behave exactly as before. Positions returned are row
+    positions of the stops table the index was built from.
+    """
+
+    def __init__(self, names: Iterable, aliases: Optional[Iterable[Tuple[int, str]]] = None):
+        """
+        Args:
+            names: stop_name column in row order
+            aliases: (row, name) pairs of further names of a stop, such as
+                Kannada names from translations.txt
+        """
+        self.names = lowercase_names(names)
+        self._primary = NameTable(self.names)
+        self.exact = self._primary.exact
+
+        alias_entries = set()
+        for position, alias in aliases or []:
+            alias = clean_kannada(strip_direction(alias)).lower()
+            if not alias:
+                continue
+            alias_entries.add((position, alias))
+            if has_kannada(alias):
+                alias_entries.add((position, transliterate_kannada(alias)))
+        alias_entries = sorted(alias_entries)
+        self._aliases = NameTable([alias for _, alias in alias_entries], [row for row, _ in alias_entries])
+
+        # Canonical keys of every name and alias, for abbreviated, punctuated
+        # or reordered input that no name contains literally
+        all_names = self.names + self._aliases.names
+        all_rows = np.concatenate([self._primary.rows, self._aliases.rows])
+        self._canonical = CanonicalNames(all_names, all_rows)
+
+        # Phonetic keys of every name and alias, for names spelled the way
+        # they sound (speech recognition, "Yeshwantpur", "Malleshwaram")
+        self._phonetic = PhoneticNames(all_names, all_rows)
+
+        # Fuzzy matching works on distinct names; trigrams ignore spaces and
+        # punctuation so "silkboard" finds "silk board"
+        first_rows = dict(self.exact)
+        for alias, position in self._aliases.exact.items():
+            first_rows[alias] = min(position, first_rows.get(alias, position))
+        self._fuzzy_words: List[List[str]] = []
+        self._fuzzy_rows: List[int] = []
+        fuzzy_postings: Dict[str, List[int]] = {}
+        for name, position in first_rows.items():
+            words = name_words(name)
+            if not words:
+                continue
+            name_id = len(self._fuzzy_rows)
+            self._fuzzy_words.append(words)
+            self._fuzzy_rows.append(position)
+            for gram in self._trigrams(''.join(words)):
+                fuzzy_postings.setdefault(gram, []).append(name_id)
+        self._fuzzy_postings = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in fuzzy_postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def alias_count(self) -> int:
+        """Number of indexed aliases (translations and transliterations)"""
+        return len(self._aliases)
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        """Distinct 3-character substrings of text"""
+        return {text[start:start + 3] for start in range(len(text) - 2)}
+
+    # ==================== Lookups ====================
+
+    def canonical_matches(self, name) -> np.ndarray:
+        """Get every row (in file order) with a name or alias holding all canonical words of name"""
+        return self._canonical.covering(name)
+
+    def phonetic_matches(self, name) -> np.ndarray:
+        """Get every row (in file order) with a name or alias sounding like name (see stop_phonetics)"""
+        return self._phonetic.matching(name)
+
+    def first_with_prefix(self, prefix: str) -> Optional[int]:
+        """Get the first row (in file order) whose stop name starts with prefix"""
+        return self._primary.first_with_prefix(prefix)
+
+    def first_containing(self, text: str) -> Optional[int]:
+        """Get the first row (in file order) whose stop name contains text"""
+        return self._primary.first_containing(text)
+
+    def containing(self, text: str) -> np.ndarray:
+        """
+        Get every row whose stop name or an alias contains text, in file order.
+
+        Args:
+            text: Lowercased search text
+
+        Returns:
+            Array of row positions
+        """
+        if not len(self._aliases) or not text:
+            return self._primary.containing(text)
+        return np.unique(np.concatenate([
+            self._primary.matching(text), self._aliases.matching(clean_kannada(text))
+        ]))
+
+    def fuzzy(self, name, limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        Find stops whose names are a few typos away from name.
+
+        A name matches when some run of its consecutive words is within
+        max_edits() of the query. Matches are ranked by distance, then
+        whole-name matches before matches at the start of a name before
+        matches inside it, then file order. Kannada input is also matched
+        by its transliteration.
+
+        Args:
+            name: Stop name as entered by the user
+            limit: Maximum number of matches
+
+        Returns:
+            (row, distance) of the best matches, one per stop
+        """
+        name = normalize_query(name)
+        if name is None:
+            return []
+        name = clean_kannada(name)
+        queries = [name]
+        if has_kannada(name):
+            queries.append(transliterate_kannada(name))
+
+        best: Dict[int, Tuple[int, int]] = {}
+        for query in queries:
+            for distance, placement, row in self._fuzzy_matches(' '.join(name_words(query))):
+                if row not in best or (distance, placement) < best[row]:
+                    best[row] = (distance, placement)
+
+        ranked = sorted((distance, placement, row) for row, (distance, placement) in best.items())
+        return [(row, distance) for distance, _, row in ranked[:limit]]
+
+    def _fuzzy_matches(self, query: str) -> List[Tuple[int, int, int]]:
+        """(distance, placement, row) of the distinct names matching query"""
+        allowed = max_edits(len(query))
+        grams = self._trigrams(query.replace(' ', ''))
+        if not allowed or not grams:
+            return []
+
+        postings = [self._fuzzy_postings[gram] for gram in grams if gram in self._fuzzy_postings]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._fuzzy_rows))
+        # Each edit breaks at most three trigrams (q-gram lemma)
+        candidates = np.flatnonzero(shared >= max(1, len(grams) - 3 * allowed))
+        if len(candidates) > FUZZY_MAX_CANDIDATES:
+            order = np.argsort(-shared[candidates], kind='stable')[:FUZZY_MAX_CANDIDATES]
+            candidates = np.sort(candidates[order])
+
+        masks = pattern_masks(query)
+        matches = []
+        for name_id in candidates.tolist():
+            best = window_distance(query, masks, self._fuzzy_words[name_id], allowed)
+            if best is not None:
+                matches.append((best[0], best[1], self._fuzzy_rows[name_id]))
+        return matches
+
+    def autocomplete(
+        self,
+        text: str,
+        popularity: Optional[np.ndarray] = None,
+        offset: int = 0,
+        limit: int = 10
+    ) -> Tuple[List[Tuple[int, str]], int]:
+        """
+        Rank the stops matching a partial name and return one page.
+
+        Stops whose name starts with text come first, then stops with a
+        later word starting with text, then other substring matches. A stop
+        matched only through an alias ranks just below stop names matched
+        the same way. Within each group more popular stops come first, then
+        file order. Only the requested page is sorted, so broad queries
+        cost about the same as narrow ones.
+
+        Args:
+            text: Lowercased partial name
+            popularity: Score per stops row, higher first (e.g. route count)
+            offset: Matches to skip
+            limit: Page size
+
+        Returns:
+            ([(row, match), ...] with match 'prefix', 'word' or 'substring',
+            total number of matches)
+        """
+        if not text or not len(self.names):
+            return [], 0
+        # Rank 2 * match kind, plus 1 when only an alias matches that way
+        unmatched = 2 * len(AUTOCOMPLETE_MATCHES)
+        rank = np.full(len(self.names), unmatched, dtype=np.int64)
+        kannada = clean_kannada(text)
+        for kind, lookup in ((2, 'matching'), (1, 'with_word_prefix'), (0, 'with_prefix')):
+            # Weaker matches are assigned first so stronger ones overwrite them
+            rank[getattr(self._aliases, lookup)(kannada)] = 2 * kind + 1
+            rank[getattr(self._primary, lookup)(text)] = 2 * kind
+
+        matched = np.flatnonzero(rank < unmatched)
+        total = len(matched)
+        end = min(offset + limit, total)
+        if offset >= end:
+            return [], total
+
+        # One sortable key: rank, then popularity (descending), then row
+        if popularity is None:
+            score = np.zeros(total, dtype=np.int64)
+        else:
+            score = np.clip(np.asarray(popularity, dtype=np.int64)[matched], 0, _POPULARITY_CAP - 1)
+        keys = (rank[matched] << 42) | ((_POPULARITY_CAP - 1 - score) << 21) | matched
+        if end < total:
+            keys = keys[np.argpartition(keys, end - 1)[:end]]
+        keys = np.sort(keys)[offset:end]
+        rows = (keys & _ROW_MASK).tolist()
+        return [(row, AUTOCOMPLETE_MATCHES[rank[row] // 2]) for row in rows], total
+
+    def resolve(self, name, fuzzy: bool = False, phonetic: bool = False) -> Optional[int]:
+        """
+        Resolve a stop name with the same precedence as the scan.
+
+        Tries an exact match, then the part before a parenthesis as a
+        prefix, then a prefix and finally a substring match against stop
+        names. Then a name with the same canonical key (see stop_names), a
+        name holding every canonical word of the query, and finally the
+        lookups above against aliases.
+
+        Names from speech recognition are usually whole names spelled the
+        way they sound, so with phonetic the three key probes (exact name,
+        canonical key, phonetic key, see stop_phonetics) are tried first,
+        before the steps above. Phonetic keys are only used for such voice
+        queries.
+
+        Args:
+            name: Stop name as entered by the user
+            fuzzy: Fall back to the best fuzzy match
+            phonetic: Try the exact, canonical and phonetic keys first
+
+        Returns:
+            Row position of the matching stop, or None
+        """
+        name = normalize_query(name)
+        if name is None:
+            return None
+        if phonetic:
+            position = self.exact.get(name)
+            if position is None:
+                position = self._canonical.first(name)
+            if position is None:
+                position = self._phonetic.first(name)
+            if position is not None:
+                return position
+        position = self._primary.resolve(name)
+        if position is None:
+            position = self._canonical.first(name)
+        if position is None:
+            position = self._canonical.best_covering(name)
+        if position is None and len(self._aliases):
+            position = self._aliases.resolve(clean_kannada(name))
+        if position is None and fuzzy:
+            matches = self.fuzzy(name, limit=1)
+            position = matches[0][0] if matches else None
+        return position
+
+    def resolve_many(self, names: Sequence, fuzzy: bool = False, phonetic: bool = False) -> List[Optional[int]]:
+        """
+        Resolve a batch of stop names, resolving each distinct name once.
+
+        Names that only differ in case or surrounding whitespace count as
+        the same name.
+
+        Args:
+            names: Stop names as entered by users
+            fuzzy: Fall back to the best fuzzy match
+            phonetic: Try the exact, canonical and phonetic keys first
+
+        Returns:
+            Row position of the matching stop (or None) for each name
+        """
+        resolved: Dict[Optional[str], Optional[int]] = {None: None}
+        positions = []
+        for name in names:
+            key = normalize_query(name)
+            if key not in resolved:
+                resolved[key] = self.resolve(key, fuzzy=fuzzy, phonetic=phonetic)
+            positions.append(resolved[key])
+        return positions
+
+
+# ==================== Autocomplete cursors ====================
+
+def encode_cursor(query: str, offset: int, feed_version: Optional[str] = None) -> str:
+    """
+    Encode an opaque autocomplete cursor for the page starting at offset.
+
+    The query and feed version are included so a cursor cannot be reused
+    for another query or after the feed changed.
+    """
+    payload = json.dumps({'q': query, 'o': offset, 'v': feed_version}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor from encode_cursor().
+
+    Returns:
+        Dict with 'query', 'offset' and 'feed_version'
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        offset = payload['o']
+        if not isinstance(offset, int) or offset < 0 or not isinstance(payload['q'], str):
+            raise ValueError
+    except (ValueError, KeyError, TypeError, UnicodeError) as e:
+        raise ValueError('malformed cursor') from e
+    return {'query': payload['q'], 'offset': offset, 'feed_version': payload.get('v')}
+
+
+# ==================== Benchmark ====================
+
+def benchmark_queries(names: List[str]) -> List[str]:
+    """
+    Build a query mix from stop names: exact names, parenthetical variants,
+    prefixes, inner substrings and misses.
+    """
+    queries = []
+    for name in names:
+        if not name:
+            continue
+        queries.append(name.upper())
+        queries.append(f"{name[:6]} (stand)")
+        queries.append(name[:max(1, len(name) // 2)])
+        queries.append(name[len(name) // 3: len(name) // 3 + 5])
+        queries.append(f"{name} zz")
+    return queries
+
+
+def run_benchmark(stop_names: Iterable, limit: Optional[int] = None) -> Dict[str, float]:
+    """
+    Time the index against the scan on the same queries.
+
+    Args:
+        stop_names: stop_name column in row order
+        limit: Stop names to derive queries from (default: all)
+
+    Returns:
+        Dict with build time, mean lookup times and the number of mismatches
+    """
+    stop_names = list(stop_names)
+    start = perf_counter()
+    index = StopNameIndex(stop_names)
+    build_ms = (perf_counter() - start) * 1000
+    lower = np.asarray(index.names, dtype=str)
+    queries = benchmark_queries(index.names[:limit] if limit else index.names)
+
+    start = perf_counter()
+    indexed = [index.resolve(query) for query in queries]
+    index_us = (perf_counter() - start) / len(queries) * 1e6
+
+    start = perf_counter()
+    scanned = [scan_stop_position(lower, query) for query in queries]
+    scan_us = (perf_counter() - start) / len(queries) * 1e6
+
+    return {
+        'stops': len(index),
+        'queries': len(queries),
+        'build_ms': round(build_ms, 1),
+        'index_us': round(index_us, 2),
+        'scan_us': round(scan_us, 2),
+        'mismatches': sum(a != b for a, b in zip(indexed, scanned))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stop name index tools')
+    parser.add_argument('command', choices=['benchmark'])
+    parser.add_argument('--feed', help='GTFS feed to benchmark (default: the primary feed)')
+    parser.add_argument('--limit', type=int, help='Stop names to derive queries from')
+    args = parser.parse_args()
+
+    from gtfs_loader import GTFSDataset
+    stops = GTFSDataset.from_config(feed=args.feed)['stops']
+    result = run_benchmark(stops['stop_name'], limit=args.limit)
+    print(f"{result['stops']} stops, {result['queries']} queries, index built in {result['build_ms']} ms")
+    print(f"  index: {result['index_us']:9.2f} us/lookup")
+    print(f"  scan:  {result['scan_us']:9.2f} us/lookup ({result['scan_us'] / result['index_us']:.0f}x slower)")
+    print(f"  mismatches: {result['mismatches']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Spatial Stop Index for BMTC Fare Service
+
+Answers "which stops are near this point" without scanning stops.txt. Stop
+coordinates are placed on the unit sphere as 3-D vectors and held in a
+KD-tree (scipy's cKDTree). The straight-line (chord) distance between two
+such vectors grows monotonically with the great-circle distance, so the
+tree's nearest neighbours are the nearest stops on the ground. Distances
+are converted back to great-circle kilometres exactly, with no planar
+approximation near the query point.
+
+Both lookups take arrays of points, so a batch of points costs one
+vectorized tree query:
+
+- nearest: the k closest stops, optionally only those within a radius
+- within:  every stop within a radius, closest first
+
+Stops without coordinates are left out of the tree.
+
+Usage:
+    from stop_spatial import StopSpatialIndex
+
+    index = StopSpatialIndex(stops['stop_lat'], stops['stop_lon'])
+    rows, km = index.nearest([12.9767], [77.5710], k=5)   # (1, 5) arrays
+    matches = index.within([12.9767], [77.5710], radius_km=0.5)
+
+    python stop_spatial.py benchmark     # time lookups on the configured feed
+"""
+
+import argparse
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from config import config
+
+# Row and distance reported for the missing neighbours of a point
+NO_ROW = -1
+
+
+def unit_vectors(lat: Sequence[float], lon: Sequence[float]) -> np.ndarray:
+    """Convert latitudes and longitudes in degrees to unit 3-D vectors"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Convert unit-sphere chord lengths to great-circle kilometres"""
+    return 2 * config.EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    """Convert a great-circle distance in kilometres to a unit-sphere chord length"""
+    return 2 * np.sin(min(km / (2 * config.EARTH_RADIUS_KM), np.pi / 2))
+
+
+class StopSpatialIndex:
+    """
+    KD-tree over stop coordinates answering nearest-k and radius queries.
+
+    Results are stops rows (positions in the stops table), so callers can
+    read any stop column with iloc.
+    """
+
+    def __init__(self, lat: Sequence[float], lon: Sequence[float]):
+        """
+        Args:
+            lat: Stop latitudes in degrees, in stops row order
+            lon: Stop longitudes in degrees, in stops row order
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        located = np.isfinite(lat) & np.isfinite(lon)
+
+        # Tree position -> stops row
+        self.rows = np.flatnonzero(located).astype(np.int32)
+        self.tree = cKDTree(unit_vectors(lat[located], lon[located]))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def nearest(
+        self,
+        lat: Sequence[float],
+        lon: Sequence[float],
+        k: int = 5,
+        radius_km: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest stops to each point.
+
+        Args:
+            lat: Point latitudes in degrees
+            lon: Point longitudes in degrees
+            k: Stops per point
+            radius_km: Only return stops within this distance
+
+        Returns:
+            (rows, distances_km), both of shape (points, k) and ordered by
+            distance. Missing neighbours (fewer than k stops, or none left
+            within the radius) are NO_ROW with an infinite distance.
+        """
+        points = unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))
+        if not len(self.rows) or k < 1:
+            return (np.full((len(points), max(k, 0)), NO_ROW, dtype=np.int32),
+                    np.full((len(points), max(k, 0)), np.inf))
+
+        bound = np.inf if radius_km is None else np.nextafter(km_to_chord(radius_km), np.inf)
+        chords, positions = self.tree.query(points, k=k, distance_upper_bound=bound)
+        chords = np.asarray(chords, dtype=np.float64).reshape(len(points), k)
+        positions = np.asarray(positions).reshape(len(points), k)
+
+        # cKDTree marks missing neighbours with position n and distance inf
+        found = positions < len(self.rows)
+        rows = np.where(found, self.rows[np.minimum(positions, len(self.rows) - 1)], NO_ROW).astype(np.int32)
+        return rows, np.where(found, chord_to_km(chords), np.inf)
+
+    def within(
+        self,
+        lat: Sequence[float],
+        lon: Sequence[float],
+        radius_km: float,
+        limit: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find every stop within a radius of each point.
+
+        Args:
+            lat: Point latitudes in degrees
+            lon: Point longitudes in degrees
+            radius_km: Search radius in kilometres
+            limit: Keep only the closest this many stops per point
+
+        Returns:
+            One (rows, distances_km) pair per point, ordered by distance
+        """
+        points = unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))
+        if not len(self.rows):
+            return [(np.empty(0, dtype=np.int32), np.empty(0)) for _ in range(len(points))]
+
+        matches = self.tree.query_ball_point(points, r=km_to_chord(radius_km))
+        results = []
+        for point, positions in zip(points, matches):
+            positions = np.asarray(positions, dtype=np.intp)
+            chords = np.linalg.norm(self.tree.data[positions] - point, axis=1)
+            # Closest first; ties keep stops row order
+            order = np.lexsort((positions, chords))[:limit]
+            results.append((self.rows[positions[order]], chord_to_km(chords[order])))
+        return results
+
+
+# ==================== Benchmark ====================
+
+def run_benchmark(lat: Sequence[float], lon: Sequence[float], queries: int = 1000, seed: int = 7) -> Dict[str, float]:
+    """
+    Time the index against a full haversine scan on random points near stops.
+
+    Args:
+        lat: Stop latitudes in degrees
+        lon: Stop longitudes in degrees
+        queries: Number of query points
+        seed: Random seed for the query points
+
+    Returns:
+        Per-query timings in microseconds and the number of nearest-stop
+        disagreements with the scan
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+
+    start = perf_counter()
+    index = StopSpatialIndex(lat, lon)
+    build_ms = (perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(index.rows), queries)
+    query_lat = lat[index.rows[picks]] + rng.normal(0, 0.01, queries)
+    query_lon = lon[index.rows[picks]] + rng.normal(0, 0.01, queries)
+
+    start = perf_counter()
+    for i in range(queries):
+        index.nearest(query_lat[i:i + 1], query_lon[i:i + 1], k=5)
+    single_us = (perf_counter() - start) / queries * 1e6
+
+    start = perf_counter()
+    rows, _ = index.nearest(query_lat, query_lon, k=5)
+    batch_us = (perf_counter() - start) / queries * 1e6
+
+    start = perf_counter()
+    index.within(query_lat, query_lon, radius_km=0.5)
+    within_us = (perf_counter() - start) / queries * 1e6
+
+    # Reference: haversine to every stop
+    start = perf_counter()
+    stop_lat, stop_lon = np.radians(lat[index.rows]), np.radians(lon[index.rows])
+    mismatches = 0
+    for i in range(queries):
+        point_lat, point_lon = np.radians(query_lat[i]), np.radians(query_lon[i])
+        a = (np.sin((stop_lat - point_lat) / 2) ** 2
+             + np.cos(point_lat) * np.cos(stop_lat) * np.sin((stop_lon - point_lon) / 2) ** 2)
+        if index.rows[np.argmin(a)] != rows[i, 0]:
+            mismatches += 1
+    scan_us = (perf_counter() - start) / queries * 1e6
+
+    return {
+        'stops': len(index),
+        'queries': queries,
+        'build_ms': round(build_ms, 2),
+        'nearest_us': round(single_us, 2),
+        'nearest_batch_us': round(batch_us, 2),
+        'within_500m_us': round(within_us, 2),
+        'scan_us': round(scan_us, 2),
+        'mismatches': mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spatial stop index tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    benchmark = subparsers.add_parser('benchmark', help='Time nearest-stop lookups against a full scan')
+    benchmark.add_argument('--feed', help='Configured feed name (default: the primary feed)')
+    benchmark.add_argument('--queries', type=int, default=1000, help='Number of query points')
+    args = parser.parse_args()
+
+    from gtfs_loader import GTFSDataset
+    dataset = GTFSDataset.from_config(feed=args.feed)
+    stops = dataset['stops']
+    result = run_benchmark(stops['stop_lat'], stops['stop_lon'], queries=args.queries)
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == '__main__':
+    main()
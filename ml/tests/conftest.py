@@ -243,14 +243,14 @@ def valid_batch_request(valid_prediction_request):
 @pytest.fixture
 def fare_client(mock_gtfs_data):
     """Create Flask test client for fare API with mocked GTFS data"""
-    # Mock the GTFS data loading function
-    with patch('fare_service.load_gtfs_data', return_value=mock_gtfs_data):
+    from query_cache import QueryCache
+    
+    # Mock the GTFS data loading function; each test gets an empty query cache
+    with patch('fare_service.load_gtfs_data', return_value=mock_gtfs_data), \
+         patch('fare_service.stop_query_cache', QueryCache(max_size=64)):
         # Import after patching
         import fare_service
         
-        # Clear the LRU cache to ensure our mock is used
-        fare_service.load_gtfs_data.cache_clear()
-        
         fare_service.app.config['TESTING'] = True
         
         with fare_service.app.test_client() as client:
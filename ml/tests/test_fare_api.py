@@ -7,6 +7,7 @@ Tests all fare API endpoints using the real Flask application.
 import pytest
 import sys
 import json
+import pandas as pd
 from pathlib import Path
 from unittest.mock import patch
 
@@ -103,6 +104,134 @@ class TestStopsEndpoint:
         assert data['count'] == 0
         assert len(data['stops']) == 0
     
+    def test_search_stops_canonical(self, fare_client):
+        """Test that reordered and punctuated names are found by canonical words"""
+        response = fare_client.get('/api/stops/search?q=City,%20Electronic')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['match'] == 'canonical'
+        assert data['stops'] == [{'stop_id': '4', 'stop_name': 'Electronic City'}]
+    
+    def test_search_stops_fuzzy(self, fare_client):
+        """Test that a misspelt query returns the closest stops"""
+        response = fare_client.get('/api/stops/search?q=Koramagala')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['match'] == 'fuzzy'
+        assert data['stops'][0]['stop_name'] == 'Koramangala'
+        assert data['stops'][0]['distance'] == 1
+    
+    def test_search_stops_fuzzy_disabled(self, fare_client):
+        """Test that fuzzy suggestions can be switched off"""
+        import fare_service
+        with patch.object(fare_service.config, 'STOP_SEARCH_FUZZY', False):
+            response = fare_client.get('/api/stops/search?q=Koramagala')
+        
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_search_stops_phonetic(self, fare_client):
+        """Test that names spelled the way they sound (voice input) match"""
+        import fare_service
+        with patch.object(fare_service.config, 'STOP_SEARCH_FUZZY', False):
+            response = fare_client.get('/api/stops/search?q=Jaya Nagara')
+        data = json.loads(response.data)
+        
+        assert data['match'] == 'phonetic'
+        assert data['stops'] == [{'stop_id': '5', 'stop_name': 'Jayanagar'}]
+    
+    def test_search_stops_kannada(self, fare_client, mock_gtfs_data):
+        """Test that Kannada names from translations find the same stop"""
+        mock_gtfs_data['translations'] = pd.DataFrame({
+            'table_name': ['stops'], 'field_name': ['stop_name'], 'language': ['kn'],
+            'record_id': ['1'], 'translation': ['ಮೆಜೆಸ್ಟಿಕ್']
+        })
+        
+        response = fare_client.get('/api/stops/search?q=ಮೆಜೆಸ್ಟಿಕ್')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['stops'] == [{'stop_id': '1', 'stop_name': 'Majestic'}]
+    
+    def test_autocomplete_ranking(self, fare_client, mock_gtfs_data):
+        """Test prefix matches before inner word matches, busier stops first"""
+        mock_gtfs_data['stops'] = pd.DataFrame({
+            'stop_id': ['1', '2', '3', '4'],
+            'stop_name': ['Old Majestic', 'Majestic', 'Majestic Metro', 'Koramangala'],
+        })
+        mock_gtfs_data['trips'] = pd.DataFrame({'route_id': ['G-4', 'V-500'], 'trip_id': ['t1', 't2']})
+        mock_gtfs_data['stop_times'] = pd.DataFrame({'trip_id': ['t1', 't2'], 'stop_id': ['3', '3']})
+        
+        response = fare_client.get('/api/stops/autocomplete?q=Maj')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [stop['stop_id'] for stop in data['stops']] == ['3', '2', '1']
+        assert [stop['match'] for stop in data['stops']] == ['prefix', 'prefix', 'word']
+        assert data['stops'][0]['route_count'] == 2
+        assert (data['total'], data['next_cursor']) == (3, None)
+    
+    def test_autocomplete_pagination(self, fare_client):
+        """Test that next_cursor pages through every match once"""
+        response = fare_client.get('/api/stops/autocomplete?q=a&limit=1')
+        data = json.loads(response.data)
+        seen = [stop['stop_id'] for stop in data['stops']]
+        
+        while data['next_cursor']:
+            response = fare_client.get(f"/api/stops/autocomplete?q=a&limit=1&cursor={data['next_cursor']}")
+            data = json.loads(response.data)
+            assert data['count'] == 1
+            seen += [stop['stop_id'] for stop in data['stops']]
+        
+        assert sorted(seen) == ['1', '2', '5']
+        assert data['total'] == 3
+    
+    def test_autocomplete_fuzzy(self, fare_client):
+        """Test that a misspelt prefix falls back to the closest stops"""
+        response = fare_client.get('/api/fare/stops/autocomplete?q=Koramangla')
+        data = json.loads(response.data)
+        
+        assert data['stops'][0]['stop_name'] == 'Koramangala'
+        assert data['stops'][0]['match'] == 'fuzzy'
+    
+    def test_autocomplete_invalid(self, fare_client):
+        """Test rejected limits, foreign cursors and cursors of an older feed"""
+        from stop_search import encode_cursor
+        
+        assert fare_client.get('/api/stops/autocomplete?q=a&limit=500').status_code == 400
+        assert fare_client.get('/api/stops/autocomplete').status_code == 400
+        cursor = encode_cursor('ma', 2)
+        assert fare_client.get(f'/api/stops/autocomplete?q=ko&cursor={cursor}').status_code == 400
+        
+        stale = encode_cursor('a', 2, 'old-version')
+        response = fare_client.get(f'/api/stops/autocomplete?q=a&cursor={stale}')
+        assert response.status_code == 400
+        assert 'expired' in json.loads(response.data)['details'][0]
+    
+    def test_search_stops_cached(self, fare_client):
+        """Test that a repeated search is served from the query cache"""
+        import fare_service
+        first = json.loads(fare_client.get('/api/stops/search?q=Maj').data)
+        second = json.loads(fare_client.get('/api/stops/search?q=maj').data)
+        stats = json.loads(fare_client.get('/api/stops/cache').data)
+        
+        assert first == second
+        assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+        
+        # A feed swap drops the feed's cached queries
+        fare_service.drop_cached_stop_queries(None, None, None)
+        assert len(fare_service.stop_query_cache) == 0
+    
+    def test_autocomplete_cached_per_page(self, fare_client):
+        """Test that pages and limits are cached separately"""
+        for url in ['/api/stops/autocomplete?q=a&limit=1', '/api/stops/autocomplete?q=a&limit=2',
+                    '/api/stops/autocomplete?q=a&limit=1']:
+            fare_client.get(url)
+        stats = json.loads(fare_client.get('/api/fare/stops/cache').data)
+        
+        assert (stats['hits'], stats['size']) == (1, 2)
+    
     def test_search_stops_alternate_endpoint(self, fare_client):
         """Test alternate search endpoint"""
         response = fare_client.get('/api/fare/stops/search?q=Majestic')
@@ -112,6 +241,142 @@ class TestStopsEndpoint:
         assert 'stops' in data
 
 
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestResolveStopsEndpoint:
+    """Test batch stop name resolution"""
+    
+    def test_resolve_batch(self, fare_client):
+        """Test that names resolve in input order, unresolved ones as null"""
+        response = fare_client.post('/api/stops/resolve', json={
+            'names': ['Majestic', 'kora', ' MAJESTIC ', 'Whitefeild', '', 'NonExistentStop123']
+        })
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        stops = [result['stop'] and result['stop']['stop_id'] for result in data['results']]
+        assert stops == ['1', '2', '1', '3', None, None]
+        assert data['results'][2]['query'] == ' MAJESTIC '
+        assert (data['count'], data['resolved']) == (6, 4)
+        assert data['results'][0]['stop'] == {
+            'stop_id': '1', 'stop_name': 'Majestic', 'stop_lat': 12.9767, 'stop_lon': 77.571
+        }
+    
+    def test_resolve_without_fuzzy(self, fare_client):
+        """Test that typo-tolerant matching can be turned off per request"""
+        response = fare_client.post('/api/fare/stops/resolve', json={'names': ['Whitefeild'], 'fuzzy': False})
+        
+        assert json.loads(response.data)['results'][0]['stop'] is None
+    
+    def test_resolve_phonetic(self, fare_client):
+        """Test resolving speech-recognized names"""
+        response = fare_client.post('/api/stops/resolve', json={
+            'names': ['Jaya Nagara', 'Koramangla'], 'fuzzy': False, 'phonetic': True
+        })
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [result['stop']['stop_id'] for result in data['results']] == ['5', '2']
+    
+    def test_resolve_invalid(self, fare_client):
+        """Test rejected request bodies"""
+        assert fare_client.post('/api/stops/resolve', json={'names': []}).status_code == 400
+        assert fare_client.post('/api/stops/resolve', json={'names': [1]}).status_code == 400
+        assert fare_client.post('/api/stops/resolve', data='not json').status_code == 400
+
+
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestNearbyStopsEndpoint:
+    """Test nearest-stop and radius endpoints"""
+    
+    def test_nearby(self, fare_client):
+        """Test the closest stops to a point, nearest first"""
+        response = fare_client.get('/api/stops/nearby?lat=12.9767&lon=77.5710&limit=2')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [stop['stop_name'] for stop in data['stops']] == ['Majestic', 'Jayanagar']
+        assert data['stops'][0]['distance_km'] == 0.0
+        assert data['stops'][1]['distance_km'] == pytest.approx(5.914, abs=0.001)
+    
+    def test_nearby_with_radius(self, fare_client):
+        """Test that a radius leaves out farther stops"""
+        response = fare_client.get('/api/fare/stops/nearby?lat=12.9767&lon=77.5710&limit=5&radius_km=1')
+        
+        assert [stop['stop_id'] for stop in json.loads(response.data)['stops']] == ['1']
+    
+    def test_within(self, fare_client):
+        """Test every stop within a radius"""
+        response = fare_client.get('/api/stops/within?lat=12.95&lon=77.60&radius_km=5')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert sorted(stop['stop_id'] for stop in data['stops']) == ['1', '2', '5']
+        assert data['radius_km'] == 5.0
+    
+    def test_batch(self, fare_client):
+        """Test one lookup for several points"""
+        response = fare_client.post('/api/stops/nearby/batch', json={
+            'points': [{'lat': 12.9767, 'lon': 77.5710}, {'lat': 12.8456, 'lon': 77.6603}],
+            'limit': 1
+        })
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [result['stops'][0]['stop_id'] for result in data['results']] == ['1', '4']
+    
+    def test_invalid(self, fare_client):
+        """Test rejected points, radii and batches"""
+        assert fare_client.get('/api/stops/nearby?lat=15&lon=77.57').status_code == 400
+        assert fare_client.get('/api/stops/within?lat=12.97&lon=77.57').status_code == 400
+        assert fare_client.post('/api/stops/nearby/batch', json={'points': []}).status_code == 400
+
+
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestStationsEndpoint:
+    """Test station search and lookup"""
+    
+    def test_search(self, fare_client):
+        """Test stations named like the query"""
+        response = fare_client.get('/api/stations/search?q=jaya')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['match'] == 'substring'
+        assert data['stations'][0]['station_id'] == '5'
+        assert data['stations'][0]['stop_ids'] == ['5']
+        assert data['stations'][0]['station_lat'] == pytest.approx(12.925)
+    
+    def test_search_fuzzy(self, fare_client):
+        """Test typo-tolerant station search"""
+        data = json.loads(fare_client.get('/api/fare/stations/search?q=majestc').data)
+        
+        assert data['match'] == 'fuzzy'
+        assert data['stations'][0]['station_name'] == 'Majestic'
+    
+    def test_station(self, fare_client):
+        """Test a station with its member stops"""
+        response = fare_client.get('/api/stations/2')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['station_name'] == 'Koramangala'
+        assert [stop['stop_id'] for stop in data['stops']] == ['2']
+        assert fare_client.get('/api/stations/missing').status_code == 404
+    
+    def test_stop_station(self, fare_client):
+        """Test the station of a stop"""
+        response = fare_client.get('/api/stops/3/station')
+        
+        assert json.loads(response.data)['station_name'] == 'Whitefield'
+        assert fare_client.get('/api/stops/missing/station').status_code == 404
+
+
 @pytest.mark.api
 @pytest.mark.fare
 @pytest.mark.integration
@@ -144,6 +409,20 @@ class TestCalculateFareEndpoint:
         # Total should include GST
         assert data['total'] >= data['fare']
     
+    def test_calculate_fare_misspelt_stops(self, fare_client):
+        """Test that misspelt stop names resolve to the closest stops"""
+        response = fare_client.post(
+            '/api/fare/calculate',
+            data=json.dumps({'origin': 'Majestc', 'destination': 'Koramangla'}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['origin'] == 'Majestc'
+        assert data['actual_origin_name'] == 'Majestic'
+        assert data['actual_destination_name'] == 'Koramangala'
+    
     def test_calculate_fare_alternate_endpoint(self, fare_client, valid_fare_request):
         """Test alternate fare calculation endpoint"""
         response = fare_client.post(
@@ -296,6 +575,196 @@ class TestJourneyPlanEndpoint:
         assert 'not found' in data['error'].lower()
 
 
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestDistanceFares:
+    """Test the distance-band fallback shared by single and batch fares"""
+    
+    def test_single_matches_batch(self, fare_client):
+        """Test that calculate_fare and calculate_fares give the same fallback fares"""
+        from fare_service import calculate_fare, calculate_fares
+        
+        origins, destinations = ['1', '3', '1', '9'], ['5', '5', '2', '1']
+        batch = calculate_fares(origins, destinations)
+        assert batch == [calculate_fare(origin, destination) for origin, destination in zip(origins, destinations)]
+        assert [fare['price'] for fare in batch] == [15.0, 25.0, 5.0, 10.0]
+        assert batch[0]['distance_km'] == pytest.approx(5.91, abs=0.01)
+        assert batch[3]['source'] == 'default_fallback'
+
+
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestCalculateFareBatchEndpoint:
+    """Test batch fare calculation"""
+    
+    def test_batch_in_input_order(self, fare_client):
+        """Test pairs by name and id with GTFS, reverse and distance fares"""
+        response = fare_client.post('/api/fare/calculate/batch', json={'pairs': [
+            {'origin': 'Majestic', 'destination': 'Whitefield'},
+            {'origin_id': '3', 'destination_id': 1},
+            {'origin_id': '1', 'destination': 'Jayanagar'},
+            {'origin': 'Majestc', 'destination_id': '2', 'route_id': 'G-4'}
+        ]})
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        results = data['results']
+        assert [result['fare'] for result in results] == [10.0, 10.0, 15.0, 5.0]
+        assert [result['source'] for result in results] == ['gtfs', 'gtfs', 'distance_calculation', 'gtfs']
+        assert [result['fallback'] for result in results] == [False, False, True, False]
+        assert results[0]['origin_id'] == '1'
+        assert results[1]['origin'] == '3'
+        assert results[1]['destination_name'] == 'Majestic'
+        assert results[2]['distance_km'] == pytest.approx(5.9, abs=0.1)
+        assert results[3]['origin_name'] == 'Majestic'
+        assert results[0]['total'] == pytest.approx(10.5)
+        assert (data['count'], data['priced']) == (4, 4)
+        assert data['sources'] == {'gtfs': 3, 'distance_calculation': 1}
+    
+    def test_unresolved_pairs(self, fare_client):
+        """Test that unknown and identical stops are reported per pair"""
+        response = fare_client.post('/api/calculate_fare/batch', json={'pairs': [
+            {'origin': 'NonExistentStop123', 'destination': 'Majestic'},
+            {'origin_id': '1', 'destination_id': '99'},
+            {'origin_id': '1', 'destination': 'Majestic'},
+            {'origin_id': '2', 'destination_id': '4'}
+        ]})
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        errors = [result.get('error') for result in data['results']]
+        assert errors == [
+            'Origin stop "NonExistentStop123" not found',
+            'Destination stop "99" not found',
+            'Origin and destination are the same stop',
+            None
+        ]
+        assert data['results'][0]['fare'] is None
+        assert data['results'][0]['destination_id'] == '1'
+        assert data['results'][3]['fare_id'] == 'fare_3'
+        assert data['priced'] == 1
+    
+    def test_matches_single_fares(self, fare_client):
+        """Test that every batch fare equals calculate_fare for the pair"""
+        import fare_service
+        origins = ['1', '3', '1', '2', '5', '4']
+        destinations = ['2', '1', '5', '4', '3', '2']
+        routes = [None, None, None, 'KBS-1', None, 'X-1']
+        
+        batch = fare_service.calculate_fares(origins, destinations, routes)
+        assert batch == [fare_service.calculate_fare(*pair) for pair in zip(origins, destinations, routes)]
+    
+    def test_matches_single_endpoint(self, fare_client, monkeypatch):
+        """Test that batch items carry the single endpoint's fare fields, GST included"""
+        import fare_service
+        monkeypatch.setattr(fare_service.config, 'GST_RATE', 0.18)
+        pairs = [('Majestic', 'Whitefield'), ('Majestic', 'Jayanagar')]
+        
+        batch = fare_client.post('/api/fare/calculate/batch', json={
+            'pairs': [{'origin': origin, 'destination': destination} for origin, destination in pairs]
+        }).get_json()['results']
+        for (origin, destination), item in zip(pairs, batch):
+            single = fare_client.post('/api/fare/calculate', json={'origin': origin, 'destination': destination}).get_json()
+            fields = ['fare', 'currency', 'fare_id', 'route_id', 'gst', 'total', 'source', 'fallback', 'distance_km']
+            assert {field: single[field] for field in fields} == {field: item[field] for field in fields}
+        assert batch[0]['gst'] == pytest.approx(1.8)
+    
+    def test_same_stop_policy(self, fare_client):
+        """Test that both endpoints reject names resolving to one stop"""
+        single = fare_client.post('/api/fare/calculate', json={'origin': 'Majestic', 'destination': 'Majes'})
+        batch = fare_client.post('/api/fare/calculate/batch', json={
+            'pairs': [{'origin': 'Majestic', 'destination': 'Majes'}]
+        }).get_json()
+        
+        assert single.status_code == 400
+        assert single.get_json()['error'] == 'Origin and destination are the same stop'
+        assert batch['results'][0]['error'] == 'Origin and destination are the same stop'
+    
+    def test_batch_invalid(self, fare_client):
+        """Test rejected request bodies"""
+        assert fare_client.post('/api/fare/calculate/batch', json={'pairs': []}).status_code == 400
+        assert fare_client.post('/api/fare/calculate/batch', json={'pairs': [{'origin': 'Majestic'}]}).status_code == 400
+        assert fare_client.post('/api/fare/calculate/batch', data='not json').status_code == 400
+
+
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestFareMatrixExport:
+    """Test streaming fare matrix exports"""
+    
+    @pytest.fixture
+    def route_data(self, mock_gtfs_data):
+        """Mock data with a V-500 trip serving Majestic, Koramangala and Whitefield"""
+        mock_gtfs_data['trips'] = pd.DataFrame({'route_id': ['V-500'], 'service_id': ['1'], 'trip_id': ['T1']})
+        mock_gtfs_data['stop_times'] = pd.DataFrame({
+            'trip_id': ['T1', 'T1', 'T1'], 'stop_id': ['3', '1', '2'], 'stop_sequence': [3, 1, 2]
+        })
+        return mock_gtfs_data
+    
+    def test_stop_matrix_csv(self, fare_client):
+        """Test a stop-to-stop matrix over listed stops"""
+        response = fare_client.get('/api/fare/matrix?stop_ids=1,3,5')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'fare_matrix_stop.csv' in response.headers['Content-Disposition']
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines == [
+            'origin_id,1,3,5',
+            '1,,10.0,15.0',
+            '3,10.0,,25.0',
+            '5,15.0,25.0,'
+        ]
+    
+    def test_stop_matrix_ndjson(self, fare_client):
+        """Test the NDJSON header and per-origin records"""
+        response = fare_client.get('/api/fare_matrix?stop_ids=1,3,5&format=ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        assert response.mimetype == 'application/x-ndjson'
+        assert records[0] == {
+            'level': 'stop', 'route_id': None, 'columns': ['1', '3', '5'],
+            'names': ['Majestic', 'Whitefield', 'Jayanagar']
+        }
+        assert records[1] == {
+            'origin_id': '1', 'origin_name': 'Majestic',
+            'fares': [None, 10.0, 15.0], 'sources': [None, 'gtfs', 'distance_calculation']
+        }
+        assert len(records) == 4
+    
+    def test_route_matrix(self, fare_client, route_data):
+        """Test a matrix over a route's stops in stop_sequence order"""
+        response = fare_client.get('/api/fare/matrix?route_id=V-500&format=ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        assert records[0]['columns'] == ['1', '2', '3']
+        assert records[0]['route_id'] == 'V-500'
+        assert records[1]['fares'] == [None, 5.0, 10.0]
+    
+    def test_zone_matrix(self, fare_client):
+        """Test that zone matrices hold GTFS fares only"""
+        response = fare_client.get('/api/fare/matrix?stop_ids=1,2,3&level=zone')
+        
+        assert response.get_data(as_text=True).splitlines() == [
+            'origin_id,1,2,3',
+            '1,,5.0,10.0',
+            '2,5.0,,',
+            '3,10.0,,'
+        ]
+    
+    def test_export_errors(self, fare_client, route_data):
+        """Test unknown routes and stops and invalid parameters"""
+        assert fare_client.get('/api/fare/matrix?route_id=X-1').status_code == 404
+        response = fare_client.get('/api/fare/matrix?stop_ids=1,99')
+        assert response.status_code == 404
+        assert '99' in json.loads(response.data)['error']
+        assert fare_client.get('/api/fare/matrix').status_code == 400
+        assert fare_client.get('/api/fare/matrix?stop_ids=1,2&format=xml').status_code == 400
+
+
 @pytest.mark.api
 @pytest.mark.fare
 @pytest.mark.integration
@@ -397,3 +866,65 @@ class TestFareAPIWithMockedData:
         # Should have calculated fare from GTFS data
         assert data['fare'] > 0
         assert 'source' in data
+
+
+@pytest.mark.api
+@pytest.mark.fare
+@pytest.mark.integration
+class TestGTFSStatusEndpoint:
+    """Test GTFS status reporting"""
+    
+    def test_gtfs_status(self, fare_client):
+        """Test that status lists tables and their load state"""
+        response = fare_client.get('/api/gtfs/status')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert 'tables' in data
+        assert data['tables']['stops']['loaded'] is True
+        assert data['tables']['stops']['rows'] == 5
+    
+    def test_gtfs_memory(self, fare_client):
+        """Test that the memory report lists bytes per table"""
+        response = fare_client.get('/api/gtfs/memory')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data['tables']['stops']['bytes_after'] > 0
+        assert data['total_bytes_after'] > 0
+        assert data['total_index_bytes'] == sum(data['indexes'].values())
+
+
+@pytest.mark.fare
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestGTFSPreload:
+    """Test loading GTFS data ahead of forking workers"""
+    
+    def test_preload_materializes_all_tables(self, mock_gtfs_files):
+        """Test that preloading loads every table and freezes the GC"""
+        import fare_service
+        from gtfs_loader import GTFSDataset
+        
+        dataset = GTFSDataset(
+            {
+                'stops': mock_gtfs_files / 'stops.txt',
+                'routes': mock_gtfs_files / 'routes.txt',
+                'fare_rules': mock_gtfs_files / 'fare_rules.txt',
+            },
+            required=['stops']
+        )
+        with patch('fare_service.load_gtfs_data', return_value=dataset), \
+             patch('fare_service.gc') as mock_gc:
+            result = fare_service.preload_gtfs_data()
+        
+        assert result is dataset
+        assert set(dataset.status()['loaded_tables']) == {'stops', 'routes', 'fare_rules'}
+        mock_gc.freeze.assert_called_once()
+    
+    def test_preload_without_data(self):
+        """Test that preloading tolerates unavailable GTFS data"""
+        import fare_service
+        
+        with patch('fare_service.load_gtfs_data', return_value=None):
+            assert fare_service.preload_gtfs_data() is None
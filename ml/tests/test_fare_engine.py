@@ -0,0 +1,259 @@
+"""
+Tests for the Fare Rule Lookup Engine
+
+Tests FareRuleIndex lookups (pair direction, route preference, contains_id
+fallback, unknown fare_ids) against the mask scan they replace, and the
+dense FareMatrix built from them.
+"""
+
+import pytest
+import sys
+import pickle
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fare_engine import (
+    FareMatrix, FareRuleIndex, NO_FARE, distance_band_fares, haversine_km, run_benchmark, scan_fare, synthetic_fare_tables
+)
+
+
+@pytest.fixture
+def fares():
+    """Three priced fares"""
+    return pd.DataFrame({
+        'fare_id': ['base', 'express', 'zone'],
+        'price': [10.0, 25.0, 15.0],
+        'currency_type': ['INR', 'INR', 'INR']
+    })
+
+
+@pytest.fixture
+def rules():
+    """Rules with a duplicate pair, a route-specific rule, a missing fare and contains rules"""
+    return pd.DataFrame({
+        'fare_id': ['base', 'express', 'base', 'missing', 'zone', 'base'],
+        'route_id': ['R1', 'R2', 'R1', 'R1', 'R1', 'R3'],
+        'origin_id': ['A', 'A', 'A', 'C', None, None],
+        'destination_id': ['B', 'B', 'B', 'D', None, None],
+        'contains_id': [None, None, None, None, 'D', 'E']
+    })
+
+
+@pytest.mark.fare
+@pytest.mark.unit
+class TestFareRuleIndex:
+    """Test fare lookups by zone pair and route"""
+
+    def test_forward_pair(self, rules, fares):
+        """Test that the first rule of a pair wins"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.pair_rule('A', 'B') == 0
+        assert index.lookup('A', 'B') == {'fare_id': 'base', 'price': 10.0, 'currency': 'INR', 'route_id': 'R1'}
+
+    def test_reverse_pair(self, rules, fares):
+        """Test that a pair without rules uses the reverse direction"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.pair_rule('B', 'A') == 0
+        assert index.lookup('B', 'A')['price'] == 10.0
+
+    def test_route_preference(self, rules, fares):
+        """Test that a rule for the requested route wins within the pair"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.lookup('A', 'B', route_id='R2')['fare_id'] == 'express'
+        assert index.lookup('B', 'A', route_id='R2')['price'] == 25.0
+        assert index.lookup('A', 'B', route_id='R9')['fare_id'] == 'base'
+
+    def test_contains_fallback(self, rules, fares):
+        """Test that a rule with an unknown fare_id falls back to contains_id rules"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.rule_fares[3] == NO_FARE
+        assert index.lookup('C', 'D') == {
+            'fare_id': 'zone', 'price': 15.0, 'currency': 'INR', 'route_id': 'R1', 'source': 'contains_zone'
+        }
+        assert index.lookup('E', 'X')['source'] == 'contains_zone'
+
+    def test_no_fare(self, rules, fares):
+        """Test pairs and zones without rules"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.pair_rule('A', 'X') is None
+        assert index.lookup('X', 'Y') is None
+        assert index.lookup('C', 'F') is None
+
+    def test_without_tables(self):
+        """Test feeds without fare tables or without some columns"""
+        assert FareRuleIndex(None, None).lookup('A', 'B') is None
+        assert len(FareRuleIndex(pd.DataFrame({'fare_id': ['base']}), None)) == 1
+
+    @pytest.mark.parametrize('route_id', [None, 'R1', 'R2'])
+    @pytest.mark.parametrize('origin, destination', [('A', 'B'), ('B', 'A'), ('C', 'D'), ('D', 'C'), ('E', 'A'), ('X', 'Y')])
+    def test_matches_scan(self, rules, fares, origin, destination, route_id):
+        """Test that the index agrees with the mask scan"""
+        index = FareRuleIndex(rules, fares)
+
+        assert index.lookup(origin, destination, route_id) == scan_fare(rules, fares, origin, destination, route_id)
+
+
+@pytest.mark.fare
+@pytest.mark.unit
+class TestFareMatrix:
+    """Test the dense zone x zone fare matrix"""
+
+    @pytest.fixture
+    def matrix(self, rules, fares):
+        """Matrix over the rules, with stop S1 in zone A"""
+        return FareMatrix(FareRuleIndex(rules, fares), stop_ids=['S1', 'S2'], stop_zones=['A', None])
+
+    def test_cells(self, matrix):
+        """Test the zone numbering and compact cells"""
+        assert matrix.zones == ['A', 'C', 'B', 'D', 'E']
+        assert matrix.cells.shape == (5, 5)
+        assert matrix.cells.dtype == np.uint8
+        assert matrix.cells[matrix.codes['A'], matrix.codes['C']] == matrix.empty
+
+    @pytest.mark.parametrize('route_id', [None, 'R2', 'R9'])
+    @pytest.mark.parametrize('origin', ['A', 'B', 'C', 'D', 'E', 'X'])
+    @pytest.mark.parametrize('destination', ['A', 'B', 'C', 'D', 'E', 'X'])
+    def test_matches_scan(self, matrix, rules, fares, origin, destination, route_id):
+        """Test that every cell agrees with the mask scan"""
+        assert matrix.lookup(origin, destination, route_id) == scan_fare(rules, fares, origin, destination, route_id)
+
+    def test_lookup_many(self, matrix, rules, fares):
+        """Test that batch lookups match the scan, in input order"""
+        origins = ['A', 'B', 'S1', 'C', 'X', 'E', 'A']
+        destinations = ['B', 'A', 'B', 'D', 'Y', 'X', 'B']
+        route_ids = [None, 'R2', None, None, None, None, 'R9']
+        
+        expected = [scan_fare(rules, fares, matrix.zone_id(o), matrix.zone_id(d), r)
+                    for o, d, r in zip(origins, destinations, route_ids)]
+        assert matrix.lookup_many(origins, destinations, route_ids) == expected
+        assert matrix.lookup_many(['A'], ['B']) == [matrix.lookup('A', 'B')]
+        assert matrix.lookup_many([], []) == []
+    
+    def test_routes_sharing_fares(self, fares):
+        """Test that cells stay one byte when many routes share a few fares"""
+        count = 600
+        rules = pd.DataFrame({
+            'fare_id': [['base', 'express', 'zone'][i % 3] for i in range(count)],
+            'route_id': [f'R{i}' for i in range(count)],
+            'origin_id': [f'Z{i}' for i in range(count)],
+            'destination_id': [f'Z{i + 1}' for i in range(count)]
+        })
+        matrix = FareMatrix(FareRuleIndex(rules, fares))
+
+        assert len(matrix.outcome_rows) == 3
+        assert matrix.cells.dtype == np.uint8
+        assert matrix.lookup('Z8', 'Z7') == {'fare_id': 'express', 'price': 25.0, 'currency': 'INR', 'route_id': 'R7'}
+        assert matrix.lookup_many(['Z1', 'Z299'], ['Z2', 'Z300']) == [
+            scan_fare(rules, fares, 'Z1', 'Z2'), scan_fare(rules, fares, 'Z299', 'Z300')
+        ]
+
+    def test_first_contains_rule_wins(self, matrix):
+        """Test the cell between two contains_id zones"""
+        assert matrix.lookup('E', 'D')['fare_id'] == 'zone'
+
+    def test_stop_zones(self, matrix):
+        """Test that stops are looked up by their zone_id"""
+        assert matrix.zone_id('S1') == 'A'
+        assert matrix.zone_id('S2') == 'S2'
+        assert matrix.lookup('S1', 'B')['fare_id'] == 'base'
+        assert matrix.lookup('B', 'S1', route_id='R2')['fare_id'] == 'express'
+        assert matrix.lookup('S2', 'B') is None
+
+    def test_too_many_zones(self, rules, fares):
+        """Test that feeds above the zone limit answer from the rules"""
+        matrix = FareMatrix(FareRuleIndex(rules, fares), max_zones=2)
+
+        assert matrix.cells is None
+        assert matrix.lookup('B', 'A')['fare_id'] == 'base'
+        assert matrix.stats()['cells_mb'] == 0.0
+
+    def test_save_memory_maps(self, matrix, temp_test_dir):
+        """Test that saved cells are memory-mapped and left out of pickles"""
+        path = matrix.save(temp_test_dir / 'fare_matrix.npy')
+
+        assert isinstance(matrix.cells, np.memmap)
+        assert matrix.stats()['memory_mapped']
+        payload = pickle.dumps(matrix)
+        assert len(payload) < path.stat().st_size + 2000
+        restored = pickle.loads(payload)
+        assert isinstance(restored.cells, np.memmap)
+        assert restored.lookup('A', 'B')['price'] == 10.0
+
+    def test_missing_file_uses_rules(self, matrix, temp_test_dir):
+        """Test that a pickled matrix whose file is gone still answers"""
+        path = matrix.save(temp_test_dir / 'fare_matrix.npy')
+        payload = pickle.dumps(matrix)
+        path.unlink()
+        restored = pickle.loads(payload)
+
+        assert restored.cells is None
+        assert restored.lookup('A', 'B')['price'] == 10.0
+
+    def test_empty_rules(self):
+        """Test a feed without fare tables"""
+        matrix = FareMatrix(FareRuleIndex(None, None))
+
+        assert len(matrix) == 0
+        assert matrix.lookup('A', 'B') is None
+
+
+@pytest.mark.fare
+@pytest.mark.unit
+class TestDistanceBandFares:
+    """Test the distance-band fallback for pairs without a GTFS fare"""
+
+    def test_band_fares(self):
+        """Test that each distance pays the first tier it does not exceed"""
+        fares = distance_band_fares([0.0, 2.0, 2.01, 5.0, 7.5, 10.0, 15.0, 15.01, 120.0, float('nan')])
+        assert fares.tolist() == [5.0, 5.0, 10.0, 10.0, 15.0, 15.0, 20.0, 25.0, 25.0, 10.0]
+
+    def test_configured_tiers(self, monkeypatch):
+        """Test that the tiers and default fare come from config"""
+        import fare_engine
+
+        # Config modules may be reloaded by other tests: patch the one in use
+        settings = type(fare_engine.config)
+        monkeypatch.setattr(settings, 'DISTANCE_THRESHOLD_TIER1', 3.0)
+        monkeypatch.setattr(settings, 'FARE_TIER5', 30.0)
+        monkeypatch.setattr(settings, 'DEFAULT_FARE', 12.0)
+
+        assert distance_band_fares([2.5, 40.0, float('nan')]).tolist() == [5.0, 30.0, 12.0]
+        tiers = {'tiers': [{'max_km': 1.0, 'fare': 2.0}, {'max_km': float('inf'), 'fare': 4.0}], 'default': 3.0}
+        assert distance_band_fares([0.5, 1.5], tiers).tolist() == [2.0, 4.0]
+
+    def test_haversine(self):
+        """Test vectorized great-circle distances"""
+        distances = haversine_km([12.0, 12.9767], [77.0, 77.5710], [13.0, 12.9767], [77.0, 77.5710])
+        assert distances.tolist() == pytest.approx([111.19, 0.0], abs=0.01)
+
+
+@pytest.mark.fare
+@pytest.mark.unit
+class TestFareBenchmark:
+    """Test the synthetic tables and the benchmark report"""
+
+    def test_synthetic_tables(self):
+        """Test the shape of the generated tables"""
+        rules, fares = synthetic_fare_tables(rules=500, zones=20, routes=10)
+
+        assert len(rules) == 500
+        assert rules['contains_id'].notna().sum() == 50
+        assert len(fares) == 40
+
+    def test_benchmark_matches_scan(self):
+        """Test that the benchmark queries all agree with the scan"""
+        rules, fares = synthetic_fare_tables(rules=2000, zones=30, routes=20)
+        result = run_benchmark(rules, fares, queries=12)
+
+        assert result['rules'] == 2000
+        assert result['queries'] == 12
+        assert result['mismatches'] == 0
+        assert result['matrix_mismatches'] == 0
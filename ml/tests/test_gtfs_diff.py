@@ -0,0 +1,188 @@
+"""
+Tests for Incremental GTFS Feed Ingestion
+
+Tests row-hash diffs, table patching, index carry-over and the change report.
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gtfs_loader import GTFSDataset, apply_schema
+from gtfs_diff import diff_table, apply_feed_diff
+
+
+def typed(name, df):
+    """Apply the memory-lean schema to a copy of a sample table"""
+    return apply_schema(name, df.copy())
+
+
+def rewrite(path, df):
+    """Rewrite a GTFS file and make sure its fingerprint changes"""
+    df.to_csv(path, index=False)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def dataset_factory(mock_gtfs_files):
+    """Factory creating lazy datasets over the temporary GTFS files"""
+    def _factory():
+        paths = {
+            name: mock_gtfs_files / f'{name}.txt'
+            for name in ['stops', 'routes', 'fare_attributes', 'fare_rules']
+        }
+        return GTFSDataset(paths, required=list(paths))
+    return _factory
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestDiffTable:
+    """Test diffing two versions of one table"""
+    
+    def test_unchanged(self, sample_stops_df):
+        """Test that equal tables are reported unchanged and reused"""
+        old = typed('stops', sample_stops_df)
+        result = diff_table('stops', old, typed('stops', sample_stops_df))
+        
+        assert result['mode'] == 'unchanged'
+        assert result['df'] is old
+    
+    def test_insert_update_delete(self, sample_stops_df):
+        """Test counting and applying inserted, updated and deleted rows"""
+        old = typed('stops', sample_stops_df)
+        new_df = sample_stops_df[sample_stops_df['stop_id'] != '3'].copy()
+        new_df.loc[new_df['stop_id'] == '2', 'stop_name'] = 'Koramangala 1st Block'
+        new_df = pd.concat([
+            pd.DataFrame({'stop_id': ['6'], 'stop_name': ['Hebbal'], 'stop_lat': [13.0358], 'stop_lon': [77.5970]}),
+            new_df
+        ], ignore_index=True)
+        
+        result = diff_table('stops', old, typed('stops', new_df))
+        
+        assert result['mode'] == 'patched'
+        assert (result['inserted'], result['updated'], result['deleted']) == (1, 1, 1)
+        assert result['inserted_keys'] == ['6']
+        assert result['updated_keys'] == ['2']
+        assert result['deleted_keys'] == ['3']
+        # Surviving rows keep their order, inserted rows are appended
+        patched = result['df']
+        assert patched['stop_id'].tolist() == ['1', '2', '4', '5', '6']
+        assert patched['stop_name'].iloc[1] == 'Koramangala 1st Block'
+        assert result['inserted_from'] == 4
+    
+    def test_categorical_columns_stay_categorical(self, sample_fare_rules_df):
+        """Test that patching keeps categorical columns with merged categories"""
+        old = typed('fare_rules', sample_fare_rules_df)
+        new_df = pd.concat([
+            sample_fare_rules_df,
+            pd.DataFrame({'fare_id': ['fare_9'], 'route_id': ['500-D'], 'origin_id': ['5'], 'destination_id': ['1']})
+        ], ignore_index=True)
+        
+        result = diff_table('fare_rules', old, typed('fare_rules', new_df))
+        
+        assert result['mode'] == 'patched'
+        assert result['inserted'] == 1
+        assert isinstance(result['df']['route_id'].dtype, pd.CategoricalDtype)
+        assert result['df']['route_id'].tolist() == ['G-4', 'V-500', 'KBS-1', '500-D']
+    
+    def test_duplicate_keys_replace_table(self, sample_stops_df):
+        """Test that tables with duplicate keys are replaced wholesale"""
+        new_df = pd.concat([sample_stops_df, sample_stops_df.iloc[:1]], ignore_index=True)
+        result = diff_table('stops', typed('stops', sample_stops_df), typed('stops', new_df))
+        
+        assert result['mode'] == 'replaced'
+        assert len(result['df']) == 6
+    
+    def test_changed_columns_replace_table(self, sample_stops_df):
+        """Test that a changed column layout replaces the table"""
+        new_df = sample_stops_df.assign(zone_id=sample_stops_df['stop_id'])
+        result = diff_table('stops', typed('stops', sample_stops_df), typed('stops', new_df))
+        
+        assert result['mode'] == 'replaced'
+        assert 'zone_id' in result['df'].columns
+
+
+@pytest.mark.gtfs
+@pytest.mark.integration
+class TestApplyFeedDiff:
+    """Test populating a new feed version from the active one"""
+    
+    def test_unchanged_tables_reused(self, dataset_factory, sample_stops_df):
+        """Test that tables and indexes of unchanged files carry over"""
+        import gtfs_index  # registers stop_rows
+        old = dataset_factory().materialize()
+        stop_rows = old.index('stop_rows')
+        
+        new = dataset_factory()
+        report = apply_feed_diff(old, new)
+        
+        assert report['changed_tables'] == []
+        assert new['stops'] is old['stops']
+        assert new.index('stop_rows') is stop_rows
+        assert report['indexes']['stop_rows']['action'] == 'carried'
+    
+    def test_changed_table_patched(self, mock_gtfs_files, dataset_factory, sample_stops_df):
+        """Test that only the changed table is patched and indexes updated"""
+        import gtfs_index  # registers stop_rows
+        old = dataset_factory().materialize()
+        old.index('stop_rows')
+        
+        new_stops = pd.concat([
+            sample_stops_df,
+            pd.DataFrame({'stop_id': ['6'], 'stop_name': ['Hebbal'], 'stop_lat': [13.0358], 'stop_lon': [77.5970]})
+        ], ignore_index=True)
+        rewrite(mock_gtfs_files / 'stops.txt', new_stops)
+        
+        new = dataset_factory()
+        report = apply_feed_diff(old, new)
+        
+        assert report['changed_tables'] == ['stops']
+        assert report['tables']['stops']['inserted'] == 1
+        assert report['tables']['routes']['mode'] == 'unchanged'
+        assert new['routes'] is old['routes']
+        assert report['indexes']['stop_rows']['action'] == 'updated'
+        assert new.index('stop_rows')['6'] == 5
+        # Same content as a full reload
+        fresh = dataset_factory()
+        pd.testing.assert_frame_equal(new['stops'], fresh['stops'])
+        assert new.index('stop_rows') == fresh.index('stop_rows')
+    
+    def test_deleted_rows_rebuild_positional_index(self, mock_gtfs_files, dataset_factory, sample_stops_df):
+        """Test that deletions rebuild indexes without an applicable update"""
+        import gtfs_index  # registers stop_rows
+        old = dataset_factory().materialize()
+        old.index('stop_rows')
+        
+        rewrite(mock_gtfs_files / 'stops.txt', sample_stops_df.iloc[1:])
+        new = dataset_factory()
+        report = apply_feed_diff(old, new)
+        
+        assert report['tables']['stops']['deleted'] == 1
+        assert report['indexes']['stop_rows']['action'] == 'rebuilt'
+        assert new.index('stop_rows') == {'2': 0, '3': 1, '4': 2, '5': 3}
+    
+    def test_unloaded_tables_stay_lazy(self, dataset_factory):
+        """Test that tables the active dataset never loaded are not loaded"""
+        old = dataset_factory()
+        old['stops']
+        
+        new = dataset_factory()
+        apply_feed_diff(old, new)
+        
+        assert new.is_loaded('stops')
+        assert not new.is_loaded('routes')
+    
+    def test_invalid_patch_rejected(self, mock_gtfs_files, dataset_factory, sample_stops_df):
+        """Test that a changed required table failing validation fails the diff"""
+        from gtfs_validation import GTFSValidationError
+        old = dataset_factory().materialize()
+        
+        rewrite(mock_gtfs_files / 'stops.txt', sample_stops_df.drop(columns=['stop_lat']))
+        with pytest.raises(GTFSValidationError):
+            apply_feed_diff(old, dataset_factory())
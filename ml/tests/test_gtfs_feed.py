@@ -0,0 +1,324 @@
+"""
+Tests for GTFS Feed Hot Reload
+
+Tests atomic dataset swaps, warm-up, failure handling, per-request
+version pinning in the fare service and serving several feeds.
+"""
+
+import pytest
+import sys
+import os
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gtfs_loader import GTFSDataset
+from gtfs_feed import FeedManager, FeedRegistry
+
+
+def write_feed_info(gtfs_dir, version):
+    """Write a feed_info.txt with the given version and a fresh mtime"""
+    path = gtfs_dir / 'feed_info.txt'
+    path.write_text(
+        'feed_publisher_name,feed_publisher_url,feed_lang,feed_version\n'
+        f'BMTC,https://mybmtc.karnataka.gov.in,en,{version}\n'
+    )
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def feed_dir(mock_gtfs_files):
+    """Temporary GTFS directory with a versioned feed_info.txt"""
+    write_feed_info(mock_gtfs_files, '20250101')
+    return mock_gtfs_files
+
+
+@pytest.fixture
+def dataset_factory(feed_dir):
+    """Factory creating lazy datasets over the temporary feed"""
+    def _factory():
+        paths = {
+            name: feed_dir / f'{name}.txt'
+            for name in ['stops', 'routes', 'fare_attributes', 'fare_rules', 'feed_info']
+        }
+        return GTFSDataset(paths, required=['stops', 'routes', 'fare_attributes', 'fare_rules'])
+    return _factory
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestFeedManager:
+    """Test building and swapping feed versions"""
+    
+    def test_current_builds_once(self, dataset_factory):
+        """Test that the dataset is created on first use and then reused"""
+        feed = FeedManager(dataset_factory, name='test')
+        
+        data = feed.current()
+        assert data is feed.current()
+        assert data.feed_version == '20250101'
+        assert feed.status()['reload_count'] == 0
+    
+    def test_reload_skipped_when_unchanged(self, dataset_factory):
+        """Test that reload is a no-op while the files are unchanged"""
+        feed = FeedManager(dataset_factory, name='test')
+        data = feed.current()
+        
+        assert not feed.has_changed()
+        assert feed.reload() is False
+        assert feed.current() is data
+    
+    def test_reload_swaps_new_version(self, feed_dir, dataset_factory):
+        """Test that a changed feed is swapped in and old references stay valid"""
+        feed = FeedManager(dataset_factory, name='test')
+        old = feed.current()
+        
+        write_feed_info(feed_dir, '20250201')
+        assert feed.has_changed()
+        assert feed.reload() is True
+        
+        assert feed.current() is not old
+        assert feed.current().feed_version == '20250201'
+        # A request holding the old dataset keeps serving the old version
+        assert old.feed_version == '20250101'
+        assert len(old['stops']) == 5
+        assert feed.status()['reload_count'] == 1
+    
+    def test_reload_warms_loaded_tables(self, feed_dir, dataset_factory):
+        """Test that the new dataset preloads what the old one had loaded"""
+        feed = FeedManager(dataset_factory, name='test')
+        feed.current()['stops']
+        
+        write_feed_info(feed_dir, '20250201')
+        feed.reload()
+        
+        assert feed.current().is_loaded('stops')
+        assert not feed.current().is_loaded('routes')
+    
+    def test_swap_listener_called(self, dataset_factory):
+        """Test that swap listeners receive the old and new datasets"""
+        feed = FeedManager(dataset_factory, name='test')
+        old = feed.current()
+        swaps = []
+        feed.add_swap_listener(lambda before, after: swaps.append((before, after)))
+        
+        feed.reload(force=True)
+        
+        assert swaps == [(old, feed.current())]
+    
+    def test_evict_notifies_listeners(self, dataset_factory):
+        """Test that eviction runs swap listeners with no new dataset"""
+        feed = FeedManager(dataset_factory, name='test')
+        old = feed.current()
+        swaps = []
+        feed.add_swap_listener(lambda before, after: swaps.append((before, after)))
+        
+        feed.evict()
+        feed.evict()
+        
+        assert swaps == [(old, None)]
+    
+    def test_failed_build_keeps_active_version(self, dataset_factory):
+        """Test that a feed that fails to build is not swapped in"""
+        builds = [dataset_factory]
+        feed = FeedManager(lambda: builds[-1](), name='test')
+        active = feed.current()
+        
+        builds.append(lambda: None)
+        assert feed.reload(force=True) is False
+        assert feed.current() is active
+        
+        def broken():
+            raise ValueError("corrupt feed")
+        builds.append(broken)
+        assert feed.reload(force=True) is False
+        assert feed.current() is active
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestFeedRegistry:
+    """Test serving several feeds side by side"""
+    
+    def test_feeds_isolated(self, dataset_factory):
+        """Test that each feed has its own dataset"""
+        feeds = FeedRegistry(
+            {'a': FeedManager(dataset_factory, name='a'), 'b': FeedManager(dataset_factory, name='b')},
+            default='a'
+        )
+        
+        assert feeds.current() is feeds.current('a')
+        assert feeds.current('a') is not feeds.current('b')
+        feeds.current('b')['stops']
+        assert not feeds.current('a').is_loaded('stops')
+        with pytest.raises(KeyError):
+            feeds.current('c')
+    
+    def test_unknown_default_rejected(self, dataset_factory):
+        """Test that the default feed must be registered"""
+        with pytest.raises(ValueError):
+            FeedRegistry({'a': FeedManager(dataset_factory)}, default='b')
+    
+    def test_evicts_least_recently_used(self, dataset_factory):
+        """Test that idle feeds are evicted once the budget is exceeded"""
+        feeds = FeedRegistry(
+            {name: FeedManager(dataset_factory, name=name) for name in ['a', 'b', 'c']},
+            default='a', memory_budget=1
+        )
+        for name in ['a', 'b']:
+            feeds.current(name)['stops']
+        
+        feeds.current('c')
+        
+        assert not feeds.get('a').is_loaded
+        assert not feeds.get('b').is_loaded
+        assert feeds.get('c').is_loaded
+    
+    def test_evicted_feed_rebuilt(self, dataset_factory):
+        """Test that an evicted feed is built again on its next use"""
+        feeds = FeedRegistry(
+            {'a': FeedManager(dataset_factory, name='a'), 'b': FeedManager(dataset_factory, name='b')},
+            default='a', memory_budget=1
+        )
+        old = feeds.current('a')
+        old['stops']
+        feeds.current('b')
+        
+        data = feeds.current('a')
+        
+        assert data is not old
+        assert data.feed_version == '20250101'
+        assert len(old['stops']) == 5
+    
+    def test_evicts_index_heavy_feed(self, dataset_factory):
+        """Test that built indexes count towards the budget"""
+        import gtfs_index  # registers the indexes
+        
+        feeds = FeedRegistry(
+            {'a': FeedManager(dataset_factory, name='a'), 'b': FeedManager(dataset_factory, name='b')},
+            default='a'
+        )
+        data = feeds.current('a')
+        data.index('stop_names')
+        data.index('stop_stations')
+        usage = feeds.get('a').memory_usage()
+        assert usage['index_bytes'] > 0
+        assert feeds.status()['feeds']['a']['index_bytes'] == usage['index_bytes']
+        
+        # The tables alone fit the budget, tables and indexes do not
+        feeds.memory_budget = usage['table_bytes']
+        feeds.current('b')
+        
+        assert not feeds.get('a').is_loaded
+        assert feeds.get('b').is_loaded
+    
+    def test_no_budget_keeps_feeds(self, dataset_factory):
+        """Test that nothing is evicted without a budget"""
+        feeds = FeedRegistry(
+            {'a': FeedManager(dataset_factory, name='a'), 'b': FeedManager(dataset_factory, name='b')},
+            default='a'
+        )
+        feeds.current('a')['stops']
+        feeds.current('b')['stops']
+        
+        assert feeds.enforce_budget() == []
+        status = feeds.status()
+        assert status['memory_budget_bytes'] is None
+        assert all(feed['loaded'] for feed in status['feeds'].values())
+        assert status['memory_bytes'] == sum(feed['memory_bytes'] for feed in status['feeds'].values())
+
+
+@pytest.mark.gtfs
+@pytest.mark.fare
+@pytest.mark.integration
+class TestFareServiceFeed:
+    """Test the fare service's use of the active feed"""
+    
+    @pytest.fixture
+    def feed_client(self, dataset_factory):
+        """Fare API client backed by a real FeedManager"""
+        import fare_service
+        feed = FeedManager(dataset_factory, name='test')
+        with patch.object(fare_service, 'feeds', FeedRegistry({'test': feed}, default='test')):
+            fare_service.app.config['TESTING'] = True
+            with fare_service.app.test_client() as client:
+                yield client, feed
+    
+    def test_feed_version_header(self, feed_client):
+        """Test that responses report the feed version that served them"""
+        client, _ = feed_client
+        response = client.get('/api/fare/stops?search=majestic')
+        
+        assert response.status_code == 200
+        assert response.headers['X-GTFS-Feed-Version'] == '20250101'
+    
+    def test_request_pinned_to_version(self, feed_dir, feed_client):
+        """Test that a reload during a request does not change its dataset"""
+        import fare_service
+        client, feed = feed_client
+        
+        with fare_service.app.test_request_context('/api/fare/stops'):
+            before = fare_service.load_gtfs_data()
+            write_feed_info(feed_dir, '20250201')
+            feed.reload()
+            assert fare_service.load_gtfs_data() is before
+        
+        assert fare_service.load_gtfs_data().feed_version == '20250201'
+    
+    def test_evict_drops_cached_queries(self, feed_client):
+        """Test that cached stop queries do not outlive an evicted dataset"""
+        import fare_service
+        from query_cache import QueryCache
+        client, feed = feed_client
+        feed.add_swap_listener(partial(fare_service.drop_cached_stop_queries, 'test'))
+        
+        with patch.object(fare_service, 'stop_query_cache', QueryCache(max_size=8)) as cache:
+            client.get('/api/fare/stops/search?q=majestic')
+            assert len(cache) == 1
+            
+            feed.evict()
+            assert len(cache) == 0
+    
+    def test_reload_endpoint(self, feed_dir, feed_client):
+        """Test reloading the feed through the API"""
+        client, _ = feed_client
+        client.get('/api/fare/health')
+        
+        write_feed_info(feed_dir, '20250301')
+        response = client.post('/api/gtfs/reload')
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['reloaded'] is True
+        assert data['feed']['feed_version'] == '20250301'
+        assert data['feed']['last_diff']['changed_tables'] == ['feed_info']
+        assert client.get('/api/gtfs/status').get_json()['feed']['reload_count'] == 1
+    
+    def test_feed_parameter(self, dataset_factory):
+        """Test choosing a feed per request"""
+        import fare_service
+        feeds = FeedRegistry(
+            {'test': FeedManager(dataset_factory, name='test'), 'other': FeedManager(dataset_factory, name='other')},
+            default='test'
+        )
+        with patch.object(fare_service, 'feeds', feeds):
+            fare_service.app.config['TESTING'] = True
+            with fare_service.app.test_client() as client:
+                response = client.get('/api/fare/stops?search=majestic&feed=other')
+                assert response.status_code == 200
+                assert response.headers['X-GTFS-Feed'] == 'other'
+                assert feeds.get('other').is_loaded
+                assert not feeds.get('test').is_loaded
+                
+                response = client.get('/api/fare/stops?feed=missing')
+                assert response.status_code == 404
+                assert response.get_json()['feeds'] == ['test', 'other']
+                
+                data = client.get('/api/gtfs/feeds').get_json()
+                assert data['default'] == 'test'
+                assert set(data['feeds']) == {'test', 'other'}
+                other = data['feeds']['other']
+                assert other['memory_bytes'] == other['table_bytes'] + other['index_bytes'] > 0
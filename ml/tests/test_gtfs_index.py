@@ -0,0 +1,262 @@
+"""
+Tests for Pre-built GTFS Indexes
+
+Tests the lookup index builders, the fare lookup precedence built on them
+and the compiled index bundle.
+"""
+
+import pytest
+import sys
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gtfs_index
+from gtfs_loader import GTFSDataset
+from gtfs_index import (
+    build_fare_matrix, build_fare_pairs, build_route_stops, build_route_trips, build_shape_points, build_stop_names, build_stop_routes,
+    build_stop_coords, build_stop_spatial, build_stop_stations,
+    compile_bundle, load_bundle, read_bundle
+)
+
+
+@pytest.fixture
+def dataset_factory(mock_gtfs_files):
+    """Factory creating lazy datasets over the temporary GTFS files"""
+    def _factory():
+        return GTFSDataset({
+            name: mock_gtfs_files / f'{name}.txt'
+            for name in ['stops', 'routes', 'fare_attributes', 'fare_rules', 'shapes', 'trips']
+        })
+    return _factory
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestIndexBuilders:
+    """Test the registered index builders"""
+    
+    def test_stop_names(self, mock_gtfs_data):
+        """Test the stop name index over the stops table"""
+        index = build_stop_names(mock_gtfs_data)
+        
+        assert index.exact['majestic'] == 0
+        assert index.resolve('Electronic') == 3
+    
+    def test_fare_pairs(self, mock_gtfs_data):
+        """Test pair rules and fare prices"""
+        index = build_fare_pairs(mock_gtfs_data)
+        
+        assert index.pair_rule('1', '3') == 1
+        assert index.lookup('3', '1')['price'] == 10.0
+        assert index.contains == {}
+        assert build_fare_pairs({'fare_rules': None, 'fare_attributes': None}).lookup('1', '2') is None
+    
+    def test_fare_matrix(self, mock_gtfs_data):
+        """Test zone fares resolved into the matrix"""
+        matrix = build_fare_matrix(mock_gtfs_data)
+        
+        assert matrix.lookup('3', '1')['fare_id'] == 'fare_2'
+        assert matrix.lookup('1', '2', 'G-4')['price'] == 5.0
+        assert matrix.path is None
+    
+    def test_route_stops(self, mock_gtfs_data):
+        """Test route -> stops rows in stop_sequence order of its trips"""
+        trips = pd.DataFrame({'route_id': ['G-4', 'V-500', 'G-4'], 'trip_id': ['T1', 'T2', 'T3']})
+        stop_times = pd.DataFrame({
+            'trip_id': ['T1', 'T1', 'T2', 'T3', 'T3', 'T1', 'T9'],
+            'stop_id': ['2', '1', '3', '4', '1', '9', '5'],
+            'stop_sequence': [2, 1, 1, 2, 1, 3, 1]
+        })
+        route_stops = build_route_stops({**mock_gtfs_data, 'trips': trips, 'stop_times': stop_times})
+        
+        assert route_stops['G-4'].tolist() == [0, 1, 3]
+        assert route_stops['V-500'].tolist() == [2]
+        assert build_route_stops(mock_gtfs_data) == {}
+    
+    def test_route_trips(self):
+        """Test route -> trips in file order"""
+        trips = pd.DataFrame({'route_id': ['G-4', 'V-500', 'G-4'], 'trip_id': ['t1', 't2', 't3']})
+        
+        assert build_route_trips({'trips': trips}) == {'G-4': ['t1', 't3'], 'V-500': ['t2']}
+        assert build_route_trips({'trips': None}) == {}
+    
+    def test_stop_routes(self, mock_gtfs_data):
+        """Test distinct route counts per stop in stops order"""
+        trips = pd.DataFrame({'route_id': ['G-4', 'V-500', 'G-4'], 'trip_id': ['t1', 't2', 't3']})
+        stop_times = pd.DataFrame({
+            'trip_id': ['t1', 't1', 't2', 't2', 't3', 'unknown'],
+            'stop_id': ['1', '2', '1', '3', '1', '4'],
+        })
+        data = {**mock_gtfs_data, 'trips': trips, 'stop_times': stop_times}
+        
+        assert build_stop_routes(data).tolist() == [2, 1, 1, 0, 0]
+        assert build_stop_routes(mock_gtfs_data).tolist() == [0] * 5
+    
+    def test_stop_coords(self, mock_gtfs_data):
+        """Test the coordinate arrays used by distance fares"""
+        lat, lon = build_stop_coords(mock_gtfs_data)
+        
+        assert lat.dtype == np.float64
+        assert lat[0] == 12.9767 and lon[4] == 77.5838
+        assert build_stop_coords({'stops': mock_gtfs_data['stops'].drop(columns=['stop_lat'])}) is None
+    
+    def test_stop_spatial(self, mock_gtfs_data):
+        """Test the spatial index over stop coordinates"""
+        index = build_stop_spatial(mock_gtfs_data)
+        rows, _ = index.nearest([12.9767], [77.5710], k=2)
+        
+        assert rows[0].tolist() == [0, 4]
+    
+    def test_stop_stations(self, mock_gtfs_data):
+        """Test stations over stops without parent_station (none are close)"""
+        stations = build_stop_stations(mock_gtfs_data)
+        
+        assert len(stations) == 5
+        assert stations.ids == ['1', '2', '3', '4', '5']
+    
+    def test_shape_points_sorted(self, sample_shapes_df):
+        """Test that shape points are ordered by sequence"""
+        shapes = sample_shapes_df.iloc[::-1].reset_index(drop=True)
+        points = build_shape_points({'shapes': shapes})['G4-shape']
+        
+        assert points['seq'].tolist() == [0, 1, 2]
+        assert points['lat'][0] == pytest.approx(12.9767)
+
+
+@pytest.mark.fare
+@pytest.mark.unit
+class TestFareLookup:
+    """Test calculate_fare precedence on top of the fare_pairs index"""
+    
+    @pytest.fixture
+    def fare_data(self, mock_gtfs_data):
+        """Fare rules with a reverse pair, route-specific rules and zones"""
+        rules = pd.DataFrame({
+            'fare_id': ['fare_1', 'fare_2', 'fare_3', 'fare_4'],
+            'route_id': ['G-4', 'V-500', 'V-500', 'KBS-1'],
+            'origin_id': ['1', '1', '1', None],
+            'destination_id': ['2', '2', '3', None],
+            'contains_id': [None, None, None, '5']
+        })
+        return {**mock_gtfs_data, 'fare_rules': rules}
+    
+    def calculate(self, data, *args):
+        import fare_service
+        with patch.object(fare_service, 'load_gtfs_data', return_value=data):
+            return fare_service.calculate_fare(*args)
+    
+    def test_direct_pair(self, fare_data):
+        """Test that the first rule for a pair wins"""
+        assert self.calculate(fare_data, '1', '2')['fare_id'] == 'fare_1'
+    
+    def test_reverse_pair(self, fare_data):
+        """Test that the reverse direction is used when needed"""
+        result = self.calculate(fare_data, '3', '1')
+        assert (result['fare_id'], result['price']) == ('fare_3', 15.0)
+    
+    def test_route_specific(self, fare_data):
+        """Test that a rule for the requested route is preferred"""
+        assert self.calculate(fare_data, '1', '2', 'V-500')['fare_id'] == 'fare_2'
+        assert self.calculate(fare_data, '1', '2', 'X-1')['fare_id'] == 'fare_1'
+    
+    def test_contains_zone(self, fare_data):
+        """Test the contains_id fallback"""
+        result = self.calculate(fare_data, '5', '4')
+        assert (result['fare_id'], result['source']) == ('fare_4', 'contains_zone')
+    
+    def test_distance_fallback(self, fare_data):
+        """Test that unknown pairs fall back to distance bands"""
+        assert self.calculate(fare_data, '2', '3')['source'] == 'distance_calculation'
+
+
+@pytest.mark.gtfs
+@pytest.mark.integration
+class TestIndexBundle:
+    """Test compiling and loading the index bundle"""
+    
+    def test_round_trip(self, dataset_factory, temp_test_dir):
+        """Test that bundled indexes are adopted without building"""
+        path = temp_test_dir / 'indexes.pkl'
+        summary = compile_bundle(dataset_factory(), path)
+        assert set(summary['indexes']) >= {'stop_rows', 'stop_names', 'fare_pairs', 'route_trips', 'shape_points'}
+        
+        dataset = dataset_factory()
+        with patch.dict(gtfs_index.INDEX_BUILDERS['stop_names'], builder=None):
+            adopted = load_bundle(dataset, path)
+            assert 'stop_names' in adopted
+            assert dataset.index('stop_names').exact['majestic'] == 0
+        assert not dataset.is_loaded('stops')
+    
+    def test_changed_source_not_adopted(self, dataset_factory, mock_gtfs_files, temp_test_dir):
+        """Test that indexes over changed files are rebuilt instead"""
+        path = temp_test_dir / 'indexes.pkl'
+        compile_bundle(dataset_factory(), path)
+        
+        stops = mock_gtfs_files / 'stops.txt'
+        stops.write_text(stops.read_text() + '6,Hebbal,13.0358,77.597\n')
+        adopted = load_bundle(dataset_factory(), path)
+        
+        assert 'stop_names' not in adopted
+        assert 'fare_pairs' in adopted
+    
+    def test_fare_matrix_memory_mapped(self, mock_gtfs_files, temp_test_dir):
+        """Test that the bundled fare matrix maps its cells from the snapshot directory"""
+        def dataset():
+            return GTFSDataset(
+                {name: mock_gtfs_files / f'{name}.txt' for name in ['stops', 'fare_attributes', 'fare_rules']},
+                snapshot_dir=temp_test_dir / 'snapshot'
+            )
+        path = temp_test_dir / 'indexes.pkl'
+        compile_bundle(dataset(), path)
+        files = list((temp_test_dir / 'snapshot').glob('fare_matrix.v*.npy'))
+        assert len(files) == 1
+        
+        adopted = dataset()
+        assert 'fare_matrix' in load_bundle(adopted, path)
+        matrix = adopted.index('fare_matrix')
+        assert matrix.path == files[0]
+        assert matrix.stats()['memory_mapped']
+        assert matrix.rules is adopted.index('fare_pairs')
+        assert matrix.lookup('3', '1')['price'] == 10.0
+    
+    def test_stale_fare_matrices(self, mock_gtfs_files, temp_test_dir):
+        """Test that builds keep older fare matrices and compile removes them"""
+        snapshot = temp_test_dir / 'snapshot'
+        snapshot.mkdir()
+        stale = snapshot / 'fare_matrix.v1-000000000000.npy'
+        stale.write_bytes(b'')
+        dataset = GTFSDataset(
+            {name: mock_gtfs_files / f'{name}.txt' for name in ['stops', 'fare_attributes', 'fare_rules']},
+            snapshot_dir=snapshot
+        )
+        
+        dataset.index('fare_matrix')
+        assert stale.exists()
+        
+        with patch.object(Path, 'unlink', side_effect=PermissionError('mapped')):
+            compile_bundle(dataset, temp_test_dir / 'indexes.pkl')
+        assert stale.exists()
+        
+        compile_bundle(dataset, temp_test_dir / 'indexes.pkl')
+        assert [path.name for path in snapshot.glob('fare_matrix.v*.npy')] == [dataset.index('fare_matrix').path.name]
+    
+    def test_version_mismatch_ignored(self, dataset_factory, temp_test_dir):
+        """Test that bundles of another format version are ignored"""
+        path = temp_test_dir / 'indexes.pkl'
+        compile_bundle(dataset_factory(), path)
+        bundle = read_bundle(path)
+        bundle['format_version'] = -1
+        path.write_bytes(pickle.dumps(bundle))
+        
+        assert read_bundle(path) is None
+        assert load_bundle(dataset_factory(), path) == []
+    
+    def test_missing_bundle(self, dataset_factory, temp_test_dir):
+        """Test that a missing bundle adopts nothing"""
+        assert load_bundle(dataset_factory(), temp_test_dir / 'none.pkl') == []
@@ -0,0 +1,238 @@
+"""
+Tests for Lazy GTFS Loading
+
+Tests on-demand table materialization, thread safety and load timings.
+"""
+
+import pytest
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gtfs_loader
+from gtfs_loader import GTFSDataset, apply_schema, dataset_status, dataset_memory_report
+
+
+@pytest.fixture
+def gtfs_dataset(mock_gtfs_files):
+    """Lazy dataset over the temporary GTFS files (no snapshots)"""
+    paths = {
+        'stops': mock_gtfs_files / 'stops.txt',
+        'routes': mock_gtfs_files / 'routes.txt',
+        'fare_attributes': mock_gtfs_files / 'fare_attributes.txt',
+        'fare_rules': mock_gtfs_files / 'fare_rules.txt',
+        'shapes': mock_gtfs_files / 'shapes.txt',
+    }
+    return GTFSDataset(paths, required=['stops', 'routes', 'fare_attributes', 'fare_rules'])
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestLazyLoading:
+    """Test on-demand table loading"""
+    
+    def test_nothing_loaded_initially(self, gtfs_dataset):
+        """Test that creating the dataset does not read any table"""
+        assert gtfs_dataset.status()['loaded_tables'] == []
+        assert 'stops' in gtfs_dataset
+        assert not gtfs_dataset.is_loaded('stops')
+    
+    def test_table_loaded_on_access(self, gtfs_dataset):
+        """Test that accessing a table loads only that table"""
+        stops_df = gtfs_dataset['stops']
+        
+        assert len(stops_df) == 5
+        assert gtfs_dataset.is_loaded('stops')
+        assert not gtfs_dataset.is_loaded('routes')
+    
+    def test_string_id_columns(self, gtfs_dataset):
+        """Test that ID columns are converted to strings"""
+        assert gtfs_dataset['stops']['stop_id'].tolist() == ['1', '2', '3', '4', '5']
+        assert gtfs_dataset['fare_rules']['origin_id'].iloc[0] == '1'
+    
+    def test_missing_optional_table_is_none(self, gtfs_dataset):
+        """Test that a missing optional table behaves like before (None)"""
+        assert gtfs_dataset['shapes'] is None
+        assert gtfs_dataset.get('shapes') is None
+        assert gtfs_dataset.load_timings()['shapes']['source'] == 'missing'
+    
+    def test_unknown_table_raises(self, gtfs_dataset):
+        """Test that unknown table names raise KeyError"""
+        with pytest.raises(KeyError):
+            gtfs_dataset['calendar_dates']
+        assert gtfs_dataset.get('calendar_dates') is None
+    
+    def test_missing_required(self, mock_gtfs_files):
+        """Test reporting of missing required files"""
+        dataset = GTFSDataset(
+            {'stops': mock_gtfs_files / 'stops.txt', 'trips': mock_gtfs_files / 'trips.txt'},
+            required=['stops', 'trips']
+        )
+        assert dataset.missing_required() == [str(mock_gtfs_files / 'trips.txt')]
+        with pytest.raises(FileNotFoundError):
+            dataset['trips']
+    
+    def test_extra_feed_from_config(self, temp_test_dir):
+        """Test loading a configured extra feed of BOM-prefixed CSV files"""
+        from config import TestingConfig
+        feed_dir = temp_test_dir / 'kaggle'
+        feed_dir.mkdir()
+        # Rows end with a stray delimiter, as in the Kaggle export
+        (feed_dir / 'stops.csv').write_text(
+            '\ufeffstop_id,stop_name,stop_lat,stop_lon\n'
+            '1,Majestic,12.9767,77.5713,\n'
+            '2,Shivajinagar,12.9857,77.6057,\n',
+            encoding='utf-8'
+        )
+        cfg = TestingConfig()
+        cfg.GTFS_EXTRA_FEEDS = {'kaggle': {'dir': feed_dir, 'extension': '.csv', 'required': ['stops']}}
+        
+        dataset = GTFSDataset.from_config(cfg, feed='kaggle')
+        stops = dataset['stops']
+        
+        assert dataset.paths['stops'] == feed_dir / 'stops.csv'
+        assert dataset.missing_required() == []
+        assert list(stops['stop_id']) == ['1', '2']
+        assert list(stops['stop_lon']) == pytest.approx([77.5713, 77.6057])
+        with pytest.raises(KeyError):
+            GTFSDataset.from_config(cfg, feed='unknown')
+    
+    def test_materialize_all(self, gtfs_dataset):
+        """Test forcing every table to load"""
+        gtfs_dataset.materialize()
+        assert set(gtfs_dataset.status()['loaded_tables']) == set(gtfs_dataset.paths)
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestLoadTimings:
+    """Test per-table load timing reports"""
+    
+    def test_timings_recorded(self, gtfs_dataset):
+        """Test that rows, duration and source are recorded per table"""
+        gtfs_dataset['stops']
+        timings = gtfs_dataset.load_timings()
+        
+        assert list(timings) == ['stops']
+        assert timings['stops']['rows'] == 5
+        assert timings['stops']['load_ms'] >= 0
+        assert timings['stops']['source'] == 'csv'
+    
+    def test_dataset_status_plain_dict(self, mock_gtfs_data):
+        """Test that plain dicts of frames are reported as fully loaded"""
+        status = dataset_status(mock_gtfs_data)
+        assert status['tables']['stops'] == {'loaded': True, 'rows': 5}
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestThreadSafety:
+    """Test concurrent first access"""
+    
+    def test_concurrent_access_loads_once(self, gtfs_dataset):
+        """Test that racing threads trigger a single load per table"""
+        calls = []
+        real_read_table = gtfs_loader.read_table
+        
+        def counting_read_table(name, path, snapshot_dir=None, **kwargs):
+            calls.append(name)
+            return real_read_table(name, path, snapshot_dir, **kwargs)
+        
+        results = []
+        with patch('gtfs_loader.read_table', side_effect=counting_read_table):
+            threads = [
+                threading.Thread(target=lambda: results.append(gtfs_dataset['stops']))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        
+        assert calls == ['stops']
+        assert all(df is results[0] for df in results)
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestMemoryLeanSchema:
+    """Test schema-driven dtypes and memory reporting"""
+    
+    def test_stops_dtypes(self, gtfs_dataset):
+        """Test that stop IDs are strings and coordinates float32"""
+        stops_df = gtfs_dataset['stops']
+        assert stops_df['stop_id'].dtype == object
+        assert stops_df['stop_lat'].dtype == np.float32
+        assert stops_df['stop_lon'].dtype == np.float32
+    
+    def test_fare_rules_categorical(self, gtfs_dataset):
+        """Test that repeated fare rule IDs are categorical"""
+        fare_rules_df = gtfs_dataset['fare_rules']
+        for column in ['fare_id', 'route_id', 'origin_id', 'destination_id']:
+            assert isinstance(fare_rules_df[column].dtype, pd.CategoricalDtype)
+        assert (fare_rules_df['origin_id'] == '1').sum() == 2
+    
+    def test_interned_ids(self):
+        """Test that identifier strings are interned"""
+        df = apply_schema('stops', pd.DataFrame({'stop_id': [101, 102]}))
+        assert df['stop_id'].tolist() == ['101', '102']
+        assert df['stop_id'].iloc[0] is sys.intern('101')
+    
+    def test_small_integer_sequences(self):
+        """Test downcasting of sequences, widening on missing values"""
+        df = apply_schema('shapes', pd.DataFrame({
+            'shape_id': ['a', 'a'],
+            'shape_pt_sequence': [1, 2],
+            'shape_dist_traveled': [0.0, 1.5]
+        }))
+        assert df['shape_pt_sequence'].dtype == np.int32
+        
+        df = apply_schema('trips', pd.DataFrame({'direction_id': [0, None]}))
+        assert df['direction_id'].dtype == np.float32
+    
+    def test_unconvertible_column_left_as_parsed(self):
+        """Test that malformed columns do not fail the load"""
+        df = apply_schema('shapes', pd.DataFrame({'shape_pt_lat': ['north', 'south']}))
+        assert df['shape_pt_lat'].tolist() == ['north', 'south']
+    
+    def test_memory_report(self, gtfs_dataset):
+        """Test bytes per table before and after compaction"""
+        gtfs_dataset['fare_attributes']
+        report = gtfs_dataset.memory_report()
+        
+        entry = report['tables']['fare_attributes']
+        assert entry['bytes_before'] > 0
+        assert entry['bytes_after'] > 0
+        assert report['total_bytes_after'] == entry['bytes_after']
+        assert 'stops' not in report['tables']
+    
+    def test_memory_report_indexes(self, gtfs_dataset):
+        """Test that built and adopted indexes are sized in the report"""
+        import gtfs_index  # registers the indexes
+        
+        gtfs_dataset.index('stop_names')
+        gtfs_dataset.adopt_index('stop_coords', {'101': (12.97, 77.59)})
+        report = gtfs_dataset.memory_report()
+        
+        assert set(report['indexes']) == {'stop_names', 'stop_coords'}
+        assert all(size > 0 for size in report['indexes'].values())
+        assert report['total_index_bytes'] == sum(report['indexes'].values())
+        assert 'stop_names' not in report['tables']
+    
+    def test_index_shared_objects_not_counted(self):
+        """Test that tables an index refers to are not counted again"""
+        table = pd.DataFrame({'stop_id': [str(i) for i in range(10_000)]})
+        
+        assert gtfs_loader.index_bytes({'stops': table}, shared=[table]) < 1000
+        assert gtfs_loader.index_bytes({'stops': table}) > 10_000
+    
+    def test_memory_report_plain_dict(self, mock_gtfs_data):
+        """Test memory report for plain dicts of frames"""
+        report = dataset_memory_report(mock_gtfs_data)
+        assert report['tables']['stops']['bytes_before'] is None
+        assert report['tables']['stops']['bytes_after'] > 0
@@ -0,0 +1,143 @@
+"""
+Tests for the GTFS Columnar Snapshot Cache
+
+Tests snapshot round-trips, freshness checks and rebuild triggers.
+"""
+
+import os
+import json
+import pytest
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gtfs_snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    source_fingerprint,
+    snapshot_root,
+    is_fresh,
+    write_table,
+    load_table
+)
+
+
+@pytest.fixture
+def stops_source(temp_test_dir, sample_stops_df):
+    """Write sample stops to a GTFS text file"""
+    path = temp_test_dir / 'stops.txt'
+    sample_stops_df.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestSourceFingerprint:
+    """Test source file fingerprints"""
+    
+    def test_fingerprint_existing_file(self, stops_source):
+        """Test fingerprint of an existing file"""
+        fingerprint = source_fingerprint(stops_source)
+        assert fingerprint['size'] == stops_source.stat().st_size
+        assert fingerprint['mtime_ns'] == stops_source.stat().st_mtime_ns
+    
+    def test_fingerprint_missing_file(self, temp_test_dir):
+        """Test fingerprint of a missing file is None"""
+        assert source_fingerprint(temp_test_dir / 'missing.txt') is None
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestSnapshotRoundTrip:
+    """Test writing and reading table snapshots"""
+    
+    def test_round_trip_preserves_values(self, temp_test_dir, stops_source, sample_stops_df):
+        """Test that a snapshot reproduces the original table"""
+        snapshot_dir = temp_test_dir / 'snapshot'
+        fingerprint = source_fingerprint(stops_source)
+        
+        assert write_table(snapshot_dir, 'stops', sample_stops_df, fingerprint)
+        loaded = load_table(snapshot_dir, 'stops', fingerprint)
+        
+        assert loaded is not None
+        assert list(loaded.columns) == list(sample_stops_df.columns)
+        assert loaded['stop_id'].tolist() == sample_stops_df['stop_id'].tolist()
+        assert loaded['stop_name'].tolist() == sample_stops_df['stop_name'].tolist()
+        np.testing.assert_array_equal(loaded['stop_lat'].to_numpy(), sample_stops_df['stop_lat'].to_numpy())
+    
+    def test_round_trip_missing_values(self, temp_test_dir, stops_source):
+        """Test that missing text values survive the round trip"""
+        df = pd.DataFrame({
+            'fare_id': ['fare_1', None, 'fare_1'],
+            'transfers': [np.nan, 1.0, 2.0]
+        })
+        fingerprint = source_fingerprint(stops_source)
+        write_table(temp_test_dir, 'fare_attributes', df, fingerprint)
+        loaded = load_table(temp_test_dir, 'fare_attributes', fingerprint)
+        
+        assert loaded['fare_id'].isna().tolist() == [False, True, False]
+        assert loaded['fare_id'].iloc[2] == 'fare_1'
+        assert np.isnan(loaded['transfers'].iloc[0])
+    
+    def test_round_trip_categorical(self, temp_test_dir, stops_source):
+        """Test that categorical columns are restored as categoricals"""
+        df = pd.DataFrame({'route_id': pd.Categorical(['G-4', 'V-500', 'G-4'])})
+        fingerprint = source_fingerprint(stops_source)
+        write_table(temp_test_dir, 'trips', df, fingerprint)
+        loaded = load_table(temp_test_dir, 'trips', fingerprint)
+        
+        assert isinstance(loaded['route_id'].dtype, pd.CategoricalDtype)
+        assert loaded['route_id'].tolist() == ['G-4', 'V-500', 'G-4']
+    
+    def test_numeric_columns_are_memory_mapped(self, temp_test_dir, stops_source, sample_stops_df):
+        """Test that numeric columns are backed by memory-mapped files"""
+        fingerprint = source_fingerprint(stops_source)
+        write_table(temp_test_dir, 'stops', sample_stops_df, fingerprint)
+        
+        table_dir = snapshot_root(temp_test_dir) / 'stops'
+        manifest = json.loads((table_dir / 'manifest.json').read_text())
+        lat_entry = next(c for c in manifest['columns'] if c['name'] == 'stop_lat')
+        assert lat_entry['kind'] == 'numeric'
+        assert (table_dir / f"{lat_entry['file']}.npy").exists()
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestSnapshotFreshness:
+    """Test snapshot invalidation"""
+    
+    def test_no_snapshot_is_not_fresh(self, temp_test_dir, stops_source):
+        """Test that a missing snapshot is reported as stale"""
+        assert is_fresh(temp_test_dir, 'stops', source_fingerprint(stops_source)) is False
+        assert load_table(temp_test_dir, 'stops', source_fingerprint(stops_source)) is None
+    
+    def test_source_change_invalidates_snapshot(self, temp_test_dir, stops_source, sample_stops_df):
+        """Test that changing the source file invalidates the snapshot"""
+        write_table(temp_test_dir, 'stops', sample_stops_df, source_fingerprint(stops_source))
+        assert is_fresh(temp_test_dir, 'stops', source_fingerprint(stops_source))
+        
+        # Append a row and bump mtime
+        sample_stops_df.iloc[:1].to_csv(stops_source, mode='a', header=False, index=False)
+        stat = stops_source.stat()
+        os.utime(stops_source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert is_fresh(temp_test_dir, 'stops', source_fingerprint(stops_source)) is False
+        assert load_table(temp_test_dir, 'stops', source_fingerprint(stops_source)) is None
+    
+    def test_format_version_mismatch(self, temp_test_dir, stops_source, sample_stops_df):
+        """Test that snapshots from another format version are ignored"""
+        fingerprint = source_fingerprint(stops_source)
+        write_table(temp_test_dir, 'stops', sample_stops_df, fingerprint)
+        
+        manifest_path = snapshot_root(temp_test_dir) / 'stops' / 'manifest.json'
+        manifest = json.loads(manifest_path.read_text())
+        manifest['format_version'] = SNAPSHOT_FORMAT_VERSION + 1
+        manifest_path.write_text(json.dumps(manifest))
+        
+        assert load_table(temp_test_dir, 'stops', fingerprint) is None
+    
+    def test_write_without_fingerprint(self, temp_test_dir, sample_stops_df):
+        """Test that tables without a source file are not snapshotted"""
+        assert write_table(temp_test_dir, 'stops', sample_stops_df, None) is False
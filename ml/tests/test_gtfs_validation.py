@@ -0,0 +1,173 @@
+"""
+Tests for GTFS Validation
+
+Tests per-table schema and integrity checks and rejection of bad tables at
+load.
+"""
+
+import pytest
+import sys
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gtfs_loader import GTFSDataset, apply_schema, dataset_validation_report
+from gtfs_validation import GTFSValidationError, validate_table, validate_dataset
+
+
+def checks(report):
+    """Map check name -> severity of a table report"""
+    return {issue['check']: issue['severity'] for issue in report['issues']}
+
+
+@pytest.fixture
+def sample_trips_df():
+    """Create sample GTFS trips dataframe"""
+    return pd.DataFrame({
+        'route_id': ['G-4', 'V-500', 'V-500'],
+        'service_id': ['weekday', 'weekday', 'weekend'],
+        'trip_id': ['t1', 't2', 't3']
+    })
+
+
+@pytest.mark.gtfs
+@pytest.mark.validation
+@pytest.mark.unit
+class TestValidateTable:
+    """Test individual checks"""
+    
+    def test_valid_table(self, sample_stops_df):
+        """Test that clean data passes without issues"""
+        report = validate_table('stops', apply_schema('stops', sample_stops_df.copy()))
+        
+        assert report['valid']
+        assert report['issues'] == []
+        assert report['rows'] == 5
+    
+    def test_wrong_file_rejected(self, sample_routes_df):
+        """Test that a routes file posing as stop_times is rejected"""
+        report = validate_table('stop_times', sample_routes_df)
+        
+        assert not report['valid']
+        assert checks(report) == {'missing_columns': 'error'}
+        assert report['issues'][0]['examples'] == ['trip_id', 'stop_id', 'stop_sequence']
+    
+    def test_duplicate_ids(self, sample_stops_df):
+        """Test that duplicate stop IDs are an error"""
+        df = pd.concat([sample_stops_df, sample_stops_df.iloc[:1]], ignore_index=True)
+        report = validate_table('stops', apply_schema('stops', df))
+        
+        assert checks(report) == {'duplicate_ids': 'error'}
+        assert report['issues'][0]['examples'] == ['1']
+    
+    def test_non_numeric_coordinates(self, sample_stops_df):
+        """Test that unparseable coordinates are an error"""
+        df = sample_stops_df.astype({'stop_lat': object})
+        df.loc[2, 'stop_lat'] = 'twelve'
+        report = validate_table('stops', apply_schema('stops', df))
+        
+        assert checks(report)['invalid_type'] == 'error'
+        assert report['issues'][0]['examples'] == ['twelve']
+    
+    def test_coordinates_out_of_bounds(self, sample_stops_df):
+        """Test that stops outside Bangalore are a warning only"""
+        df = sample_stops_df.copy()
+        df.loc[0, 'stop_lat'] = 19.07
+        report = validate_table('stops', apply_schema('stops', df))
+        
+        assert report['valid']
+        assert checks(report) == {'coordinates_out_of_bounds': 'warning'}
+    
+    def test_foreign_keys(self, sample_trips_df, sample_routes_df):
+        """Test orphan detection and severity by share of orphans"""
+        parents = {'routes': sample_routes_df}
+        few = sample_trips_df.copy()
+        few.loc[0, 'route_id'] = 'X-1'
+        most = sample_trips_df.assign(route_id='X-1')
+        
+        assert checks(validate_table('trips', few, parents)) == {'foreign_key': 'warning'}
+        assert checks(validate_table('trips', most, parents)) == {'foreign_key': 'error'}
+        assert checks(validate_table('trips', sample_trips_df, {})) == {'foreign_key_unchecked': 'warning'}
+    
+    def test_validate_dataset(self, mock_gtfs_data):
+        """Test the report for a plain dict of tables"""
+        report = validate_dataset(mock_gtfs_data)
+        
+        assert report['valid']
+        assert set(report['tables']) == set(mock_gtfs_data)
+
+
+@pytest.mark.gtfs
+@pytest.mark.validation
+@pytest.mark.integration
+class TestRejectAtLoad:
+    """Test that GTFSDataset rejects bad tables before serving them"""
+    
+    def test_bad_optional_table_is_none(self, mock_gtfs_files):
+        """Test that a rejected optional table is treated as missing"""
+        (mock_gtfs_files / 'stop_times.txt').write_bytes((mock_gtfs_files / 'routes.txt').read_bytes())
+        dataset = GTFSDataset({
+            'routes': mock_gtfs_files / 'routes.txt',
+            'stop_times': mock_gtfs_files / 'stop_times.txt'
+        }, required=['routes'])
+        
+        assert dataset['stop_times'] is None
+        assert dataset.load_timings()['stop_times']['source'] == 'rejected'
+        assert not dataset.validation_report()['valid']
+    
+    def test_bad_required_table_raises(self, mock_gtfs_files):
+        """Test that a rejected required table raises on every access"""
+        (mock_gtfs_files / 'stops.txt').write_text('stop_id,stop_name\n1,Majestic\n')
+        dataset = GTFSDataset({'stops': mock_gtfs_files / 'stops.txt'}, required=['stops'])
+        
+        with pytest.raises(GTFSValidationError) as first:
+            dataset['stops']
+        with pytest.raises(GTFSValidationError) as second:
+            dataset['stops']
+        assert second.value is first.value
+        assert first.value.report['issues'][0]['check'] == 'missing_columns'
+    
+    def test_foreign_keys_load_parents(self, mock_gtfs_files):
+        """Test that validating fare_rules checks fares and routes"""
+        dataset = GTFSDataset({
+            name: mock_gtfs_files / f'{name}.txt'
+            for name in ['fare_rules', 'fare_attributes', 'routes']
+        })
+        dataset['fare_rules']
+        
+        assert dataset.is_loaded('fare_attributes')
+        assert dataset.validation_report()['tables']['fare_rules']['valid']
+        assert 'validate_ms' in dataset.load_timings()['fare_rules']
+    
+    def test_validation_disabled(self, mock_gtfs_files):
+        """Test that validate=False serves tables unchecked"""
+        (mock_gtfs_files / 'stop_times.txt').write_bytes((mock_gtfs_files / 'routes.txt').read_bytes())
+        dataset = GTFSDataset({'stop_times': mock_gtfs_files / 'stop_times.txt'}, validate=False)
+        
+        assert len(dataset['stop_times']) == 3
+    
+    def test_full_report(self, mock_gtfs_files):
+        """Test that a full report loads and validates every table"""
+        dataset = GTFSDataset({name: mock_gtfs_files / f'{name}.txt' for name in ['stops', 'routes']})
+        report = dataset_validation_report(dataset, full=True)
+        
+        assert set(report['tables']) == {'stops', 'routes'}
+        assert report['valid']
+
+
+@pytest.mark.gtfs
+@pytest.mark.api
+@pytest.mark.fare
+class TestValidationEndpoint:
+    """Test /api/gtfs/validation"""
+    
+    def test_validation_report(self, fare_client):
+        """Test the structured report for the served data"""
+        response = fare_client.get('/api/gtfs/validation')
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['valid'] is True
+        assert data['errors'] == 0
+        assert 'stops' in data['tables']
@@ -0,0 +1,120 @@
+"""
+Tests for GTFS Zip Ingestion
+
+Tests reading tables straight out of a GTFS zip in chunks.
+"""
+
+import pytest
+import sys
+import zipfile
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gtfs_loader
+from gtfs_loader import GTFSDataset, read_table
+from gtfs_zip import ZipMember
+
+TABLES = ['stops', 'routes', 'fare_attributes', 'fare_rules']
+
+
+def write_zip(gtfs_dir, zip_path, prefix=''):
+    """Pack the GTFS text files of gtfs_dir into a zip"""
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(gtfs_dir.glob('*.txt')):
+            archive.write(path, prefix + path.name)
+    return zip_path
+
+
+@pytest.fixture
+def gtfs_zip(mock_gtfs_files, temp_test_dir):
+    """GTFS zip holding the temporary GTFS files"""
+    return write_zip(mock_gtfs_files, temp_test_dir / 'bmtc_gtfs.zip')
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestZipMember:
+    """Test locating and fingerprinting files inside an archive"""
+    
+    def test_exists(self, gtfs_zip):
+        """Test member lookup by file name"""
+        assert ZipMember(gtfs_zip, 'stops.txt').exists()
+        assert not ZipMember(gtfs_zip, 'shapes.txt').exists()
+        assert not ZipMember(gtfs_zip.parent / 'missing.zip', 'stops.txt').exists()
+    
+    def test_nested_directory(self, mock_gtfs_files, temp_test_dir):
+        """Test that files under a top-level directory are found"""
+        nested = write_zip(mock_gtfs_files, temp_test_dir / 'nested.zip', prefix='gtfs/')
+        stops = ZipMember(nested, 'stops.txt')
+        
+        assert stops.exists()
+        assert stops.name == 'stops.txt'
+        assert str(stops).endswith('nested.zip!stops.txt')
+    
+    def test_fingerprint_follows_content(self, mock_gtfs_files, gtfs_zip, temp_test_dir):
+        """Test that re-packing unchanged files keeps the fingerprint"""
+        before = ZipMember(gtfs_zip, 'stops.txt').fingerprint()
+        write_zip(mock_gtfs_files, gtfs_zip)
+        
+        assert ZipMember(gtfs_zip, 'stops.txt').fingerprint() == before
+        
+        (mock_gtfs_files / 'stops.txt').write_text('stop_id,stop_name,stop_lat,stop_lon\n1,Majestic,12.9767,77.5710\n')
+        write_zip(mock_gtfs_files, gtfs_zip)
+        assert ZipMember(gtfs_zip, 'stops.txt').fingerprint() != before
+    
+    def test_open_missing_member(self, gtfs_zip):
+        """Test that opening an absent member raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            with ZipMember(gtfs_zip, 'shapes.txt').open():
+                pass
+
+
+@pytest.mark.gtfs
+@pytest.mark.integration
+class TestZipDataset:
+    """Test loading typed tables from a zip"""
+    
+    def test_same_tables_as_directory(self, mock_gtfs_files, gtfs_zip):
+        """Test that zip and loose files produce identical typed tables"""
+        from_dir = GTFSDataset({name: mock_gtfs_files / f'{name}.txt' for name in TABLES})
+        from_zip = GTFSDataset({name: ZipMember(gtfs_zip, f'{name}.txt') for name in TABLES})
+        
+        for name in TABLES:
+            pd.testing.assert_frame_equal(from_zip[name], from_dir[name])
+    
+    def test_chunked_read(self, gtfs_zip):
+        """Test that small chunks are parsed separately and merged"""
+        with patch.object(gtfs_loader, 'apply_schema', wraps=gtfs_loader.apply_schema) as spy:
+            result = read_table('fare_rules', ZipMember(gtfs_zip, 'fare_rules.txt'), chunk_rows=2)
+        full = read_table('fare_rules', ZipMember(gtfs_zip, 'fare_rules.txt'), chunk_rows=100)
+        
+        assert spy.call_count == 2
+        assert isinstance(result['df']['route_id'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(result['df'], full['df'])
+        assert result['default_bytes'] > 0
+    
+    def test_missing_required_member(self, gtfs_zip):
+        """Test that a required table missing from the zip is reported"""
+        dataset = GTFSDataset(
+            {'stops': ZipMember(gtfs_zip, 'stops.txt'), 'shapes': ZipMember(gtfs_zip, 'shapes.txt')},
+            required=['stops', 'shapes']
+        )
+        
+        assert dataset.missing_required() == [f'{gtfs_zip}!shapes.txt']
+        with pytest.raises(FileNotFoundError):
+            dataset['shapes']
+    
+    def test_from_config_zip(self, gtfs_zip):
+        """Test that GTFS_ZIP_PATH switches the dataset to the archive"""
+        from config import TestingConfig
+        cfg = TestingConfig()
+        cfg.GTFS_ZIP_PATH = gtfs_zip
+        
+        dataset = GTFSDataset.from_config(cfg)
+        
+        assert dataset.paths['stops'] == ZipMember(gtfs_zip, 'stops.txt')
+        assert dataset.missing_required() == []
+        assert len(dataset['stops']) == 5
@@ -0,0 +1,102 @@
+"""
+Tests for the Query Result Cache
+
+Tests LRU eviction, the entry timeout, invalidation and the counters
+reported by QueryCache.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from query_cache import QueryCache
+
+
+def counting(value):
+    """Build a compute callable that records how often it ran"""
+    calls = []
+    def compute():
+        calls.append(value)
+        return value
+    return compute, calls
+
+
+@pytest.mark.unit
+class TestQueryCache:
+    """Test caching, eviction and statistics"""
+
+    def test_hit_after_miss(self):
+        """Test that a repeated key is computed once"""
+        cache = QueryCache(max_size=4)
+        compute, calls = counting(['Majestic'])
+
+        assert cache.get_or_compute('maj', compute) == ['Majestic']
+        assert cache.get_or_compute('maj', compute) == ['Majestic']
+
+        assert calls == [['Majestic']]
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['size']) == (1, 1, 0.5, 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used key is evicted first"""
+        cache = QueryCache(max_size=2)
+        cache.get_or_compute('a', lambda: 1)
+        cache.get_or_compute('b', lambda: 2)
+        cache.get_or_compute('a', lambda: 1)       # 'a' is now most recent
+        cache.get_or_compute('c', lambda: 3)       # evicts 'b'
+
+        compute, calls = counting(2)
+        cache.get_or_compute('a', lambda: 0)
+        cache.get_or_compute('b', compute)
+
+        assert calls == [2]
+        assert cache.stats()['evictions'] == 2
+        assert len(cache) == 2
+
+    def test_timeout(self):
+        """Test that entries expire after the timeout"""
+        cache = QueryCache(max_size=4, timeout=10)
+        with patch('query_cache.monotonic', return_value=100.0):
+            cache.get_or_compute('maj', lambda: 'old')
+        with patch('query_cache.monotonic', return_value=105.0):
+            assert cache.get_or_compute('maj', lambda: 'new') == 'old'
+        with patch('query_cache.monotonic', return_value=111.0):
+            assert cache.get_or_compute('maj', lambda: 'new') == 'new'
+
+        assert cache.stats()['expirations'] == 1
+
+    def test_invalidate(self):
+        """Test dropping all entries or those of one feed"""
+        cache = QueryCache(max_size=8)
+        for key in [('bmtc', 'a'), ('bmtc', 'b'), ('kaggle', 'a')]:
+            cache.get_or_compute(key, lambda: key)
+
+        assert cache.invalidate(lambda key: key[0] == 'bmtc') == 2
+        assert len(cache) == 1
+        assert cache.invalidate() == 1
+        assert cache.stats()['invalidations'] == 2
+
+    def test_disabled(self):
+        """Test that a disabled cache computes every time"""
+        cache = QueryCache(max_size=4, enabled=False)
+        compute, calls = counting(1)
+
+        cache.get_or_compute('a', compute)
+        cache.get_or_compute('a', compute)
+
+        assert len(calls) == 2
+        assert cache.stats()['size'] == 0
+        assert cache.stats()['misses'] == 2
+
+    def test_failed_compute_not_cached(self):
+        """Test that an exception is raised and nothing is stored"""
+        cache = QueryCache(max_size=4)
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute('a', lambda: (_ for _ in ()).throw(ValueError('boom')))
+
+        assert len(cache) == 0
+        assert cache.get_or_compute('a', lambda: 1) == 1
@@ -0,0 +1,143 @@
+"""
+Tests for Stop Clustering into Stations
+
+Tests which stops are grouped (distance, core name words, parent_station),
+station numbering, names and centroids, and station search.
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stop_clusters import StopStations, cluster_stats, core_words, similar_names
+
+
+@pytest.fixture
+def stations():
+    """Stops of three places, with both directions and Gate/Circle variants"""
+    return StopStations(
+        ['10', '11', '12', '13', '14', '15', '16'],
+        [
+            'Hebbal',
+            'Majestic',
+            'Hebbal (Towards Majestic)',
+            'Nagarabhavi Circle',
+            'Nagarabhavi Gate',
+            'Hebbal Flyover',
+            'Hebbal'
+        ],
+        # 16 shares Hebbal's name but is 3 km away
+        [13.0400, 12.9767, 13.0405, 12.9600, 12.9603, 13.0401, 13.0670],
+        [77.5900, 77.5710, 77.5904, 77.5100, 77.5102, 77.5901, 77.5900],
+        radius_m=200
+    )
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestCoreWords:
+    """Test the name comparison behind clustering"""
+
+    def test_generic_words_dropped(self):
+        """Test that generic words do not name the place"""
+        assert core_words('Nagarabhavi Bus Stop') == {'nagarabhavi'}
+        assert core_words('K.R. Puram Rly Stn') == {'kr', 'puram', 'railway'}
+        assert core_words('Bus Stand') == {'bus', 'stand'}
+        assert core_words(None) == frozenset()
+
+    def test_similar_names(self):
+        """Test that one name's core words must all be in the other's"""
+        assert similar_names(core_words('Nagarabhavi Circle'), core_words('Nagarabhavi Gate'))
+        assert similar_names(core_words('Kempegowda Bus Station'), core_words('Kempegowda Bus Station (Majestic)'))
+        assert not similar_names(core_words('HBR Layout 1st Cross'), core_words('HBR Layout 2nd Cross'))
+        assert not similar_names(core_words('Hebbal'), frozenset())
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestStopStations:
+    """Test grouping stops into stations"""
+
+    def test_groups(self, stations):
+        """Test that close, similarly named stops share a station"""
+        assert len(stations) == 4
+        assert stations.station_of.tolist() == [0, 1, 0, 2, 2, 0, 3]
+        assert stations.members(0).tolist() == [0, 2, 5]
+        assert stations.sizes().tolist() == [3, 1, 2, 1]
+
+    def test_station_attributes(self, stations):
+        """Test station ids, names and centroids"""
+        assert stations.ids == ['10', '11', '13', '16']
+        assert stations.names[0] == 'Hebbal'
+        assert stations.names[2] == 'Nagarabhavi Circle'
+        assert stations.lat[2] == pytest.approx(12.96015)
+        assert stations.position('13') == 2
+        assert stations.position('14') is None
+
+    def test_radius(self):
+        """Test that a smaller radius keeps opposite stops apart"""
+        stations = StopStations(['1', '2'], ['Hebbal', 'Hebbal'], [13.0400, 13.0405], [77.5900, 77.5904], radius_m=20)
+
+        assert len(stations) == 2
+
+    def test_parent_station(self):
+        """Test that stops sharing a parent_station are grouped and named by it"""
+        stations = StopStations(
+            ['1', '2', '3'], ['Platform 1', 'Majestic', 'Platform 2'],
+            [12.9767, 12.9900, 12.9770], [77.5710, 77.5500, 77.5712],
+            parent_stations=['KBS', None, 'KBS']
+        )
+
+        assert stations.station_of.tolist() == [0, 1, 0]
+        assert stations.ids == ['KBS', '2']
+
+    def test_missing_coordinates(self):
+        """Test that stops without coordinates are stations of their own"""
+        stations = StopStations(['1', '2'], ['Hebbal', 'Hebbal'], [13.04, np.nan], [77.59, np.nan])
+
+        assert len(stations) == 2
+        assert np.isnan(stations.lat[1])
+
+    def test_empty(self):
+        """Test a feed without stops"""
+        stations = StopStations([], [], [], [])
+
+        assert len(stations) == 0
+        assert len(stations.search('hebbal')) == 0
+
+    def test_stats(self, stations):
+        """Test the reported reduction of the stop set"""
+        stats = cluster_stats(stations)
+
+        assert stats['stops'] == 7
+        assert stats['stations'] == 4
+        assert stats['multi_stop_stations'] == 2
+        assert stats['largest_station'] == 3
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestStationSearch:
+    """Test finding stations by name"""
+
+    def test_search_station_names(self, stations):
+        """Test that stations named like the query are found once each"""
+        assert stations.search('hebbal').tolist() == [0, 3]
+
+    def test_search_member_names(self, stations):
+        """Test that member stop names find their station"""
+        assert stations.search('flyover').tolist() == [0]
+        assert stations.search('gate').tolist() == [2]
+
+    def test_search_canonical(self, stations):
+        """Test reordered words through canonical matching"""
+        assert stations.search('gate nagarabhavi').tolist() == [2]
+
+    def test_resolve(self, stations):
+        """Test resolving a name to one station"""
+        assert stations.resolve('Nagarabhavi Gate') == 2
+        assert stations.resolve('majestc', fuzzy=True) == 1
+        assert stations.resolve('unknown place') is None
@@ -0,0 +1,86 @@
+"""
+Tests for Stop Name Canonicalization
+
+Tests canonical keys of stop name variants and the CanonicalNames lookups.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stop_names import canonical_name, canonical_tokens, strip_direction, CanonicalNames
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestCanonicalName:
+    """Test the canonicalization steps"""
+
+    @pytest.mark.parametrize('variants', [
+        ['K.R. Puram', 'K R Puram', 'KR Puram', 'k.r.puram', 'K-R Puram'],
+        ['Silk Board Jn', 'Silk Board Junction', 'silk board jn.', 'Silk  Board Jct'],
+        ['Magadi Rd', 'Magadi Road', 'MAGADI ROAD'],
+        ['H B R Layout 1st Main', 'HBR Lyt First Main', 'H.B.R. Layout (1st Main)'],
+        ["St. John's Hospital", 'St Johns Hosp'],
+        ['Majestic (Towards Hebbal)', 'Majestic'],
+        ['Bus-Stand & Depot', 'Bus Stand and Depot', 'Busstand and Depot'],
+    ])
+    def test_variants_share_key(self, variants):
+        """Test that spelling variants of a name get the same key"""
+        assert len({canonical_name(name) for name in variants}) == 1
+
+    def test_keys(self):
+        """Test a few keys in full"""
+        assert canonical_name('K.R. Puram Rly Stn') == 'kr puram railway station'
+        assert canonical_tokens('2nd Stage  H B R Layout (2nd Cross)') == [
+            '2nd', 'stage', 'hbr', 'layout', '2nd', 'cross'
+        ]
+        # Single letters next to longer words stay separate words
+        assert canonical_name('A Block') == 'a block'
+
+    def test_kannada(self):
+        """Test Kannada names keep their script and lose joiners and direction"""
+        assert canonical_name('ಸಿಲ್ಕ್‌ ಬೋರ್ಡ್') == 'ಸಿಲ್ಕ್ ಬೋರ್ಡ್'
+        assert canonical_name('ಮೆಜೆಸ್ಟಿಕ್ (ಟುವರ್ಡ್ಸ್  ಹೆಬ್ಬಾಳ)') == 'ಮೆಜೆಸ್ಟಿಕ್'
+        assert strip_direction('Hebbal (towards Yelahanka)') == 'Hebbal'
+
+    def test_empty(self):
+        """Test names without words"""
+        assert canonical_name(None) is None
+        assert canonical_name(' - ') is None
+        assert canonical_tokens(float('nan')) == []
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestCanonicalNames:
+    """Test key and token lookups"""
+
+    @pytest.fixture
+    def names(self):
+        """Names with a duplicate key, an alias row and a missing name"""
+        return CanonicalNames(
+            ['Silk Board Junction', 'K R Puram', 'Central Silk Board', None, 'KR Puram', 'Silk Board'],
+            [0, 1, 2, 3, 4, 1]
+        )
+
+    def test_first(self, names):
+        """Test that the first row with the key wins"""
+        assert names.first('K.R. Puram') == 1
+        assert names.first('silk board jn') == 0
+        assert names.first('Hebbal') is None
+        assert names.first('') is None
+
+    def test_covering(self, names):
+        """Test rows holding every query word, in any order"""
+        assert names.covering('board silk').tolist() == [0, 1, 2]
+        assert names.covering('silk hebbal').tolist() == []
+        assert len(names) == 5
+
+    def test_best_covering(self, names):
+        """Test that the name with the fewest other words wins"""
+        assert names.best_covering('Board Silk') == 1
+        assert names.best_covering('silk central') == 2
+        assert names.best_covering('xyz') is None
@@ -0,0 +1,91 @@
+"""
+Tests for Phonetic Stop Name Keys
+
+Tests phonetic keys of voice-style spellings of Bangalore stop names and
+the PhoneticNames lookups.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stop_phonetics import phonetic_key, phonetic_spelling, PhoneticNames
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestPhoneticKey:
+    """Test the phonetic key steps"""
+
+    @pytest.mark.parametrize('variants', [
+        ['Yeshawanthapura', 'Yeshwantpur', 'Yeshvanthpura', 'yeshwanth pur'],
+        ['Malleswaram', 'Malleshwaram', 'Malleshvaram'],
+        ['Jayanagara', 'Jaya Nagar', 'jayanagar'],
+        ['Chamarajapete', 'Chamrajpet', 'Chamarajpet'],
+        ['Banashankari', 'Banashankary', 'Banasankari'],
+        ['Electronic City', 'Electronik Siti'],
+        ['K R Puram', 'KR Pura', 'K.R. Puram'],
+        ['Majestic', 'Majestik', 'ಮಜೆಸ್ಟಿಕ್'],
+        ['Whitefield', 'Whitefeeld', 'Vhitefield'],
+        ['Hebbal', 'Hebal'],
+    ])
+    def test_variants_share_key(self, variants):
+        """Test that spellings of the same sound get the same key"""
+        assert len({phonetic_key(name) for name in variants}) == 1
+
+    @pytest.mark.parametrize('first, second', [
+        ('Majestic', 'Majestc'),
+        ('Jayanagar', 'Jinnagara'),
+        ('Hebbal', 'Hubli'),
+        ('HBR Layout 1st Cross', 'HBR Layout 2nd Cross'),
+        ('Tropez', 'Tropez zz'),
+    ])
+    def test_different_names_differ(self, first, second):
+        """Test that typos and other places keep their own key"""
+        assert phonetic_key(first) != phonetic_key(second)
+
+    def test_keys(self):
+        """Test a few spellings and keys in full"""
+        assert phonetic_spelling('Yeshwantpur') == 'yesvantpur'
+        assert phonetic_key('Yeshawanthapura') == 'yesvntpur'
+        assert phonetic_key('Chickpete') == 'cikpet'
+        assert phonetic_key('Majestic (Towards Hebbal)') == phonetic_key('Majestic')
+        assert phonetic_key('') is None
+        assert phonetic_key(None) is None
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestPhoneticNames:
+    """Test phonetic lookups over stop names"""
+
+    @pytest.fixture
+    def names(self):
+        """Names with a shared key, a duplicate and a missing name"""
+        return PhoneticNames(['Koramangala', 'Yeshwanthpura', None, 'Kormangala', 'Koramangala', 'Jayanagar'])
+
+    def test_first(self, names):
+        """Test resolving a spoken spelling to a row"""
+        assert names.first('yeshwantpur') == 1
+        assert names.first('jaya nagara') == 5
+        assert names.first('unknown place') is None
+        assert names.first('') is None
+
+    def test_first_prefers_closest_spelling(self, names):
+        """Test that the spelling closest to the query wins among names sharing a key"""
+        assert names.first('koramangala') == 0
+        assert names.first('kormangla') == 3
+
+    def test_matching(self, names):
+        """Test every row sounding like a name, in file order"""
+        assert names.matching('koramangla').tolist() == [0, 3, 4]
+        assert len(names.matching('unknown')) == 0
+
+    def test_rows(self):
+        """Test that names map to the given rows"""
+        names = PhoneticNames(['ಮಜೆಸ್ಟಿಕ್', 'Majestic'], rows=[7, 7])
+
+        assert names.first('majestik') == 7
+        assert len(names) == 1
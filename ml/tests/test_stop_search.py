@@ -0,0 +1,366 @@
+"""
+Tests for Indexed Stop Name Resolution
+
+Tests that StopNameIndex resolves names with the same precedence as the
+reference scan, typo-tolerant matching, translated names, ranked
+autocomplete, and the fare service lookups built on it.
+"""
+
+import pytest
+import sys
+import random
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stop_search import (
+    StopNameIndex, scan_stop_position, lowercase_names, run_benchmark,
+    pattern_masks, window_distance, max_edits, stop_name_aliases, strip_direction,
+    encode_cursor, decode_cursor
+)
+
+
+STOP_NAMES = [
+    'Kempegowda Bus Station', 'Majestic', 'Silk Board', 'Majestic (Platform 20)',
+    'Silk Board Junction', None, 'K R Puram', 'Hebbal', 'majestic', 'Board Office',
+]
+
+
+@pytest.fixture
+def stop_index():
+    """Index over names with duplicates, a missing name and shared prefixes"""
+    return StopNameIndex(STOP_NAMES)
+
+
+def scan(names, query):
+    """Resolve a query with the reference scan"""
+    return scan_stop_position(np.asarray(lowercase_names(names), dtype=str), query)
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestStopNameIndex:
+    """Test lookups and their precedence"""
+
+    def test_exact_first_row(self, stop_index):
+        """Test that duplicate names resolve to the first row"""
+        assert stop_index.resolve('MAJESTIC') == 1
+        assert stop_index.resolve('  Hebbal ') == 7
+
+    def test_parenthetical_prefix(self, stop_index):
+        """Test that the part before a parenthesis is tried as a prefix"""
+        assert stop_index.resolve('Silk (Central)') == 2
+        assert stop_index.resolve('Majestic (Platform 20)') == 3
+
+    def test_prefix_before_substring(self, stop_index):
+        """Test that a prefix match wins over an earlier substring match"""
+        # 'board' is inside row 2 but only row 9 starts with it
+        assert stop_index.resolve('Board') == 9
+        assert stop_index.first_containing('board') == 2
+
+    def test_substring(self, stop_index):
+        """Test substring matches of short and long queries"""
+        assert stop_index.resolve('puram') == 6
+        assert stop_index.resolve('us') == 0
+        assert stop_index.containing('board').tolist() == [2, 4, 9]
+        assert stop_index.containing('bo').tolist() == [2, 4, 9]
+        assert stop_index.containing('').tolist() == list(range(len(STOP_NAMES)))
+
+    def test_no_match(self, stop_index):
+        """Test names without any match and invalid input"""
+        assert stop_index.resolve('Yeshwanthpur') is None
+        assert stop_index.containing('xyz').tolist() == []
+        assert stop_index.resolve('') is None
+        assert stop_index.resolve('   ') is None
+        assert stop_index.resolve(None) is None
+
+    @pytest.mark.parametrize('query', [
+        'majestic', 'Majestic (X)', '(Platform', 'silk', 'board', 'k r', 'r p',
+        'a', 'station', 'Silk Board Junction', 'unknown stop', 'silk hebbal'
+    ])
+    def test_matches_scan(self, stop_index, query):
+        """Test agreement with the reference scan"""
+        assert stop_index.resolve(query) == scan(STOP_NAMES, query)
+
+    def test_matches_scan_random(self):
+        """Test agreement with the reference scan on generated names"""
+        rng = random.Random(7)
+        words = ['nagar', 'halli', 'cross', 'main', 'road', 'gate', 'pura', 'layout', '1st', '(east)']
+        names = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(300)]
+        index = StopNameIndex(names)
+
+        queries = [name[start:start + length] for name in names[:100]
+                   for start, length in [(0, 4), (2, 6), (0, 30)]]
+        queries += [f"{name.split()[0]} (x)" for name in names[:50]]
+
+        for query in queries:
+            assert index.resolve(query) == scan(names, query), query
+
+    def test_canonical_variants(self, stop_index):
+        """Test names the scan misses but that only differ in spelling conventions"""
+        for query, row in [('bus  station', 0), ('Silk Board Jn.', 4), ('K.R. Puram', 6), ('KR-Puram', 6)]:
+            assert scan(STOP_NAMES, query) is None
+            assert stop_index.resolve(query) == row, query
+
+    def test_canonical_word_order(self, stop_index):
+        """Test that reordered words find the name with fewest other words"""
+        assert scan(STOP_NAMES, 'Board Silk') is None
+        assert stop_index.resolve('Board Silk') == 2
+        assert stop_index.resolve('Station Bus') == 0
+        assert stop_index.canonical_matches('board silk').tolist() == [2, 4]
+    
+    def test_phonetic_spellings(self, stop_index):
+        """Test names spelled the way they sound, as speech recognition writes them"""
+        for query, row in [('Majestik', 1), ('Hebal', 7), ('KR Pooram', 6)]:
+            assert scan(STOP_NAMES, query) is None
+            assert stop_index.resolve(query, phonetic=True) == row, query
+            # Phonetic keys are only probed for voice queries
+            assert stop_index.resolve(query) is None, query
+        assert stop_index.phonetic_matches('majestik').tolist() == [1, 8]
+    
+    def test_phonetic_first(self, stop_index):
+        """Test that voice mode tries the key probes before prefix and substring"""
+        # 'hebal' is neither a prefix nor a substring of any name
+        assert stop_index.resolve('hebal', phonetic=True) == 7
+        # Whole names win over partial ones; partial names still resolve
+        assert stop_index.resolve('majestic', phonetic=True) == 1
+        assert stop_index.resolve('kempe', phonetic=True) == 0
+        assert stop_index.resolve_many(['Majestik', 'majestik'], phonetic=True) == [1, 1]
+
+    def test_resolve_many(self, stop_index, monkeypatch):
+        """Test batch resolution in input order, resolving repeats once"""
+        calls = []
+        resolve = stop_index.resolve
+        monkeypatch.setattr(stop_index, 'resolve', lambda name, **options: calls.append(name) or resolve(name, **options))
+
+        positions = stop_index.resolve_many(['Board', ' MAJESTIC', None, 'board', 'majestic', '', 'nowhere'])
+
+        assert positions == [9, 1, None, 9, 1, None, None]
+        assert calls == ['board', 'majestic', 'nowhere']
+
+    def test_benchmark(self):
+        """Test that the benchmark reports agreement with the scan"""
+        result = run_benchmark(STOP_NAMES)
+
+        assert result['mismatches'] == 0
+        assert result['queries'] == 45
+
+
+def levenshtein(a, b):
+    """Plain dynamic programming edit distance"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j - 1] + (char_a != char_b), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestFuzzyMatching:
+    """Test typo-tolerant matching"""
+
+    def test_misspelt_names(self, stop_index):
+        """Test that misspellings find the intended stops"""
+        assert stop_index.fuzzy('Majestc')[0] == (1, 1)
+        assert stop_index.fuzzy('Hebbl') == [(7, 1)]
+        # A missing space is one edit from a run of words
+        assert stop_index.fuzzy('silkboard')[:2] == [(2, 1), (4, 1)]
+
+    def test_ranking(self, stop_index):
+        """Test that whole-name matches rank before matches inside a name"""
+        # 'station' is inside 'Kempegowda Bus Station', 'board' starts 'Board Office'
+        assert [row for row, _ in stop_index.fuzzy('boart')] == [9, 2, 4]
+        assert stop_index.fuzzy('statio') == [(0, 1)]
+
+    def test_limit_and_distinct_names(self, stop_index):
+        """Test the limit and that duplicate names are reported once"""
+        assert stop_index.fuzzy('majestc', limit=1) == [(1, 1)]
+        rows = [row for row, _ in stop_index.fuzzy('majestc')]
+        assert 8 not in rows
+
+    def test_edit_bound(self, stop_index):
+        """Test that short queries are not corrected and long ones allow two edits"""
+        assert max_edits(3) == 0
+        assert max_edits(5) == 1
+        assert max_edits(12) == 2
+        assert stop_index.fuzzy('hbl') == []
+        assert stop_index.fuzzy('Hbbl') == []
+        assert stop_index.fuzzy('Kempegowda Bus Statn')[0] == (0, 2)
+        assert stop_index.fuzzy('NonExistentStop123XYZ') == []
+
+    def test_resolve_fallback(self, stop_index):
+        """Test that resolve only falls back to fuzzy matching when asked"""
+        assert stop_index.resolve('Majestc') is None
+        assert stop_index.resolve('Majestc', fuzzy=True) == 1
+        # Substring matches still win over fuzzy ones
+        assert stop_index.resolve('puram', fuzzy=True) == 6
+
+    def test_window_distance_matches_reference(self):
+        """Test the bit-parallel distance against dynamic programming"""
+        rng = random.Random(3)
+        for _ in range(2000):
+            words = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 4))]
+            query = ' '.join(''.join(rng.choice('abc ') for _ in range(rng.randint(1, 8))).split()) or 'a'
+            bound = rng.randint(0, 3)
+
+            expected = None
+            for start in range(len(words)):
+                for end in range(start, len(words)):
+                    distance = levenshtein(query, ' '.join(words[start:end + 1]))
+                    placement = 0 if start == 0 and end == len(words) - 1 else (1 if start == 0 else 2)
+                    if distance <= bound and (expected is None or (distance, placement) < expected):
+                        expected = (distance, placement)
+
+            assert window_distance(query, pattern_masks(query), words, bound) == expected
+
+
+@pytest.fixture
+def alias_index():
+    """Index over STOP_NAMES with Kannada names of two stops"""
+    return StopNameIndex(STOP_NAMES, aliases=[
+        (1, 'ಮೆಜೆಸ್ಟಿಕ್ (ಟುವರ್ಡ್ಸ್  ಹೆಬ್ಬಾಳ)'),
+        (7, 'ಹೆಬ್ಬಾಳ'),
+        (2, 'ಸಿಲ್ಕ್\u200c ಬೋರ್ಡ್'),
+    ])
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestTranslatedNames:
+    """Test matching stops by translated and transliterated names"""
+
+    def test_kannada_resolves_to_same_stop(self, alias_index):
+        """Test that Kannada names resolve to the stop of the English name"""
+        assert alias_index.resolve('ಮೆಜೆಸ್ಟಿಕ್') == alias_index.resolve('Majestic') == 1
+        assert alias_index.resolve('ಹೆಬ್ಬಾಳ') == 7
+        # Zero-width joiners in the published name are ignored
+        assert alias_index.resolve('ಸಿಲ್ಕ್ ಬೋರ್ಡ್') == 2
+
+    def test_transliterated_input(self, alias_index):
+        """Test that Kannada typed in Latin letters finds the stop"""
+        # The English names alone match neither
+        assert scan(STOP_NAMES, 'silk bord') is None
+        assert alias_index.resolve('silk bord') == 2
+        assert alias_index.resolve('mejestik') == 1
+
+    def test_direction_suffix_not_indexed(self, alias_index):
+        """Test that "(towards ...)" does not make a stop match its destination"""
+        assert strip_direction('ಮೆಜೆಸ್ಟಿಕ್ (ಟುವರ್ಡ್ಸ್  ಹೆಬ್ಬಾಳ)') == 'ಮೆಜೆಸ್ಟಿಕ್'
+        assert alias_index.containing('ಹೆಬ್ಬಾಳ').tolist() == [7]
+
+    def test_english_names_take_precedence(self, alias_index):
+        """Test that aliases do not change lookups English names answer"""
+        for query in ['majestic', 'Board', 'puram', 'station', 'Silk (x)']:
+            assert alias_index.resolve(query) == scan(STOP_NAMES, query)
+
+    def test_containing_merges_aliases(self, alias_index):
+        """Test that search returns stops matched by either name once"""
+        assert alias_index.containing('ಬೋರ್ಡ್').tolist() == [2]
+        assert alias_index.containing('bo').tolist() == [2, 4, 9]
+        assert alias_index.alias_count == 6
+
+    def test_fuzzy_kannada(self, alias_index):
+        """Test that misspelt Kannada is matched by its transliteration"""
+        # ಹೆಬಾಳ (one b) is 'hebala', one edit from 'hebbala'
+        assert alias_index.fuzzy('ಹೆಬಾಳ')[0] == (7, 1)
+
+    def test_aliases_from_translations(self):
+        """Test reading stop name translations by record_id and field_value"""
+        stops = pd.DataFrame({'stop_id': ['1', '2', '3'], 'stop_name': ['Majestic', 'Hebbal', 'Hebbal']})
+        translations = pd.DataFrame({
+            'table_name': ['stops', 'stops', 'routes', 'stops'],
+            'field_name': ['stop_name', 'stop_name', 'route_long_name', 'stop_desc'],
+            'language': ['kn'] * 4,
+            'record_id': ['1', None, '1', '2'],
+            'field_value': [None, 'Hebbal', None, None],
+            'translation': ['ಮೆಜೆಸ್ಟಿಕ್', 'ಹೆಬ್ಬಾಳ', 'x', 'y'],
+        })
+
+        aliases = stop_name_aliases(stops, translations)
+
+        assert aliases == [(0, 'ಮೆಜೆಸ್ಟಿಕ್'), (1, 'ಹೆಬ್ಬಾಳ'), (2, 'ಹೆಬ್ಬಾಳ')]
+        assert stop_name_aliases(stops, None) == []
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestAutocomplete:
+    """Test ranked, paginated autocomplete"""
+
+    def test_ranking_tiers(self, stop_index):
+        """Test prefix matches before word starts before other substrings"""
+        page, total = stop_index.autocomplete('board')
+        assert page == [(9, 'prefix'), (2, 'word'), (4, 'word')]
+        assert total == 3
+
+        page, _ = stop_index.autocomplete('ard')
+        assert {match for _, match in page} == {'substring'}
+
+    def test_popularity_within_tier(self, stop_index):
+        """Test that busier stops come first within a tier, then file order"""
+        popularity = np.zeros(len(STOP_NAMES), dtype=np.int32)
+        popularity[[4, 8]] = [5, 3]
+
+        assert stop_index.autocomplete('board', popularity)[0] == [(9, 'prefix'), (4, 'word'), (2, 'word')]
+        assert [row for row, _ in stop_index.autocomplete('maj', popularity)[0]] == [8, 1, 3]
+
+    def test_pages_cover_full_ranking(self, stop_index):
+        """Test that consecutive pages concatenate to the full ranking"""
+        full, total = stop_index.autocomplete('a', limit=len(STOP_NAMES))
+        pages = []
+        for offset in range(0, total + 3, 3):
+            page, page_total = stop_index.autocomplete('a', offset=offset, limit=3)
+            assert page_total == total
+            pages += page
+
+        assert pages == full
+        assert len(full) == total == 9
+
+    def test_empty_and_missing(self, stop_index):
+        """Test queries without matches and offsets past the end"""
+        assert stop_index.autocomplete('xyz') == ([], 0)
+        assert stop_index.autocomplete('board', offset=10) == ([], 3)
+
+    def test_alias_matches_rank_below_names(self):
+        """Test that a stop matched only by its Kannada name ranks after name matches"""
+        index = StopNameIndex(['Magadi Road', 'Old Town'], aliases=[(1, 'ಮಾಗಡಿ')])
+        popularity = np.array([0, 10])
+
+        assert index.autocomplete('mag', popularity)[0] == [(0, 'prefix'), (1, 'prefix')]
+        assert index.autocomplete('ಮಾಗ')[0] == [(1, 'prefix')]
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to what was encoded"""
+        cursor = encode_cursor('ಮಾಗಡಿ road', 40, '2024-05')
+
+        assert decode_cursor(cursor) == {'query': 'ಮಾಗಡಿ road', 'offset': 40, 'feed_version': '2024-05'}
+        assert decode_cursor(encode_cursor('maj', 0))['feed_version'] is None
+
+    @pytest.mark.parametrize('cursor', ['', '!!!', 'e30', encode_cursor('maj', 0)[:-3]])
+    def test_malformed_cursor(self, cursor):
+        """Test that damaged cursors are rejected"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+@pytest.mark.gtfs
+@pytest.mark.fare
+@pytest.mark.unit
+class TestFindStopByName:
+    """Test the fare service lookup with and without an index"""
+
+    def test_with_and_without_index(self):
+        """Test that the indexed and scanning lookups return the same stop"""
+        from fare_service import find_stop_by_name
+        stops = pd.DataFrame({'stop_id': [str(i) for i in range(len(STOP_NAMES))], 'stop_name': STOP_NAMES})
+        index = StopNameIndex(stops['stop_name'])
+
+        for query in ['majestic', 'Board', 'puram', 'Silk (x)', 'nowhere']:
+            assert find_stop_by_name(stops, query, index) == find_stop_by_name(stops, query)
+        assert find_stop_by_name(stops, 'Board', index)['stop_id'] == '9'
+        assert find_stop_by_name(stops, 'nowhere', index) is None
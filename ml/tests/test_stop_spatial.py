@@ -0,0 +1,107 @@
+"""
+Tests for the Spatial Stop Index
+
+Tests nearest-k and radius lookups against a brute-force haversine scan,
+batched queries, stops without coordinates and the distance conversions.
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stop_spatial import StopSpatialIndex, NO_ROW, chord_to_km, km_to_chord, run_benchmark
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def random_stops():
+    """A few hundred stops spread over Bangalore"""
+    rng = np.random.default_rng(11)
+    return 12.8 + rng.random(400) * 0.3, 77.45 + rng.random(400) * 0.3
+
+
+@pytest.mark.gtfs
+@pytest.mark.unit
+class TestStopSpatialIndex:
+    """Test nearest-stop and radius lookups"""
+
+    def test_nearest_matches_scan(self, random_stops):
+        """Test that the k nearest stops and distances match a full scan"""
+        lat, lon = random_stops
+        index = StopSpatialIndex(lat, lon)
+        query_lat, query_lon = [12.97, 12.85, 13.05], [77.59, 77.70, 77.50]
+
+        rows, distances = index.nearest(query_lat, query_lon, k=4)
+
+        assert rows.shape == distances.shape == (3, 4)
+        for i in range(3):
+            expected = haversine_km(query_lat[i], query_lon[i], lat, lon)
+            assert rows[i].tolist() == np.argsort(expected)[:4].tolist()
+            assert distances[i] == pytest.approx(np.sort(expected)[:4], abs=1e-6)
+
+    def test_nearest_within_radius(self, random_stops):
+        """Test that a radius drops farther neighbours"""
+        lat, lon = random_stops
+        index = StopSpatialIndex(lat, lon)
+        expected = haversine_km(12.97, 77.59, lat, lon)
+        radius = float(np.sort(expected)[2])
+
+        rows, distances = index.nearest([12.97], [77.59], k=5, radius_km=radius)
+
+        assert rows[0, :3].tolist() == np.argsort(expected)[:3].tolist()
+        assert rows[0, 3:].tolist() == [NO_ROW, NO_ROW]
+        assert np.isinf(distances[0, 3:]).all()
+
+    def test_within_matches_scan(self, random_stops):
+        """Test that radius lookups return every stop in range, closest first"""
+        lat, lon = random_stops
+        index = StopSpatialIndex(lat, lon)
+
+        results = index.within([12.97, 12.70], [77.59, 77.59], radius_km=2.0)
+
+        expected = haversine_km(12.97, 77.59, lat, lon)
+        rows, distances = results[0]
+        assert rows.tolist() == [row for row in np.argsort(expected) if expected[row] <= 2.0]
+        assert np.all(np.diff(distances) >= 0)
+        assert len(results[1][0]) == 0
+        assert index.within([12.97], [77.59], radius_km=2.0, limit=2)[0][0].tolist() == rows[:2].tolist()
+
+    def test_missing_coordinates(self):
+        """Test that stops without coordinates are skipped but rows are kept"""
+        index = StopSpatialIndex([12.97, np.nan, 12.98], [77.59, 77.60, 77.59])
+
+        rows, distances = index.nearest([12.98], [77.59], k=3)
+
+        assert len(index) == 2
+        assert rows[0].tolist() == [2, 0, NO_ROW]
+        assert distances[0, 0] == pytest.approx(0.0, abs=1e-6)
+
+    def test_empty_index(self):
+        """Test lookups when no stop has coordinates"""
+        index = StopSpatialIndex([], [])
+
+        rows, _ = index.nearest([12.97], [77.59], k=2)
+        assert rows.tolist() == [[NO_ROW, NO_ROW]]
+        assert len(index.within([12.97], [77.59], radius_km=1.0)[0][0]) == 0
+
+    def test_distance_conversion(self):
+        """Test that chord lengths and kilometres convert both ways"""
+        assert chord_to_km(np.array([km_to_chord(1.5)]))[0] == pytest.approx(1.5)
+        # One degree of latitude is about 111.2 km
+        assert haversine_km(12.0, 77.0, 13.0, 77.0) == pytest.approx(111.19, abs=0.01)
+
+    def test_benchmark(self, random_stops):
+        """Test that the benchmark reports agreement with the scan"""
+        result = run_benchmark(*random_stops, queries=50)
+
+        assert result['mismatches'] == 0
+        assert result['stops'] == 400
@@ -0,0 +1,46 @@
+"""
+Tests for Kannada Transliteration
+
+Tests the Latin spelling of Kannada stop names used to match romanized input.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from transliteration import transliterate_kannada, has_kannada, clean_kannada
+
+
+@pytest.mark.unit
+class TestTransliteration:
+    """Test Kannada to Latin transliteration"""
+    
+    @pytest.mark.parametrize('kannada, latin', [
+        ('ಮಾಗಡಿ ರಸ್ತೆ', 'magadi raste'),
+        ('ಮೆಜೆಸ್ಟಿಕ್', 'mejestik'),
+        ('ಬೆಂಗಳೂರು', 'bengaluru'),
+        ('ಸಂಪಿಗೆ', 'sampige'),
+        ('ಹೆಬ್ಬಾಳ', 'hebbala'),
+        ('ಭದ್ರಪ್ಪ ಬಡಾವಣೆ', 'bhadrappa badavane'),
+    ])
+    def test_stop_names(self, kannada, latin):
+        """Test inherent vowels, vowel signs, virama and anusvara"""
+        assert transliterate_kannada(kannada) == latin
+    
+    def test_mixed_script_and_digits(self):
+        """Test that Latin text is kept and Kannada digits are converted"""
+        assert transliterate_kannada('ಮಾಗಡಿ Road') == 'magadi Road'
+        assert transliterate_kannada('೧೨ ನೇ') == '12 ne'
+        assert transliterate_kannada('Majestic') == 'Majestic'
+    
+    def test_zero_width_joiners(self):
+        """Test that zero-width joiners do not affect matching"""
+        assert clean_kannada('ಟೋಲ್‌ ಗೇಟ್') == 'ಟೋಲ್ ಗೇಟ್'
+        assert transliterate_kannada('ಟೋಲ್‌ ಗೇಟ್') == 'tol get'
+    
+    def test_has_kannada(self):
+        """Test script detection"""
+        assert has_kannada('ಮಾಗಡಿ Road')
+        assert not has_kannada('Magadi Road')
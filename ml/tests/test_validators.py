@@ -14,7 +14,13 @@ from validators import (
     PredictionRequestValidator,
     BatchPredictionRequestValidator,
     FareRequestValidator,
+    BatchFareRequestValidator,
+    FareMatrixExportRequestValidator,
     JourneyPlanRequestValidator,
+    StopAutocompleteRequestValidator,
+    BatchStopResolveRequestValidator,
+    NearbyStopsRequestValidator,
+    BatchNearbyStopsRequestValidator,
     CoordinateValidator,
     validate_prediction_request,
     validate_fare_request
@@ -299,6 +305,223 @@ class TestJourneyPlanRequestValidator:
         assert any('cannot be the same' in error for error in result['errors'])
 
 
+@pytest.mark.validation
+@pytest.mark.unit
+class TestStopAutocompleteRequestValidator:
+    """Test stop autocomplete request validation"""
+    
+    def test_defaults(self):
+        """Test that q is normalized and limit and offset default"""
+        validator = StopAutocompleteRequestValidator()
+        is_valid, result = validator.validate({'q': ' Maj '})
+        
+        assert is_valid is True
+        assert result == {'q': 'maj', 'limit': 10, 'offset': 0, 'feed_version': None}
+    
+    def test_missing_query(self):
+        """Test validation with missing or blank q"""
+        validator = StopAutocompleteRequestValidator()
+        
+        assert validator.validate({})[0] is False
+        assert validator.validate({'q': '  '})[0] is False
+    
+    @pytest.mark.parametrize('limit', ['0', '51', 'ten', '-1'])
+    def test_invalid_limit(self, limit):
+        """Test validation with out of range and non-numeric limits"""
+        validator = StopAutocompleteRequestValidator()
+        is_valid, result = validator.validate({'q': 'maj', 'limit': limit})
+        
+        assert is_valid is False
+        assert any('limit' in error for error in result['errors'])
+    
+    def test_cursor(self):
+        """Test that a cursor yields its offset and must match the query"""
+        from stop_search import encode_cursor
+        validator = StopAutocompleteRequestValidator()
+        cursor = encode_cursor('maj', 20, 'v1')
+        
+        is_valid, result = validator.validate({'q': 'MAJ', 'cursor': cursor, 'limit': '5'})
+        assert is_valid is True
+        assert (result['offset'], result['feed_version'], result['limit']) == (20, 'v1', 5)
+        
+        assert validator.validate({'q': 'kor', 'cursor': cursor})[0] is False
+        assert validator.validate({'q': 'maj', 'cursor': 'not-a-cursor'})[0] is False
+
+
+@pytest.mark.validation
+@pytest.mark.unit
+class TestBatchFareRequestValidator:
+    """Test batch fare request validation"""
+    
+    def test_valid_request(self):
+        """Test pairs given by stop id, by name, or mixed"""
+        validator = BatchFareRequestValidator()
+        is_valid, result = validator.validate({'pairs': [
+            {'origin': ' Majestic ', 'destination': 'Whitefield', 'route_id': 'V-500'},
+            {'origin_id': 3, 'destination_id': '1'},
+            {'origin_id': '1', 'destination': 'Jayanagar'}
+        ]})
+        
+        assert is_valid is True
+        assert result['pairs'][0] == {
+            'origin_id': None, 'origin': 'Majestic',
+            'destination_id': None, 'destination': 'Whitefield', 'route_id': 'V-500'
+        }
+        assert result['pairs'][1]['origin_id'] == '3'
+        assert result['pairs'][2]['destination'] == 'Jayanagar'
+        assert result['phonetic'] is False
+    
+    def test_invalid_pairs(self):
+        """Test missing, empty, oversized and malformed pairs"""
+        validator = BatchFareRequestValidator(max_batch_size=2)
+        pair = {'origin': 'Majestic', 'destination': 'Whitefield'}
+        
+        assert validator.validate({})[0] is False
+        assert validator.validate({'pairs': pair})[0] is False
+        assert validator.validate({'pairs': []})[0] is False
+        assert validator.validate({'pairs': [pair] * 3})[0] is False
+        is_valid, result = BatchFareRequestValidator().validate({'pairs': [
+            'Majestic',
+            {'origin': 'Majestic', 'origin_id': '1', 'destination': 'Whitefield'},
+            {'origin_id': '', 'destination': 'x'}
+        ]})
+        assert is_valid is False
+        assert result['errors'] == [
+            'Pair 1: must be an object with origin and destination',
+            'Pair 2: give either origin_id or origin, not both',
+            'Pair 3: origin_id must be a non-empty string or integer',
+            'Pair 3: destination: stop name must be at least 2 characters'
+        ]
+    
+    def test_invalid_route_and_flags(self):
+        """Test route_id types and the fuzzy/phonetic flags"""
+        validator = BatchFareRequestValidator()
+        pair = {'origin_id': '1', 'destination_id': '3'}
+        
+        assert validator.validate({'pairs': [{**pair, 'route_id': ['V-500']}]})[0] is False
+        assert validator.validate({'pairs': [pair], 'fuzzy': 'no'})[0] is False
+        assert validator.validate({'pairs': [pair], 'phonetic': True})[1]['phonetic'] is True
+
+
+@pytest.mark.validation
+@pytest.mark.unit
+class TestFareMatrixExportRequestValidator:
+    """Test fare matrix export parameter validation"""
+    
+    def test_valid_params(self):
+        """Test defaults, stop lists and options"""
+        validator = FareMatrixExportRequestValidator()
+        
+        assert validator.validate({'route_id': ' V-500 '})[1] == {
+            'route_id': 'V-500', 'stop_ids': None, 'level': 'stop', 'format': 'csv'
+        }
+        is_valid, result = validator.validate({'stop_ids': '1, 3,,5', 'level': 'ZONE', 'format': 'ndjson'})
+        assert is_valid is True
+        assert (result['stop_ids'], result['level'], result['format']) == (['1', '3', '5'], 'zone', 'ndjson')
+    
+    def test_invalid_params(self):
+        """Test missing stops, oversized lists and unknown options"""
+        validator = FareMatrixExportRequestValidator(max_stops=2)
+        
+        assert validator.validate({})[1]['errors'] == ['route_id or stop_ids is required']
+        assert validator.validate({'stop_ids': ' , '})[0] is False
+        assert validator.validate({'stop_ids': '1,2,3'})[0] is False
+        is_valid, result = validator.validate({'route_id': 'V-500', 'level': 'route', 'format': 'xml'})
+        assert is_valid is False
+        assert len(result['errors']) == 2
+
+
+@pytest.mark.validation
+@pytest.mark.unit
+class TestBatchStopResolveRequestValidator:
+    """Test batch stop resolution request validation"""
+    
+    def test_valid_request(self):
+        """Test that blank names are accepted and fuzzy defaults from config"""
+        validator = BatchStopResolveRequestValidator()
+        is_valid, result = validator.validate({'names': ['Majestic', '', None]})
+        
+        assert is_valid is True
+        assert result['names'] == ['Majestic', '', None]
+        assert isinstance(result['fuzzy'], bool)
+    
+    def test_invalid_names(self):
+        """Test missing, empty, oversized and non-string names"""
+        validator = BatchStopResolveRequestValidator(max_batch_size=3)
+        
+        assert validator.validate({})[0] is False
+        assert validator.validate({'names': 'Majestic'})[0] is False
+        assert validator.validate({'names': []})[0] is False
+        assert validator.validate({'names': ['a'] * 4})[0] is False
+        is_valid, result = validator.validate({'names': ['Majestic', 5, 'x' * 201]})
+        assert is_valid is False
+        assert [error.split(':')[0] for error in result['errors']] == ['Name 2', 'Name 3']
+    
+    def test_fuzzy_flag(self):
+        """Test that fuzzy must be a boolean"""
+        validator = BatchStopResolveRequestValidator()
+        
+        assert validator.validate({'names': ['a'], 'fuzzy': False})[1]['fuzzy'] is False
+        assert validator.validate({'names': ['a'], 'fuzzy': 'yes'})[0] is False
+    
+    def test_phonetic_flag(self):
+        """Test that phonetic defaults to False and must be a boolean"""
+        validator = BatchStopResolveRequestValidator()
+        
+        assert validator.validate({'names': ['a']})[1]['phonetic'] is False
+        assert validator.validate({'names': ['a'], 'phonetic': True})[1]['phonetic'] is True
+        assert validator.validate({'names': ['a'], 'phonetic': 1})[0] is False
+
+
+@pytest.mark.validation
+@pytest.mark.unit
+class TestNearbyStopsRequestValidator:
+    """Test nearby stop request validation"""
+    
+    def test_valid_request(self):
+        """Test that query strings are converted and limit defaults"""
+        validator = NearbyStopsRequestValidator()
+        is_valid, result = validator.validate({'lat': '12.97', 'lon': '77.59'})
+        
+        assert is_valid is True
+        assert result == {'lat': 12.97, 'lon': 77.59, 'limit': 5, 'radius_km': None}
+    
+    def test_radius_required(self):
+        """Test that radius searches need a radius within the cap"""
+        validator = NearbyStopsRequestValidator(require_radius=True)
+        
+        assert validator.validate({'lat': 12.97, 'lon': 77.59})[0] is False
+        assert validator.validate({'lat': 12.97, 'lon': 77.59, 'radius_km': '0'})[0] is False
+        assert validator.validate({'lat': 12.97, 'lon': 77.59, 'radius_km': '50'})[0] is False
+        is_valid, result = validator.validate({'lat': 12.97, 'lon': 77.59, 'radius_km': '0.5'})
+        assert is_valid is True
+        assert (result['radius_km'], result['limit']) == (0.5, 50)
+    
+    def test_invalid_point_and_limit(self):
+        """Test out of bounds coordinates and limits"""
+        validator = NearbyStopsRequestValidator()
+        is_valid, result = validator.validate({'lat': 15.0, 'lon': 77.59, 'limit': '0'})
+        
+        assert is_valid is False
+        assert len(result['errors']) == 2
+    
+    def test_batch(self):
+        """Test batch validation of points and shared options"""
+        validator = BatchNearbyStopsRequestValidator(max_batch_size=2)
+        points = [{'lat': 12.97, 'lon': 77.59}, {'lat': 12.93, 'lon': 77.62}]
+        
+        is_valid, result = validator.validate({'points': points, 'limit': 3})
+        assert is_valid is True
+        assert result['lat'] == [12.97, 12.93]
+        assert result['limit'] == 3
+        
+        assert validator.validate({'points': points * 2})[0] is False
+        assert validator.validate({'points': []})[0] is False
+        is_valid, result = validator.validate({'points': [{'lat': 12.97}, 'x']})
+        assert is_valid is False
+        assert result['errors'] == ['Point 1: lon is required', 'Point 2: must be an object with lat and lon']
+
+
 @pytest.mark.validation
 @pytest.mark.unit
 class TestCoordinateValidator:
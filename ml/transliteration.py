@@ -0,0 +1,107 @@
+"""
+Kannada to Latin Transliteration for BMTC Stop Search
+
+Stop names in translations.txt are in Kannada script, while many riders
+type Kannada names in Latin letters ("magadi raste") and the English stop
+names are themselves romanized Kannada ("Magadi Road"). This module maps
+Kannada script to the plain Latin spelling used in BMTC signage so both
+can be matched against each other:
+
+- long and short vowels map to the same letter (ಮಾಗಡಿ -> magadi)
+- aspirated consonants keep their h (ಭ -> bh), retroflex ones do not
+  (ಟ -> t, ಳ -> l)
+- a consonant carries an inherent 'a' unless followed by a vowel sign or
+  virama (ರಸ್ತೆ -> raste)
+- anusvara is 'm' before labials and at the end of a word, 'n' otherwise
+
+Characters outside the Kannada block are kept, so mixed text such as
+"ಮಾಗಡಿ Road" becomes "magadi Road".
+
+Usage:
+    from transliteration import transliterate_kannada, has_kannada
+
+    transliterate_kannada('ಮೆಜೆಸ್ಟಿಕ್')    # 'mejestik'
+"""
+
+import re
+import unicodedata
+
+# Independent vowels
+KANNADA_VOWELS = {
+    'ಅ': 'a', 'ಆ': 'a', 'ಇ': 'i', 'ಈ': 'i', 'ಉ': 'u', 'ಊ': 'u', 'ಋ': 'ru',
+    'ೠ': 'ru', 'ಌ': 'lu', 'ಎ': 'e', 'ಏ': 'e', 'ಐ': 'ai', 'ಒ': 'o', 'ಓ': 'o', 'ಔ': 'au',
+}
+
+# Consonants (without their inherent vowel)
+KANNADA_CONSONANTS = {
+    'ಕ': 'k', 'ಖ': 'kh', 'ಗ': 'g', 'ಘ': 'gh', 'ಙ': 'n',
+    'ಚ': 'ch', 'ಛ': 'chh', 'ಜ': 'j', 'ಝ': 'jh', 'ಞ': 'n',
+    'ಟ': 't', 'ಠ': 'th', 'ಡ': 'd', 'ಢ': 'dh', 'ಣ': 'n',
+    'ತ': 't', 'ಥ': 'th', 'ದ': 'd', 'ಧ': 'dh', 'ನ': 'n',
+    'ಪ': 'p', 'ಫ': 'ph', 'ಬ': 'b', 'ಭ': 'bh', 'ಮ': 'm',
+    'ಯ': 'y', 'ರ': 'r', 'ಱ': 'r', 'ಲ': 'l', 'ವ': 'v',
+    'ಶ': 'sh', 'ಷ': 'sh', 'ಸ': 's', 'ಹ': 'h', 'ಳ': 'l', 'ೞ': 'l',
+}
+
+# Dependent vowel signs following a consonant
+KANNADA_VOWEL_SIGNS = {
+    'ಾ': 'a', 'ಿ': 'i', 'ೀ': 'i', 'ು': 'u', 'ೂ': 'u', 'ೃ': 'ru', 'ೄ': 'ru',
+    'ೆ': 'e', 'ೇ': 'e', 'ೈ': 'ai', 'ೊ': 'o', 'ೋ': 'o', 'ೌ': 'au',
+}
+
+VIRAMA = '್'
+ANUSVARA = 'ಂ'
+VISARGA = 'ಃ'
+NUKTA = '಼'
+
+# Zero-width joiners appear inconsistently in typed and published names
+_ZERO_WIDTH = re.compile('[\u200c\u200d]')
+
+_KANNADA = re.compile('[\u0c80-\u0cff]')
+
+_LABIALS = {'ಪ', 'ಫ', 'ಬ', 'ಭ', 'ಮ'}
+
+
+def clean_kannada(text: str) -> str:
+    """NFC-normalize text and drop zero-width joiners"""
+    return _ZERO_WIDTH.sub('', unicodedata.normalize('NFC', text))
+
+
+def has_kannada(text: str) -> bool:
+    """Check whether text contains Kannada script"""
+    return bool(_KANNADA.search(text))
+
+
+def transliterate_kannada(text: str) -> str:
+    """
+    Transliterate the Kannada script in text to plain Latin letters.
+
+    Args:
+        text: Text possibly containing Kannada script
+
+    Returns:
+        Text with Kannada replaced by its Latin spelling
+    """
+    text = clean_kannada(text).replace(NUKTA, '')
+    out = []
+    for i, char in enumerate(text):
+        following = text[i + 1] if i + 1 < len(text) else ''
+        if char in KANNADA_CONSONANTS:
+            out.append(KANNADA_CONSONANTS[char])
+            if following not in KANNADA_VOWEL_SIGNS and following != VIRAMA:
+                out.append('a')
+        elif char in KANNADA_VOWEL_SIGNS:
+            out.append(KANNADA_VOWEL_SIGNS[char])
+        elif char in KANNADA_VOWELS:
+            out.append(KANNADA_VOWELS[char])
+        elif char == ANUSVARA:
+            out.append('m' if following in _LABIALS or not following.strip() else 'n')
+        elif char == VISARGA:
+            out.append('h')
+        elif char == VIRAMA:
+            continue
+        elif '೦' <= char <= '೯':
+            out.append(str(ord(char) - ord('೦')))
+        else:
+            out.append(char)
+    return ''.join(out)
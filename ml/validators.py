@@ -355,6 +355,163 @@ class FareRequestValidator(BaseValidator):
         return True, validated_data
 
 
+class BatchFareRequestValidator(BaseValidator):
+    """
+    Validator for batch fare calculation API requests.
+    
+    Validates:
+    - pairs: array of objects, each with origin_id or origin (stop name),
+      destination_id or destination, and an optional route_id (required)
+    - fuzzy: fall back to typo-tolerant name matching (optional boolean)
+    - phonetic: names come from speech recognition (optional boolean)
+    """
+    
+    STOP_FIELDS = ('origin', 'destination')
+    
+    def __init__(self, max_batch_size: int = None):
+        self.max_batch_size = max_batch_size or config.FARE_BATCH_MAX_SIZE
+    
+    def validate_stop(self, pair: Dict[str, Any], field: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Validate the stop of one pair given by id (<field>_id) or by name (<field>).
+        
+        Returns:
+            Tuple of (error_message, {'<field>_id': id or None, '<field>': name or None})
+        """
+        id_field = f'{field}_id'
+        stop_id, name = pair.get(id_field), pair.get(field)
+        if stop_id is not None and name is not None:
+            return f"give either {id_field} or {field}, not both", {}
+        if stop_id is not None:
+            if isinstance(stop_id, bool) or not isinstance(stop_id, (str, int)) or not str(stop_id).strip():
+                return f"{id_field} must be a non-empty string or integer", {}
+            return None, {id_field: str(stop_id).strip(), field: None}
+        is_valid, error = self.validate_stop_name(name)
+        if not is_valid:
+            return f"{field}: {error}", {}
+        return None, {id_field: None, field: name.strip()}
+    
+    def validate(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate batch fare calculation request data.
+        
+        Stops that do not resolve are reported per pair in the response, so
+        a batch job does not fail on one unknown stop.
+        
+        Args:
+            data: Request data dictionary with 'pairs' array
+            
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        if not isinstance(data, dict):
+            return False, {'errors': ['Request data must be a JSON object']}
+        
+        pairs = data.get('pairs')
+        if pairs is None:
+            return False, {'errors': ['Missing required field: pairs']}
+        
+        if not isinstance(pairs, list):
+            return False, {'errors': ['pairs must be an array']}
+        
+        if len(pairs) == 0:
+            return False, {'errors': ['pairs array cannot be empty']}
+        
+        if len(pairs) > self.max_batch_size:
+            return False, {
+                'errors': [f'Batch size exceeds maximum of {self.max_batch_size} pairs']
+            }
+        
+        errors = []
+        validated_pairs = []
+        for idx, pair in enumerate(pairs):
+            if not isinstance(pair, dict):
+                errors.append(f"Pair {idx + 1}: must be an object with origin and destination")
+                continue
+            validated = {}
+            for field in self.STOP_FIELDS:
+                error, stop = self.validate_stop(pair, field)
+                if error:
+                    errors.append(f"Pair {idx + 1}: {error}")
+                validated.update(stop)
+            route_id = pair.get('route_id')
+            if route_id is not None and (isinstance(route_id, bool) or not isinstance(route_id, (str, int))):
+                errors.append(f"Pair {idx + 1}: route_id must be a string or integer")
+            validated['route_id'] = route_id
+            validated_pairs.append(validated)
+        
+        fuzzy = data.get('fuzzy', config.STOP_SEARCH_FUZZY)
+        if not isinstance(fuzzy, bool):
+            errors.append("fuzzy must be a boolean")
+        
+        phonetic = data.get('phonetic', False)
+        if not isinstance(phonetic, bool):
+            errors.append("phonetic must be a boolean")
+        
+        if errors:
+            return False, {'errors': errors}
+        
+        return True, {'pairs': validated_pairs, 'fuzzy': fuzzy, 'phonetic': phonetic}
+
+
+class FareMatrixExportRequestValidator(BaseValidator):
+    """
+    Validator for fare matrix export API requests (query parameters).
+    
+    Validates:
+    - route_id: route whose stops make the matrix, and whose fare rules apply
+    - stop_ids: comma-separated stop ids making the matrix (instead of the
+      route's stops); route_id or stop_ids is required
+    - level: 'stop' (stop-to-stop, default) or 'zone' (zone-to-zone)
+    - format: 'csv' (default) or 'ndjson'
+    """
+    
+    LEVELS = ('stop', 'zone')
+    FORMATS = ('csv', 'ndjson')
+    
+    def __init__(self, max_stops: int = None):
+        self.max_stops = max_stops or config.FARE_EXPORT_MAX_STOPS
+    
+    def validate(self, params: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate fare matrix export request parameters.
+        
+        Args:
+            params: Request query parameters
+            
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        if not isinstance(params, dict):
+            return False, {'errors': ['Request parameters must be provided']}
+        
+        errors = []
+        
+        route_id = (params.get('route_id') or '').strip() or None
+        stop_ids = None
+        if params.get('stop_ids') is not None:
+            stop_ids = [stop_id.strip() for stop_id in str(params['stop_ids']).split(',') if stop_id.strip()]
+            if not stop_ids:
+                errors.append("stop_ids must list at least one stop id")
+            elif len(stop_ids) > self.max_stops:
+                errors.append(f"stop_ids exceeds maximum of {self.max_stops} stops")
+        elif route_id is None:
+            errors.append("route_id or stop_ids is required")
+        
+        level = (params.get('level') or 'stop').strip().lower()
+        if level not in self.LEVELS:
+            errors.append(f"level must be one of: {', '.join(self.LEVELS)}")
+        
+        output_format = (params.get('format') or 'csv').strip().lower()
+        if output_format not in self.FORMATS:
+            errors.append(f"format must be one of: {', '.join(self.FORMATS)}")
+        
+        if errors:
+            return False, {'errors': errors}
+        
+        return True, {'route_id': route_id, 'stop_ids': stop_ids, 'level': level, 'format': output_format}
+
+
 class JourneyPlanRequestValidator(BaseValidator):
     """
     Validator for journey planning API requests.
@@ -407,6 +564,294 @@ class JourneyPlanRequestValidator(BaseValidator):
         return True, validated_data
 
 
+class StopAutocompleteRequestValidator(BaseValidator):
+    """
+    Validator for stop autocomplete API requests.
+
+    Validates:
+    - q: text typed so far (required)
+    - limit: stops per page (optional)
+    - cursor: next_cursor of the previous page (optional)
+    """
+
+    def __init__(self, max_limit: int = None):
+        self.max_limit = max_limit or config.STOP_AUTOCOMPLETE_MAX_LIMIT
+
+    def validate(self, params: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate stop autocomplete request parameters.
+
+        Args:
+            params: Request query parameters
+
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        from stop_search import decode_cursor
+
+        if not isinstance(params, dict):
+            return False, {'errors': ['Request parameters must be provided']}
+
+        errors = []
+
+        # Validate q
+        query = params.get('q')
+        if query is None or (isinstance(query, str) and not query.strip()):
+            errors.append("q is required")
+        elif not isinstance(query, str):
+            errors.append("q must be a string")
+        elif len(query) > 200:
+            errors.append("q must be less than 200 characters")
+
+        # Validate limit (optional)
+        limit = params.get('limit')
+        if limit is None:
+            limit = min(config.STOP_AUTOCOMPLETE_LIMIT, self.max_limit)
+        else:
+            try:
+                limit = int(limit)
+            except (ValueError, TypeError):
+                limit = None
+            if limit is None or not (1 <= limit <= self.max_limit):
+                errors.append(f"limit must be an integer between 1 and {self.max_limit}")
+
+        # Validate cursor (optional); it must belong to the same query
+        cursor = None
+        if params.get('cursor'):
+            try:
+                cursor = decode_cursor(params['cursor'])
+            except ValueError:
+                errors.append("cursor is invalid")
+            else:
+                if isinstance(query, str) and cursor['query'] != query.strip().lower():
+                    errors.append("cursor does not belong to this query")
+
+        if errors:
+            return False, {'errors': errors}
+
+        validated_data = {
+            'q': query.strip().lower(),
+            'limit': limit,
+            'offset': cursor['offset'] if cursor else 0,
+            'feed_version': cursor['feed_version'] if cursor else None
+        }
+
+        return True, validated_data
+
+
+class BatchStopResolveRequestValidator(BaseValidator):
+    """
+    Validator for batch stop name resolution API requests.
+
+    Validates:
+    - names: array of stop names or partial names (required)
+    - fuzzy: fall back to typo-tolerant matching (optional boolean)
+    - phonetic: names come from speech recognition (optional boolean)
+    """
+
+    def __init__(self, max_batch_size: int = None):
+        self.max_batch_size = max_batch_size or config.STOP_RESOLVE_MAX_BATCH
+
+    def validate(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate batch stop resolution request data.
+
+        Blank names are accepted and simply do not resolve, so a batch job
+        does not fail on one empty field.
+
+        Args:
+            data: Request data dictionary with 'names' array
+
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        if not isinstance(data, dict):
+            return False, {'errors': ['Request data must be a JSON object']}
+
+        if 'names' not in data:
+            return False, {'errors': ['Missing required field: names']}
+
+        names = data.get('names')
+
+        if not isinstance(names, list):
+            return False, {'errors': ['names must be an array']}
+
+        if len(names) == 0:
+            return False, {'errors': ['names array cannot be empty']}
+
+        if len(names) > self.max_batch_size:
+            return False, {
+                'errors': [f'Batch size exceeds maximum of {self.max_batch_size} names']
+            }
+
+        errors = []
+        for idx, name in enumerate(names):
+            if name is not None and not isinstance(name, str):
+                errors.append(f"Name {idx + 1}: stop name must be a string")
+            elif name is not None and len(name) > 200:
+                errors.append(f"Name {idx + 1}: stop name must be less than 200 characters")
+
+        fuzzy = data.get('fuzzy', config.STOP_SEARCH_FUZZY)
+        if not isinstance(fuzzy, bool):
+            errors.append("fuzzy must be a boolean")
+
+        phonetic = data.get('phonetic', False)
+        if not isinstance(phonetic, bool):
+            errors.append("phonetic must be a boolean")
+
+        if errors:
+            return False, {'errors': errors}
+
+        return True, {'names': names, 'fuzzy': fuzzy, 'phonetic': phonetic}
+
+
+class NearbyStopsRequestValidator(BaseValidator):
+    """
+    Validator for nearby stop API requests.
+
+    Validates:
+    - lat: latitude of the point (required)
+    - lon: longitude of the point (required)
+    - limit: stops to return (optional)
+    - radius_km: search radius in kilometres (required if require_radius)
+    """
+
+    def __init__(self, require_radius: bool = False):
+        self.require_radius = require_radius
+
+    def validate_options(self, data: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Validate limit and radius_km.
+
+        Args:
+            data: Request parameters or JSON body
+
+        Returns:
+            Tuple of (list_of_errors, options)
+        """
+        errors = []
+        max_limit = config.NEARBY_STOPS_MAX_LIMIT
+        max_radius = config.NEARBY_STOPS_MAX_RADIUS_KM
+
+        limit = data.get('limit')
+        if limit is None:
+            # Radius searches return every stop in range up to the maximum
+            limit = max_limit if self.require_radius else min(config.NEARBY_STOPS_LIMIT, max_limit)
+        else:
+            try:
+                limit = int(limit)
+            except (ValueError, TypeError):
+                limit = None
+            if limit is None or not (1 <= limit <= max_limit):
+                errors.append(f"limit must be an integer between 1 and {max_limit}")
+
+        radius = data.get('radius_km')
+        if radius is None:
+            if self.require_radius:
+                errors.append("radius_km is required")
+        else:
+            try:
+                radius = float(radius)
+            except (ValueError, TypeError):
+                radius = None
+            if radius is None or not (0 < radius <= max_radius):
+                errors.append(f"radius_km must be a number greater than 0 and at most {max_radius}")
+
+        return errors, {'limit': limit, 'radius_km': radius}
+
+    def validate(self, params: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate nearby stop request parameters.
+
+        Args:
+            params: Request query parameters
+
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        if not isinstance(params, dict):
+            return False, {'errors': ['Request parameters must be provided']}
+
+        errors = []
+
+        is_valid, error = self.validate_latitude(params.get('lat'), field_name='lat')
+        if not is_valid:
+            errors.append(error)
+
+        is_valid, error = self.validate_longitude(params.get('lon'), field_name='lon')
+        if not is_valid:
+            errors.append(error)
+
+        option_errors, options = self.validate_options(params)
+        errors.extend(option_errors)
+
+        if errors:
+            return False, {'errors': errors}
+
+        return True, {'lat': float(params['lat']), 'lon': float(params['lon']), **options}
+
+
+class BatchNearbyStopsRequestValidator(NearbyStopsRequestValidator):
+    """
+    Validator for batch nearby stop API requests.
+
+    Validates an array of points sharing one limit and radius_km.
+    """
+
+    def __init__(self, max_batch_size: int = None, require_radius: bool = False):
+        super().__init__(require_radius=require_radius)
+        self.max_batch_size = max_batch_size or config.NEARBY_STOPS_MAX_BATCH
+
+    def validate(self, data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Validate batch nearby stop request data.
+
+        Args:
+            data: Request data dictionary with 'points' array
+
+        Returns:
+            Tuple of (is_valid, result_dict)
+        """
+        if not isinstance(data, dict):
+            return False, {'errors': ['Request data must be a JSON object']}
+
+        points = data.get('points')
+        if points is None:
+            return False, {'errors': ['Missing required field: points']}
+
+        if not isinstance(points, list):
+            return False, {'errors': ['points must be an array']}
+
+        if len(points) == 0:
+            return False, {'errors': ['points array cannot be empty']}
+
+        if len(points) > self.max_batch_size:
+            return False, {
+                'errors': [f'Batch size exceeds maximum of {self.max_batch_size} points']
+            }
+
+        errors, options = self.validate_options(data)
+
+        # Validate each point in the batch
+        for idx, point in enumerate(points):
+            if not isinstance(point, dict):
+                errors.append(f"Point {idx + 1}: must be an object with lat and lon")
+                continue
+            for validate, field in ((self.validate_latitude, 'lat'), (self.validate_longitude, 'lon')):
+                is_valid, error = validate(point.get(field), field_name=field)
+                if not is_valid:
+                    errors.append(f"Point {idx + 1}: {error}")
+
+        if errors:
+            return False, {'errors': errors}
+
+        return True, {
+            'lat': [float(point['lat']) for point in points],
+            'lon': [float(point['lon']) for point in points],
+            **options
+        }
+
+
 class CoordinateValidator(BaseValidator):
     """
     Standalone validator for coordinate pairs.